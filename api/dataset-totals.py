@@ -14,11 +14,10 @@ from src.etl.postgres import PostgresClient
 
 
 DATABASE_CONFIG = DatabaseConfig.from_env()
-PG_CLIENT = PostgresClient(
-    DATABASE_CONFIG.dsn,
+PG_CLIENT = PostgresClient.from_config(
+    DATABASE_CONFIG,
     application_name="dataset-totals-service",
-    connect_timeout=DATABASE_CONFIG.connect_timeout,
-    statement_timeout_ms=DATABASE_CONFIG.statement_timeout_ms,
+    pool_by_default=True,
 )
 
 
@@ -1,8 +1,11 @@
+import hashlib
 import json
+import os
 import sys
+from datetime import date
 from decimal import Decimal
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 SRC_ROOT = PROJECT_ROOT / "src"
@@ -11,19 +14,85 @@ if str(PROJECT_ROOT) not in sys.path:
 if str(SRC_ROOT) not in sys.path:
     sys.path.append(str(SRC_ROOT))
 
-from src.etl.config import DatabaseConfig
+from src.etl.config import DatabaseConfig, RedisConfig
 from src.etl.postgres import PostgresClient
+from src.etl.rollups import ROLLUP_CELL_X_SQL, ROLLUP_CELL_Y_SQL, CellRange, edge_strips
+from src.redis_cache import RedisCache
+from src.summary_cache import SnappedBounds, SummaryCache
+from src.tiles.cache import TileMemoryCache
 
 
 DATABASE_CONFIG = DatabaseConfig.from_env()
-PG_CLIENT = PostgresClient(
-    DATABASE_CONFIG.dsn,
+PG_CLIENT = PostgresClient.from_config(
+    DATABASE_CONFIG,
     application_name="map-summary-service",
-    connect_timeout=DATABASE_CONFIG.connect_timeout,
-    statement_timeout_ms=DATABASE_CONFIG.statement_timeout_ms,
+    pool_by_default=True,
 )
 
 SUMMARY_ZOOM_THRESHOLD = 12
+SUMMARY_DATASETS = ("parking_tickets", "red_light_locations", "ase_locations")
+# ``dataset=all`` answers the sidebar's three summaries in one request.
+ALL_DATASETS = "all"
+
+# Busiest downtown viewports (west, south, east, north, zoom) warmed after ETL runs.
+PREWARM_VIEWPORTS: Tuple[Tuple[float, float, float, float, float], ...] = (
+    (-79.3900, 43.6440, -79.3700, 43.6540, 15),  # Financial District
+    (-79.3980, 43.6420, -79.3820, 43.6500, 15),  # Entertainment District
+    (-79.3870, 43.6520, -79.3730, 43.6610, 15),  # Yonge-Dundas
+    (-79.4060, 43.6480, -79.3920, 43.6570, 15),  # Kensington / Chinatown
+    (-79.3780, 43.6450, -79.3620, 43.6530, 15),  # St. Lawrence
+    (-79.4300, 43.6340, -79.4100, 43.6440, 15),  # Liberty Village
+    (-79.4200, 43.6350, -79.3500, 43.6700, 13),  # Downtown core overview
+)
+
+
+# ``etl_state`` rows whose writes change a dataset's summaries: the geocode
+# backfill rewrites ticket locations and rollups outside the dataset's own ETL
+# run, and stamps its row after every batch and rollup refresh.
+DATA_VERSION_SLUGS: Dict[str, Tuple[str, ...]] = {
+    "parking_tickets": ("parking_tickets", "parking_tickets_geocode_backfill"),
+}
+
+
+def _data_version(dataset: str) -> str:
+    """Fingerprint of the ETL sync state behind ``dataset``'s summaries."""
+
+    rows = PG_CLIENT.fetch_all(
+        """
+        SELECT dataset_slug, last_resource_hash, last_synced_at
+        FROM etl_state
+        WHERE dataset_slug = ANY(%s)
+        ORDER BY dataset_slug
+        """,
+        (list(DATA_VERSION_SLUGS.get(dataset, (dataset,))),),
+    )
+    return hashlib.blake2b(repr(rows).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _build_summary_cache() -> SummaryCache:
+    redis_cache = None
+    try:
+        redis_config = RedisConfig.from_env()
+    except RuntimeError:
+        redis_config = None
+    if redis_config is not None:
+        redis_cache = RedisCache(
+            redis_config.url,
+            default_ttl_seconds=redis_config.default_ttl_seconds,
+            namespace=f"{redis_config.namespace}:summary",
+        )
+    memory = TileMemoryCache(int(float(os.getenv("SUMMARY_MEMORY_CACHE_MB", "8")) * 1024 * 1024))
+    return SummaryCache(
+        redis_cache,
+        memory,
+        _data_version,
+        ttl_seconds=int(os.getenv("SUMMARY_CACHE_TTL_S", str(6 * 60 * 60))),
+        memory_ttl_seconds=float(os.getenv("SUMMARY_MEMORY_TTL_S", "60")),
+        version_check_interval_seconds=float(os.getenv("SUMMARY_VERSION_CHECK_S", "30")),
+    )
+
+
+SUMMARY_CACHE = _build_summary_cache()
 
 
 def _json(status: int, payload: Dict[str, Any]):
@@ -50,53 +119,97 @@ def _parse_int(value: str | None) -> Optional[int]:
 
 
 def _summarize_parking(bounds: Dict[str, float], filters: Dict[str, Optional[int]]) -> Dict[str, Any]:
-    base_params: List[Any] = [bounds["west"], bounds["south"], bounds["east"], bounds["north"]]
-    where_clauses = ["ST_Intersects(data.geom, bounds.geom)"]
-    filter_params: List[Any] = []
-
-    if filters.get("year") is not None:
-        where_clauses.append("EXTRACT(YEAR FROM data.date_of_infraction) = %s")
-        filter_params.append(filters["year"])
+    """Summarise tickets in ``bounds`` from the rollup plus exact edge rows.
 
-    if filters.get("month") is not None:
-        where_clauses.append("EXTRACT(MONTH FROM data.date_of_infraction) = %s")
-        filter_params.append(filters["month"])
-
-    where_sql = " AND ".join(where_clauses)
-    summary_sql = f"""
-        WITH bounds AS (
-            SELECT ST_MakeEnvelope(%s, %s, %s, %s, 4326) AS geom
-        )
-        SELECT
-            COUNT(*)::BIGINT AS ticket_count,
-            COALESCE(SUM(data.set_fine_amount), 0)::NUMERIC AS total_fines
-        FROM parking_tickets AS data
-        CROSS JOIN bounds
-        WHERE {where_sql}
+    Rollup cells lying entirely inside the viewport are summed from
+    ``parking_ticket_rollup``; raw tickets are only scanned (through the GIST
+    index) in the partially covered cells along the viewport edges, which
+    are queried as up to four strips around the interior cells.
     """
 
-    row = PG_CLIENT.fetch_one(summary_sql, base_params + filter_params)
-    visible_count = int(row[0]) if row and row[0] is not None else 0
-    visible_revenue = float(row[1]) if row and row[1] is not None else 0.0
-
-    top_sql = f"""
-        WITH bounds AS (
-            SELECT ST_MakeEnvelope(%s, %s, %s, %s, 4326) AS geom
+    interior = CellRange.interior(bounds["west"], bounds["south"], bounds["east"], bounds["north"])
+    rollup_clauses: List[str] = []
+    rollup_params: List[Any] = []
+    strips = edge_strips(bounds["west"], bounds["south"], bounds["east"], bounds["north"], interior)
+    edge_clauses = [
+        "(" + " OR ".join("ST_Intersects(data.geom, ST_MakeEnvelope(%s, %s, %s, %s, 4326))" for _ in strips) + ")"
+    ]
+    edge_params: List[Any] = [value for strip in strips for value in strip]
+
+    year = filters.get("year")
+    month = filters.get("month")
+    if month is not None and not 1 <= month <= 12:
+        return {"zoomRestricted": False, "visibleCount": 0, "visibleRevenue": 0.0, "topStreets": []}
+    if year is not None:
+        rollup_clauses.append("rollup.year = %s")
+        rollup_params.append(year)
+        start = date(year, month or 1, 1)
+        end = date(year + 1, 1, 1) if month in (None, 12) else date(year, month + 1, 1)
+        # Date ranges instead of EXTRACT() keep the edge scan sargable.
+        edge_clauses.append("data.date_of_infraction >= %s AND data.date_of_infraction < %s")
+        edge_params.extend([start, end])
+    if month is not None:
+        rollup_clauses.append("rollup.month = %s")
+        rollup_params.append(month)
+        if year is None:
+            edge_clauses.append("EXTRACT(MONTH FROM data.date_of_infraction) = %s")
+            edge_params.append(month)
+
+    if interior is None:
+        rollup_clauses.append("FALSE")
+    else:
+        rollup_clauses.append("rollup.cell_x BETWEEN %s AND %s AND rollup.cell_y BETWEEN %s AND %s")
+        rollup_params.extend([interior.min_x, interior.max_x, interior.min_y, interior.max_y])
+        edge_clauses.append(
+            f"NOT ({ROLLUP_CELL_X_SQL.format(geom='data.geom')} BETWEEN %s AND %s "
+            f"AND {ROLLUP_CELL_Y_SQL.format(geom='data.geom')} BETWEEN %s AND %s)"
+        )
+        edge_params.extend([interior.min_x, interior.max_x, interior.min_y, interior.max_y])
+
+    sql = f"""
+        WITH contributions AS (
+            SELECT
+                rollup.street_key,
+                SUM(rollup.ticket_count)::BIGINT AS ticket_count,
+                SUM(rollup.total_fines)::NUMERIC AS total_fines,
+                MAX(rollup.sample_location) AS sample_location
+            FROM parking_ticket_rollup AS rollup
+            WHERE {" AND ".join(rollup_clauses)}
+            GROUP BY rollup.street_key
+            UNION ALL
+            SELECT
+                COALESCE(NULLIF(data.street_normalized, ''), 'Unknown') AS street_key,
+                COUNT(*)::BIGINT AS ticket_count,
+                COALESCE(SUM(data.set_fine_amount), 0)::NUMERIC AS total_fines,
+                MAX(data.location1) AS sample_location
+            FROM parking_tickets AS data
+            WHERE {" AND ".join(edge_clauses)}
+            GROUP BY 1
+        ), streets AS (
+            SELECT
+                street_key,
+                SUM(ticket_count)::BIGINT AS ticket_count,
+                SUM(total_fines)::NUMERIC AS total_fines,
+                MAX(sample_location) AS sample_location
+            FROM contributions
+            GROUP BY street_key
         )
         SELECT
-            COALESCE(NULLIF(data.street_normalized, ''), 'Unknown') AS street_key,
-            COUNT(*)::BIGINT AS ticket_count,
-            COALESCE(SUM(data.set_fine_amount), 0)::NUMERIC AS total_fines,
-            MAX(data.location1) AS sample_location
-        FROM parking_tickets AS data
-        CROSS JOIN bounds
-        WHERE {where_sql}
-        GROUP BY street_key
+            street_key,
+            ticket_count,
+            total_fines,
+            sample_location,
+            SUM(ticket_count) OVER ()::BIGINT AS visible_count,
+            SUM(total_fines) OVER ()::NUMERIC AS visible_revenue
+        FROM streets
         ORDER BY total_fines DESC, ticket_count DESC
         LIMIT 5
     """
 
-    rows = PG_CLIENT.fetch_all(top_sql, base_params + filter_params)
+    params = [*rollup_params, *edge_params]
+    rows = PG_CLIENT.fetch_all(sql, params)
+    visible_count = int(rows[0][4] or 0) if rows else 0
+    visible_revenue = float(rows[0][5] or 0) if rows else 0.0
     top_streets = [
         {
             "name": street if street else "Unknown",
@@ -104,7 +217,7 @@ def _summarize_parking(bounds: Dict[str, float], filters: Dict[str, Optional[int
             "totalRevenue": float(total_fines or Decimal("0")),
             "sampleLocation": sample or street or "Unknown",
         }
-        for street, ticket_count, total_fines, sample in rows
+        for street, ticket_count, total_fines, sample, _, _ in rows
     ]
 
     return {
@@ -115,7 +228,30 @@ def _summarize_parking(bounds: Dict[str, float], filters: Dict[str, Optional[int
     }
 
 
-def _summarize_red_light(bounds: Dict[str, float], filters: Dict[str, Optional[int]]) -> Dict[str, Any]:
+CAMERA_SUMMARY_SOURCES: Dict[str, Dict[str, str]] = {
+    "red_light_locations": {
+        "table": "red_light_camera_locations",
+        "label_sql": """
+            COALESCE(NULLIF(data.location_name, ''),
+                     CONCAT_WS(' & ', NULLIF(data.linear_name_full_1, ''), NULLIF(data.linear_name_full_2, '')),
+                     'Unknown')
+        """,
+    },
+    "ase_locations": {
+        "table": "ase_camera_locations",
+        "label_sql": "COALESCE(NULLIF(data.location, ''), data.location_code, 'Unknown')",
+    },
+}
+
+
+def _summarize_camera(dataset: str, bounds: Dict[str, float], filters: Dict[str, Optional[int]]) -> Dict[str, Any]:
+    """Totals and top-5 locations for a camera dataset in a single scan.
+
+    Locations are grouped once; the visible totals come from window sums over
+    those groups, evaluated before ``LIMIT`` trims the list to five.
+    """
+
+    source = CAMERA_SUMMARY_SOURCES[dataset]
     base_params: List[Any] = [bounds["west"], bounds["south"], bounds["east"], bounds["north"]]
     where_clauses = ["ST_Intersects(data.geom, bounds.geom)"]
     filter_params: List[Any] = []
@@ -129,41 +265,33 @@ def _summarize_red_light(bounds: Dict[str, float], filters: Dict[str, Optional[i
         filter_params.append(filters["month"])
 
     where_sql = " AND ".join(where_clauses)
-    summary_sql = f"""
-        WITH bounds AS (
-            SELECT ST_MakeEnvelope(%s, %s, %s, %s, 4326) AS geom
-        )
-        SELECT
-            COALESCE(SUM(data.ticket_count), 0)::BIGINT AS ticket_count,
-            COALESCE(SUM(data.total_fine_amount), 0)::NUMERIC AS total_fines
-        FROM red_light_camera_locations AS data
-        CROSS JOIN bounds
-        WHERE {where_sql}
-    """
-
-    row = PG_CLIENT.fetch_one(summary_sql, base_params + filter_params)
-    visible_count = int(row[0]) if row and row[0] is not None else 0
-    visible_revenue = float(row[1]) if row and row[1] is not None else 0.0
-
-    top_sql = f"""
+    sql = f"""
         WITH bounds AS (
             SELECT ST_MakeEnvelope(%s, %s, %s, %s, 4326) AS geom
+        ), locations AS (
+            SELECT
+                {source["label_sql"]} AS location_label,
+                COALESCE(SUM(data.ticket_count), 0)::BIGINT AS ticket_count,
+                COALESCE(SUM(data.total_fine_amount), 0)::NUMERIC AS total_fines
+            FROM {source["table"]} AS data
+            CROSS JOIN bounds
+            WHERE {where_sql}
+            GROUP BY location_label
         )
         SELECT
-            COALESCE(NULLIF(data.location_name, ''),
-                     CONCAT_WS(' & ', NULLIF(data.linear_name_full_1, ''), NULLIF(data.linear_name_full_2, '')),
-                     'Unknown') AS location_label,
-            COALESCE(SUM(data.ticket_count), 0)::BIGINT AS ticket_count,
-            COALESCE(SUM(data.total_fine_amount), 0)::NUMERIC AS total_fines
-        FROM red_light_camera_locations AS data
-        CROSS JOIN bounds
-        WHERE {where_sql}
-        GROUP BY location_label
+            location_label,
+            ticket_count,
+            total_fines,
+            SUM(ticket_count) OVER ()::BIGINT AS visible_count,
+            SUM(total_fines) OVER ()::NUMERIC AS visible_revenue
+        FROM locations
         ORDER BY total_fines DESC, ticket_count DESC
         LIMIT 5
     """
 
-    rows = PG_CLIENT.fetch_all(top_sql, base_params + filter_params)
+    rows = PG_CLIENT.fetch_all(sql, base_params + filter_params)
+    visible_count = int(rows[0][3] or 0) if rows else 0
+    visible_revenue = float(rows[0][4] or 0) if rows else 0.0
     top_streets = [
         {
             "name": label,
@@ -171,7 +299,7 @@ def _summarize_red_light(bounds: Dict[str, float], filters: Dict[str, Optional[i
             "totalRevenue": float(total_fines or Decimal("0")),
             "sampleLocation": label,
         }
-        for label, ticket_count, total_fines in rows
+        for label, ticket_count, total_fines, _, _ in rows
     ]
 
     return {
@@ -182,68 +310,24 @@ def _summarize_red_light(bounds: Dict[str, float], filters: Dict[str, Optional[i
     }
 
 
-def _summarize_ase(bounds: Dict[str, float], filters: Dict[str, Optional[int]]) -> Dict[str, Any]:
-    base_params: List[Any] = [bounds["west"], bounds["south"], bounds["east"], bounds["north"]]
-    where_clauses = ["ST_Intersects(data.geom, bounds.geom)"]
-    filter_params: List[Any] = []
+def _summarize_red_light(bounds: Dict[str, float], filters: Dict[str, Optional[int]]) -> Dict[str, Any]:
+    return _summarize_camera("red_light_locations", bounds, filters)
 
-    if filters.get("year") is not None:
-        where_clauses.append("COALESCE(data.years, ARRAY[]::INT[]) @> ARRAY[%s]::INT[]")
-        filter_params.append(filters["year"])
 
-    if filters.get("month") is not None:
-        where_clauses.append("COALESCE(data.months, ARRAY[]::INT[]) @> ARRAY[%s]::INT[]")
-        filter_params.append(filters["month"])
+def _summarize_ase(bounds: Dict[str, float], filters: Dict[str, Optional[int]]) -> Dict[str, Any]:
+    return _summarize_camera("ase_locations", bounds, filters)
 
-    where_sql = " AND ".join(where_clauses)
-    summary_sql = f"""
-        WITH bounds AS (
-            SELECT ST_MakeEnvelope(%s, %s, %s, %s, 4326) AS geom
-        )
-        SELECT
-            COALESCE(SUM(data.ticket_count), 0)::BIGINT AS ticket_count,
-            COALESCE(SUM(data.total_fine_amount), 0)::NUMERIC AS total_fines
-        FROM ase_camera_locations AS data
-        CROSS JOIN bounds
-        WHERE {where_sql}
-    """
 
-    row = PG_CLIENT.fetch_one(summary_sql, base_params + filter_params)
-    visible_count = int(row[0]) if row and row[0] is not None else 0
-    visible_revenue = float(row[1]) if row and row[1] is not None else 0.0
+def _combine_summaries(summaries: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """``dataset=all`` payload: the per-dataset summaries, side by side.
 
-    top_sql = f"""
-        WITH bounds AS (
-            SELECT ST_MakeEnvelope(%s, %s, %s, %s, 4326) AS geom
-        )
-        SELECT
-            COALESCE(NULLIF(data.location, ''), data.location_code, 'Unknown') AS location_label,
-            COALESCE(SUM(data.ticket_count), 0)::BIGINT AS ticket_count,
-            COALESCE(SUM(data.total_fine_amount), 0)::NUMERIC AS total_fines
-        FROM ase_camera_locations AS data
-        CROSS JOIN bounds
-        WHERE {where_sql}
-        GROUP BY location_label
-        ORDER BY total_fines DESC, ticket_count DESC
-        LIMIT 5
+    There are no overall totals: tickets and camera charges are different
+    units, so adding them would mean nothing.
     """
 
-    rows = PG_CLIENT.fetch_all(top_sql, base_params + filter_params)
-    top_streets = [
-        {
-            "name": label,
-            "ticketCount": int(ticket_count or 0),
-            "totalRevenue": float(total_fines or Decimal("0")),
-            "sampleLocation": label,
-        }
-        for label, ticket_count, total_fines in rows
-    ]
-
     return {
-        "zoomRestricted": False,
-        "visibleCount": visible_count,
-        "visibleRevenue": visible_revenue,
-        "topStreets": top_streets,
+        "zoomRestricted": any(summary.get("zoomRestricted", False) for summary in summaries.values()),
+        "datasets": summaries,
     }
 
 
@@ -254,13 +338,61 @@ def _summarize_dataset(dataset: str, bounds: Dict[str, float], filters: Dict[str
         return _summarize_red_light(bounds, filters)
     if dataset == "ase_locations":
         return _summarize_ase(bounds, filters)
+    if dataset == ALL_DATASETS:
+        return _combine_summaries({name: _summarize_dataset(name, bounds, filters) for name in SUMMARY_DATASETS})
     raise ValueError(f"Unsupported dataset '{dataset}'")
 
 
+def summarize_cached(
+    dataset: str,
+    bounds: Dict[str, float],
+    zoom: float,
+    filters: Dict[str, Optional[int]],
+) -> Dict[str, Any]:
+    """Summarise the viewport snapped to the cache grid, reusing cached results.
+
+    ``dataset=all`` is assembled from the per-dataset entries, so it shares
+    (and warms) the cache with single-dataset requests.
+    """
+
+    if dataset == ALL_DATASETS:
+        return _combine_summaries({name: summarize_cached(name, bounds, zoom, filters) for name in SUMMARY_DATASETS})
+    if dataset not in SUMMARY_DATASETS:
+        raise ValueError(f"Unsupported dataset '{dataset}'")
+    snapped = SnappedBounds.from_bounds(bounds, zoom)
+    return SUMMARY_CACHE.get_or_compute(
+        dataset,
+        snapped,
+        filters,
+        lambda: _summarize_dataset(dataset, snapped.to_bounds(), filters),
+    )
+
+
+def prewarm_summaries(
+    viewports=PREWARM_VIEWPORTS,
+    *,
+    datasets: Tuple[str, ...] = SUMMARY_DATASETS,
+    years: Tuple[Optional[int], ...] = (None,),
+) -> int:
+    """Populate the summary cache for ``viewports``; returns entries touched."""
+
+    warmed = 0
+    for west, south, east, north, zoom in viewports:
+        bounds = {"west": west, "south": south, "east": east, "north": north}
+        for dataset in datasets:
+            for year in years:
+                summarize_cached(dataset, bounds, zoom, {"year": year, "month": None})
+                warmed += 1
+    return warmed
+
+
 def handler(request):
     if request.method != "GET":
         return _json(405, {"error": "Method not allowed"})
 
+    if request.args.get("stats") == "1":
+        return _json(200, {"cache": SUMMARY_CACHE.stats()})
+
     dataset = request.args.get("dataset", "parking_tickets")
     west = _parse_float(request.args.get("west"))
     south = _parse_float(request.args.get("south"))
@@ -282,7 +414,7 @@ def handler(request):
     bounds = {"west": west, "south": south, "east": east, "north": north}
 
     try:
-        summary = _summarize_dataset(dataset, bounds, filters)
+        summary = summarize_cached(dataset, bounds, zoom, filters)
     except ValueError as exc:
         return _json(400, {"error": str(exc)})
     except Exception as exc:  # pragma: no cover - defensive
@@ -1,3 +1,4 @@
+import base64
 import json
 import os
 import sys
@@ -14,16 +15,27 @@ from src.etl.config import DatabaseConfig, RedisConfig
 from src.etl.postgres import PostgresClient
 from src.redis_cache import RedisCache
 from src.tiles import TileService
+from src.tiles.cache import TwoTierTileCache
+from src.tiles.encoding import (
+    ENCODING_GZIP,
+    ENCODING_IDENTITY,
+    EncodedTile,
+    available_encodings,
+    etag_matches,
+    negotiate_encoding,
+    pack_variant,
+    unpack_variant,
+)
+from src.tiles.singleflight import RedisSingleFlight, SingleFlight
 
 
 DATABASE_CONFIG = DatabaseConfig.from_env()
 REDIS_CONFIG = RedisConfig.from_env()
 
-PG_CLIENT = PostgresClient(
-    DATABASE_CONFIG.dsn,
+PG_CLIENT = PostgresClient.from_config(
+    DATABASE_CONFIG,
     application_name="tiles-service",
-    connect_timeout=DATABASE_CONFIG.connect_timeout,
-    statement_timeout_ms=DATABASE_CONFIG.statement_timeout_ms,
+    pool_by_default=True,
 )
 TILE_SERVICE = TileService(pg=PG_CLIENT)
 CACHE = RedisCache(
@@ -31,6 +43,17 @@ CACHE = RedisCache(
     default_ttl_seconds=REDIS_CONFIG.default_ttl_seconds,
     namespace=f"{REDIS_CONFIG.namespace}:tiles",
 )
+TILE_CACHE = TwoTierTileCache.with_budget(
+    CACHE,
+    max_megabytes=float(os.getenv("TILES_MEMORY_CACHE_MB", "64")),
+    version_check_interval_seconds=float(os.getenv("TILES_VERSION_CHECK_S", "5")),
+)
+LOCAL_FLIGHT = SingleFlight()
+REDIS_FLIGHT = RedisSingleFlight(
+    CACHE,
+    lease_ms=int(os.getenv("TILES_RENDER_LEASE_MS", "5000")),
+    empty_ttl_seconds=int(os.getenv("TILES_EMPTY_TTL_S", "30")),
+)
 
 
 def _json(status: int, payload: dict, *, headers: dict | None = None):
@@ -40,10 +63,168 @@ def _json(status: int, payload: dict, *, headers: dict | None = None):
     return status, base_headers, json.dumps(payload)
 
 
+MAX_BATCH_TILES = int(os.getenv("TILES_MAX_BATCH", "64"))
+
+
+def _parse_tile_list(raw: str) -> list[tuple[int, int, int]]:
+    coordinates: list[tuple[int, int, int]] = []
+    for token in raw.split(","):
+        token = token.strip()
+        if not token:
+            continue
+        z, x, y = (int(part) for part in token.split("/"))
+        coordinates.append((z, x, y))
+    return coordinates
+
+
+def _header(request, name: str) -> str | None:
+    headers = getattr(request, "headers", None) or {}
+    return headers.get(name) or headers.get(name.lower())
+
+
+def _store_encoded(dataset: str, z: int, x: int, y: int, tile: EncodedTile) -> None:
+    for encoding, body in tile.variants.items():
+        TILE_CACHE.set(dataset, z, x, y, pack_variant(tile.etag, body), variant=encoding)
+
+
+def _load_encoded(dataset: str, z: int, x: int, y: int, encoding: str) -> EncodedTile | None:
+    variant = ENCODING_GZIP if encoding == ENCODING_IDENTITY else encoding
+    envelope = TILE_CACHE.get(dataset, z, x, y, variant=variant)
+    unpacked = unpack_variant(envelope) if envelope is not None else None
+    if unpacked is None:
+        return None
+    etag, body = unpacked
+    return EncodedTile(etag=etag, variants={variant: body})
+
+
+def _flight_key(dataset: str, z: int, x: int, y: int) -> tuple[str, str, str, str]:
+    return (dataset, str(z), str(x), str(y))
+
+
+def _render_tile(dataset: str, z: int, x: int, y: int, encoding: str) -> EncodedTile | None:
+    """Render a tile once across threads and workers, populating Redis."""
+
+    cache_key = _flight_key(dataset, z, x, y)
+
+    def render() -> EncodedTile | None:
+        raw = TILE_SERVICE.get_tile(dataset, z, x, y)
+        if raw is None:
+            return None
+        tile = EncodedTile.from_raw(raw)
+        _store_encoded(dataset, z, x, y, tile)
+        return tile
+
+    return LOCAL_FLIGHT.do(
+        (*cache_key, encoding),
+        lambda: REDIS_FLIGHT.do(cache_key, render, lambda: _load_encoded(dataset, z, x, y, encoding)),
+    )
+
+
+def _tile_response(request, tile: EncodedTile, encoding: str):
+    headers = {
+        "Content-Type": "application/x-protobuf",
+        "Cache-Control": "public, max-age=86400, immutable",
+        "ETag": f'"{tile.etag_for(encoding)}"',
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(_header(request, "If-None-Match"), tile.etag_for(encoding)):
+        return 304, headers, b""
+    body = tile.body_for(encoding)
+    if body is None:
+        return _json(500, {"error": "Cached tile is missing the requested encoding"})
+    if encoding != ENCODING_IDENTITY:
+        headers["Content-Encoding"] = encoding
+    return 200, headers, body
+
+
+def render_stats() -> dict:
+    """Counters describing how many cold renders were coalesced."""
+
+    local = LOCAL_FLIGHT.stats()
+    remote = REDIS_FLIGHT.stats()
+    return {
+        "inProcess": local,
+        "crossWorker": remote,
+        "rendersSaved": local["coalesced"] + remote["served_from_peer"] + remote["served_empty"],
+        "cache": TILE_CACHE.stats(),
+        "encodings": list(available_encodings()),
+    }
+
+
+def _batch_handler(request):
+    """Serve a viewport of tiles with one Redis MGET and one SQL query.
+
+    Tiles are returned as base64 of their gzip variant; ``encoding`` in the
+    payload tells clients to inflate them before decoding the MVT.  Empty
+    tiles share the single-tile route's empty markers, so neither route
+    re-renders a tile the other just found empty.
+    """
+
+    dataset = request.args.get("dataset", "parking_tickets")
+    try:
+        coordinates = list(dict.fromkeys(_parse_tile_list(request.args.get("tiles") or "")))
+    except (TypeError, ValueError):
+        return _json(400, {"error": "Invalid tile coordinates"})
+    if not coordinates:
+        return _json(400, {"error": "At least one tile is required"})
+    if len(coordinates) > MAX_BATCH_TILES:
+        return _json(400, {"error": f"At most {MAX_BATCH_TILES} tiles per request"})
+
+    cached_values = TILE_CACHE.get_many(dataset, coordinates, variant=ENCODING_GZIP)
+    tiles: dict[tuple[int, int, int], bytes | None] = {}
+    missing: list[tuple[int, int, int]] = []
+    for coord, cached in zip(coordinates, cached_values):
+        unpacked = unpack_variant(cached) if cached is not None else None
+        if unpacked is not None:
+            tiles[coord] = unpacked[1]
+        else:
+            missing.append(coord)
+
+    if missing:
+        known_empty = REDIS_FLIGHT.known_empty([_flight_key(dataset, *coord) for coord in missing])
+        missing = [coord for coord, empty in zip(missing, known_empty) if not empty]
+
+    if missing:
+        try:
+            rendered = TILE_SERVICE.get_tiles(dataset, missing)
+        except ValueError as exc:
+            return _json(400, {"error": str(exc)})
+        except Exception as exc:  # pragma: no cover - defensive
+            return _json(500, {"error": str(exc)})
+        encoded = {coord: EncodedTile.from_raw(raw) for coord, raw in rendered.items() if raw is not None}
+        for encoding in available_encodings():
+            TILE_CACHE.set_many(
+                dataset,
+                {coord: pack_variant(tile.etag, tile.variants[encoding]) for coord, tile in encoded.items()},
+                variant=encoding,
+            )
+        REDIS_FLIGHT.mark_empty([_flight_key(dataset, *coord) for coord in missing if coord not in encoded])
+        for coord in missing:
+            tile = encoded.get(coord)
+            tiles[coord] = tile.variants[ENCODING_GZIP] if tile is not None else None
+
+    payload = {
+        "dataset": dataset,
+        "encoding": ENCODING_GZIP,
+        "tiles": {
+            f"{z}/{x}/{y}": (
+                base64.b64encode(tiles[(z, x, y)]).decode("ascii") if tiles.get((z, x, y)) is not None else None
+            )
+            for z, x, y in coordinates
+        },
+    }
+    return _json(200, payload, headers={"Cache-Control": "public, max-age=300"})
+
+
 def handler(request):  # Vercel-style handler
     if request.method != "GET":
         return _json(405, {"error": "Method not allowed"})
 
+    if request.args.get("tiles"):
+        return _batch_handler(request)
+    if request.args.get("stats"):
+        return _json(200, render_stats(), headers={"Cache-Control": "no-store"})
+
     try:
         dataset = request.args.get("dataset", "parking_tickets")
         z = int(request.args.get("z"))
@@ -52,27 +233,17 @@ def handler(request):  # Vercel-style handler
     except (TypeError, ValueError):
         return _json(400, {"error": "Invalid tile coordinates"})
 
-    cache_key = (dataset, str(z), str(x), str(y))
-    cached = CACHE.get(*cache_key)
+    encoding = negotiate_encoding(_header(request, "Accept-Encoding"))
+    cached = _load_encoded(dataset, z, x, y, encoding)
     if cached is not None:
-        headers = {
-            "Content-Type": "application/x-protobuf",
-            "Cache-Control": "public, max-age=86400, immutable",
-        }
-        return 200, headers, cached
+        return _tile_response(request, cached, encoding)
 
     try:
-        tile = TILE_SERVICE.get_tile(dataset, z, x, y)
+        tile = _render_tile(dataset, z, x, y, encoding)
     except Exception as exc:  # pragma: no cover - defensive
         return _json(500, {"error": str(exc)})
 
     if tile is None:
         return 204, {"Cache-Control": "public, max-age=300"}, b""
 
-    CACHE.set(tile, *cache_key, ttl=REDIS_CONFIG.default_ttl_seconds)
-
-    headers = {
-        "Content-Type": "application/x-protobuf",
-        "Cache-Control": "public, max-age=86400, immutable",
-    }
-    return 200, headers, tile
+    return _tile_response(request, tile, encoding)
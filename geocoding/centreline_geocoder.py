@@ -6,13 +6,28 @@ Single Responsibility: map Toronto street addresses to centreline geometry.
 from __future__ import annotations
 
 import difflib
+import json
 import math
+import os
+import pickle
 import re
+import threading
+import time
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, MutableMapping, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from .geocode_workers import geocode_in_pool
+from .intersection_index import IntersectionIndex, distance_metres
+
+# Bump when a change alters geocode output, so persisted results are recomputed.
+GEOCODER_VERSION = "2"
+# Bump when the pickled index layout changes, so older snapshots are rebuilt.
+_SNAPSHOT_FORMAT = 2
+
 # MARK: Data structures
 
 
@@ -29,6 +44,29 @@ class GeocodeResult:
     jurisdiction: Optional[str]
 
 
+@dataclass(frozen=True)
+class BatchGeocodeStats:
+    """Counters reported by :meth:`CentrelineGeocoder.batch_geocode_with_stats`."""
+
+    addresses: int
+    unique_addresses: int
+    cache_hits: int
+    geocoded: int
+    resolved: int
+    workers: int
+    elapsed_seconds: float
+
+    @property
+    def addresses_per_second(self) -> float:
+        return self.addresses / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def duplicate_hits(self) -> int:
+        """Inputs answered by another occurrence of the same address."""
+
+        return self.addresses - self.unique_addresses
+
+
 @dataclass(frozen=True)
 class CentrelineSegment:
     """Simplified view of a centreline record."""
@@ -108,6 +146,13 @@ _DIRECTIONS = {
 _TOKEN_PATTERN = re.compile(r"[^A-Z0-9]+")
 _NUMBER_PATTERN = re.compile(r"^(\d+)([A-Z]?)$")
 
+# Fuzzy street matching: strict pass first, then the relaxed one.
+_FUZZY_CUTOFFS = (0.88, 0.82)
+# Characters counted individually by the fuzzy candidate index; anything else
+# shares the final slot, which can only over-estimate the overlap.
+_INDEX_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 "
+_INDEX_SLOTS = {char: slot for slot, char in enumerate(_INDEX_ALPHABET)}
+
 
 def normalize_text(value: str) -> str:
     """Upper-case alphanumeric text with collapsed whitespace."""
@@ -144,6 +189,13 @@ class CentrelineGeocoder:
         self._segments_by_key = self._build_index(centreline_df)
         self._street_keys = list(self._segments_by_key.keys())
         self._fuzzy_cache: Dict[str, Optional[str]] = {}
+        self._compact_keys: Dict[str, str] = {}
+        for street_key in self._street_keys:
+            self._compact_keys.setdefault(street_key.replace(" ", ""), street_key)
+        self._key_char_counts = np.array(
+            [_char_counts(street_key) for street_key in self._street_keys], dtype=np.int32
+        ).reshape(len(self._street_keys), len(_INDEX_ALPHABET) + 1)
+        self._key_lengths = np.array([len(street_key) for street_key in self._street_keys], dtype=np.int32)
 
     # ------------------------------------------------------------------
     # Public API
@@ -186,40 +238,222 @@ class CentrelineGeocoder:
 
         return None
 
-    def batch_geocode(self, addresses: Iterable[str]) -> List[Optional[GeocodeResult]]:
-        """Geocode multiple addresses in order."""
+    def batch_geocode(
+        self,
+        addresses: Iterable[str],
+        *,
+        workers: int = 1,
+        chunk_size: int = 500,
+        cache: Optional[MutableMapping[str, Optional[GeocodeResult]]] = None,
+        snapshot_path: Optional[Path] = None,
+    ) -> List[Optional[GeocodeResult]]:
+        """Geocode multiple addresses in order (see :meth:`batch_geocode_with_stats`)."""
+
+        results, _ = self.batch_geocode_with_stats(
+            addresses,
+            workers=workers,
+            chunk_size=chunk_size,
+            cache=cache,
+            snapshot_path=snapshot_path,
+        )
+        return results
 
-        return [self.geocode(address) if isinstance(address, str) else None for address in addresses]
+    def batch_geocode_with_stats(
+        self,
+        addresses: Iterable[str],
+        *,
+        workers: int = 1,
+        chunk_size: int = 500,
+        cache: Optional[MutableMapping[str, Optional[GeocodeResult]]] = None,
+        snapshot_path: Optional[Path] = None,
+    ) -> Tuple[List[Optional[GeocodeResult]], BatchGeocodeStats]:
+        """Geocode ``addresses`` once per distinct value, optionally across processes.
+
+        Results come back in input order; non-string inputs map to ``None``.
+        ``cache`` (any mutable mapping, e.g. a dict kept across calls) answers
+        addresses seen before and receives the new results.  With
+        ``workers > 1`` the remaining addresses are sharded in ``chunk_size``
+        chunks over a process pool: forked workers share this index
+        copy-on-write, spawned ones load ``snapshot_path`` (or unpickle the
+        index when no snapshot is given).
+        """
+
+        started = time.perf_counter()
+        inputs = list(addresses)
+        unique = list(dict.fromkeys(address for address in inputs if isinstance(address, str)))
+
+        resolved_by_address: Dict[str, Optional[GeocodeResult]] = {}
+        pending: List[str] = []
+        for address in unique:
+            if cache is not None and address in cache:
+                resolved_by_address[address] = cache[address]
+            else:
+                pending.append(address)
+        cache_hits = len(unique) - len(pending)
+
+        worker_count = max(1, min(workers, -(-len(pending) // max(1, chunk_size))))
+        if worker_count == 1:
+            geocoded = [self.geocode(address) for address in pending]
+        else:
+            geocoded = geocode_in_pool(self, pending, worker_count, max(1, chunk_size), snapshot_path)
+
+        for address, result in zip(pending, geocoded):
+            resolved_by_address[address] = result
+            if cache is not None:
+                cache[address] = result
+
+        results = [resolved_by_address.get(address) if isinstance(address, str) else None for address in inputs]
+        stats = BatchGeocodeStats(
+            addresses=len(inputs),
+            unique_addresses=len(unique),
+            cache_hits=cache_hits,
+            geocoded=len(pending),
+            resolved=sum(result is not None for result in results),
+            workers=worker_count,
+            elapsed_seconds=time.perf_counter() - started,
+        )
+        return results, stats
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+    def save_snapshot(self, path: Path) -> None:
+        """Pickle the built index to ``path`` (written atomically)."""
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with temp_path.open("wb") as handle:
+            pickle.dump((GEOCODER_VERSION, _SNAPSHOT_FORMAT, self), handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load_snapshot(cls, path: Path) -> Optional["CentrelineGeocoder"]:
+        """Return the geocoder pickled at ``path``; ``None`` if missing or stale."""
+
+        try:
+            with path.open("rb") as handle:
+                version, snapshot_format, geocoder = pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ValueError, TypeError):
+            return None
+        if version != GEOCODER_VERSION or snapshot_format != _SNAPSHOT_FORMAT or not isinstance(geocoder, cls):
+            return None
+        return geocoder
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_fuzzy_cache"] = {}
+        return state
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
     def _build_index(self, df: pd.DataFrame) -> Dict[str, List[CentrelineSegment]]:
-        index: Dict[str, List[CentrelineSegment]] = {}
+        """Group segments by street key in one columnar pass over ``df``.
 
-        for _, row in df.iterrows():
-            street_label = self._compose_label(row)
-            street_key = normalize_street_name(street_label)
-            centroid = self._compute_centroid(row.get("geometry"))
+        Centroids come from ``CENTROID_LAT``/``CENTROID_LON`` and endpoints
+        from ``START_LAT``/``START_LON``/``END_LAT``/``END_LON`` when the
+        caller computed them (e.g. in SQL); otherwise both come from the
+        ``geometry`` column, given as GeoJSON dicts or strings.  Endpoints
+        feed the intersection index.
+        """
+
+        index: Dict[str, List[CentrelineSegment]] = {}
+        row_count = len(df)
+
+        def column(name: str) -> List[Any]:
+            if name not in df.columns:
+                return [None] * row_count
+            return df[name].tolist()
+
+        geometries: Optional[List[Any]] = None
+        if "CENTROID_LAT" in df.columns and "CENTROID_LON" in df.columns:
+            centroids = [_coordinate(lat, lon) for lat, lon in zip(column("CENTROID_LAT"), column("CENTROID_LON"))]
+        else:
+            geometries = [json.loads(geometry) if isinstance(geometry, str) else geometry for geometry in column("geometry")]
+            centroids = [self._compute_centroid(geometry) for geometry in geometries]
+
+        if "START_LAT" in df.columns and "END_LAT" in df.columns:
+            endpoints = [
+                (_coordinate(start_lat, start_lon), _coordinate(end_lat, end_lon))
+                for start_lat, start_lon, end_lat, end_lon in zip(
+                    column("START_LAT"), column("START_LON"), column("END_LAT"), column("END_LON")
+                )
+            ]
+        else:
+            if geometries is None:
+                geometries = [
+                    json.loads(geometry) if isinstance(geometry, str) else geometry for geometry in column("geometry")
+                ]
+            endpoints = [self._compute_endpoints(geometry) for geometry in geometries]
+        segment_endpoints: List[Tuple[CentrelineSegment, Tuple[Optional[Tuple[float, float]], ...]]] = []
+
+        labels = [
+            self._compose_label_parts(base, suffix, direction, full)
+            for base, suffix, direction, full in zip(
+                column("LINEAR_NAME"),
+                column("LINEAR_NAME_TYPE"),
+                column("LINEAR_NAME_DIR"),
+                column("LINEAR_NAME_FULL"),
+            )
+        ]
+        street_keys: Dict[str, str] = {}
+        centreline_ids = column("CENTRELINE_ID") if "CENTRELINE_ID" in df.columns else [0] * row_count
+
+        for (
+            centreline_id,
+            street_label,
+            parity_left,
+            parity_right,
+            low_even,
+            high_even,
+            low_odd,
+            high_odd,
+            feature_code,
+            feature_code_desc,
+            jurisdiction,
+            centroid,
+            segment_ends,
+        ) in zip(
+            centreline_ids,
+            labels,
+            column("PARITY_L"),
+            column("PARITY_R"),
+            column("LOW_NUM_EVEN"),
+            column("HIGH_NUM_EVEN"),
+            column("LOW_NUM_ODD"),
+            column("HIGH_NUM_ODD"),
+            column("FEATURE_CODE"),
+            column("FEATURE_CODE_DESC"),
+            column("JURISDICTION"),
+            centroids,
+            endpoints,
+        ):
+            street_key = street_keys.get(street_label)
+            if street_key is None:
+                street_key = street_keys[street_label] = normalize_street_name(street_label)
 
             segment = CentrelineSegment(
-                centreline_id=int(row.get("CENTRELINE_ID", 0)),
+                centreline_id=int(centreline_id),
                 street_key=street_key,
                 street_label=street_label,
-                parity_left=self._safe_upper(row.get("PARITY_L")),
-                parity_right=self._safe_upper(row.get("PARITY_R")),
-                low_even=self._safe_int(row.get("LOW_NUM_EVEN")),
-                high_even=self._safe_int(row.get("HIGH_NUM_EVEN")),
-                low_odd=self._safe_int(row.get("LOW_NUM_ODD")),
-                high_odd=self._safe_int(row.get("HIGH_NUM_ODD")),
-                feature_code=self._safe_int(row.get("FEATURE_CODE")),
-                feature_code_desc=row.get("FEATURE_CODE_DESC"),
-                jurisdiction=self._safe_str(row.get("JURISDICTION")),
+                parity_left=self._safe_upper(parity_left),
+                parity_right=self._safe_upper(parity_right),
+                low_even=self._safe_int(low_even),
+                high_even=self._safe_int(high_even),
+                low_odd=self._safe_int(low_odd),
+                high_odd=self._safe_int(high_odd),
+                feature_code=self._safe_int(feature_code),
+                feature_code_desc=feature_code_desc,
+                jurisdiction=self._safe_str(jurisdiction),
                 centroid=centroid,
             )
 
             index.setdefault(street_key, []).append(segment)
+            segment_endpoints.append((segment, segment_ends))
 
+        self._intersection_index = IntersectionIndex(segment_endpoints)
         return index
 
     def _parse_address(self, address: str) -> Optional[Tuple[int, str, bool]]:
@@ -306,43 +540,65 @@ class CentrelineGeocoder:
         return closest_segment
 
     def _lookup_segments(self, street_key: str) -> List[CentrelineSegment]:
-        candidates = self._segments_by_key.get(street_key)
-        if candidates:
-            return candidates
+        resolved_key = self._resolve_street_key(street_key)
+        if resolved_key is None:
+            return []
+        return self._segments_by_key.get(resolved_key, [])
+
+    def _resolve_street_key(self, street_key: str) -> Optional[str]:
+        """Indexed street key for ``street_key``: exact, undirected, unspaced, then fuzzy."""
+
+        if street_key in self._segments_by_key:
+            return street_key
 
         fallback_key = self._remove_direction(street_key)
-        if fallback_key:
-            candidates = self._segments_by_key.get(fallback_key)
-            if candidates:
-                return candidates
+        if fallback_key and fallback_key in self._segments_by_key:
+            return fallback_key
 
-        base_key = street_key.replace(" ", "")
-        for candidate_key in self._street_keys:
-            if candidate_key.replace(" ", "") == base_key:
-                return self._segments_by_key[candidate_key]
+        compact_key = self._compact_keys.get(street_key.replace(" ", ""))
+        if compact_key is not None:
+            return compact_key
 
         if street_key in self._fuzzy_cache:
-            cached = self._fuzzy_cache[street_key]
-            if cached is None:
-                return []
-            return self._segments_by_key.get(cached, [])
+            return self._fuzzy_cache[street_key]
 
         fuzzy_key = self._find_fuzzy_key(street_key)
         self._fuzzy_cache[street_key] = fuzzy_key
-        if fuzzy_key is None:
-            return []
-        return self._segments_by_key.get(fuzzy_key, [])
+        return fuzzy_key
 
     def _find_fuzzy_key(self, street_key: str) -> Optional[str]:
+        """Best ``difflib`` match at the strict cutoff, else at the relaxed one.
+
+        Equivalent to ``difflib.get_close_matches(street_key, keys, n=1,
+        cutoff=...)`` for each cutoff in turn.  Shared character counts bound
+        ``SequenceMatcher.ratio()`` from above (difflib's ``quick_ratio``), so
+        the index discards every key that cannot reach the relaxed cutoff in
+        one vectorised pass and only the survivors are scored.
+        """
+
         if not self._street_keys:
             return None
 
-        matches = difflib.get_close_matches(street_key, self._street_keys, n=1, cutoff=0.88)
-        if matches:
-            return matches[0]
-
-        matches = difflib.get_close_matches(street_key, self._street_keys, n=1, cutoff=0.82)
-        return matches[0] if matches else None
+        overlap = np.minimum(self._key_char_counts, _char_counts(street_key)).sum(axis=1)
+        with np.errstate(invalid="ignore"):
+            # Two empty strings give 0/0; difflib scores them 1.0, so keep NaN.
+            bound = 2.0 * overlap / (self._key_lengths + len(street_key))
+        candidates = np.flatnonzero(~(bound < _FUZZY_CUTOFFS[-1]))
+
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(street_key)
+        scored: List[Tuple[float, str]] = []
+        for position in candidates:
+            candidate_key = self._street_keys[position]
+            matcher.set_seq1(candidate_key)
+            scored.append((matcher.ratio(), candidate_key))
+
+        for cutoff in _FUZZY_CUTOFFS:
+            passing = [item for item in scored if item[0] >= cutoff]
+            if passing:
+                # get_close_matches ranks ties by the key itself.
+                return max(passing)[1]
+        return None
 
     def _parse_intersection(self, address: str) -> Optional[Tuple[str, str]]:
         raw = str(address).upper()
@@ -381,6 +637,39 @@ class CentrelineGeocoder:
         return normalize_street_name(normalized)
 
     def _geocode_intersection(self, street_a: str, street_b: str) -> Optional[GeocodeResult]:
+        """Locate ``street_a`` at ``street_b`` from the intersection index.
+
+        Streets that share a node resolve with a single dictionary lookup.
+        Otherwise (offsets such as "N/O", or data gaps) the closest pair of
+        nodes is found on the node grid and their midpoint returned.  Streets
+        without endpoint data fall back to the closest segment centroids.
+        """
+
+        key_a = self._resolve_street_key(street_a)
+        key_b = self._resolve_street_key(street_b)
+        if key_a is None or key_b is None:
+            return None
+
+        located = self._intersection_index.locate(key_a, key_b)
+        if located is not None:
+            segment, lat, lon = located
+            return self._intersection_result(segment, key_b, lat, lon)
+
+        return self._geocode_intersection_by_centroid(key_a, key_b)
+
+    @staticmethod
+    def _intersection_result(primary: CentrelineSegment, cross_key: str, lat: float, lon: float) -> GeocodeResult:
+        return GeocodeResult(
+            street_normalized=f"{primary.street_key} & {cross_key}",
+            latitude=lat,
+            longitude=lon,
+            centreline_id=primary.centreline_id,
+            feature_code=primary.feature_code,
+            feature_code_desc=primary.feature_code_desc,
+            jurisdiction=primary.jurisdiction,
+        )
+
+    def _geocode_intersection_by_centroid(self, street_a: str, street_b: str) -> Optional[GeocodeResult]:
         segments_a = [seg for seg in self._lookup_segments(street_a) if seg.centroid]
         segments_b = [seg for seg in self._lookup_segments(street_b) if seg.centroid]
 
@@ -394,7 +683,7 @@ class CentrelineGeocoder:
         limit = 12
         for seg_a in segments_a[:limit]:
             for seg_b in segments_b[:limit]:
-                distance = _distance_between(seg_a.centroid, seg_b.centroid)
+                distance = distance_metres(seg_a.centroid, seg_b.centroid)
                 if distance < smallest_distance:
                     smallest_distance = distance
                     best_segment_a = seg_a
@@ -468,10 +757,16 @@ class CentrelineGeocoder:
 
     @staticmethod
     def _compose_label(row: pd.Series) -> str:
+        return CentrelineGeocoder._compose_label_parts(
+            row.get("LINEAR_NAME"),
+            row.get("LINEAR_NAME_TYPE"),
+            row.get("LINEAR_NAME_DIR"),
+            row.get("LINEAR_NAME_FULL"),
+        )
+
+    @staticmethod
+    def _compose_label_parts(base: object, suffix: object, direction: object, full: object) -> str:
         parts: List[str] = []
-        base = row.get("LINEAR_NAME")
-        suffix = row.get("LINEAR_NAME_TYPE")
-        direction = row.get("LINEAR_NAME_DIR")
 
         if isinstance(base, str) and base.lower() != "none":
             parts.append(base)
@@ -480,11 +775,34 @@ class CentrelineGeocoder:
         if isinstance(direction, str) and direction.lower() != "none":
             parts.append(direction)
 
-        if not parts and isinstance(row.get("LINEAR_NAME_FULL"), str):
-            return row.get("LINEAR_NAME_FULL")
+        if not parts and isinstance(full, str):
+            return full
 
         return " ".join(parts)
 
+    @staticmethod
+    def _compute_endpoints(geometry: Optional[dict]) -> Tuple[Optional[Tuple[float, float]], ...]:
+        """First and last vertex of a LineString/MultiLineString as ``(lat, lon)``."""
+
+        if not geometry or not isinstance(geometry, dict):
+            return ()
+
+        coordinates = geometry.get("coordinates")
+        if not coordinates:
+            return ()
+
+        if geometry.get("type") == "LineString":
+            points = coordinates
+        elif geometry.get("type") == "MultiLineString":
+            points = [point for line in coordinates for point in line]
+        else:
+            return ()
+
+        points = [point for point in points if isinstance(point, (list, tuple)) and len(point) == 2]
+        if not points:
+            return ()
+        return _coordinate(points[0][1], points[0][0]), _coordinate(points[-1][1], points[-1][0])
+
     @staticmethod
     def _compute_centroid(geometry: Optional[dict]) -> Optional[Tuple[float, float]]:
         if not geometry or not isinstance(geometry, dict):
@@ -531,6 +849,13 @@ class CentrelineGeocoder:
         return str(value)
 
 
+def _char_counts(value: str) -> List[int]:
+    counts = [0] * (len(_INDEX_ALPHABET) + 1)
+    for char in value:
+        counts[_INDEX_SLOTS.get(char, len(_INDEX_ALPHABET))] += 1
+    return counts
+
+
 # MARK: Geometry helpers
 
 
@@ -550,11 +875,22 @@ def _centroid_linestring(points: Iterable[Iterable[float]]) -> Optional[Tuple[fl
     return lat_avg, lon_avg
 
 
-def _distance_between(point_a: Tuple[float, float], point_b: Tuple[float, float]) -> float:
-    lat_diff = point_a[0] - point_b[0]
-    lon_diff = point_a[1] - point_b[1]
-    # Approximate conversion of degrees to meters in Toronto region
-    return math.hypot(lat_diff * 111_320, lon_diff * 78_850)
+def _coordinate(lat: object, lon: object) -> Optional[Tuple[float, float]]:
+    if lat is None or lon is None:
+        return None
+    try:
+        lat_value, lon_value = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(lat_value) or math.isnan(lon_value):
+        return None
+    return lat_value, lon_value
 
 
-__all__ = ["CentrelineGeocoder", "GeocodeResult", "normalize_street_name"]
+__all__ = [
+    "BatchGeocodeStats",
+    "CentrelineGeocoder",
+    "GeocodeResult",
+    "GEOCODER_VERSION",
+    "normalize_street_name",
+]
@@ -0,0 +1,80 @@
+"""Process pool used by ``CentrelineGeocoder.batch_geocode_with_stats``.
+
+Single Responsibility: shard address lists over worker processes that each
+hold a centreline geocoder.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle with the geocoder
+    from .centreline_geocoder import CentrelineGeocoder, GeocodeResult
+
+# Geocoder used by pool workers; set before forking so children share it.
+_WORKER_GEOCODER: Optional["CentrelineGeocoder"] = None
+
+
+def geocode_in_pool(
+    geocoder: "CentrelineGeocoder",
+    addresses: List[str],
+    workers: int,
+    chunk_size: int,
+    snapshot_path: Optional[Path],
+) -> List[Optional["GeocodeResult"]]:
+    """Geocode ``addresses`` in ``chunk_size`` chunks across ``workers`` processes.
+
+    Forked workers share ``geocoder`` copy-on-write; spawned ones load
+    ``snapshot_path`` (or unpickle ``geocoder`` when no snapshot is given).
+    Results come back in input order.
+    """
+
+    global _WORKER_GEOCODER
+
+    chunks = [addresses[start : start + chunk_size] for start in range(0, len(addresses), chunk_size)]
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        initargs: Tuple[Any, ...] = (None, None)
+        _WORKER_GEOCODER = geocoder
+    else:  # pragma: no cover - platforms without fork
+        context = multiprocessing.get_context("spawn")
+        initargs = (str(snapshot_path), None) if snapshot_path is not None else (None, geocoder)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_geocode_worker,
+            initargs=initargs,
+        ) as executor:
+            results: List[Optional["GeocodeResult"]] = []
+            for chunk_results in executor.map(_geocode_chunk, chunks):
+                results.extend(chunk_results)
+    finally:
+        _WORKER_GEOCODER = None
+    return results
+
+
+def _init_geocode_worker(snapshot_path: Optional[str], geocoder: Optional["CentrelineGeocoder"]) -> None:
+    global _WORKER_GEOCODER
+
+    if geocoder is not None:
+        _WORKER_GEOCODER = geocoder
+    elif snapshot_path is not None:
+        from .centreline_geocoder import CentrelineGeocoder
+
+        _WORKER_GEOCODER = CentrelineGeocoder.load_snapshot(Path(snapshot_path))
+        if _WORKER_GEOCODER is None:
+            raise RuntimeError(f"Centreline geocoder snapshot {snapshot_path} is missing or stale")
+
+
+def _geocode_chunk(addresses: List[str]) -> List[Optional["GeocodeResult"]]:
+    geocoder = _WORKER_GEOCODER
+    if geocoder is None:
+        raise RuntimeError("Geocode worker started without a centreline index")
+    return [geocoder.geocode(address) for address in addresses]
+
+
+__all__ = ["geocode_in_pool"]
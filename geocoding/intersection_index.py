@@ -0,0 +1,164 @@
+"""Intersection node index for the centreline geocoder.
+
+Single Responsibility: find where two centreline streets meet, from the
+endpoints their segments share or, failing that, their closest endpoints.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle with the geocoder
+    from .centreline_geocoder import CentrelineSegment
+
+Point = Tuple[float, float]
+
+# Intersection nodes: endpoint coordinates are rounded to this many decimal
+# places (~0.1 m) to merge the shared vertex of touching segments.
+_NODE_PRECISION = 6
+# Nearest-node fallback grid (metres per cell) and how far to search it.
+_NODE_CELL_METRES = 150.0
+_NODE_SEARCH_RINGS = 10
+# Approximate conversion of degrees to metres in the Toronto region.
+_METRES_PER_DEGREE_LAT = 111_320
+_METRES_PER_DEGREE_LON = 78_850
+
+
+class IntersectionIndex:
+    """Segment endpoints indexed as nodes shared between streets.
+
+    ``_intersections`` maps each sorted pair of street keys meeting at a node
+    to that node, so cross-street lookups are one dictionary hit.
+    ``_street_node_cells`` buckets every street's nodes on a metric grid for
+    the nearest-node fallback when two streets never touch.
+    """
+
+    def __init__(
+        self,
+        segment_endpoints: Iterable[Tuple["CentrelineSegment", Tuple[Optional[Point], ...]]],
+    ) -> None:
+        node_ids: Dict[Point, int] = {}
+        self._node_coords: List[Point] = []
+        self._node_streets: List[Dict[str, "CentrelineSegment"]] = []
+        self._street_nodes: Dict[str, List[int]] = {}
+        self._street_node_cells: Dict[str, Dict[Tuple[int, int], List[int]]] = {}
+        self._intersections: Dict[Tuple[str, str], int] = {}
+
+        for segment, ends in segment_endpoints:
+            for point in ends:
+                if point is None:
+                    continue
+                node_key = (round(point[0], _NODE_PRECISION), round(point[1], _NODE_PRECISION))
+                node = node_ids.get(node_key)
+                if node is None:
+                    node = node_ids[node_key] = len(self._node_coords)
+                    self._node_coords.append(node_key)
+                    self._node_streets.append({})
+                streets = self._node_streets[node]
+                if segment.street_key in streets:
+                    continue
+                for other_key in streets:
+                    self._intersections.setdefault(_street_pair(segment.street_key, other_key), node)
+                streets[segment.street_key] = segment
+                self._street_nodes.setdefault(segment.street_key, []).append(node)
+                self._street_node_cells.setdefault(segment.street_key, {}).setdefault(
+                    _grid_cell(self._node_coords[node]), []
+                ).append(node)
+
+    def locate(self, key_a: str, key_b: str) -> Optional[Tuple["CentrelineSegment", float, float]]:
+        """Return ``(segment of key_a, lat, lon)`` where ``key_a`` meets ``key_b``.
+
+        Streets that share a node resolve with a single dictionary lookup.
+        Otherwise (offsets such as "N/O", or data gaps) the closest pair of
+        nodes is found on the node grid and their midpoint returned.  ``None``
+        when either street has no endpoint data.
+        """
+
+        node = self._intersections.get(_street_pair(key_a, key_b))
+        if node is not None:
+            lat, lon = self._node_coords[node]
+            return self._node_streets[node][key_a], lat, lon
+
+        nearest = self._nearest_nodes(key_a, key_b)
+        if nearest is None:
+            return None
+        node_a, node_b = nearest
+        lat = (self._node_coords[node_a][0] + self._node_coords[node_b][0]) / 2
+        lon = (self._node_coords[node_a][1] + self._node_coords[node_b][1]) / 2
+        return self._node_streets[node_a][key_a], lat, lon
+
+    def _nearest_nodes(self, key_a: str, key_b: str) -> Optional[Tuple[int, int]]:
+        """Closest (node on ``key_a``, node on ``key_b``) pair, searched ring by ring on the grid."""
+
+        nodes_a = self._street_nodes.get(key_a)
+        cells_b = self._street_node_cells.get(key_b)
+        if not nodes_a or not cells_b:
+            return None
+
+        best: Optional[Tuple[int, int]] = None
+        best_distance = math.inf
+        for ring in range(_NODE_SEARCH_RINGS + 1):
+            for node_a in nodes_a:
+                origin = self._node_coords[node_a]
+                cell_x, cell_y = _grid_cell(origin)
+                for cell in _ring_cells(cell_x, cell_y, ring):
+                    for node_b in cells_b.get(cell, ()):
+                        distance = distance_metres(origin, self._node_coords[node_b])
+                        if distance < best_distance:
+                            best_distance = distance
+                            best = (node_a, node_b)
+            # Anything in a later ring is at least ``ring`` cells away.
+            if best is not None and best_distance <= ring * _NODE_CELL_METRES:
+                return best
+        if best is not None:
+            return best
+
+        # Farther apart than the grid search radius: compare every pair.
+        coords_a = np.array([self._node_coords[node] for node in nodes_a])
+        nodes_b = self._street_nodes[key_b]
+        coords_b = np.array([self._node_coords[node] for node in nodes_b])
+        distances = np.hypot(
+            (coords_a[:, None, 0] - coords_b[None, :, 0]) * _METRES_PER_DEGREE_LAT,
+            (coords_a[:, None, 1] - coords_b[None, :, 1]) * _METRES_PER_DEGREE_LON,
+        )
+        index_a, index_b = np.unravel_index(int(np.argmin(distances)), distances.shape)
+        return nodes_a[index_a], nodes_b[index_b]
+
+
+def distance_metres(point_a: Point, point_b: Point) -> float:
+    """Approximate distance in metres between two ``(lat, lon)`` points."""
+
+    lat_diff = point_a[0] - point_b[0]
+    lon_diff = point_a[1] - point_b[1]
+    return math.hypot(lat_diff * _METRES_PER_DEGREE_LAT, lon_diff * _METRES_PER_DEGREE_LON)
+
+
+def _street_pair(key_a: str, key_b: str) -> Tuple[str, str]:
+    return (key_a, key_b) if key_a <= key_b else (key_b, key_a)
+
+
+def _grid_cell(point: Point) -> Tuple[int, int]:
+    return (
+        math.floor(point[1] * _METRES_PER_DEGREE_LON / _NODE_CELL_METRES),
+        math.floor(point[0] * _METRES_PER_DEGREE_LAT / _NODE_CELL_METRES),
+    )
+
+
+def _ring_cells(cell_x: int, cell_y: int, ring: int) -> Iterable[Tuple[int, int]]:
+    """Grid cells at Chebyshev distance ``ring`` from ``(cell_x, cell_y)``."""
+
+    if ring == 0:
+        yield cell_x, cell_y
+        return
+    for offset in range(-ring, ring + 1):
+        yield cell_x + offset, cell_y - ring
+        yield cell_x + offset, cell_y + ring
+    for offset in range(-ring + 1, ring):
+        yield cell_x - ring, cell_y + offset
+        yield cell_x + ring, cell_y + offset
+
+
+__all__ = ["IntersectionIndex", "distance_metres"]
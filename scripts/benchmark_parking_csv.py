@@ -0,0 +1,155 @@
+"""Compare the row-by-row and columnar parking ticket CSV paths.
+
+Prepares every row of a yearly archive with both ``PARKING_TICKETS_CSV_ENGINE``
+values and reports rows/sec.  Geocoding is disabled unless ``--geocode`` is
+passed so the numbers reflect parsing, normalisation and hashing only.  With
+``--database-url`` each engine also COPYs its rows into a temporary staging
+table through the pipelined binary COPY used by the ETL.
+
+Without ``--archive`` a synthetic archive of ``--rows`` tickets is generated.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+
+import dotenv
+import psycopg
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.etl.datasets.parking_tickets import CSV_ENGINES, ParkingTicketsETL  # noqa: E402
+
+
+SYNTHETIC_HEADER = (
+    "tag_number_masked,date_of_infraction,infraction_code,infraction_description,"
+    "set_fine_amount,time_of_infraction,location1,location2,location3,location4"
+)
+SYNTHETIC_STREETS = ("QUEEN ST W", "KING ST W", "YONGE ST", "BLOOR ST W", "DUNDAS ST W", "SPADINA AVE")
+SYNTHETIC_INFRACTIONS = (
+    ("29", "PARK PROHIBITED TIME NO PERMIT", "30"),
+    ("5", "PARK HWY PROHIBED TIME/DAY", "50"),
+    ("207", "PARK MACHINE-REQD FEE NOT PAID", "30"),
+    ("9", "STOP HWY PROHIBITED TIME/DAY", "60"),
+)
+
+
+def resolve_dsn(cli_dsn: Optional[str]) -> Optional[str]:
+    if cli_dsn:
+        return cli_dsn
+    for key in ("POSTGIS_DATABASE_URL", "DATABASE_URL", "POSTGRES_URL"):
+        value = os.getenv(key)
+        if value:
+            return value
+    return None
+
+
+def write_synthetic_archive(path: Path, rows: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    lines = [SYNTHETIC_HEADER]
+    for index in range(rows):
+        code, description, fine = rng.choice(SYNTHETIC_INFRACTIONS)
+        lines.append(
+            ",".join(
+                (
+                    f"***{index:05d}",
+                    f"2023{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}",
+                    code,
+                    description,
+                    fine,
+                    f"{rng.randint(0, 23):02d}{rng.randint(0, 59):02d}",
+                    rng.choice(("NR", "AT", "OPP", "")),
+                    f"{rng.randint(1, 400)} {rng.choice(SYNTHETIC_STREETS)}",
+                    "",
+                    "",
+                )
+            )
+        )
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("Parking_Tags_Data_2023.000.csv", "\n".join(lines) + "\n")
+
+
+def build_loader(engine: str, chunk_rows: int, geocode: bool, dsn: Optional[str]) -> ParkingTicketsETL:
+    os.environ["PARKING_TICKETS_CSV_ENGINE"] = engine
+    os.environ["PARKING_TICKETS_CSV_CHUNK_ROWS"] = str(chunk_rows)
+    # Measure cold geocoding rather than results persisted by earlier runs.
+    os.environ["PARKING_TICKETS_GEOCODE_CACHE"] = "0"
+    if not geocode:
+        os.environ["PARKING_TICKETS_DISABLE_GEOCODER"] = "1"
+    from src.etl.postgres import PostgresClient
+
+    pg = PostgresClient(dsn) if dsn else None
+    return ParkingTicketsETL.for_staging(SimpleNamespace(slug="parking_tickets"), pg)  # type: ignore[arg-type]
+
+
+def count_prepared(loader: ParkingTicketsETL, archive_path: Path) -> int:
+    loader._geocode_cache.clear()
+    return sum(len(batch) for _, _, batch in loader._iter_archive_chunks(archive_path))
+
+
+def copy_prepared(loader: ParkingTicketsETL, dsn: str, archive_path: Path) -> int:
+    loader._geocode_cache.clear()
+    with psycopg.connect(dsn) as conn:
+        conn.execute(
+            "CREATE TEMP TABLE benchmark_parking_staging "
+            "(LIKE parking_tickets_staging INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        rows = loader._copy_archive(conn, "benchmark_parking_staging", 0, archive_path)
+        conn.rollback()
+    return rows
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--archive", type=Path, help="Parking tags zip archive to benchmark")
+    parser.add_argument("--rows", type=int, default=500_000, help="Synthetic archive size when --archive is omitted")
+    parser.add_argument("--chunk-rows", type=int, default=100_000, help="Columnar batch size")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per engine (best run is reported)")
+    parser.add_argument("--geocode", action="store_true", help="Include geocoding in the measurement")
+    parser.add_argument("--database-url", help="Also time COPY into a temporary staging table")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    dotenv.load_dotenv(REPO_ROOT / ".env")
+    dsn = resolve_dsn(args.database_url) if args.database_url else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive_path = args.archive
+        if archive_path is None:
+            archive_path = Path(tmp) / "parking_tags_synthetic.zip"
+            write_synthetic_archive(archive_path, args.rows)
+
+        results: dict[str, float] = {}
+        for engine in CSV_ENGINES:
+            loader = build_loader(engine, args.chunk_rows, args.geocode, dsn)
+            best: Optional[float] = None
+            rows = 0
+            for _ in range(max(1, args.repeat)):
+                started = time.perf_counter()
+                rows = copy_prepared(loader, dsn, archive_path) if dsn else count_prepared(loader, archive_path)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            rate = rows / best if best else 0.0
+            results[engine] = rate
+            stage = "prepare+copy" if dsn else "prepare"
+            print(f"{engine:>9}: {rows} rows, {stage} {best:.2f}s, {rate:,.0f} rows/sec", flush=True)
+
+        if results.get("rows"):
+            print(f"speedup: {results['columnar'] / results['rows']:.2f}x", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Micro-benchmark the centreline street-key fallback lookups.
+
+Parses a sample of parking ticket ``location2`` values into street keys and,
+for each key without an exact match, times the previous linear scans
+(space-stripped comparison plus two ``difflib.get_close_matches`` passes over
+every street key) against the indexed lookups in ``CentrelineGeocoder``.  The
+script fails if the two ever disagree.
+
+With a database URL the centreline and a random sample of distinct
+``location2`` values are read from Postgres; ``--locations-file`` supplies the
+sample from a text file instead.  Without a database a synthetic street
+network and typo-laden addresses are generated.
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import dotenv
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from geocoding.centreline_geocoder import CentrelineGeocoder  # noqa: E402
+
+
+CENTRELINE_SQL = """
+    SELECT
+        centreline_id AS "CENTRELINE_ID",
+        linear_name AS "LINEAR_NAME",
+        linear_name_type AS "LINEAR_NAME_TYPE",
+        linear_name_dir AS "LINEAR_NAME_DIR",
+        linear_name_full AS "LINEAR_NAME_FULL"
+    FROM centreline_segments
+"""
+
+SAMPLE_SQL = """
+    SELECT location2
+    FROM (SELECT DISTINCT location2 FROM parking_tickets WHERE location2 IS NOT NULL) AS locations
+    ORDER BY random()
+    LIMIT %s
+"""
+
+SYNTHETIC_NAMES = (
+    "QUEEN", "KING", "YONGE", "BLOOR", "DUNDAS", "SPADINA", "BATHURST", "COLLEGE", "HARBORD", "OSSINGTON",
+    "DUFFERIN", "LANSDOWNE", "RONCESVALLES", "PARKSIDE", "EGLINTON", "LAWRENCE", "SHEPPARD", "FINCH", "DANFORTH",
+    "GERRARD", "CARLAW", "PAPE", "DONLANDS", "WOODBINE", "KINGSTON", "MARKHAM", "MIDLAND", "BIRCHMOUNT",
+)
+SYNTHETIC_TYPES = ("ST", "AVE", "RD", "BLVD", "DR", "CRES", "CRT", "PL")
+SYNTHETIC_DIRS = ("", "E", "W", "N", "S")
+
+
+def resolve_dsn(cli_dsn: Optional[str]) -> Optional[str]:
+    if cli_dsn:
+        return cli_dsn
+    for key in ("POSTGIS_DATABASE_URL", "DATABASE_URL", "POSTGRES_URL"):
+        value = os.getenv(key)
+        if value:
+            return value
+    return None
+
+
+def synthetic_inputs(sample: int, seed: int = 11) -> tuple[pd.DataFrame, List[str]]:
+    rng = random.Random(seed)
+    rows = []
+    for index in range(6000):
+        name = f"{rng.choice(SYNTHETIC_NAMES)}{rng.choice(('', 'VIEW', 'WOOD', 'HILL', 'DALE', 'CREST'))}"
+        if index % 3 == 0:
+            name = f"{name} {rng.choice(SYNTHETIC_NAMES)}"
+        rows.append(
+            {
+                "CENTRELINE_ID": index,
+                "LINEAR_NAME": name,
+                "LINEAR_NAME_TYPE": rng.choice(SYNTHETIC_TYPES),
+                "LINEAR_NAME_DIR": rng.choice(SYNTHETIC_DIRS) or None,
+            }
+        )
+    frame = pd.DataFrame(rows)
+
+    def mangle(text: str) -> str:
+        chars = list(text)
+        for _ in range(rng.randint(0, 2)):
+            position = rng.randrange(len(chars))
+            operation = rng.random()
+            if operation < 0.4:
+                del chars[position]
+            elif operation < 0.7:
+                chars.insert(position, rng.choice("AEIOURST"))
+            else:
+                chars[position] = rng.choice("ABCDEFGHIJKLMNOPRSTUVWY")
+        return "".join(chars)
+
+    locations = []
+    for _ in range(sample):
+        row = rows[rng.randrange(len(rows))]
+        street = " ".join(part for part in (row["LINEAR_NAME"], row["LINEAR_NAME_TYPE"], row["LINEAR_NAME_DIR"]) if part)
+        locations.append(f"{rng.randint(1, 2000)} {mangle(street)}")
+    return frame, locations
+
+
+def database_inputs(dsn: str, sample: int) -> tuple[pd.DataFrame, List[str]]:
+    import psycopg
+
+    with psycopg.connect(dsn) as conn:
+        frame = pd.read_sql_query(CENTRELINE_SQL, conn)
+        rows = conn.execute(SAMPLE_SQL, (sample,)).fetchall()
+    return frame, [row[0] for row in rows]
+
+
+def street_keys_for(geocoder: CentrelineGeocoder, locations: List[str]) -> List[str]:
+    keys: List[str] = []
+    for location in locations:
+        parsed = geocoder._parse_address(location)
+        if parsed is not None:
+            keys.append(parsed[1])
+            continue
+        intersection = geocoder._parse_intersection(location)
+        if intersection is not None:
+            keys.extend(intersection)
+            continue
+        street_only = geocoder._parse_street_only(location)
+        if street_only is not None:
+            keys.append(street_only)
+    return keys
+
+
+def linear_lookup(geocoder: CentrelineGeocoder, street_key: str) -> Optional[str]:
+    """The pre-index fallback: scan every key, then difflib over every key."""
+
+    base_key = street_key.replace(" ", "")
+    for candidate_key in geocoder._street_keys:
+        if candidate_key.replace(" ", "") == base_key:
+            return candidate_key
+    for cutoff in (0.88, 0.82):
+        matches = difflib.get_close_matches(street_key, geocoder._street_keys, n=1, cutoff=cutoff)
+        if matches:
+            return matches[0]
+    return None
+
+
+def indexed_lookup(geocoder: CentrelineGeocoder, street_key: str) -> Optional[str]:
+    compact_key = geocoder._compact_keys.get(street_key.replace(" ", ""))
+    if compact_key is not None:
+        return compact_key
+    return geocoder._find_fuzzy_key(street_key)
+
+
+def time_lookup(
+    lookup: Callable[[CentrelineGeocoder, str], Optional[str]],
+    geocoder: CentrelineGeocoder,
+    keys: List[str],
+) -> tuple[float, List[Optional[str]]]:
+    started = time.perf_counter()
+    results = [lookup(geocoder, key) for key in keys]
+    return time.perf_counter() - started, results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Read centreline and location2 samples from Postgres")
+    parser.add_argument("--locations-file", type=Path, help="Newline-separated location2 values to use as the sample")
+    parser.add_argument("--sample", type=int, default=2000, help="Number of location2 values to sample")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    dotenv.load_dotenv(REPO_ROOT / ".env")
+    dsn = resolve_dsn(args.database_url)
+
+    if dsn:
+        frame, locations = database_inputs(dsn, args.sample)
+    else:
+        frame, locations = synthetic_inputs(args.sample)
+    if args.locations_file is not None:
+        locations = [line.strip() for line in args.locations_file.read_text().splitlines() if line.strip()]
+
+    started = time.perf_counter()
+    geocoder = CentrelineGeocoder(frame)
+    print(f"indexed {len(geocoder._street_keys)} street keys in {time.perf_counter() - started:.2f}s", flush=True)
+
+    keys = sorted(
+        {
+            key
+            for key in street_keys_for(geocoder, locations)
+            if key not in geocoder._segments_by_key
+            and (geocoder._remove_direction(key) or "") not in geocoder._segments_by_key
+        }
+    )
+    print(f"{len(locations)} locations -> {len(keys)} street keys without an exact match", flush=True)
+
+    linear_seconds, linear_results = time_lookup(linear_lookup, geocoder, keys)
+    indexed_seconds, indexed_results = time_lookup(indexed_lookup, geocoder, keys)
+    mismatches = [
+        (key, old, new) for key, old, new in zip(keys, linear_results, indexed_results) if old != new
+    ]
+    if mismatches:
+        for key, old, new in mismatches[:10]:
+            print(f"MISMATCH {key!r}: linear={old!r} indexed={new!r}", file=sys.stderr)
+        raise SystemExit(f"{len(mismatches)} lookups differ between the linear and indexed paths")
+
+    matched = sum(result is not None for result in indexed_results)
+    print(f"  linear: {linear_seconds:.3f}s ({linear_seconds / max(1, len(keys)) * 1000:.2f} ms/key)", flush=True)
+    print(f" indexed: {indexed_seconds:.3f}s ({indexed_seconds / max(1, len(keys)) * 1000:.2f} ms/key)", flush=True)
+    print(f"identical results ({matched}/{len(keys)} matched), speedup {linear_seconds / max(indexed_seconds, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,18 @@
 
 This script looks for tickets missing `street_normalized` or `geom`, applies the
 same geocoding logic as the ETL pipeline, and updates the table in-place.
+
+Work is done per distinct ``location1..4`` tuple rather than per ticket: tuples
+are paged by keyset over a partial index of unresolved tickets, each batch's
+results are COPYed into a temp table and applied with one ``UPDATE ... FROM``,
+and the last processed tuple is checkpointed in ``etl_state`` in the same
+transaction, so an interrupted run resumes where it stopped.
+
+Updated tickets get their tile columns recomputed, their tile features queued
+in ``tile_dirty_features`` (before and after the update, since the feature key
+follows the geocoded street), and the ``parking_ticket_rollup`` years they fall
+in are rebuilt once the run ends.  Pending rollup years are kept in the
+checkpoint until that refresh commits.
 """
 
 from __future__ import annotations
@@ -12,20 +24,45 @@ import os
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import dotenv
-import pandas as pd
 import psycopg
+from psycopg.types.json import Json
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
 from geocoding.centreline_geocoder import CentrelineGeocoder, GeocodeResult
+from src.etl.bootstrap import PARKING_TILE_FEATURE_KEY_SQL, TILE_DIRTY_FEATURES_DDL
+from src.etl.centreline_index import load_centreline_geocoder, snapshot_dir_for
+from src.etl.parking_partitions import tile_columns_sql
+from src.etl.postgres import copy_batches
+from src.etl.rollups import PARKING_ROLLUP_DDL, refresh_parking_rollup
+from src.etl.state import DDL as ETL_STATE_DDL
 
 
 DEFAULT_BATCH_SIZE = 10_000
+CHECKPOINT_SLUG = "parking_tickets_geocode_backfill"
+LOCATION_KEY_SQL = (
+    "COALESCE(location1, ''), COALESCE(location2, ''), COALESCE(location3, ''), COALESCE(location4, '')"
+)
+UNRESOLVED_PREDICATE_SQL = "(street_normalized IS NULL OR geom IS NULL)"
+UNRESOLVED_INDEX_SQL = f"""
+    CREATE INDEX IF NOT EXISTS parking_tickets_unresolved_location_idx
+    ON parking_tickets ({LOCATION_KEY_SQL})
+    WHERE {UNRESOLVED_PREDICATE_SQL}
+"""
+RESULT_COLUMNS = ("location1", "location2", "location3", "location4", "street_normalized", "centreline_id", "longitude", "latitude")
+RESULT_TYPES = ("text", "text", "text", "text", "text", "int8", "float8", "float8")
+RESULT_MATCH_SQL = """
+    COALESCE(t.location1, '') = r.location1
+    AND COALESCE(t.location2, '') = r.location2
+    AND COALESCE(t.location3, '') = r.location3
+    AND COALESCE(t.location4, '') = r.location4
+"""
+RESULT_GEOM_SQL = "ST_SetSRID(ST_MakePoint(r.longitude, r.latitude), 4326)"
 LOCATION_LOOKUP_ENV = "PARKING_TICKETS_LOCATION_LOOKUP"
 SKIP_GEOCODER_ENV = "PARKING_TICKETS_SKIP_GEOCODE"
 
@@ -106,49 +143,61 @@ class TicketGeocoder:
         self._geocoder: Optional[CentrelineGeocoder] = None
 
     def geocode_row(self, record: Dict[str, Optional[str]]) -> Optional[GeocodeResultPayload]:
-        key = tuple((record.get(f"location{i}") or "").strip().upper() for i in range(1, 5))
-        cached = self._geocode_cache.get(key)
-        if cached is not None:
-            return cached
-
-        lookup_result = self._lookup_precomputed_location(record)
-        if lookup_result is not None:
-            payload = GeocodeResultPayload(
-                street_normalized=lookup_result.get("street_normalized"),
-                centreline_id=lookup_result.get("centreline_id"),
-                latitude=lookup_result.get("latitude"),
-                longitude=lookup_result.get("longitude"),
-            )
-            self._geocode_cache[key] = payload
-            return payload
-
-        if self._skip_geocoder:
-            self._geocode_cache[key] = None
-            return None
-
-        address = " ".join(part for part in key if part).strip()
-        if not address:
-            self._geocode_cache[key] = None
-            return None
-
-        geocoder = self._get_geocoder()
-        try:
-            result = geocoder.geocode(address)
-        except Exception:
-            result = None
-
-        if isinstance(result, GeocodeResult):
-            payload = GeocodeResultPayload(
-                street_normalized=result.street_normalized,
-                centreline_id=result.centreline_id,
-                latitude=result.latitude,
-                longitude=result.longitude,
-            )
-        else:
-            payload = None
+        return self.geocode_rows([record])[0]
+
+    def clear_cache(self) -> None:
+        self._geocode_cache.clear()
+
+    def geocode_rows(
+        self,
+        records: Sequence[Dict[str, Optional[str]]],
+        *,
+        workers: int = 1,
+    ) -> List[Optional[GeocodeResultPayload]]:
+        """Geocode ``records`` in order with one batched geocoder call for unseen addresses."""
+
+        keys = [tuple((record.get(f"location{i}") or "").strip().upper() for i in range(1, 5)) for record in records]
+        pending: Dict[Tuple[str, str, str, str], str] = {}
+        for record, key in zip(records, keys):
+            if key in self._geocode_cache or key in pending:
+                continue
 
-        self._geocode_cache[key] = payload
-        return payload
+            lookup_result = self._lookup_precomputed_location(record)
+            if lookup_result is not None:
+                self._geocode_cache[key] = GeocodeResultPayload(
+                    street_normalized=lookup_result.get("street_normalized"),
+                    centreline_id=lookup_result.get("centreline_id"),
+                    latitude=lookup_result.get("latitude"),
+                    longitude=lookup_result.get("longitude"),
+                )
+                continue
+
+            address = " ".join(part for part in key if part).strip()
+            if self._skip_geocoder or not address:
+                self._geocode_cache[key] = None
+                continue
+            pending[key] = address
+
+        if pending:
+            results, stats = self._get_geocoder().batch_geocode_with_stats(list(pending.values()), workers=workers)
+            for key, result in zip(pending, results):
+                self._geocode_cache[key] = (
+                    GeocodeResultPayload(
+                        street_normalized=result.street_normalized,
+                        centreline_id=result.centreline_id,
+                        latitude=result.latitude,
+                        longitude=result.longitude,
+                    )
+                    if isinstance(result, GeocodeResult)
+                    else None
+                )
+            if stats.geocoded:
+                print(
+                    f"Geocoded {stats.geocoded} addresses ({stats.resolved} resolved) with {stats.workers} "
+                    f"worker(s) at {stats.addresses_per_second:,.0f} addresses/sec."
+                )
+
+        return [self._geocode_cache[key] for key in keys]
 
     def _lookup_precomputed_location(self, record: Dict[str, Optional[str]]) -> Optional[Dict[str, float | None]]:
         candidates = [
@@ -163,43 +212,231 @@ class TicketGeocoder:
     def _get_geocoder(self) -> CentrelineGeocoder:
         if self._geocoder is not None:
             return self._geocoder
-        df = pd.read_sql_query(
-            """
-            SELECT
-                centreline_id AS "CENTRELINE_ID",
-                linear_name AS "LINEAR_NAME",
-                linear_name_type AS "LINEAR_NAME_TYPE",
-                linear_name_dir AS "LINEAR_NAME_DIR",
-                linear_name_full AS "LINEAR_NAME_FULL",
-                linear_name_label AS "LINEAR_NAME_LABEL",
-                parity_left AS "PARITY_L",
-                parity_right AS "PARITY_R",
-                low_num_even AS "LOW_NUM_EVEN",
-                high_num_even AS "HIGH_NUM_EVEN",
-                low_num_odd AS "LOW_NUM_ODD",
-                high_num_odd AS "HIGH_NUM_ODD",
-                feature_code AS "FEATURE_CODE",
-                feature_code_desc AS "FEATURE_CODE_DESC",
-                jurisdiction AS "JURISDICTION",
-                ST_AsGeoJSON(geom) AS "geometry"
-            FROM centreline_segments
-            """,
-            self._conn,
-        )
-        self._geocoder = CentrelineGeocoder(df)
+        self._geocoder = load_centreline_geocoder(self._conn, snapshot_dir_for(None))
         return self._geocoder
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Backfill parking ticket geocoding")
     parser.add_argument("--database-url", dest="database_url", help="Postgres connection string override")
-    parser.add_argument("--limit", type=int, default=None, help="Maximum rows to process")
-    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows to fetch per pass")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum distinct locations to process")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Distinct locations per pass")
     parser.add_argument("--skip-geocoder", action="store_true", help="Only use precomputed lookup (no fuzzy geocoder)")
     parser.add_argument("--dry-run", action="store_true", help="Do not persist updates, only report")
+    parser.add_argument("--reset", action="store_true", help="Ignore the saved checkpoint and start from the first location")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=max(1, (os.cpu_count() or 1) - 1),
+        help="Geocoder processes per batch of distinct addresses",
+    )
     return parser.parse_args()
 
 
+def load_checkpoint(conn: psycopg.Connection) -> Dict[str, Any]:
+    row = conn.execute("SELECT metadata FROM etl_state WHERE dataset_slug = %s", (CHECKPOINT_SLUG,)).fetchone()
+    return dict(row[0] or {}) if row else {}
+
+
+def save_checkpoint(conn: psycopg.Connection, checkpoint: Dict[str, Any]) -> None:
+    conn.execute(
+        """
+        INSERT INTO etl_state (dataset_slug, last_synced_at, metadata)
+        VALUES (%s, NOW(), %s)
+        ON CONFLICT (dataset_slug)
+        DO UPDATE SET last_synced_at = EXCLUDED.last_synced_at, metadata = EXCLUDED.metadata, updated_at = NOW()
+        """,
+        (CHECKPOINT_SLUG, Json(checkpoint)),
+    )
+
+
+def fetch_location_batch(
+    conn: psycopg.Connection,
+    after: Optional[Sequence[str]],
+    size: int,
+) -> List[Tuple[str, str, str, str]]:
+    """Next ``size`` distinct unresolved location tuples after ``after`` in key order."""
+
+    keyset_sql = f"AND ({LOCATION_KEY_SQL}) > (%s, %s, %s, %s)" if after is not None else ""
+    rows = conn.execute(
+        f"""
+        SELECT DISTINCT {LOCATION_KEY_SQL}
+        FROM parking_tickets
+        WHERE {UNRESOLVED_PREDICATE_SQL} {keyset_sql}
+        ORDER BY 1, 2, 3, 4
+        LIMIT %s
+        """,
+        (*after, size) if after is not None else (size,),
+    ).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def apply_batch(conn: psycopg.Connection, results: List[Tuple[Any, ...]]) -> Tuple[int, List[int]]:
+    """COPY resolved locations into a temp table and update their tickets in one statement.
+
+    Returns the number of tickets updated and the years they are dated in.
+    """
+
+    conn.execute(
+        """
+        CREATE TEMP TABLE geocode_backfill_results (
+            location1 TEXT NOT NULL,
+            location2 TEXT NOT NULL,
+            location3 TEXT NOT NULL,
+            location4 TEXT NOT NULL,
+            street_normalized TEXT,
+            centreline_id BIGINT,
+            longitude DOUBLE PRECISION,
+            latitude DOUBLE PRECISION
+        ) ON COMMIT DROP
+        """
+    )
+    copy_batches(conn, "geocode_backfill_results", RESULT_COLUMNS, [results], types=RESULT_TYPES, prefetch=0)
+    conn.execute("ANALYZE geocode_backfill_results")
+    # Features the tickets are drawn under now; tickets without a point are not on the tiles.
+    conn.execute(
+        f"""
+        INSERT INTO tile_dirty_features (dataset, feature_id)
+        SELECT DISTINCT 'parking_tickets', {PARKING_TILE_FEATURE_KEY_SQL}
+        FROM (
+            SELECT t.centreline_id, t.street_normalized, t.location1, t.ticket_hash
+            FROM parking_tickets AS t
+            JOIN geocode_backfill_results AS r ON {RESULT_MATCH_SQL}
+            WHERE t.street_normalized IS NULL AND t.geom IS NOT NULL
+        ) AS previous
+        ON CONFLICT (dataset, feature_id) DO UPDATE SET marked_at = NOW()
+        """
+    )
+    rows = conn.execute(
+        f"""
+        WITH updated AS (
+            UPDATE parking_tickets AS t
+            SET
+                street_normalized = COALESCE(r.street_normalized, t.street_normalized),
+                centreline_id = COALESCE(r.centreline_id, t.centreline_id),
+                geom = COALESCE({RESULT_GEOM_SQL}, t.geom),
+                geom_3857 = COALESCE(r.geom_3857, t.geom_3857),
+                tile_qk_prefix = COALESCE(r.tile_qk_prefix, t.tile_qk_prefix),
+                updated_at = NOW()
+            FROM (
+                SELECT r.*, {tile_columns_sql(RESULT_GEOM_SQL)}
+                FROM geocode_backfill_results AS r
+            ) AS r ({", ".join(RESULT_COLUMNS)}, geom_3857, tile_qk_prefix)
+            WHERE (t.street_normalized IS NULL OR t.geom IS NULL)
+              AND {RESULT_MATCH_SQL}
+            RETURNING t.date_of_infraction, t.centreline_id, t.street_normalized, t.location1, t.ticket_hash
+        ), queued AS (
+            INSERT INTO tile_dirty_features (dataset, feature_id)
+            SELECT DISTINCT 'parking_tickets', {PARKING_TILE_FEATURE_KEY_SQL}
+            FROM updated
+            ON CONFLICT (dataset, feature_id) DO UPDATE SET marked_at = NOW()
+        )
+        SELECT EXTRACT(YEAR FROM date_of_infraction)::INT, COUNT(*)
+        FROM updated
+        GROUP BY 1
+        """
+    ).fetchall()
+    updated = sum(int(count) for _, count in rows)
+    return updated, sorted(int(year) for year, _ in rows)
+
+
+def refresh_rollup_years(conn: psycopg.Connection, checkpoint: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild the rollup years pending in ``checkpoint`` and clear them in the same transaction."""
+
+    years = checkpoint.get("rollup_years") or []
+    for year in years:
+        rows = refresh_parking_rollup(conn, year=int(year))
+        print(f"Refreshed {rows:,} rollup rows for {year}.")
+    checkpoint = {**checkpoint, "rollup_years": []}
+    save_checkpoint(conn, checkpoint)
+    conn.commit()
+    return checkpoint
+
+
+def run_backfill(
+    conn: psycopg.Connection,
+    geocoder: TicketGeocoder,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+    reset: bool = False,
+    workers: int = 1,
+) -> Tuple[int, int]:
+    """Geocode unresolved locations batch by batch; returns ``(locations, tickets updated)`` totals."""
+
+    saved = load_checkpoint(conn)
+    # Rollup years still pending from an earlier run survive a reset or a finished pass.
+    pending_years = saved.get("rollup_years") or []
+    checkpoint = {"rollup_years": pending_years} if reset or saved.get("completed") else saved
+    after: Optional[List[str]] = checkpoint.get("last_location")
+    total_locations = int(checkpoint.get("locations", 0))
+    total_updated = int(checkpoint.get("tickets_updated", 0))
+    rollup_years = set(checkpoint.get("rollup_years") or [])
+    if after is not None:
+        print(f"Resuming after {tuple(after)} ({total_locations:,} locations, {total_updated:,} tickets so far).")
+
+    processed_this_run = 0
+    while True:
+        size = batch_size
+        if limit is not None:
+            size = min(size, limit - processed_this_run)
+            if size <= 0:
+                break
+        locations = fetch_location_batch(conn, after, size)
+        if not locations:
+            if not dry_run:
+                checkpoint = {**checkpoint, "completed": True}
+                save_checkpoint(conn, checkpoint)
+            conn.commit()
+            break
+
+        records = [dict(zip(("location1", "location2", "location3", "location4"), key)) for key in locations]
+        payloads = geocoder.geocode_rows(records, workers=workers)
+        geocoder.clear_cache()
+        results = [
+            (*key, payload.street_normalized, payload.centreline_id, payload.longitude, payload.latitude)
+            for key, payload in zip(locations, payloads)
+            if payload is not None
+        ]
+
+        after = list(locations[-1])
+        processed_this_run += len(locations)
+        total_locations += len(locations)
+
+        if dry_run:
+            conn.rollback()
+            print(f"[dry-run] Would resolve {len(results)} of {len(locations)} locations (processed {total_locations:,}).")
+        else:
+            updated, years = apply_batch(conn, results) if results else (0, [])
+            total_updated += updated
+            rollup_years.update(years)
+            checkpoint = {
+                "last_location": after,
+                "locations": total_locations,
+                "tickets_updated": total_updated,
+                "rollup_years": sorted(rollup_years),
+                "completed": False,
+            }
+            save_checkpoint(conn, checkpoint)
+            conn.commit()
+            print(
+                f"Resolved {len(results)} of {len(locations)} locations; updated {updated:,} tickets "
+                f"(processed {total_locations:,} locations)."
+            )
+
+        if len(locations) < size:
+            if not dry_run:
+                checkpoint = {**checkpoint, "completed": True}
+                save_checkpoint(conn, checkpoint)
+                conn.commit()
+            break
+
+    if not dry_run and checkpoint.get("rollup_years"):
+        refresh_rollup_years(conn, checkpoint)
+    return total_locations, total_updated
+
+
 def main() -> None:
     load_env()
     os.environ[SKIP_GEOCODER_ENV] = "0"
@@ -211,95 +448,22 @@ def main() -> None:
         conn.autocommit = False
         geocoder = TicketGeocoder(conn, skip_geocoder=args.skip_geocoder or os.getenv(SKIP_GEOCODER_ENV, "0").lower() in {"1", "true", "yes"})
 
-        total_processed = 0
-        total_updated = 0
-
-        while True:
-            remaining = args.limit - total_processed if args.limit is not None else args.batch_size
-            if remaining <= 0:
-                break
-            chunk_size = min(args.batch_size, remaining) if args.limit is not None else args.batch_size
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT ticket_hash, location1, location2, location3, location4
-                    FROM parking_tickets
-                    WHERE street_normalized IS NULL OR geom IS NULL
-                    ORDER BY date_of_infraction NULLS LAST, ticket_hash
-                    LIMIT %s OFFSET %s
-                    """,
-                    (chunk_size, total_processed),
-                )
-                rows = cur.fetchall()
-
-            if not rows:
-                break
-
-            updates = []
-            for ticket_hash, loc1, loc2, loc3, loc4 in rows:
-                record = {
-                    "ticket_hash": ticket_hash,
-                    "location1": loc1,
-                    "location2": loc2,
-                    "location3": loc3,
-                    "location4": loc4,
-                }
-                payload = geocoder.geocode_row(record)
-                if payload is None:
-                    continue
-                updates.append(
-                    (
-                        payload.street_normalized,
-                        payload.centreline_id,
-                        payload.longitude,
-                        payload.latitude,
-                        payload.longitude,
-                        payload.latitude,
-                        ticket_hash,
-                    )
-                )
-
-            total_processed += len(rows)
-
-            if not updates:
-                conn.rollback()
-                print(f"Processed {total_processed} rows; no geocodable updates found in this batch.")
-                if len(rows) < chunk_size:
-                    break
-                continue
-
-            if args.dry_run:
-                conn.rollback()
-                total_updated += len(updates)
-                print(f"[dry-run] Would update {len(updates)} tickets (processed {total_processed}).")
-                if len(rows) < chunk_size:
-                    break
-                continue
-
-            with conn.cursor() as cur:
-                cur.executemany(
-                    """
-                    UPDATE parking_tickets
-                    SET
-                        street_normalized = COALESCE(%s, street_normalized),
-                        centreline_id = COALESCE(%s, centreline_id),
-                        geom = CASE
-                            WHEN %s IS NOT NULL AND %s IS NOT NULL THEN ST_SetSRID(ST_MakePoint(%s, %s), 4326)
-                            ELSE geom
-                        END,
-                        updated_at = NOW()
-                    WHERE ticket_hash = %s
-                    """,
-                    updates,
-                )
-            conn.commit()
-            total_updated += len(updates)
-            print(f"Updated {len(updates)} tickets (processed {total_processed}).")
-
-            if len(rows) < chunk_size:
-                break
-
-        print(f"Geocoding complete. Processed {total_processed} rows, updated {total_updated}.")
+        conn.execute(ETL_STATE_DDL)
+        conn.execute(TILE_DIRTY_FEATURES_DDL)
+        conn.execute(PARKING_ROLLUP_DDL)
+        conn.execute(UNRESOLVED_INDEX_SQL)
+        conn.commit()
+
+        total_locations, total_updated = run_backfill(
+            conn,
+            geocoder,
+            batch_size=args.batch_size,
+            limit=args.limit,
+            dry_run=args.dry_run,
+            reset=args.reset,
+            workers=args.workers,
+        )
+        print(f"Geocoding complete. Processed {total_locations:,} locations, updated {total_updated:,} tickets.")
 
 
 if __name__ == "__main__":
@@ -1,4 +1,9 @@
-"""Load pre-downloaded parking ticket CSVs into PostGIS using cached geocodes."""
+"""Load pre-downloaded parking ticket CSVs into PostGIS using cached geocodes.
+
+Like the ETL, each reloaded year queues its tile features in
+``tile_dirty_features`` (before the partition is emptied and again for every
+loaded batch) and rebuilds the ``parking_ticket_rollup`` years it touched.
+"""
 
 from __future__ import annotations
 
@@ -10,9 +15,8 @@ import os
 import sys
 import zipfile
 from collections import Counter
-from datetime import date
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import dotenv
 
@@ -20,14 +24,26 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.append(str(REPO_ROOT))
 
-from src.etl.datasets.parking_tickets import (  # noqa: E402
+from src.etl.bootstrap import (  # noqa: E402
+    TILE_DIRTY_FEATURES_DDL,
+    mark_parking_features_dirty,
+    mark_staged_parking_features_dirty,
+)
+from src.etl.parking_records import (  # noqa: E402
     STAGING_COLUMNS,
     build_ticket_hash,
     _normalise_date,
     _normalise_time,
     _safe_decimal,
 )
+from src.etl.parking_partitions import (  # noqa: E402
+    ensure_partitioned_parking_tickets,
+    ensure_year_partition,
+    tile_columns_sql,
+    year_bounds,
+)
 from src.etl.postgres import PostgresClient  # noqa: E402
+from src.etl.rollups import ensure_parking_rollup, refresh_parking_rollup  # noqa: E402
 
 
 GeocodeRecord = Tuple[Optional[str], Optional[int], Optional[float], Optional[float]]
@@ -53,28 +69,9 @@ def load_geocode_cache(path: Path) -> Dict[str, GeocodeRecord]:
 
 
 def ensure_tables(pg: PostgresClient) -> None:
-    pg.execute(
-        """
-        CREATE TABLE IF NOT EXISTS parking_tickets (
-            ticket_hash TEXT PRIMARY KEY,
-            ticket_number TEXT,
-            date_of_infraction DATE,
-            time_of_infraction TEXT,
-            infraction_code TEXT,
-            infraction_description TEXT,
-            set_fine_amount NUMERIC,
-            location1 TEXT,
-            location2 TEXT,
-            location3 TEXT,
-            location4 TEXT,
-            street_normalized TEXT,
-            centreline_id BIGINT,
-            geom geometry(POINT, 4326),
-            created_at TIMESTAMPTZ DEFAULT NOW(),
-            updated_at TIMESTAMPTZ DEFAULT NOW()
-        )
-        """
-    )
+    pg.execute(TILE_DIRTY_FEATURES_DDL)
+    ensure_partitioned_parking_tickets(pg)
+    ensure_parking_rollup(pg)
     pg.execute(
         """
         CREATE TABLE IF NOT EXISTS parking_tickets_staging (
@@ -96,81 +93,37 @@ def ensure_tables(pg: PostgresClient) -> None:
         )
         """
     )
-    pg.execute(
-        """
-        ALTER TABLE parking_tickets
-        ADD COLUMN IF NOT EXISTS ticket_hash TEXT
-        """
-    )
     pg.execute(
         """
         ALTER TABLE parking_tickets_staging
         ADD COLUMN IF NOT EXISTS ticket_hash TEXT
         """
     )
-    pg.execute(
-        """
-        DO $$
-        BEGIN
-            IF EXISTS (
-                SELECT 1
-                FROM information_schema.table_constraints
-                WHERE table_schema = 'public'
-                  AND table_name = 'parking_tickets'
-                  AND constraint_type = 'PRIMARY KEY'
-            ) THEN
-                EXECUTE 'ALTER TABLE parking_tickets DROP CONSTRAINT parking_tickets_pkey';
-            END IF;
-        END
-        $$
-        """
-    )
-    pg.execute(
-        """
-        UPDATE parking_tickets
-        SET ticket_hash = md5(
-            COALESCE(ticket_number, '') || '|' ||
-            COALESCE(date_of_infraction::TEXT, '') || '|' ||
-            COALESCE(time_of_infraction, '') || '|' ||
-            COALESCE(infraction_code, '') || '|' ||
-            COALESCE(infraction_description, '') || '|' ||
-            COALESCE(set_fine_amount::TEXT, '') || '|' ||
-            COALESCE(location1, '') || '|' ||
-            COALESCE(location2, '') || '|' ||
-            COALESCE(location3, '') || '|' ||
-            COALESCE(location4, '')
-        )
-        WHERE ticket_hash IS NULL
-        """
-    )
-    pg.execute("ALTER TABLE parking_tickets ALTER COLUMN ticket_hash SET NOT NULL")
-    pg.execute(
-        """
-        DO $$
-        BEGIN
-            IF NOT EXISTS (
-                SELECT 1
-                FROM information_schema.table_constraints
-                WHERE table_schema = 'public'
-                  AND table_name = 'parking_tickets'
-                  AND constraint_type = 'PRIMARY KEY'
-            ) THEN
-                EXECUTE 'ALTER TABLE parking_tickets ADD CONSTRAINT parking_tickets_pkey PRIMARY KEY (ticket_hash)';
-            END IF;
-        END
-        $$
-        """
-    )
 
 
-def load_batch(pg: PostgresClient, rows: Iterable[Tuple]) -> None:
+def load_batch(pg: PostgresClient, rows: Iterable[Tuple]) -> Set[int]:
+    """Upsert ``rows`` and return the ticket years they landed in."""
+
     rows_list = list(rows)
     if not rows_list:
-        return
+        return set()
     pg.execute("TRUNCATE parking_tickets_staging")
     pg.copy_rows("parking_tickets_staging", STAGING_COLUMNS, rows_list)
-    pg.execute(
+    years = pg.fetch_all(
+        """
+        SELECT DISTINCT EXTRACT(YEAR FROM NULLIF(date_of_infraction, '')::DATE)::INT
+        FROM parking_tickets_staging
+        WHERE NULLIF(date_of_infraction, '') IS NOT NULL
         """
+    )
+    with pg.connect() as conn:
+        for (year,) in years:
+            ensure_year_partition(conn, year)
+    # Before and after the upsert: a re-geocoded ticket moves to another feature.
+    with pg.connect() as conn:
+        mark_staged_parking_features_dirty(conn, "parking_tickets_staging")
+    pg.execute(
+        f"""
         INSERT INTO parking_tickets AS target (
             ticket_hash,
             ticket_number,
@@ -185,31 +138,36 @@ def load_batch(pg: PostgresClient, rows: Iterable[Tuple]) -> None:
             location4,
             street_normalized,
             centreline_id,
-            geom
+            geom,
+            geom_3857,
+            tile_qk_prefix
         )
-        SELECT DISTINCT ON (ticket_hash)
-            ticket_hash,
-            ticket_number,
-            NULLIF(date_of_infraction, '')::DATE,
-            time_of_infraction,
-            infraction_code,
-            infraction_description,
-            NULLIF(set_fine_amount, '')::NUMERIC,
-            location1,
-            location2,
-            location3,
-            location4,
-            street_normalized,
-            centreline_id,
-            CASE
-                WHEN longitude IS NULL OR latitude IS NULL THEN NULL
-                ELSE ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)
-            END
-        FROM parking_tickets_staging
-        ORDER BY ticket_hash, NULLIF(date_of_infraction, '')::DATE DESC, time_of_infraction DESC
-        ON CONFLICT (ticket_hash) DO UPDATE SET
+        SELECT deduped.*, {tile_columns_sql("deduped.geom")}
+        FROM (
+            SELECT DISTINCT ON (ticket_hash)
+                ticket_hash,
+                ticket_number,
+                NULLIF(date_of_infraction, '')::DATE,
+                time_of_infraction,
+                infraction_code,
+                infraction_description,
+                NULLIF(set_fine_amount, '')::NUMERIC,
+                location1,
+                location2,
+                location3,
+                location4,
+                street_normalized,
+                centreline_id,
+                CASE
+                    WHEN longitude IS NULL OR latitude IS NULL THEN NULL
+                    ELSE ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)
+                END AS geom
+            FROM parking_tickets_staging
+            WHERE NULLIF(date_of_infraction, '') IS NOT NULL
+            ORDER BY ticket_hash, NULLIF(date_of_infraction, '')::DATE DESC, time_of_infraction DESC
+        ) AS deduped
+        ON CONFLICT (ticket_hash, date_of_infraction) DO UPDATE SET
             ticket_number = EXCLUDED.ticket_number,
-            date_of_infraction = EXCLUDED.date_of_infraction,
             time_of_infraction = EXCLUDED.time_of_infraction,
             infraction_code = EXCLUDED.infraction_code,
             infraction_description = EXCLUDED.infraction_description,
@@ -221,9 +179,14 @@ def load_batch(pg: PostgresClient, rows: Iterable[Tuple]) -> None:
             street_normalized = COALESCE(EXCLUDED.street_normalized, target.street_normalized),
             centreline_id = COALESCE(EXCLUDED.centreline_id, target.centreline_id),
             geom = COALESCE(EXCLUDED.geom, target.geom),
+            geom_3857 = COALESCE(EXCLUDED.geom_3857, target.geom_3857),
+            tile_qk_prefix = COALESCE(EXCLUDED.tile_qk_prefix, target.tile_qk_prefix),
             updated_at = NOW()
         """
     )
+    with pg.connect() as conn:
+        mark_staged_parking_features_dirty(conn, "parking_tickets_staging")
+    return {int(year) for (year,) in years}
 
 
 def _prepare_ticket_row(record: Dict[str, Optional[str]], geocodes: Dict[str, GeocodeRecord]) -> Optional[Tuple]:
@@ -321,14 +284,13 @@ def iter_ticket_rows_from_zip(zip_path: Path, geocodes: Dict[str, GeocodeRecord]
 
 
 def load_year(pg: PostgresClient, csv_paths: List[Path], year: int, geocodes: Dict[str, GeocodeRecord]) -> int:
-    start = date(year, 1, 1)
-    end = date(year + 1, 1, 1)
-    pg.execute(
-        "DELETE FROM parking_tickets WHERE date_of_infraction >= %s AND date_of_infraction < %s",
-        (start.isoformat(), end.isoformat()),
-    )
+    with pg.connect() as conn:
+        partition = ensure_year_partition(conn, year)
+        mark_parking_features_dirty(conn, *year_bounds(year))
+        conn.execute(f"TRUNCATE {partition}")
 
     written = 0
+    touched_years = {year}
     for csv_path in csv_paths:
         print(f"Processing {csv_path} ...")
         if csv_path.suffix.lower() == ".zip":
@@ -336,8 +298,12 @@ def load_year(pg: PostgresClient, csv_paths: List[Path], year: int, geocodes: Di
         else:
             rows = list(iter_ticket_rows(csv_path, geocodes))
         if rows:
-            load_batch(pg, rows)
+            touched_years |= load_batch(pg, rows)
             written += len(rows)
+
+    with pg.connect() as conn:
+        for touched in sorted(touched_years):
+            refresh_parking_rollup(conn, year=touched)
     return written
 
 
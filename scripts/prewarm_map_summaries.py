@@ -0,0 +1,69 @@
+"""Prewarm the viewport summary cache for the busiest downtown viewports.
+
+Loads ``api/map-summary.py`` (whose module name is not importable directly) and
+runs its summaries for ``PREWARM_VIEWPORTS`` so the first sidebar requests after
+an ETL run are served from Redis.  Run it once the ETL has finished syncing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SUMMARY_MODULE_PATH = PROJECT_ROOT / "api" / "map-summary.py"
+
+
+def _load_summary_module():
+    spec = importlib.util.spec_from_file_location("map_summary", SUMMARY_MODULE_PATH)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load {SUMMARY_MODULE_PATH}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--dataset",
+        action="append",
+        dest="datasets",
+        help="Dataset to warm (repeatable). Defaults to every dataset, which also serves 'all'.",
+    )
+    parser.add_argument(
+        "--year",
+        action="append",
+        type=int,
+        dest="years",
+        help="Also warm the given year filter (repeatable). The unfiltered view is always warmed.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    env_path = PROJECT_ROOT / ".env"
+    if env_path.exists():
+        load_dotenv(env_path, override=False)
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+
+    summary = _load_summary_module()
+    datasets = tuple(args.datasets or summary.SUMMARY_DATASETS)
+    years = (None, *(args.years or ()))
+    started = time.perf_counter()
+    warmed = summary.prewarm_summaries(datasets=datasets, years=years)
+    elapsed = time.perf_counter() - started
+    print(f"Warmed {warmed} viewport summaries in {elapsed:.1f}s", flush=True)
+    print(f"Cache stats: {summary.SUMMARY_CACHE.stats()}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,11 @@ database connection string, and invokes ``TileSchemaManager.ensure`` with
 ``include_tile_tables=True`` so that the Postgres ``*_camera_tiles`` tables are
 fully regenerated.  Rebuilds run in parallel worker threads to minimise wall-clock
 time while keeping the database tuned for heavy writes.
+
+Set ``TILE_REBUILD_MODE=incremental`` to refresh only the parking tile features
+queued by the ETL since the last build (camera tables are small and always
+rebuilt); the first build always runs in full.  ``ensure`` publishes the
+resulting tile versions to Redis and purges the changed tiles.
 """
 
 from __future__ import annotations
@@ -119,7 +124,9 @@ def main() -> None:
         logger=lambda msg: print(f"[tiles] {msg}", flush=True),
     )
     started = time.monotonic()
-    manager.ensure(include_tile_tables=True)
+    incremental = os.getenv("TILE_REBUILD_MODE", "full").strip().lower() == "incremental"
+    print(f"Tile rebuild mode: {'incremental' if incremental else 'full'}", flush=True)
+    manager.ensure(include_tile_tables=True, incremental=incremental)
     duration = time.monotonic() - started
     print(f"Camera tile tables rebuilt in {duration:.1f}s", flush=True)
 
@@ -9,7 +9,7 @@ import sys
 from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable, List, Sequence
+from typing import Callable, Iterable, List, Sequence
 
 import dotenv
 import psycopg
@@ -26,6 +26,8 @@ from src.etl.bootstrap import ensure_base_tables  # noqa: E402
 from src.etl.postgres import PostgresClient  # noqa: E402
 from src.tiles.schema import TileSchemaManager  # noqa: E402
 from src.etl.runner import run_pipeline as run_core_datasets  # noqa: E402
+from src.etl.scheduler import DagScheduler, SchedulerError, Stage, StageTiming  # noqa: E402
+from src.etl.state import ETLStateStore  # noqa: E402
 
 # MARK: Constants
 
@@ -59,28 +61,35 @@ DEFAULT_REQUIRED_TABLES: tuple[str, ...] = (
     "spatial_ref_sys",
 )
 
-SCRIPT_STEPS: tuple[tuple[str, Path, Sequence[str]], ...] = (
+# (label, script, args, labels of steps it needs). Steps without a path between
+# them run concurrently; Redis is pushed once every summary file is written.
+SCRIPT_STEPS: tuple[tuple[str, Path, Sequence[str], tuple[str, ...]], ...] = (
     (
         "Build yearly metrics",
         REPO_ROOT / "scripts" / "build_yearly_metrics.py",
         (),
+        (),
     ),
     (
         "Build camera datasets",
         REPO_ROOT / "preprocessing" / "build_camera_datasets.py",
         (),
+        (),
     ),
     (
         "Build ward datasets",
         REPO_ROOT / "scripts" / "build_camera_ward_datasets.py",
         (),
+        (),
     ),
     (
         "Push tickets to Redis",
         REPO_ROOT / "scripts" / "push_tickets_to_redis.py",
         (),
+        ("Build yearly metrics", "Build camera datasets", "Build ward datasets"),
     ),
 )
+REFRESH_STATE_SLUG = "full_refresh"
 
 
 # MARK: Utilities
@@ -172,6 +181,43 @@ def run_python_script(script_path: Path, args: Sequence[str], env: dict[str, str
     subprocess.run(command, check=True, env=env)
 
 
+def build_script_stages(
+    env: dict[str, str],
+    dsn: str,
+    redis_url: str | None,
+    force_ward_download: bool,
+) -> list[Stage]:
+    stages: list[Stage] = []
+    for label, script_path, script_args, depends_on in SCRIPT_STEPS:
+        step_args = list(script_args)
+        if label != "Push tickets to Redis":
+            step_args.extend(["--database-url", dsn])
+        if label == "Build ward datasets" and redis_url:
+            step_args.extend(["--redis-url", redis_url])
+        if label == "Build ward datasets" and force_ward_download:
+            step_args.append("--force-download")
+        stages.append(Stage(name=label, run=script_runner(label, script_path, step_args, env), depends_on=depends_on))
+    return stages
+
+
+def script_runner(label: str, script_path: Path, args: Sequence[str], env: dict[str, str]) -> Callable[[], None]:
+    def run() -> None:
+        print(f"=== {label} ===")
+        run_python_script(script_path, args, env)
+
+    return run
+
+
+def record_refresh_timings(dsn: str, timings: dict[str, StageTiming]) -> None:
+    client = PostgresClient(dsn=dsn, application_name="toronto-parking-refresh")
+    ETLStateStore(client).record_run_timings(
+        REFRESH_STATE_SLUG,
+        {"steps": {name: timing.to_json() for name, timing in timings.items()}},
+    )
+    for name, timing in timings.items():
+        print(f"   {timing.status:>9}  {timing.elapsed_seconds:8.1f}s  {name}")
+
+
 def run_restart_commands(commands: list[list[str]]) -> None:
     for command in commands:
         if not command:
@@ -255,6 +301,11 @@ def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
         action="store_true",
         help="Force re-download of ward GeoJSON when building ward datasets",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Datasets / script steps to run concurrently (default: ETL_MAX_PARALLEL_STAGES or 3)",
+    )
     parser.add_argument(
         "--non-interactive",
         action="store_true",
@@ -326,22 +377,23 @@ def main(argv: Iterable[str] | None = None) -> None:
             etl_env["REDIS_URL"] = redis_url
             etl_env.setdefault("REDIS_PUBLIC_URL", redis_url)
         with temporary_env(etl_env):
-            run_core_datasets()
+            run_core_datasets(max_workers=args.workers)
 
     if not args.skip_tiles:
         print("=== Ensuring tile schema ===")
         ensure_tile_schema(dsn, args.quadkey_zoom, args.quadkey_prefix)
 
-    for label, script_path, script_args in SCRIPT_STEPS:
-        step_args = list(script_args)
-        if label != "Push tickets to Redis":
-            step_args.extend(["--database-url", dsn])
-        if label == "Build ward datasets" and redis_url:
-            step_args.extend(["--redis-url", redis_url])
-        if label == "Build ward datasets" and args.force_ward_download:
-            step_args.append("--force-download")
-        print(f"=== {label} ===")
-        run_python_script(script_path, step_args, env)
+    print("=== Running refresh steps ===")
+    scheduler = DagScheduler(
+        build_script_stages(env, dsn, redis_url, args.force_ward_download),
+        max_workers=args.workers,
+    )
+    try:
+        timings = scheduler.run()
+    except SchedulerError as exc:
+        record_refresh_timings(dsn, exc.timings)
+        raise
+    record_refresh_timings(dsn, timings)
 
     print("=== Verifying required tables ===")
     verify_tables(dsn, required_tables)
@@ -2,30 +2,65 @@
 
 from __future__ import annotations
 
+from datetime import date
+from typing import Any, Sequence
+
+from .parking_partitions import ensure_partitioned_parking_tickets
 from .postgres import PostgresClient
+from .rollups import PARKING_ROLLUP_DDL
 from .state import DDL as ETL_STATE_DDL
 
-BASE_TABLE_DDLS: tuple[str, ...] = (
+# Identity of a parking-ticket feature in ``parking_ticket_tiles``.
+PARKING_TILE_FEATURE_KEY_SQL = "COALESCE(centreline_id::text, street_normalized, location1, ticket_hash)"
+
+# Features whose tile rows are stale; loaders append, incremental tile refreshes drain.
+TILE_DIRTY_FEATURES_DDL = """
+    CREATE TABLE IF NOT EXISTS tile_dirty_features (
+        dataset TEXT NOT NULL,
+        feature_id TEXT NOT NULL,
+        marked_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (dataset, feature_id)
+    )
+"""
+
+
+def mark_parking_features_dirty(conn: Any, start: date, end: date) -> None:
+    """Queue the tile features of tickets dated in ``[start, end)`` for incremental refresh.
+
+    Loaders call this before a year is deleted and after it is reloaded so
+    features that lost or gained tickets are both picked up by the tile refresh.
     """
-    CREATE TABLE IF NOT EXISTS parking_tickets (
-        ticket_hash TEXT PRIMARY KEY,
-        ticket_number TEXT,
-        date_of_infraction DATE,
-        time_of_infraction TEXT,
-        infraction_code TEXT,
-        infraction_description TEXT,
-        set_fine_amount NUMERIC,
-        location1 TEXT,
-        location2 TEXT,
-        location3 TEXT,
-        location4 TEXT,
-        street_normalized TEXT,
-        centreline_id BIGINT,
-        geom geometry(POINT, 4326),
-        created_at TIMESTAMPTZ DEFAULT NOW(),
-        updated_at TIMESTAMPTZ DEFAULT NOW()
+
+    conn.execute(
+        f"""
+        INSERT INTO tile_dirty_features (dataset, feature_id)
+        SELECT DISTINCT 'parking_tickets', {PARKING_TILE_FEATURE_KEY_SQL}
+        FROM parking_tickets
+        WHERE date_of_infraction >= %s AND date_of_infraction < %s
+        ON CONFLICT (dataset, feature_id) DO UPDATE SET marked_at = NOW()
+        """,
+        (start.isoformat(), end.isoformat()),
     )
-    """,
+
+
+def mark_staged_parking_features_dirty(
+    conn: Any, staging_table: str, where_sql: str = "TRUE", params: Sequence[Any] = ()
+) -> None:
+    """Queue the tile features of stored tickets matching staged rows in ``where_sql``."""
+
+    conn.execute(
+        f"""
+        INSERT INTO tile_dirty_features (dataset, feature_id)
+        SELECT DISTINCT 'parking_tickets', {PARKING_TILE_FEATURE_KEY_SQL}
+        FROM parking_tickets
+        WHERE ticket_hash IN (SELECT ticket_hash FROM {staging_table} WHERE {where_sql})
+        ON CONFLICT (dataset, feature_id) DO UPDATE SET marked_at = NOW()
+        """,
+        params,
+    )
+
+
+BASE_TABLE_DDLS: tuple[str, ...] = (
     """
     CREATE TABLE IF NOT EXISTS parking_tickets_staging (
         ticket_hash TEXT,
@@ -230,9 +265,18 @@ def ensure_base_tables(dsn: str) -> None:
 
     client = PostgresClient(dsn=dsn, application_name="toronto-parking-bootstrap")
     client.ensure_extensions()
+    ensure_partitioned_parking_tickets(client)
     for ddl in BASE_TABLE_DDLS:
         client.execute(ddl)
     client.execute(ETL_STATE_DDL)
+    client.execute(TILE_DIRTY_FEATURES_DDL)
+    client.execute(PARKING_ROLLUP_DDL)
 
 
-__all__ = ["ensure_base_tables"]
+__all__ = [
+    "PARKING_TILE_FEATURE_KEY_SQL",
+    "TILE_DIRTY_FEATURES_DDL",
+    "ensure_base_tables",
+    "mark_parking_features_dirty",
+    "mark_staged_parking_features_dirty",
+]
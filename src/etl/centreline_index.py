@@ -0,0 +1,117 @@
+"""Shared construction of the centreline geocoder for ETL loaders.
+
+Every loader that geocodes used to read ``centreline_segments`` with
+``ST_AsGeoJSON`` and build its own :class:`CentrelineGeocoder`.  Centroids (the
+vertex mean, matching the Python fallback) and segment endpoints (the
+intersection nodes) are now computed in SQL, and the built index is pickled
+under a snapshot directory keyed by the centreline data version, so later runs
+and parallel workers load it instead of rebuilding.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+import time
+from typing import Any, Optional
+
+import pandas as pd
+
+from geocoding.centreline_geocoder import GEOCODER_VERSION, CentrelineGeocoder
+
+from .storage import ArtefactStore
+
+
+LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_DIR_ENV = "CENTRELINE_SNAPSHOT_DIR"
+DEFAULT_SNAPSHOT_DIR = Path("output") / "etl" / "staging" / "centreline"
+
+CENTRELINE_FRAME_SQL = """
+    SELECT
+        centreline_id AS "CENTRELINE_ID",
+        linear_name AS "LINEAR_NAME",
+        linear_name_type AS "LINEAR_NAME_TYPE",
+        linear_name_dir AS "LINEAR_NAME_DIR",
+        linear_name_full AS "LINEAR_NAME_FULL",
+        linear_name_label AS "LINEAR_NAME_LABEL",
+        parity_left AS "PARITY_L",
+        parity_right AS "PARITY_R",
+        low_num_even AS "LOW_NUM_EVEN",
+        high_num_even AS "HIGH_NUM_EVEN",
+        low_num_odd AS "LOW_NUM_ODD",
+        high_num_odd AS "HIGH_NUM_ODD",
+        feature_code AS "FEATURE_CODE",
+        feature_code_desc AS "FEATURE_CODE_DESC",
+        jurisdiction AS "JURISDICTION",
+        ST_Y(ST_Centroid(ST_Points(geom))) AS "CENTROID_LAT",
+        ST_X(ST_Centroid(ST_Points(geom))) AS "CENTROID_LON",
+        ST_Y(ST_StartPoint(ST_GeometryN(geom, 1))) AS "START_LAT",
+        ST_X(ST_StartPoint(ST_GeometryN(geom, 1))) AS "START_LON",
+        ST_Y(ST_EndPoint(ST_GeometryN(geom, ST_NumGeometries(geom)))) AS "END_LAT",
+        ST_X(ST_EndPoint(ST_GeometryN(geom, ST_NumGeometries(geom)))) AS "END_LON"
+    FROM centreline_segments
+"""
+
+
+def centreline_version(conn: Any, *, dataset_slug: str = "centreline") -> str:
+    """Version tag for artefacts derived from the current centreline data."""
+
+    row = conn.execute(
+        "SELECT last_resource_hash FROM etl_state WHERE dataset_slug = %s",
+        (dataset_slug,),
+    ).fetchone()
+    source = row[0] if row and row[0] else None
+    if source is None:
+        # Centreline loaded outside the ETL; fingerprint the table instead.
+        stats = conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(centreline_id), 0), COALESCE(SUM(centreline_id), 0) FROM centreline_segments"
+        ).fetchone()
+        source = "table:" + ":".join(str(value) for value in (stats or ()))
+    digest = hashlib.sha1(source.encode("utf-8"), usedforsecurity=False).hexdigest()[:16]
+    return f"{digest}-g{GEOCODER_VERSION}"
+
+
+def snapshot_dir_for(store: Optional[ArtefactStore]) -> Optional[Path]:
+    """``CENTRELINE_SNAPSHOT_DIR``, else the store's staging area; empty env disables."""
+
+    configured = os.getenv(SNAPSHOT_DIR_ENV)
+    if configured is not None:
+        return Path(configured) if configured.strip() else None
+    if store is not None:
+        return store.staging_root / "centreline"
+    return DEFAULT_SNAPSHOT_DIR
+
+
+def load_centreline_geocoder(conn: Any, snapshot_dir: Optional[Path] = None) -> CentrelineGeocoder:
+    """Load the geocoder snapshot for the current centreline data, building it if needed."""
+
+    snapshot_path: Optional[Path] = None
+    if snapshot_dir is not None:
+        snapshot_path = snapshot_dir / f"geocoder-{centreline_version(conn)}.pickle"
+        started = time.perf_counter()
+        geocoder = CentrelineGeocoder.load_snapshot(snapshot_path)
+        if geocoder is not None:
+            LOGGER.info("Loaded centreline geocoder snapshot %s in %.2fs", snapshot_path, time.perf_counter() - started)
+            return geocoder
+
+    started = time.perf_counter()
+    frame = pd.read_sql_query(CENTRELINE_FRAME_SQL, conn)
+    geocoder = CentrelineGeocoder(frame)
+    LOGGER.info("Built centreline geocoder from %s segments in %.2fs", len(frame), time.perf_counter() - started)
+    if snapshot_path is not None:
+        try:
+            geocoder.save_snapshot(snapshot_path)
+        except OSError as exc:  # pragma: no cover - best effort cache
+            LOGGER.warning("Could not write centreline geocoder snapshot %s: %s", snapshot_path, exc)
+    return geocoder
+
+
+__all__ = [
+    "CENTRELINE_FRAME_SQL",
+    "centreline_version",
+    "load_centreline_geocoder",
+    "snapshot_dir_for",
+]
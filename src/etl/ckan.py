@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, Iterator, Optional
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence
+import itertools
 import json
 import logging
 import time
@@ -13,7 +16,9 @@ import os
 
 import requests
 from requests import Response
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import RetryError, retry, stop_after_attempt, wait_exponential
+
+from .storage import ArtefactInfo, ArtefactWriter
 
 
 LOGGER = logging.getLogger(__name__)
@@ -42,6 +47,7 @@ class CKANClient:
         self.base_url = base_url.rstrip("/")
         self.user_agent = user_agent
         self.timeout = timeout
+        self._sql_unavailable = False
         self._session = requests.Session()
         self._session.headers.update({"User-Agent": self.user_agent})
         verify = os.getenv("REQUESTS_CA_BUNDLE") or os.getenv("SSL_CERT_FILE")
@@ -81,8 +87,18 @@ class CKANClient:
             )
 
     @retry(wait=wait_exponential(multiplier=1, min=2, max=30), stop=stop_after_attempt(5))
-    def download_resource(self, resource_id: str, destination: Path) -> Path:
-        """Download a CKAN resource dump to ``destination``."""
+    def download_resource(self, resource_id: str, destination: Path, *, resume: bool = True) -> ArtefactInfo:
+        """Download a CKAN resource dump to ``destination`` and return its size and SHA1.
+
+        Chunks are hashed as they arrive and written to
+        ``<destination>.part``, which is renamed into place once complete
+        (:class:`ArtefactWriter`), so the file never has to be read back to
+        be hashed.  When a partial file from an interrupted attempt exists and
+        the server validator (ETag or Last-Modified) was recorded for it, the
+        download continues with an HTTP ``Range`` request guarded by
+        ``If-Range``; a server that ignores the range or reports a changed
+        file sends the whole body and the partial file is discarded.
+        """
 
         meta_url = f"{self.base_url}/api/3/action/resource_show"
         response = self._session.get(meta_url, params={"id": resource_id}, timeout=self.timeout)
@@ -92,15 +108,48 @@ class CKANClient:
             raise CKANError(f"Resource {resource_id} does not have a download URL")
 
         destination.parent.mkdir(parents=True, exist_ok=True)
+        partial = destination.with_name(destination.name + ".part")
+        validator_path = destination.with_name(destination.name + ".part.json")
+
+        headers: Dict[str, str] = {}
+        offset = partial.stat().st_size if resume and partial.exists() else 0
+        validator = _read_validator(validator_path, url) if offset else None
+        if validator:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+        else:
+            offset = 0
 
-        LOGGER.info("Downloading resource %s → %s", resource_id, destination)
-        with self._session.get(url, stream=True, timeout=self.timeout) as stream:
+        with self._session.get(url, stream=True, timeout=self.timeout, headers=headers) as stream:
+            if stream.status_code == 416 and offset:
+                # Nothing left to send: the partial file is already complete.
+                if _content_range_total(stream.headers.get("Content-Range")) == offset:
+                    LOGGER.info("Download of resource %s was already complete", resource_id)
+                    with ArtefactWriter(destination, append=True) as writer:
+                        artefact = writer.commit()
+                    validator_path.unlink(missing_ok=True)
+                    return artefact
+                partial.unlink(missing_ok=True)
+                validator_path.unlink(missing_ok=True)
+                raise CKANError(f"Range request for resource {resource_id} rejected; restarting download")
             stream.raise_for_status()
-            with destination.open("wb") as fh:
+            append = stream.status_code == 206 and offset > 0
+            if append:
+                LOGGER.info("Resuming resource %s at byte %s → %s", resource_id, offset, destination)
+            else:
+                LOGGER.info("Downloading resource %s → %s", resource_id, destination)
+                validator = stream.headers.get("ETag") or stream.headers.get("Last-Modified")
+                if validator and not validator.startswith("W/"):
+                    validator_path.write_text(json.dumps({"url": url, "validator": validator}))
+                else:
+                    validator_path.unlink(missing_ok=True)
+            with ArtefactWriter(destination, append=append) as writer:
                 for chunk in stream.iter_content(chunk_size=1 << 20):
                     if chunk:
-                        fh.write(chunk)
-        return destination
+                        writer.write(chunk)
+                artefact = writer.commit()
+        validator_path.unlink(missing_ok=True)
+        return artefact
 
     def datastore_search(
         self,
@@ -109,8 +158,35 @@ class CKANClient:
         limit: int = 5000,
         filters: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None,
+        prefetch: int = 0,
     ) -> Iterator[Dict[str, Any]]:
-        """Iterate over rows in a datastore-active CKAN resource."""
+        """Iterate over rows in a datastore-active CKAN resource.
+
+        Equality ``filters`` are served by :meth:`iter_datastore_keyset`;
+        other ``datastore_search`` parameters (``q``, ``sort``, ...) fall back
+        to offset paging through the search endpoint.  So do instances that
+        disable or restrict ``datastore_search_sql``: when its first page
+        fails the client logs it and keeps using the search endpoint.
+        """
+
+        extra = {key: value for key, value in (params or {}).items() if key not in {"id", "limit"}}
+        if not extra and not self._sql_unavailable:
+            where = " AND ".join(_sql_filter(column, value) for column, value in (filters or {}).items()) or None
+            started = False
+            try:
+                for record in self.iter_datastore_keyset(resource_id, where=where, page_size=limit, prefetch=prefetch):
+                    started = True
+                    yield record
+                return
+            except (CKANError, RetryError) as exc:
+                if started:
+                    raise
+                LOGGER.warning(
+                    "datastore_search_sql failed for %s (%s); paging through datastore_search instead",
+                    resource_id,
+                    exc,
+                )
+                self._sql_unavailable = True
 
         offset = 0
         has_more = True
@@ -144,6 +220,69 @@ class CKANClient:
         response = self._session.get(url, params={"sql": sql}, timeout=self.timeout)
         return self._handle_response(response)
 
+    def iter_datastore_keyset(
+        self,
+        resource_id: str,
+        *,
+        where: str | None = None,
+        columns: Sequence[str] | None = None,
+        page_size: int = 5000,
+        prefetch: int = 0,
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over a datastore table in ``_id`` order without ``OFFSET``.
+
+        Each page is ``WHERE _id > <last seen> ORDER BY _id LIMIT n``, so every
+        request costs the same however deep into the table it is.  With
+        ``prefetch`` the table is instead split into ``_id`` ranges of
+        ``page_size`` up to ``MAX(_id)`` and up to ``prefetch`` ranges are
+        fetched concurrently; only that many pages are ever held in memory
+        and rows are still yielded in ``_id`` order.
+        """
+
+        table = _sql_identifier(resource_id)
+        selected = "*" if not columns else ", ".join(_sql_identifier(name) for name in ("_id", *columns))
+        condition = f" AND ({where})" if where else ""
+
+        if prefetch <= 0:
+            last_id = 0
+            while True:
+                sql = (
+                    f"SELECT {selected} FROM {table} WHERE _id > {last_id}{condition} "
+                    f"ORDER BY _id LIMIT {int(page_size)}"
+                )
+                records = _records(self.datastore_search_sql(sql))
+                yield from records
+                if len(records) < page_size:
+                    return
+                last_id = int(records[-1]["_id"])
+
+        bounds = self.datastore_search_sql(f"SELECT MAX(_id) AS max_id FROM {table}").get("records", [])
+        max_id = int(bounds[0]["max_id"] or 0) if bounds else 0
+
+        def fetch(lower: int) -> List[Dict[str, Any]]:
+            sql = (
+                f"SELECT {selected} FROM {table} WHERE _id > {lower} AND _id <= {lower + int(page_size)}"
+                f"{condition} ORDER BY _id"
+            )
+            return _records(self.datastore_search_sql(sql))
+
+        lowers = iter(range(0, max_id, int(page_size)))
+        with ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="ckan-datastore") as executor:
+            pending: Deque[Future] = deque()
+            try:
+                for lower in itertools.islice(lowers, prefetch):
+                    pending.append(executor.submit(fetch, lower))
+                while pending:
+                    records = pending.popleft().result()
+                    lower = next(lowers, None)
+                    if lower is not None:
+                        pending.append(executor.submit(fetch, lower))
+                    yield from records
+            finally:
+                # A consumer that stops early should not wait on pages it will never read.
+                for future in pending:
+                    future.cancel()
+
     def iter_datastore_sql(
         self,
         resource_id: str,
@@ -151,7 +290,14 @@ class CKANClient:
         where: str | None = None,
         order_by: str | None = None,
         chunk_size: int = 5000,
+        prefetch: int = 0,
     ) -> Iterator[Dict[str, Any]]:
+        """Iterate over ``SELECT *`` results (minus ``_full_text``); ``_id`` order uses keyset paging."""
+
+        if order_by is None or order_by.strip().lower() in {"_id", "_id asc", '"_id"'}:
+            yield from self.iter_datastore_keyset(resource_id, where=where, page_size=chunk_size, prefetch=prefetch)
+            return
+
         offset = 0
         while True:
             sql_parts = [f'SELECT * FROM "{resource_id}"']
@@ -161,8 +307,7 @@ class CKANClient:
                 sql_parts.append(f"ORDER BY {order_by}")
             sql_parts.append(f"LIMIT {chunk_size} OFFSET {offset}")
             sql = " ".join(sql_parts)
-            payload = self.datastore_search_sql(sql)
-            records = payload.get("records", [])
+            records = _records(self.datastore_search_sql(sql))
             if not records:
                 break
             for record in records:
@@ -172,6 +317,70 @@ class CKANClient:
                 break
 
 
+def _sql_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_literal(value: Any) -> str:
+    """Quoted SQL literal.
+
+    Postgres types an untyped quoted literal from the column it is compared
+    with, so ``'1'`` works against text and integer columns alike; a bare
+    ``1`` fails on text columns with ``operator does not exist``.
+    """
+
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        value = "true" if value else "false"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _records(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Rows of a ``datastore_search_sql`` response without the ``_full_text`` search index.
+
+    ``datastore_search`` never returns that column; ``SELECT *`` does.
+    """
+
+    records = payload.get("records", [])
+    for record in records:
+        record.pop("_full_text", None)
+    return records
+
+
+def _sql_filter(column: str, value: Any) -> str:
+    """SQL for one ``datastore_search`` equality filter (lists mean any-of)."""
+
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return "FALSE"
+        return f"{_sql_identifier(column)} IN ({', '.join(_sql_literal(item) for item in value)})"
+    if value is None:
+        return f"{_sql_identifier(column)} IS NULL"
+    return f"{_sql_identifier(column)} = {_sql_literal(value)}"
+
+
+def _read_validator(path: Path, url: str) -> Optional[str]:
+    """Validator recorded for a partial download of ``url``, if any."""
+
+    try:
+        payload = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get("url") != url:
+        return None
+    return payload.get("validator")
+
+
+def _content_range_total(value: Optional[str]) -> Optional[int]:
+    """Total length from a ``Content-Range: bytes */<total>`` header."""
+
+    if not value or "/" not in value:
+        return None
+    total = value.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
 __all__ = [
     "CKANClient",
     "CKANError",
@@ -44,6 +44,12 @@ class DatabaseConfig:
     # Memory optimization: Reduced from 600000ms (10min) to 60000ms (1min)
     # Long-running queries were accumulating memory on Railway
     statement_timeout_ms: int | None = 60_000
+    # Connection pooling shared by the API handlers and the ETL pipeline;
+    # ``None`` (PG_POOL_ENABLED unset) leaves the choice to the caller.
+    pool_enabled: bool | None = None
+    pool_min_size: int = 1
+    pool_max_size: int = 4
+    pool_max_idle_seconds: float = 300.0
 
     @classmethod
     def from_env(cls) -> "DatabaseConfig":
@@ -62,7 +68,20 @@ class DatabaseConfig:
         schema = os.getenv("POSTGRES_SCHEMA", "public")
         # Memory optimization: Default reduced to 60000ms (1 minute)
         timeout = int(os.getenv("PG_STATEMENT_TIMEOUT_MS", "60000"))
-        return cls(dsn=dsn, schema=schema, statement_timeout_ms=timeout)
+        pool_flag = os.getenv("PG_POOL_ENABLED", "").strip().lower()
+        pool_enabled = pool_flag in {"1", "true", "yes"} if pool_flag else None
+        pool_min_size = int(os.getenv("PG_POOL_MIN_SIZE", "1"))
+        pool_max_size = int(os.getenv("PG_POOL_MAX_SIZE", "4"))
+        pool_max_idle = float(os.getenv("PG_POOL_MAX_IDLE_S", "300"))
+        return cls(
+            dsn=dsn,
+            schema=schema,
+            statement_timeout_ms=timeout,
+            pool_enabled=pool_enabled,
+            pool_min_size=pool_min_size,
+            pool_max_size=pool_max_size,
+            pool_max_idle_seconds=pool_max_idle,
+        )
 
 
 @dataclass(frozen=True)
@@ -109,6 +128,7 @@ class DatasetConfig:
     incremental_field: str | None = None
     primary_key: tuple[str, ...] = ("source_pk",)
     timezone: str = "America/Toronto"
+    depends_on: tuple[str, ...] = ()
 
 
 @dataclass(frozen=True)
@@ -186,6 +206,7 @@ class ETLConfig:
                 handler="src.etl.datasets.parking_tickets:ParkingTicketsETL",
                 incremental_field=None,
                 primary_key=("ticket_number",),
+                depends_on=("centreline",),
                 resources=apply_overrides(
                     "parking_tickets",
                     {
@@ -201,6 +222,7 @@ class ETLConfig:
                 handler="src.etl.datasets.red_light_locations:RedLightLocationsETL",
                 incremental_field=None,
                 primary_key=("intersection_id",),
+                depends_on=("centreline",),
                 resources=apply_overrides(
                     "red_light_locations",
                     {
@@ -222,6 +244,7 @@ class ETLConfig:
                 handler="src.etl.datasets.ase_locations:ASELocationsETL",
                 incremental_field=None,
                 primary_key=("location_code",),
+                depends_on=("centreline",),
                 resources=apply_overrides(
                     "ase_locations",
                     {
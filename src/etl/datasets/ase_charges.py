@@ -19,6 +19,9 @@ STAGING_COLUMNS = (
     "location",
 )
 
+# Postgres types of ``STAGING_COLUMNS`` for binary COPY.
+STAGING_COLUMN_TYPES = ("text",) * 7
+
 
 class ASEChargesETL(DatasetETL):
     def extract(self, state: DatasetState) -> ExtractionResult | None:
@@ -44,8 +47,8 @@ class ASEChargesETL(DatasetETL):
             ):
                 sha1 = manifest_entry.get("sha1") or sha1sum(path)
             else:
-                path = self.download_resource(resource_cfg, suffix=suffix)
-                sha1 = sha1sum(path)
+                artefact = self.download_resource(resource_cfg, suffix=suffix)
+                path, sha1 = artefact.path, artefact.sha1
                 has_changes = True
 
             resource_paths[name] = path
@@ -126,7 +129,9 @@ class ASEChargesETL(DatasetETL):
             """
         )
 
-        self.pg.copy_rows("ase_charges_staging", STAGING_COLUMNS, rows)
+        self.pg.copy_rows(
+            "ase_charges_staging", STAGING_COLUMNS, rows, types=STAGING_COLUMN_TYPES, coerce_text=True,
+        )
         self.pg.execute(
             """
             INSERT INTO ase_charges AS target (
@@ -9,12 +9,14 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Iterable as TypingIterable, Mapping, Sequence
 from functools import lru_cache
+import time
 
 from ..ckan import CKANClient
 from ..config import DatasetConfig, CKANResourceConfig
+from ..downloads import DownloadManager, DownloadRequest, DownloadResult
 from ..postgres import PostgresClient
 from ..state import DatasetState, ETLStateStore
-from ..storage import ArtefactStore
+from ..storage import ArtefactInfo, ArtefactStore
 
 
 @dataclass
@@ -45,25 +47,36 @@ class DatasetETL(ABC):
         self.pg = pg
         self.state_store = state_store
         self._resource_cache: dict[str, Dict[str, Any]] = {}
+        self.stage_timings: Dict[str, float] = {}
 
     def run(self) -> None:
         state = self.state_store.get(self.config.slug)
+        started = time.perf_counter()
         extraction = self.extract(state)
+        self.stage_timings["extract"] = time.perf_counter() - started
         if extraction is None:
             return
+        started = time.perf_counter()
         transformed = self.transform(extraction, state)
+        self.stage_timings["transform"] = time.perf_counter() - started
+        started = time.perf_counter()
         self.load(transformed, state)
-        metadata = {
-            "row_count": transformed.get("row_count"),
-            "resources": extraction.resource_metadata,
-        }
+        self.stage_timings["load"] = time.perf_counter() - started
         self.state_store.upsert(
             self.config.slug,
             last_synced_at=datetime.utcnow(),
             last_resource_hash="|".join(sorted(extraction.resource_hashes.values())),
-            metadata=metadata,
+            metadata=self.state_metadata(extraction, transformed),
         )
 
+    def state_metadata(self, extraction: ExtractionResult, transformed: Dict[str, Any]) -> Dict[str, Any]:
+        """Metadata stored in ``etl_state`` once ``load`` has finished."""
+
+        return {
+            "row_count": transformed.get("row_count"),
+            "resources": extraction.resource_metadata,
+        }
+
     @abstractmethod
     def extract(self, state: DatasetState) -> ExtractionResult | None:
         """Download new artefacts if necessary."""
@@ -77,10 +90,20 @@ class DatasetETL(ABC):
         """Persist the transformed payload into PostgreSQL."""
 
     # Utility helpers -------------------------------------------------
-    def download_resource(self, resource: CKANResourceConfig, *, suffix: str) -> Path:
+    def download_resource(self, resource: CKANResourceConfig, *, suffix: str) -> ArtefactInfo:
+        """Download ``resource`` into the raw store; the SHA1 is computed while streaming."""
+
         path = self.store.raw_path(self.config.slug, resource.resource_id, suffix)
-        self.ckan.download_resource(resource.resource_id, path)
-        return path
+        artefact = self.ckan.download_resource(resource.resource_id, path)
+        self.store.record_download(
+            self.config.slug, resource.resource_id, artefact.path, sha1=artefact.sha1, size=artefact.size
+        )
+        return artefact
+
+    def download_resources(self, requests: Sequence[DownloadRequest]) -> Dict[str, DownloadResult]:
+        """Fetch several resources concurrently; see :class:`DownloadManager`."""
+
+        return DownloadManager(self.ckan, self.store, self.config.slug).download_all(requests)
 
     def get_package_resource(self, resource: CKANResourceConfig) -> Dict[str, Any]:
         package_id = resource.package_id or self.config.package_id
@@ -56,8 +56,8 @@ class CentrelineETL(DatasetETL):
             ):
                 sha1 = manifest_entry.get("sha1") or sha1sum(path)
             else:
-                path = self.download_resource(resource_cfg, suffix=suffix)
-                sha1 = sha1sum(path)
+                artefact = self.download_resource(resource_cfg, suffix=suffix)
+                path, sha1 = artefact.path, artefact.sha1
                 has_changes = True
 
             resource_paths[name] = path
@@ -4,13 +4,13 @@
 from __future__ import annotations
 
 import csv
-import hashlib
-import io
 import json
+import multiprocessing
 import os
 import sys
-import zipfile
-from datetime import date, datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from itertools import islice
 from pathlib import Path
 from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
@@ -19,93 +19,46 @@ import logging
 
 from geocoding.centreline_geocoder import CentrelineGeocoder, GeocodeResult
 
+from ..bootstrap import (
+    TILE_DIRTY_FEATURES_DDL,
+    mark_parking_features_dirty,
+    mark_staged_parking_features_dirty,
+)
+from ..centreline_index import load_centreline_geocoder, snapshot_dir_for
+from ..downloads import DownloadRequest
+from ..geocode_cache import GeocodeStore
+from ..parking_checkpoints import YearLoadCheckpoint, read_load_checkpoint, write_load_checkpoint
+from ..parking_partitions import (
+    PARKING_TICKET_COLUMNS,
+    ensure_partitioned_parking_tickets,
+    ensure_year_partition,
+    swap_year_partition,
+    tile_columns_sql,
+    year_bounds,
+)
+from ..parking_records import (
+    STAGING_COLUMNS,
+    _normalise_date,
+    _normalise_time,
+    _safe_decimal,
+    build_ticket_hash,
+    iter_archive_members,
+    prepare_frame,
+)
+from ..postgres import PostgresClient, copy_batches
+from ..rollups import ensure_parking_rollup, refresh_parking_rollup
 from ..state import DatasetState
-from ..utils import sha1sum
+from ..utils import chunked, sha1sum
 from .base import DatasetETL, ExtractionResult
 
-STAGING_COLUMNS = (
-    "ticket_hash",
-    "ticket_number",
-    "date_of_infraction",
-    "time_of_infraction",
-    "infraction_code",
-    "infraction_description",
-    "set_fine_amount",
-    "location1",
-    "location2",
-    "location3",
-    "location4",
-    "street_normalized",
-    "centreline_id",
-    "latitude",
-    "longitude",
-)
-
-_GEOCODE_MISS = object()
-
-
-def build_ticket_hash(
-    ticket_number: Optional[str],
-    parsed_date: Optional[str],
-    time_value: Optional[str],
-    infraction_code: Optional[str],
-    infraction_description: Optional[str],
-    set_fine: Optional[str],
-    location1: Optional[str],
-    location2: Optional[str],
-    location3: Optional[str],
-    location4: Optional[str],
-) -> str:
-    components = (
-        ticket_number or "",
-        parsed_date or "",
-        time_value or "",
-        infraction_code or "",
-        infraction_description or "",
-        set_fine or "",
-        location1 or "",
-        location2 or "",
-        location3 or "",
-        location4 or "",
-    )
-    raw = "|".join(components)
-    return hashlib.md5(raw.encode("utf-8")).hexdigest()
-
-
-def _safe_decimal(value: Any) -> Optional[str]:
-    if value in (None, ""):
-        return None
-    try:
-        from decimal import Decimal
-
-        return str(Decimal(str(value)))
-    except Exception:
-        return None
+# Postgres types of ``STAGING_COLUMNS`` for binary COPY.
+STAGING_COLUMN_TYPES = ("text",) * 12 + ("int8", "float8", "float8")
 
+CSV_ENGINES = ("rows", "columnar")
 
-def _normalise_date(value: Optional[str]) -> Optional[str]:
-    if not value:
-        return None
-    value = value.strip()
-    if not value:
-        return None
-    for fmt in ("%Y-%m-%d", "%Y%m%d", "%Y/%m/%d"):
-        try:
-            return datetime.strptime(value, fmt).date().isoformat()
-        except ValueError:
-            continue
-    return None
-
+PARKING_TICKET_INSERT_COLUMNS = ", ".join(PARKING_TICKET_COLUMNS)
 
-def _normalise_time(value: Optional[str]) -> Optional[str]:
-    if not value:
-        return None
-    value = value.strip()
-    if not value:
-        return None
-    if len(value) == 4 and value.isdigit():
-        return f"{value[:2]}:{value[2:]}"
-    return value
+_GEOCODE_MISS = object()
 
 
 logger = logging.getLogger(__name__)
@@ -125,6 +78,20 @@ class ParkingTicketsETL(DatasetETL):
         if disable_geo_env is None:
             disable_geo_env = os.getenv("PARKING_TICKETS_SKIP_GEOCODE", "0")
         self._disable_geocoder = disable_geo_env.lower() in {"1", "true", "yes"}
+        persist_env = os.getenv("PARKING_TICKETS_GEOCODE_CACHE", "1")
+        self.persist_geocodes = persist_env.lower() not in {"0", "false", "no"}
+        self._geocode_store: Optional[GeocodeStore] = None
+        self._geocode_store_opened = False
+        self.load_workers = max(1, int(os.getenv("PARKING_TICKETS_LOAD_WORKERS", "1") or 1))
+        csv_engine = (os.getenv("PARKING_TICKETS_CSV_ENGINE") or "rows").strip().lower()
+        if csv_engine not in CSV_ENGINES:
+            raise ValueError(
+                f"PARKING_TICKETS_CSV_ENGINE must be one of {', '.join(CSV_ENGINES)}; got {csv_engine!r}"
+            )
+        self.csv_engine = csv_engine
+        self.csv_chunk_rows = max(1, int(os.getenv("PARKING_TICKETS_CSV_CHUNK_ROWS", "100000") or 100000))
+        self.copy_prefetch = max(0, int(os.getenv("PARKING_TICKETS_COPY_PREFETCH", "2") or 0))
+        self.checkpoint_rows = max(1, int(os.getenv("PARKING_TICKETS_CHECKPOINT_ROWS", "250000") or 250000))
         years_env = os.getenv("PARKING_TICKETS_YEARS")
         if years_env:
             parsed: List[int] = []
@@ -141,6 +108,7 @@ class ParkingTicketsETL(DatasetETL):
         resource_paths: Dict[str, Path] = {}
         resource_hashes: Dict[str, str] = {}
         resource_metadata: Dict[str, Dict[str, Any]] = {}
+        downloads: List[DownloadRequest] = []
         has_changes = False
 
         for name, resource_cfg in self.config.resources.items():
@@ -154,29 +122,40 @@ class ParkingTicketsETL(DatasetETL):
             manifest_entry = previous_resources.get(name, {})
             last_modified = resource_info.get("last_modified")
 
-            changed = False
-            if last_modified and manifest_entry.get("last_modified") == last_modified and path.exists():
-                sha1 = manifest_entry.get("sha1") or sha1sum(path)
-            else:
-                path = self.download_resource(resource_cfg, suffix=suffix)
-                sha1 = sha1sum(path)
-                changed = True
-
-            if not changed and manifest_entry.get("sha1") and manifest_entry.get("sha1") != sha1:
-                changed = True
-
             resource_metadata[name] = {
                 "resource_id": resource_cfg.resource_id,
                 "last_modified": last_modified,
                 "format": resource_info.get("format"),
-                "sha1": sha1,
+                "sha1": None,
                 "year": year,
             }
-            resource_hashes[name] = sha1
+            if last_modified and manifest_entry.get("last_modified") == last_modified and path.exists():
+                sha1 = manifest_entry.get("sha1") or sha1sum(path)
+                resource_metadata[name]["sha1"] = sha1
+                resource_hashes[name] = sha1
+                if manifest_entry.get("sha1") and manifest_entry.get("sha1") != sha1:
+                    resource_paths[name] = path
+                    has_changes = True
+                continue
 
-            if changed:
-                resource_paths[name] = path
-                has_changes = True
+            unchanged_revision = bool(last_modified) and manifest_entry.get("last_modified") == last_modified
+            downloads.append(
+                DownloadRequest(
+                    key=name,
+                    resource_id=resource_cfg.resource_id,
+                    destination=path,
+                    last_modified=last_modified,
+                    expected_sha1=manifest_entry.get("sha1") if unchanged_revision else None,
+                )
+            )
+
+        # Yearly archives are independent; fetch them concurrently.
+        for name, result in self.download_resources(downloads).items():
+            resource_metadata[name]["sha1"] = result.sha1
+            resource_metadata[name]["size"] = result.size
+            resource_hashes[name] = result.sha1
+            resource_paths[name] = result.path
+            has_changes = True
 
         if not has_changes:
             return None
@@ -196,6 +175,7 @@ class ParkingTicketsETL(DatasetETL):
                     "name": name,
                     "path": path,
                     "year": meta.get("year"),
+                    "hash": extraction.resource_hashes.get(name),
                 }
             )
         return {
@@ -211,21 +191,35 @@ class ParkingTicketsETL(DatasetETL):
 
         self._ensure_tables()
         self.pg.ensure_extensions()
+        self._backfill_rollup_if_empty()
 
         existing_metadata = (state.metadata or {}).get("resources", {}) if state else {}
         updated_metadata: Dict[str, Dict[str, Any]] = {}
         total_rows = 0
 
+        workers = min(self.load_workers, len(resources))
+        total_undated = 0
+        parallel_checkpoints: Dict[str, YearLoadCheckpoint] = {}
+        if workers > 1:
+            logger.info("[parking_tickets] loading %s archives with %s workers", len(resources), workers)
+            parallel_checkpoints = self._load_years_parallel(resources, workers)
+
         for descriptor in resources:
             name = descriptor["name"]
             path: Path = descriptor["path"]
             year = descriptor.get("year")
-            rows_written = self._load_resource_year(year, path)
-            total_rows += rows_written
-            logger.info("[parking_tickets] loaded %s rows for year %s", rows_written, year)
+            if name in parallel_checkpoints:
+                checkpoint = parallel_checkpoints[name]
+            else:
+                archive_hash = descriptor.get("hash") or payload.get("resource_hashes", {}).get(name)
+                checkpoint = self._load_resource_year(year, path, archive_hash)
+                logger.info("[parking_tickets] loaded %s rows for year %s", checkpoint.rows_loaded, year)
+            total_rows += checkpoint.rows_loaded
+            total_undated += checkpoint.rows_undated
 
             meta = dict(payload["resource_metadata"].get(name, {}))
-            meta["row_count"] = rows_written
+            meta["row_count"] = checkpoint.rows_loaded
+            meta["rows_undated"] = checkpoint.rows_undated
             meta["year"] = year
             updated_metadata[name] = meta
 
@@ -233,17 +227,16 @@ class ParkingTicketsETL(DatasetETL):
             if key not in updated_metadata:
                 updated_metadata[key] = value
 
-        metadata = {
-            "row_count": total_rows,
-            "resources": updated_metadata,
-        }
+        # ``run`` records these through ``state_metadata`` after the load.
+        payload["row_count"] = total_rows
+        payload["rows_undated"] = total_undated
+        payload["loaded_resources"] = updated_metadata
 
-        self.state_store.upsert(
-            self.config.slug,
-            last_synced_at=datetime.utcnow(),
-            last_resource_hash="|".join(sorted(payload["resource_hashes"].values())),
-            metadata=metadata,
-        )
+    def state_metadata(self, extraction: ExtractionResult, transformed: Dict[str, Any]) -> Dict[str, Any]:
+        metadata = super().state_metadata(extraction, transformed)
+        metadata["rows_undated"] = transformed.get("rows_undated", 0)
+        metadata["resources"] = transformed.get("loaded_resources", extraction.resource_metadata)
+        return metadata
 
     # Internal helpers -------------------------------------------------
     def _extract_year(self, resource_name: str, fallback: Optional[str]) -> Optional[int]:
@@ -256,61 +249,295 @@ class ParkingTicketsETL(DatasetETL):
                     return int(token)
         return None
 
-    def _load_resource_year(self, year: Optional[int], archive_path: Path) -> int:
+    def _load_resource_year(
+        self, year: Optional[int], archive_path: Path, archive_hash: Optional[str] = None
+    ) -> YearLoadCheckpoint:
         if year is None:
             raise RuntimeError("Unable to determine year for parking tickets resource")
 
-        start = date(year, 1, 1)
-        end = date(year + 1, 1, 1)
-        self._geocode_cache.clear()
+        checkpoint = self._stage_year(year, archive_path, archive_hash)
+        if checkpoint.status != "merged":
+            self._merge_staged_year(checkpoint)
+        return checkpoint
+
+    def _stage_year(self, year: int, archive_path: Path, archive_hash: Optional[str]) -> YearLoadCheckpoint:
+        """Stage ``year`` into its own table, resuming from the last checkpoint.
+
+        Rows are committed every ``PARKING_TICKETS_CHECKPOINT_ROWS`` together
+        with the archive position, so a restarted load skips what is already
+        staged.  A checkpoint is only reused for the same archive hash and
+        when the staging table still holds exactly the rows it recorded
+        (UNLOGGED tables are emptied by a server crash).
+        """
+
+        staging_table = self._worker_staging_table(year)
+        with self.pg.connect() as conn:
+            checkpoint = read_load_checkpoint(conn, self.config.slug, year)
+            if checkpoint is not None and (archive_hash is None or checkpoint.archive_hash != archive_hash):
+                checkpoint = None
+            if checkpoint is not None and checkpoint.status == "merged":
+                logger.info("[parking_tickets] year %s already merged from this archive; skipping", year)
+                return checkpoint
+
+            conn.execute(
+                f"CREATE UNLOGGED TABLE IF NOT EXISTS {staging_table} "
+                "(LIKE parking_tickets_staging INCLUDING DEFAULTS)"
+            )
+            if checkpoint is not None:
+                staged = conn.execute(f"SELECT COUNT(*) FROM {staging_table}").fetchone()[0]
+                if staged != checkpoint.rows_staged:
+                    logger.warning(
+                        "[parking_tickets] %s holds %s rows but the checkpoint recorded %s; restaging year %s",
+                        staging_table,
+                        staged,
+                        checkpoint.rows_staged,
+                        year,
+                    )
+                    checkpoint = None
+            if checkpoint is None:
+                conn.execute(f"TRUNCATE {staging_table}")
+                checkpoint = YearLoadCheckpoint(year=year, archive_hash=archive_hash, staging_table=staging_table)
+                write_load_checkpoint(conn, self.config.slug, checkpoint)
+            elif checkpoint.status == "staging":
+                logger.info(
+                    "[parking_tickets] resuming year %s at %s row %s (%s rows already staged)",
+                    year,
+                    checkpoint.member,
+                    checkpoint.member_rows,
+                    checkpoint.rows_staged,
+                )
+            conn.commit()
+
+            if checkpoint.status == "staging":
+                self._copy_archive(conn, staging_table, year, archive_path, checkpoint)
+                checkpoint.status = "staged"
+                write_load_checkpoint(conn, self.config.slug, checkpoint)
+                conn.commit()
+        return checkpoint
 
-        rows_written = 0
-        column_list = ",".join(STAGING_COLUMNS)
-        copy_sql = f"COPY parking_tickets_staging ({column_list}) FROM STDIN WITH (FORMAT text)"
+    def _merge_staged_year(self, checkpoint: YearLoadCheckpoint) -> None:
+        """Merge a staged year once; the checkpoint flips to ``merged`` in the same transaction."""
 
         with self.pg.connect() as conn:
             conn.execute("SET LOCAL synchronous_commit TO OFF")
+            checkpoint.rows_undated = self._merge_year(conn, checkpoint.year, checkpoint.staging_table)
+            conn.execute(f"DROP TABLE IF EXISTS {checkpoint.staging_table}")
+            checkpoint.status = "merged"
+            write_load_checkpoint(conn, self.config.slug, checkpoint)
+            conn.commit()
+
+    def _copy_archive(
+        self,
+        conn: Any,
+        staging_table: str,
+        year: int,
+        archive_path: Path,
+        checkpoint: Optional[YearLoadCheckpoint] = None,
+    ) -> int:
+        """Binary COPY of the prepared rows of ``archive_path`` into ``staging_table``.
+
+        Batches are parsed, geocoded and encoded on a prefetch thread while the
+        previous batch is being sent (``PARKING_TICKETS_COPY_PREFETCH``).
+        Without ``checkpoint`` everything is sent on the caller's transaction.
+        With one, reading starts at its position and every
+        ``checkpoint_rows`` rows are committed along with the updated
+        checkpoint; the total staged for the year is returned.
+        """
+
+        self._open_geocode_store()
+        chunks = self._iter_archive_chunks(
+            archive_path,
+            checkpoint.member if checkpoint is not None else None,
+            checkpoint.member_rows if checkpoint is not None else 0,
+        )
+        base_rows = checkpoint.rows_staged if checkpoint is not None else 0
+        next_progress = [(base_rows // self.COPY_PROGRESS_INTERVAL + 1) * self.COPY_PROGRESS_INTERVAL]
+
+        def log_progress(rows_written: int) -> None:
+            rows_written += base_rows
+            if rows_written >= next_progress[0]:
+                next_progress[0] = (rows_written // self.COPY_PROGRESS_INTERVAL + 1) * self.COPY_PROGRESS_INTERVAL
+                logger.info(
+                    "[parking_tickets] streamed %s rows for year %s", rows_written, year,
+                )
+
+        def copy(batches: Iterable[Any]) -> int:
+            return copy_batches(
+                conn,
+                staging_table,
+                STAGING_COLUMNS,
+                batches,
+                types=STAGING_COLUMN_TYPES,
+                prefetch=self.copy_prefetch,
+                progress=log_progress,
+            )
+
+        if checkpoint is None:
+            rows_written = copy(batch for _, _, batch in chunks)
+            if self._geocode_store is not None:
+                self._geocode_store.flush()
+            return rows_written
+
+        chunks = iter(chunks)
+        while True:
+            first = next(chunks, None)
+            if first is None:
+                return checkpoint.rows_staged
+            position = [first[0], first[1]]
+
+            def window() -> Iterator[Any]:
+                # One checkpoint's worth of batches; ``position`` trails what was yielded.
+                staged = len(first[2])
+                yield first[2]
+                while staged < self.checkpoint_rows:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        return
+                    position[:] = [chunk[0], chunk[1]]
+                    staged += len(chunk[2])
+                    yield chunk[2]
+
+            conn.execute("SET LOCAL synchronous_commit TO OFF")
+            rows_written = copy(window())
+            base_rows += rows_written
+            checkpoint.member, checkpoint.member_rows = position
+            checkpoint.rows_staged += rows_written
+            if self._geocode_store is not None:
+                self._geocode_store.flush()
+            write_load_checkpoint(conn, self.config.slug, checkpoint)
+            conn.commit()
+            logger.info(
+                "[parking_tickets] checkpointed year %s at %s row %s (%s rows staged)",
+                year,
+                checkpoint.member,
+                checkpoint.member_rows,
+                checkpoint.rows_staged,
+            )
+
+    def _open_geocode_store(self) -> None:
+        """Seed ``_geocode_cache`` from the persistent store once per loader.
+
+        Entries are versioned by the centreline dataset hash, so results
+        survive across years and runs until the centreline data changes.
+        """
+
+        if self._geocode_store_opened:
+            return
+        self._geocode_store_opened = True
+        if not self.persist_geocodes or self._disable_geocoder or self.pg is None:
+            return
+        store = GeocodeStore.open(self.pg)
+        for key, value in store.load().items():
+            if value is None:
+                self._geocode_cache.setdefault(key, _GEOCODE_MISS)
+                continue
+            street_normalized, centreline_id, latitude, longitude = value
+            self._geocode_cache.setdefault(
+                key,
+                {
+                    "street_normalized": street_normalized,
+                    "centreline_id": centreline_id,
+                    "latitude": latitude,
+                    "longitude": longitude,
+                },
+            )
+        self._geocode_store = store
+
+    def _merge_year(self, conn: Any, year: int, staging_table: str) -> int:
+        """Replace ``year`` in ``parking_tickets`` with the rows in ``staging_table``.
+
+        Rows dated inside ``year`` rebuild its partition, which is then swapped
+        in; geocodes the new archive lacks are carried over from the old
+        partition.  Stray rows dated in other years are upserted.  Rows without
+        a date cannot be partitioned; their count is logged and returned.
+        """
+
+        start, end = year_bounds(year)
+        mark_parking_features_dirty(conn, start, end)
+        params = (start.isoformat(), end.isoformat())
+        in_year = (
+            "NULLIF(date_of_infraction, '')::DATE >= %s AND NULLIF(date_of_infraction, '')::DATE < %s"
+        )
+
+        def populate(conn: Any, build_table: str, previous: Optional[str]) -> None:
+            fresh = self._staging_select_sql(staging_table, in_year)
+            if previous is None:
+                conn.execute(
+                    f"""
+                    INSERT INTO {build_table} ({PARKING_TICKET_INSERT_COLUMNS})
+                    SELECT fresh.*, NOW(), NOW()
+                    FROM ({fresh}) AS fresh
+                    """,
+                    params,
+                )
+                return
             conn.execute(
-                "DELETE FROM parking_tickets WHERE date_of_infraction >= %s AND date_of_infraction < %s",
-                (start.isoformat(), end.isoformat()),
+                f"""
+                INSERT INTO {build_table} ({PARKING_TICKET_INSERT_COLUMNS})
+                SELECT
+                    fresh.ticket_hash,
+                    fresh.ticket_number,
+                    fresh.date_of_infraction,
+                    fresh.time_of_infraction,
+                    fresh.infraction_code,
+                    fresh.infraction_description,
+                    fresh.set_fine_amount,
+                    fresh.location1,
+                    fresh.location2,
+                    fresh.location3,
+                    fresh.location4,
+                    COALESCE(fresh.street_normalized, previous.street_normalized),
+                    COALESCE(fresh.centreline_id, previous.centreline_id),
+                    COALESCE(fresh.geom, previous.geom),
+                    {tile_columns_sql("COALESCE(fresh.geom, previous.geom)")},
+                    COALESCE(previous.created_at, NOW()),
+                    NOW()
+                FROM ({fresh}) AS fresh
+                LEFT JOIN {previous} AS previous
+                  ON previous.ticket_hash = fresh.ticket_hash
+                 AND previous.date_of_infraction = fresh.date_of_infraction
+                """,
+                params,
             )
-            conn.execute("TRUNCATE parking_tickets_staging")
 
-            with conn.cursor().copy(copy_sql) as copy:
-                for row in self._iter_archive_rows(archive_path):
-                    copy.write_row(row)
-                    rows_written += 1
-                    if rows_written % self.COPY_PROGRESS_INTERVAL == 0:
-                        logger.info(
-                            "[parking_tickets] streamed %s rows for year %s", rows_written, year,
-                        )
+        swap_year_partition(conn, year, populate)
+        other_years = self._upsert_out_of_year(conn, staging_table, in_year, params)
+        mark_parking_features_dirty(conn, start, end)
+        refresh_parking_rollup(conn, year=year)
+        for other_year in other_years:
+            refresh_parking_rollup(conn, year=other_year)
 
+        undated = int(
             conn.execute(
-                """
-                INSERT INTO parking_tickets AS target (
-                    ticket_hash,
-                    ticket_number,
-                    date_of_infraction,
-                    time_of_infraction,
-                    infraction_code,
-                    infraction_description,
-                    set_fine_amount,
-                    location1,
-                    location2,
-                    location3,
-                    location4,
-                    street_normalized,
-                    centreline_id,
-                    geom
-                )
+                f"SELECT COUNT(*) FROM {staging_table} WHERE NULLIF(date_of_infraction, '') IS NULL"
+            ).fetchone()[0]
+        )
+        if undated:
+            logger.warning(
+                "[parking_tickets] skipped %s staged rows without a date_of_infraction for year %s",
+                undated,
+                year,
+            )
+        return undated
+
+    @staticmethod
+    def _staging_select_sql(staging_table: str, where_sql: str) -> str:
+        """Deduplicated, typed ticket rows from ``staging_table`` matching ``where_sql``.
+
+        Columns follow ``PARKING_TICKET_COLUMNS`` up to ``tile_qk_prefix``.
+        """
+
+        return f"""
+            SELECT deduped.*, {tile_columns_sql("deduped.geom")}
+            FROM (
                 SELECT DISTINCT ON (ticket_hash)
                     ticket_hash,
                     ticket_number,
-                    NULLIF(date_of_infraction, '')::DATE,
+                    NULLIF(date_of_infraction, '')::DATE AS date_of_infraction,
                     time_of_infraction,
                     infraction_code,
                     infraction_description,
-                    NULLIF(set_fine_amount, '')::NUMERIC,
+                    NULLIF(set_fine_amount, '')::NUMERIC AS set_fine_amount,
                     location1,
                     location2,
                     location3,
@@ -320,71 +547,177 @@ class ParkingTicketsETL(DatasetETL):
                     CASE
                         WHEN longitude IS NULL OR latitude IS NULL THEN NULL
                         ELSE ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)
-                    END
-                FROM parking_tickets_staging
+                    END AS geom
+                FROM {staging_table}
+                WHERE {where_sql}
                 ORDER BY ticket_hash, NULLIF(date_of_infraction, '')::DATE DESC, time_of_infraction DESC
-                ON CONFLICT (ticket_hash) DO UPDATE SET
-                    ticket_number = EXCLUDED.ticket_number,
-                    date_of_infraction = EXCLUDED.date_of_infraction,
-                    time_of_infraction = EXCLUDED.time_of_infraction,
-                    infraction_code = EXCLUDED.infraction_code,
-                    infraction_description = EXCLUDED.infraction_description,
-                    set_fine_amount = EXCLUDED.set_fine_amount,
-                    location1 = EXCLUDED.location1,
-                    location2 = EXCLUDED.location2,
-                    location3 = EXCLUDED.location3,
-                    location4 = EXCLUDED.location4,
-                    street_normalized = COALESCE(EXCLUDED.street_normalized, target.street_normalized),
-                    centreline_id = COALESCE(EXCLUDED.centreline_id, target.centreline_id),
-                    geom = COALESCE(EXCLUDED.geom, target.geom),
-                    updated_at = NOW()
-                """
-            )
-            conn.execute("TRUNCATE parking_tickets_staging")
-            conn.commit()
+            ) AS deduped
+        """
+
+    def _upsert_out_of_year(
+        self, conn: Any, staging_table: str, in_year: str, params: Tuple[str, str]
+    ) -> List[int]:
+        """Upsert staged rows dated outside the archive's year into their partitions.
+
+        Returns the years touched.  Tile features of the affected tickets are
+        queued before and after the upsert, as ``_merge_year`` does for whole
+        years; the caller refreshes the rollups of the returned years.
+        """
+
+        outside = f"NULLIF(date_of_infraction, '') IS NOT NULL AND NOT ({in_year})"
+        years = conn.execute(
+            f"""
+            SELECT DISTINCT EXTRACT(YEAR FROM NULLIF(date_of_infraction, '')::DATE)::INT
+            FROM {staging_table}
+            WHERE {outside}
+            """,
+            params,
+        ).fetchall()
+        if not years:
+            return []
+        touched = sorted(row[0] for row in years)
+        for other_year in touched:
+            ensure_year_partition(conn, other_year)
+        mark_staged_parking_features_dirty(conn, staging_table, outside, params)
+        conn.execute(
+            f"""
+            INSERT INTO parking_tickets AS target ({PARKING_TICKET_INSERT_COLUMNS})
+            SELECT fresh.*, NOW(), NOW()
+            FROM ({self._staging_select_sql(staging_table, outside)}) AS fresh
+            ON CONFLICT (ticket_hash, date_of_infraction) DO UPDATE SET
+                ticket_number = EXCLUDED.ticket_number,
+                time_of_infraction = EXCLUDED.time_of_infraction,
+                infraction_code = EXCLUDED.infraction_code,
+                infraction_description = EXCLUDED.infraction_description,
+                set_fine_amount = EXCLUDED.set_fine_amount,
+                location1 = EXCLUDED.location1,
+                location2 = EXCLUDED.location2,
+                location3 = EXCLUDED.location3,
+                location4 = EXCLUDED.location4,
+                street_normalized = COALESCE(EXCLUDED.street_normalized, target.street_normalized),
+                centreline_id = COALESCE(EXCLUDED.centreline_id, target.centreline_id),
+                geom = COALESCE(EXCLUDED.geom, target.geom),
+                geom_3857 = COALESCE(EXCLUDED.geom_3857, target.geom_3857),
+                tile_qk_prefix = COALESCE(EXCLUDED.tile_qk_prefix, target.tile_qk_prefix),
+                updated_at = NOW()
+            """,
+            params,
+        )
+        mark_staged_parking_features_dirty(conn, staging_table, outside, params)
+        logger.info(
+            "[parking_tickets] upserted rows dated in years %s from %s",
+            touched,
+            staging_table,
+        )
+        return touched
 
-        return rows_written
-
-    def _iter_archive_rows(self, archive_path: Path) -> Iterator[Tuple[Any, ...]]:
-        with zipfile.ZipFile(archive_path) as archive:
-            csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
-            for member in sorted(archive.namelist()):
-                name_lower = member.lower()
-                if member.endswith("/"):
-                    continue
-                if "parking_tags" not in name_lower:
-                    continue
-                encoding = self._detect_member_encoding(archive, member)
-                with archive.open(member) as handle:
-                    wrapper = io.TextIOWrapper(
-                        handle,
-                        encoding=encoding,
-                        errors="ignore",
-                        newline="",
-                    )
-                    reader = csv.DictReader(wrapper)
-                    for record in reader:
-                        prepared = self._prepare_row(record)
-                        if prepared is not None:
-                            yield prepared
+    # Parallel ingest ---------------------------------------------------
+    @classmethod
+    def for_staging(cls, config, pg: PostgresClient) -> "ParkingTicketsETL":
+        """Build a loader that can only parse and stage archives (worker processes)."""
+
+        return cls(config, ckan=None, store=None, pg=pg, state_store=None)
 
     @staticmethod
-    def _detect_member_encoding(archive: zipfile.ZipFile, member: str) -> str:
-        try:
-            with archive.open(member) as sample:
-                prefix = sample.read(4)
-        except KeyError:
-            return "utf-8"
-
-        if prefix.startswith(b"\xff\xfe"):
-            return "utf-16-le"
-        if prefix.startswith(b"\xfe\xff"):
-            return "utf-16-be"
-        if prefix.startswith(b"\xef\xbb\xbf"):
-            return "utf-8-sig"
-        if b"\x00" in prefix:
-            return "utf-16-le"
-        return "utf-8"
+    def _worker_staging_table(year: int) -> str:
+        return f"parking_tickets_staging_{int(year)}"
+
+    def _load_years_parallel(
+        self, descriptors: List[Dict[str, Any]], workers: int
+    ) -> Dict[str, YearLoadCheckpoint]:
+        """Stage archives concurrently in worker processes, then merge each year.
+
+        Every worker opens its own connection and COPYs one archive into a
+        per-year UNLOGGED staging table.  Merges run here, one year per
+        transaction, as soon as the year is staged, so ``parking_tickets`` only
+        ever sees one writer.
+        """
+
+        for descriptor in descriptors:
+            if descriptor.get("year") is None:
+                raise RuntimeError("Unable to determine year for parking tickets resource")
+
+        worker_pg = replace(self.pg, pooled=False, application_name=f"{self.pg.application_name}-worker")
+        checkpoints: Dict[str, YearLoadCheckpoint] = {}
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = {
+                executor.submit(
+                    _stage_year_worker,
+                    self.config,
+                    worker_pg,
+                    descriptor["year"],
+                    descriptor["path"],
+                    descriptor.get("hash"),
+                ): descriptor
+                for descriptor in descriptors
+            }
+            for future in as_completed(futures):
+                descriptor = futures[future]
+                checkpoint = future.result()
+                if checkpoint.status != "merged":
+                    self._merge_staged_year(checkpoint)
+                checkpoints[descriptor["name"]] = checkpoint
+                logger.info("[parking_tickets] merged %s rows for year %s", checkpoint.rows_loaded, checkpoint.year)
+        return checkpoints
+
+    def _backfill_rollup_if_empty(self) -> None:
+        if self.pg.fetch_one("SELECT 1 FROM parking_ticket_rollup LIMIT 1") is not None:
+            return
+        with self.pg.connect() as conn:
+            rows = refresh_parking_rollup(conn)
+            conn.commit()
+        logger.info("[parking_tickets] backfilled %s rollup rows", rows)
+
+    def _iter_archive_chunks(
+        self,
+        archive_path: Path,
+        resume_member: Optional[str] = None,
+        resume_rows: int = 0,
+    ) -> Iterator[Tuple[str, int, Any]]:
+        """Yield ``(member, records consumed, batch)`` using the configured CSV engine.
+
+        The position is in source CSV records so a checkpoint can resume
+        mid-member: zip members are deflate streams without random access, so
+        the first ``resume_rows`` records of ``resume_member`` are read and
+        discarded rather than prepared and geocoded again.  Batches may be
+        empty when every record of a chunk was rejected.
+        """
+
+        csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+        for member, wrapper in iter_archive_members(archive_path, resume_member):
+            offset = resume_rows if member == resume_member else 0
+            if self.csv_engine == "columnar":
+                reader = pd.read_csv(
+                    wrapper,
+                    dtype=object,
+                    keep_default_na=False,
+                    na_filter=False,
+                    chunksize=self.csv_chunk_rows,
+                )
+                # Skip parsed records, not lines: quoted fields may span lines.
+                skipped = 0
+                while skipped < offset:
+                    try:
+                        discarded = len(reader.get_chunk(min(offset - skipped, self.csv_chunk_rows)))
+                    except StopIteration:
+                        break
+                    if not discarded:
+                        break
+                    skipped += discarded
+                consumed = offset
+                for chunk in reader:
+                    consumed += len(chunk)
+                    yield member, consumed, prepare_frame(chunk, self._geocode_record)
+            else:
+                records = csv.DictReader(wrapper)
+                consumed = offset
+                for _ in islice(records, offset):
+                    pass
+                for block in chunked(records, self.csv_chunk_rows):
+                    consumed += len(block)
+                    prepared = (self._prepare_row(record) for record in block)
+                    yield member, consumed, [row for row in prepared if row is not None]
 
     def _prepare_row(self, record: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
         if record:
@@ -503,36 +836,20 @@ class ParkingTicketsETL(DatasetETL):
         except Exception:
             result = None
         self._geocode_cache[key] = result if result is not None else _GEOCODE_MISS
+        if self._geocode_store is not None:
+            self._geocode_store.add(
+                key,
+                None
+                if result is None
+                else (result.street_normalized, result.centreline_id, result.latitude, result.longitude),
+            )
         return result
 
     def _get_geocoder(self) -> CentrelineGeocoder:
         if self._geocoder is not None:
             return self._geocoder
         with self.pg.connect() as conn:
-            df = pd.read_sql_query(
-                """
-                SELECT
-                    centreline_id AS "CENTRELINE_ID",
-                    linear_name AS "LINEAR_NAME",
-                    linear_name_type AS "LINEAR_NAME_TYPE",
-                    linear_name_dir AS "LINEAR_NAME_DIR",
-                    linear_name_full AS "LINEAR_NAME_FULL",
-                    linear_name_label AS "LINEAR_NAME_LABEL",
-                    parity_left AS "PARITY_L",
-                    parity_right AS "PARITY_R",
-                    low_num_even AS "LOW_NUM_EVEN",
-                    high_num_even AS "HIGH_NUM_EVEN",
-                    low_num_odd AS "LOW_NUM_ODD",
-                    high_num_odd AS "HIGH_NUM_ODD",
-                    feature_code AS "FEATURE_CODE",
-                    feature_code_desc AS "FEATURE_CODE_DESC",
-                    jurisdiction AS "JURISDICTION",
-                    ST_AsGeoJSON(geom) AS "geometry"
-                FROM centreline_segments
-                """,
-                conn,
-            )
-        self._geocoder = CentrelineGeocoder(df)
+            self._geocoder = load_centreline_geocoder(conn, snapshot_dir_for(self.store))
         return self._geocoder
 
     # Lookup helpers -------------------------------------------------
@@ -592,28 +909,8 @@ class ParkingTicketsETL(DatasetETL):
         return None
 
     def _ensure_tables(self) -> None:
-        self.pg.execute(
-            """
-            CREATE TABLE IF NOT EXISTS parking_tickets (
-                ticket_hash TEXT PRIMARY KEY,
-                ticket_number TEXT,
-                date_of_infraction DATE,
-                time_of_infraction TEXT,
-                infraction_code TEXT,
-                infraction_description TEXT,
-                set_fine_amount NUMERIC,
-                location1 TEXT,
-                location2 TEXT,
-                location3 TEXT,
-                location4 TEXT,
-                street_normalized TEXT,
-                centreline_id BIGINT,
-                geom geometry(POINT, 4326),
-                created_at TIMESTAMPTZ DEFAULT NOW(),
-                updated_at TIMESTAMPTZ DEFAULT NOW()
-            )
-            """
-        )
+        self.pg.execute(TILE_DIRTY_FEATURES_DDL)
+        ensure_partitioned_parking_tickets(self.pg)
         self.pg.execute(
             """
             CREATE TABLE IF NOT EXISTS parking_tickets_staging (
@@ -636,69 +933,27 @@ class ParkingTicketsETL(DatasetETL):
             """
         )
         self.pg.execute("ALTER TABLE parking_tickets_staging SET UNLOGGED")
-        self.pg.execute(
-            """
-            ALTER TABLE parking_tickets
-            ADD COLUMN IF NOT EXISTS ticket_hash TEXT
-            """
-        )
         self.pg.execute(
             """
             ALTER TABLE parking_tickets_staging
             ADD COLUMN IF NOT EXISTS ticket_hash TEXT
             """
         )
-        self.pg.execute(
-            """
-            DO $$
-            BEGIN
-                IF EXISTS (
-                    SELECT 1
-                    FROM information_schema.table_constraints
-                    WHERE table_schema = 'public'
-                      AND table_name = 'parking_tickets'
-                      AND constraint_type = 'PRIMARY KEY'
-                ) THEN
-                    EXECUTE 'ALTER TABLE parking_tickets DROP CONSTRAINT parking_tickets_pkey';
-                END IF;
-            END
-            $$
-            """
-        )
-        self.pg.execute(
-            """
-            UPDATE parking_tickets
-            SET ticket_hash = md5(
-                COALESCE(ticket_number, '') || '|' ||
-                COALESCE(date_of_infraction::TEXT, '') || '|' ||
-                COALESCE(time_of_infraction, '') || '|' ||
-                COALESCE(infraction_code, '') || '|' ||
-                COALESCE(infraction_description, '') || '|' ||
-                COALESCE(set_fine_amount::TEXT, '') || '|' ||
-                COALESCE(location1, '') || '|' ||
-                COALESCE(location2, '') || '|' ||
-                COALESCE(location3, '') || '|' ||
-                COALESCE(location4, '')
-            )
-            WHERE ticket_hash IS NULL
-            """
-        )
-        self.pg.execute("ALTER TABLE parking_tickets ALTER COLUMN ticket_hash SET NOT NULL")
-        self.pg.execute(
-            """
-            DO $$
-            BEGIN
-                IF NOT EXISTS (
-                    SELECT 1
-                    FROM information_schema.table_constraints
-                    WHERE table_schema = 'public'
-                      AND table_name = 'parking_tickets'
-                      AND constraint_type = 'PRIMARY KEY'
-                ) THEN
-                    EXECUTE 'ALTER TABLE parking_tickets ADD CONSTRAINT parking_tickets_pkey PRIMARY KEY (ticket_hash)';
-                END IF;
-            END
-            $$
-            """
-        )
-
+        ensure_parking_rollup(self.pg)
+
+
+def _stage_year_worker(
+    config, pg: PostgresClient, year: int, archive_path: Path, archive_hash: Optional[str] = None
+) -> YearLoadCheckpoint:
+    """Process-pool entry point: parse, geocode and stage one yearly archive."""
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    loader = ParkingTicketsETL.for_staging(config, pg)
+    checkpoint = loader._stage_year(year, archive_path, archive_hash)
+    logger.info(
+        "[parking_tickets] staged %s rows for year %s in %s",
+        checkpoint.rows_staged,
+        year,
+        checkpoint.staging_table,
+    )
+    return checkpoint
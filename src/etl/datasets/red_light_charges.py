@@ -20,6 +20,9 @@ STAGING_COLUMNS = (
     "time_of_infraction",
 )
 
+# Postgres types of ``STAGING_COLUMNS`` for binary COPY.
+STAGING_COLUMN_TYPES = ("text",) * 8
+
 
 class RedLightChargesETL(DatasetETL):
     def extract(self, state: DatasetState) -> ExtractionResult | None:
@@ -45,8 +48,8 @@ class RedLightChargesETL(DatasetETL):
             ):
                 sha1 = manifest_entry.get("sha1") or sha1sum(path)
             else:
-                path = self.download_resource(resource_cfg, suffix=suffix)
-                sha1 = sha1sum(path)
+                artefact = self.download_resource(resource_cfg, suffix=suffix)
+                path, sha1 = artefact.path, artefact.sha1
                 has_changes = True
 
             resource_paths[name] = path
@@ -130,7 +133,9 @@ class RedLightChargesETL(DatasetETL):
             """
         )
 
-        self.pg.copy_rows("red_light_charges_staging", STAGING_COLUMNS, rows)
+        self.pg.copy_rows(
+            "red_light_charges_staging", STAGING_COLUMNS, rows, types=STAGING_COLUMN_TYPES, coerce_text=True,
+        )
         self.pg.execute(
             """
             INSERT INTO red_light_charges AS target (
@@ -11,6 +11,7 @@ import pandas as pd
 
 from geocoding.centreline_geocoder import CentrelineGeocoder, GeocodeResult
 
+from ..centreline_index import load_centreline_geocoder, snapshot_dir_for
 from ..state import DatasetState
 from ..utils import iter_csv, sha1sum
 from .base import DatasetETL, ExtractionResult
@@ -37,6 +38,9 @@ STAGING_COLUMNS = (
     "geometry_geojson",
 )
 
+# Postgres types of ``STAGING_COLUMNS`` for binary COPY.
+STAGING_COLUMN_TYPES = ("text",) * 8 + ("int4",) + ("text",) * 5
+
 
 def _format_pg_array(values: Sequence[int]) -> str:
     if not values:
@@ -176,8 +180,8 @@ class RedLightLocationsETL(DatasetETL):
             ):
                 sha1 = manifest_entry.get("sha1") or sha1sum(path)
             else:
-                path = self.download_resource(resource_cfg, suffix=suffix)
-                sha1 = sha1sum(path)
+                artefact = self.download_resource(resource_cfg, suffix=suffix)
+                path, sha1 = artefact.path, artefact.sha1
                 has_changes = True
 
             resource_paths[name] = path
@@ -376,7 +380,9 @@ class RedLightLocationsETL(DatasetETL):
             """
         )
 
-        self.pg.copy_rows("red_light_camera_locations_staging", STAGING_COLUMNS, rows)
+        self.pg.copy_rows(
+            "red_light_camera_locations_staging", STAGING_COLUMNS, rows, types=STAGING_COLUMN_TYPES, coerce_text=True,
+        )
         self.pg.execute(
             """
             INSERT INTO red_light_camera_locations AS target (
@@ -443,34 +449,7 @@ class RedLightLocationsETL(DatasetETL):
         if self._geocoder is not None:
             return self._geocoder
         with self.pg.connect() as conn:  # type: ignore[arg-type]
-            df = pd.read_sql_query(
-                """
-                SELECT
-                    centreline_id AS "CENTRELINE_ID",
-                    linear_name AS "LINEAR_NAME",
-                    linear_name_type AS "LINEAR_NAME_TYPE",
-                    linear_name_dir AS "LINEAR_NAME_DIR",
-                    linear_name_full AS "LINEAR_NAME_FULL",
-                    linear_name_label AS "LINEAR_NAME_LABEL",
-                    parity_left AS "PARITY_L",
-                    parity_right AS "PARITY_R",
-                    low_num_even AS "LOW_NUM_EVEN",
-                    high_num_even AS "HIGH_NUM_EVEN",
-                    low_num_odd AS "LOW_NUM_ODD",
-                    high_num_odd AS "HIGH_NUM_ODD",
-                    feature_code AS "FEATURE_CODE",
-                    feature_code_desc AS "FEATURE_CODE_DESC",
-                    jurisdiction AS "JURISDICTION",
-                    ST_AsGeoJSON(geom) AS "geometry"
-                FROM centreline_segments
-                """,
-                conn,
-            )
-        if "geometry" in df.columns:
-            df["geometry"] = df["geometry"].apply(
-                lambda value: json.loads(value) if isinstance(value, str) else value,
-            )
-        self._geocoder = CentrelineGeocoder(df)
+            self._geocoder = load_centreline_geocoder(conn, snapshot_dir_for(self.store))
         return self._geocoder
 
     def _geocode_location(self, location: Any) -> Optional[Tuple[float, float]]:
@@ -0,0 +1,189 @@
+"""Concurrent, resumable downloads of CKAN resources into the artefact store.
+
+``DownloadManager`` fetches a batch of resources on a bounded thread pool
+(``CKAN_DOWNLOAD_WORKERS``).  Each download resumes an interrupted
+``.part`` file with an HTTP range request (see
+:meth:`CKANClient.download_resource`), is hashed as it streams, recorded in the
+dataset manifest kept by :class:`ArtefactStore`, and content that already
+exists anywhere in the store is hardlinked instead of stored twice.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+from .ckan import CKANClient
+from .storage import ArtefactStore
+
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_DOWNLOAD_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class DownloadRequest:
+    """One resource to materialise at ``destination``.
+
+    ``last_modified`` and ``expected_sha1`` describe the revision the caller
+    last saw (normally the ``etl_state`` manifest entry); when the CKAN
+    revision is unchanged the content is expected to hash the same.
+    """
+
+    key: str
+    resource_id: str
+    destination: Path
+    last_modified: Optional[str] = None
+    expected_sha1: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class DownloadResult:
+    key: str
+    path: Path
+    sha1: str
+    size: int
+    outcome: str  # "downloaded", "present" or "linked"
+    elapsed_seconds: float = 0.0
+
+
+def download_workers() -> int:
+    return max(1, int(os.getenv("CKAN_DOWNLOAD_WORKERS", str(DEFAULT_DOWNLOAD_WORKERS)) or DEFAULT_DOWNLOAD_WORKERS))
+
+
+class DownloadManager:
+    """Fetch CKAN resources concurrently with resume, verification and dedupe."""
+
+    def __init__(
+        self,
+        ckan: CKANClient,
+        store: ArtefactStore,
+        dataset_slug: str,
+        *,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.ckan = ckan
+        self.store = store
+        self.dataset_slug = dataset_slug
+        self.max_workers = max_workers or download_workers()
+        # Finding identical content and recording the new file must be atomic,
+        # or two identical resources finishing together never see each other.
+        self._dedupe_lock = threading.Lock()
+
+    def download_all(self, requests: Sequence[DownloadRequest]) -> Dict[str, DownloadResult]:
+        """Download every request, at most ``max_workers`` at a time; results keyed by ``key``."""
+
+        if not requests:
+            return {}
+        started = time.perf_counter()
+        workers = min(self.max_workers, len(requests))
+        if workers == 1:
+            results = [self.download(request) for request in requests]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ckan-download") as executor:
+                results = list(executor.map(self.download, requests))
+        total_bytes = sum(result.size for result in results if result.outcome == "downloaded")
+        LOGGER.info(
+            "[%s] fetched %s resources (%s downloaded, %.1f MB) with %s workers in %.1fs",
+            self.dataset_slug,
+            len(results),
+            sum(result.outcome == "downloaded" for result in results),
+            total_bytes / (1 << 20),
+            workers,
+            time.perf_counter() - started,
+        )
+        return {result.key: result for result in results}
+
+    def download(self, request: DownloadRequest) -> DownloadResult:
+        started = time.perf_counter()
+        destination = request.destination
+
+        record = self.store.download_record(self.dataset_slug, request.resource_id)
+        if (
+            record is not None
+            and request.last_modified is not None
+            and record.get("last_modified") == request.last_modified
+            and self.store.raw_root / record["path"] == destination
+            and (request.expected_sha1 is None or record.get("sha1") == request.expected_sha1)
+        ):
+            return DownloadResult(request.key, destination, record["sha1"], record["size"], "present")
+
+        if request.expected_sha1 is not None:
+            existing = self.store.find_content(request.expected_sha1)
+            if existing is not None and self._link(existing, destination):
+                size = destination.stat().st_size
+                self._record(request, request.expected_sha1, size)
+                LOGGER.info("Linked resource %s to identical content at %s", request.resource_id, existing)
+                return DownloadResult(
+                    request.key, destination, request.expected_sha1, size, "linked", time.perf_counter() - started
+                )
+
+        artefact = self.ckan.download_resource(request.resource_id, destination)
+        sha1 = artefact.sha1
+        if request.expected_sha1 is not None and sha1 != request.expected_sha1:
+            # Same CKAN revision, different bytes: most likely a resumed file that
+            # was spliced from two versions.  Fetch it once more from scratch.
+            LOGGER.warning(
+                "Resource %s hashed to %s but the manifest recorded %s; downloading again without resume",
+                request.resource_id,
+                sha1,
+                request.expected_sha1,
+            )
+            artefact = self.ckan.download_resource(request.resource_id, destination, resume=False)
+            sha1 = artefact.sha1
+            if sha1 != request.expected_sha1:
+                LOGGER.warning("Resource %s content changed without a new last_modified", request.resource_id)
+
+        with self._dedupe_lock:
+            existing = self.store.find_content(sha1)
+            if existing is not None and self._link(existing, destination):
+                LOGGER.info("Deduplicated resource %s against %s", request.resource_id, existing)
+            self._record(request, sha1, artefact.size)
+        return DownloadResult(request.key, destination, sha1, artefact.size, "downloaded", time.perf_counter() - started)
+
+    def _record(self, request: DownloadRequest, sha1: str, size: int) -> None:
+        self.store.record_download(
+            self.dataset_slug,
+            request.resource_id,
+            request.destination,
+            sha1=sha1,
+            size=size,
+            last_modified=request.last_modified,
+        )
+
+    @staticmethod
+    def _link(source: Path, destination: Path) -> bool:
+        """Atomically replace ``destination`` with a hardlink to ``source``."""
+
+        try:
+            if destination.exists() and os.path.samefile(source, destination):
+                return True
+        except OSError:  # pragma: no cover - racing deletes
+            return False
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        temporary = destination.with_name(f".{destination.name}.link")
+        try:
+            temporary.unlink(missing_ok=True)
+            os.link(source, temporary)
+            os.replace(temporary, destination)
+        except OSError as exc:
+            # Different filesystem or no hardlink support: keep separate copies.
+            LOGGER.debug("Could not hardlink %s to %s: %s", destination, source, exc)
+            temporary.unlink(missing_ok=True)
+            return False
+        return True
+
+
+__all__ = [
+    "DownloadManager",
+    "DownloadRequest",
+    "DownloadResult",
+    "download_workers",
+]
@@ -0,0 +1,144 @@
+"""Persistent address -> geocode store shared across ETL runs and years.
+
+Geocoder results for parking ticket locations are kept in
+``parking_geocode_cache`` keyed by the normalised ``location1..4`` tuple and a
+version string combining the centreline dataset hash with
+``GEOCODER_VERSION``.  A new centreline import (or a geocoder change) yields a
+new version, so stale entries are simply never read again.  Loaders read every
+entry for the current version once at startup and append new results in
+batches, so repeat runs only geocode genuinely new addresses.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .centreline_index import centreline_version
+from .postgres import PostgresClient, copy_batches
+
+
+LOGGER = logging.getLogger(__name__)
+
+LocationKey = Tuple[str, str, str, str]
+# ``None`` records a confirmed geocoder miss.
+CachedGeocode = Optional[Tuple[Optional[str], Optional[int], Optional[float], Optional[float]]]
+
+GEOCODE_CACHE_DDL = """
+    CREATE TABLE IF NOT EXISTS parking_geocode_cache (
+        version TEXT NOT NULL,
+        location1 TEXT NOT NULL,
+        location2 TEXT NOT NULL,
+        location3 TEXT NOT NULL,
+        location4 TEXT NOT NULL,
+        resolved BOOLEAN NOT NULL,
+        street_normalized TEXT,
+        centreline_id BIGINT,
+        latitude DOUBLE PRECISION,
+        longitude DOUBLE PRECISION,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (version, location1, location2, location3, location4)
+    )
+"""
+
+_CACHE_COLUMNS = (
+    "version",
+    "location1",
+    "location2",
+    "location3",
+    "location4",
+    "resolved",
+    "street_normalized",
+    "centreline_id",
+    "latitude",
+    "longitude",
+)
+_CACHE_TYPES = ("text",) * 5 + ("bool", "text", "int8", "float8", "float8")
+
+
+@dataclass
+class GeocodeStore:
+    """Batched reader/writer for ``parking_geocode_cache`` rows of one version."""
+
+    pg: PostgresClient
+    version: str
+    batch_size: int = 5000
+    _pending: List[Tuple[Any, ...]] = field(default_factory=list, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    @classmethod
+    def open(cls, pg: PostgresClient, **kwargs: Any) -> "GeocodeStore":
+        with pg.connect() as conn:
+            conn.execute(GEOCODE_CACHE_DDL)
+            version = centreline_version(conn)
+        return cls(pg, version, **kwargs)
+
+    def load(self) -> Dict[LocationKey, CachedGeocode]:
+        """Return every cached geocode for this version."""
+
+        entries: Dict[LocationKey, CachedGeocode] = {}
+        with self.pg.connect() as conn:
+            with conn.cursor(name="parking_geocode_cache_load") as cursor:
+                cursor.itersize = 50_000
+                cursor.execute(
+                    """
+                    SELECT location1, location2, location3, location4, resolved,
+                           street_normalized, centreline_id, latitude, longitude
+                    FROM parking_geocode_cache
+                    WHERE version = %s
+                    """,
+                    (self.version,),
+                )
+                for row in cursor:
+                    key = (row[0], row[1], row[2], row[3])
+                    entries[key] = (row[5], row[6], row[7], row[8]) if row[4] else None
+        LOGGER.info("Loaded %s cached geocodes for version %s", len(entries), self.version)
+        return entries
+
+    def add(self, key: LocationKey, value: CachedGeocode) -> None:
+        """Queue a geocoder result (``None`` for a miss), flushing full batches."""
+
+        resolved = value is not None
+        street, centreline_id, latitude, longitude = value if value is not None else (None, None, None, None)
+        row = (self.version, *key, resolved, street, centreline_id, latitude, longitude)
+        with self._lock:
+            self._pending.append(row)
+            ready = len(self._pending) >= self.batch_size
+        if ready:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write queued entries; concurrent writers of the same key are ignored."""
+
+        with self._lock:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return 0
+        with self.pg.connect() as conn:
+            conn.execute(
+                "CREATE TEMP TABLE parking_geocode_cache_batch "
+                "(LIKE parking_geocode_cache INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+            copy_batches(
+                conn,
+                "parking_geocode_cache_batch",
+                _CACHE_COLUMNS,
+                [rows],
+                types=_CACHE_TYPES,
+                prefetch=0,
+            )
+            column_list = ", ".join(_CACHE_COLUMNS)
+            conn.execute(
+                f"""
+                INSERT INTO parking_geocode_cache ({column_list})
+                SELECT {column_list} FROM parking_geocode_cache_batch
+                ON CONFLICT DO NOTHING
+                """
+            )
+            conn.commit()
+        return len(rows)
+
+
+__all__ = ["GEOCODE_CACHE_DDL", "GeocodeStore"]
@@ -0,0 +1,77 @@
+"""Chunk checkpoints for resumable parking ticket year loads.
+
+Each yearly archive is COPYed into an UNLOGGED staging table in windows of
+records.  After every window a :class:`YearLoadCheckpoint` is written to
+``etl_state.metadata['load_checkpoints'][year]`` in the same transaction as the
+staged rows, so an interrupted load resumes at the first record not yet staged
+and a finished staging pass goes straight to the merge.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+from psycopg.types.json import Json
+
+
+@dataclass
+class YearLoadCheckpoint:
+    """Staging progress for one yearly archive.
+
+    Stored in ``etl_state.metadata['load_checkpoints'][year]`` and committed in
+    the same transaction as the staged rows it describes.  ``member_rows``
+    counts the CSV records of ``member`` already consumed; earlier members
+    (in sorted order) are complete.
+    """
+
+    year: int
+    archive_hash: Optional[str]
+    staging_table: str
+    member: Optional[str] = None
+    member_rows: int = 0
+    rows_staged: int = 0
+    rows_undated: int = 0
+    status: str = "staging"  # staging -> staged -> merged
+
+    @property
+    def rows_loaded(self) -> int:
+        """Staged rows that reached ``parking_tickets`` (undated rows cannot)."""
+
+        return self.rows_staged - self.rows_undated
+
+    @classmethod
+    def from_json(cls, payload: Dict[str, Any]) -> "YearLoadCheckpoint":
+        fields = cls.__dataclass_fields__
+        return cls(**{key: value for key, value in payload.items() if key in fields})
+
+
+def read_load_checkpoint(conn: Any, dataset_slug: str, year: int) -> Optional[YearLoadCheckpoint]:
+    row = conn.execute(
+        "SELECT metadata -> 'load_checkpoints' -> %s FROM etl_state WHERE dataset_slug = %s",
+        (str(year), dataset_slug),
+    ).fetchone()
+    if not row or not row[0]:
+        return None
+    return YearLoadCheckpoint.from_json(row[0])
+
+
+def write_load_checkpoint(conn: Any, dataset_slug: str, checkpoint: YearLoadCheckpoint) -> None:
+    conn.execute(
+        """
+        INSERT INTO etl_state (dataset_slug, metadata)
+        VALUES (%(slug)s, jsonb_build_object('load_checkpoints', jsonb_build_object(%(year)s::TEXT, %(payload)s::JSONB)))
+        ON CONFLICT (dataset_slug) DO UPDATE SET
+            metadata = jsonb_set(
+                COALESCE(etl_state.metadata, '{}'::JSONB),
+                '{load_checkpoints}',
+                COALESCE(etl_state.metadata -> 'load_checkpoints', '{}'::JSONB)
+                    || jsonb_build_object(%(year)s::TEXT, %(payload)s::JSONB)
+            ),
+            updated_at = NOW()
+        """,
+        {"slug": dataset_slug, "year": str(checkpoint.year), "payload": Json(asdict(checkpoint))},
+    )
+
+
+__all__ = ["YearLoadCheckpoint", "read_load_checkpoint", "write_load_checkpoint"]
@@ -0,0 +1,381 @@
+"""Year-range partitioning of ``parking_tickets``.
+
+``parking_tickets`` is range partitioned on ``date_of_infraction`` with one
+partition per calendar year (``parking_tickets_y2023`` ...).  Postgres requires
+unique constraints on a partitioned table to include the partition key, so the
+primary key is ``(ticket_hash, date_of_infraction)``; the hash already covers
+the date, so ticket identity is unchanged.  Year filters written as date ranges
+prune to one partition, and a year reload builds a fresh table and swaps it in
+with DETACH/ATTACH instead of deleting and re-inserting millions of rows.
+
+The Web Mercator ``geom_3857`` and ``tile_qk_prefix`` columns the tile
+pipeline reads are part of the table definition and are filled by every
+writer here, so :class:`src.tiles.schema.TileSchemaManager` never has to
+rebuild the table to add them.
+
+Tickets without a date cannot be placed in a partition.  Loads count and log
+the staged rows they skip (``rows_undated`` in the dataset's ``etl_state``
+metadata); migrating a legacy heap moves such rows to
+``parking_tickets_undated``, which keeps the heap's columns and is not read by
+the pipeline.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+import logging
+import re
+from typing import Any, Callable, Optional
+
+from .postgres import PostgresClient
+
+
+logger = logging.getLogger(__name__)
+
+PARKING_TICKETS_DDL = """
+    CREATE TABLE IF NOT EXISTS parking_tickets (
+        ticket_hash TEXT NOT NULL,
+        ticket_number TEXT,
+        date_of_infraction DATE NOT NULL,
+        time_of_infraction TEXT,
+        infraction_code TEXT,
+        infraction_description TEXT,
+        set_fine_amount NUMERIC,
+        location1 TEXT,
+        location2 TEXT,
+        location3 TEXT,
+        location4 TEXT,
+        street_normalized TEXT,
+        centreline_id BIGINT,
+        geom geometry(POINT, 4326),
+        geom_3857 geometry(POINT, 3857),
+        tile_qk_prefix TEXT,
+        created_at TIMESTAMPTZ DEFAULT NOW(),
+        updated_at TIMESTAMPTZ DEFAULT NOW(),
+        PRIMARY KEY (ticket_hash, date_of_infraction)
+    ) PARTITION BY RANGE (date_of_infraction)
+"""
+
+PARKING_TICKET_COLUMNS = (
+    "ticket_hash",
+    "ticket_number",
+    "date_of_infraction",
+    "time_of_infraction",
+    "infraction_code",
+    "infraction_description",
+    "set_fine_amount",
+    "location1",
+    "location2",
+    "location3",
+    "location4",
+    "street_normalized",
+    "centreline_id",
+    "geom",
+    "geom_3857",
+    "tile_qk_prefix",
+    "created_at",
+    "updated_at",
+)
+
+LEGACY_TABLE = "parking_tickets_legacy"
+UNDATED_TABLE = "parking_tickets_undated"
+
+# Quadkey settings for ``tile_qk_prefix``; the ``TileSchemaManager`` defaults.
+TILE_QUADKEY_ZOOM = 16
+TILE_QUADKEY_PREFIX_LENGTH = 16
+
+MERCATOR_QUADKEY_PREFIX_DDL = """
+    CREATE OR REPLACE FUNCTION mercator_quadkey_prefix(
+        input geometry,
+        zoom integer,
+        prefix_length integer
+    ) RETURNS text AS $$
+    DECLARE
+        max_zoom integer := GREATEST(1, zoom);
+        effective_prefix integer := LEAST(GREATEST(prefix_length, 1), max_zoom);
+        quadkey text;
+        srid integer;
+    BEGIN
+        IF input IS NULL THEN
+            RETURN NULL;
+        END IF;
+
+        srid := COALESCE(NULLIF(ST_SRID(input), 0), 3857);
+
+        WITH point AS (
+            SELECT ST_Transform(
+                ST_SetSRID(ST_Centroid(input), srid),
+                4326
+            ) AS geom
+        ), coords AS (
+            SELECT
+                GREATEST(LEAST(ST_X(geom), 180.0), -180.0) AS lon,
+                GREATEST(LEAST(ST_Y(geom), 85.0511287798), -85.0511287798) AS lat
+            FROM point
+        ), tiles AS (
+            SELECT
+                floor(((lon + 180.0) / 360.0) * power(2, max_zoom))::bigint AS tile_x,
+                floor(((1.0 - ln(tan(radians(lat)) + (1.0 / cos(radians(lat)))) / pi()) / 2.0 * power(2, max_zoom)))::bigint AS tile_y
+            FROM coords
+        ), digits AS (
+            SELECT
+                ((tile_x >> (i - 1)) & 1) + 2 * ((tile_y >> (i - 1)) & 1) AS digit,
+                i
+            FROM tiles,
+            LATERAL generate_series(max_zoom, 1, -1) AS gs(i)
+        )
+        SELECT string_agg(digit::text, '' ORDER BY i DESC)
+        INTO quadkey
+        FROM digits;
+
+        RETURN SUBSTRING(COALESCE(quadkey, '') FROM 1 FOR effective_prefix);
+    END;
+    $$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE;
+"""
+
+# Populates the build table: ``populate(conn, build_table, previous_partition)``.
+PartitionPopulator = Callable[[Any, str, Optional[str]], None]
+
+
+def tile_columns_sql(geom_sql: str) -> str:
+    """``geom_3857, tile_qk_prefix`` select expressions derived from ``geom_sql``."""
+
+    return (
+        f"ST_Transform({geom_sql}, 3857), "
+        f"mercator_quadkey_prefix({geom_sql}, {TILE_QUADKEY_ZOOM}, {TILE_QUADKEY_PREFIX_LENGTH})"
+    )
+
+
+def partition_name(year: int) -> str:
+    return f"parking_tickets_y{int(year)}"
+
+
+def year_bounds(year: int) -> tuple[date, date]:
+    """Half-open ``[start, end)`` date range covered by ``year``'s partition."""
+
+    return date(int(year), 1, 1), date(int(year) + 1, 1, 1)
+
+
+def _bounds_sql(year: int) -> str:
+    start, end = year_bounds(year)
+    return f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+
+
+def parking_tickets_kind(conn: Any) -> Optional[str]:
+    """``'p'`` when partitioned, ``'r'`` for the legacy heap, ``None`` when missing."""
+
+    row = conn.execute(
+        """
+        SELECT c.relkind
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relname = 'parking_tickets'
+          AND n.nspname = current_schema()
+        """
+    ).fetchone()
+    if row is None:
+        return None
+    kind = row[0]
+    return kind.decode() if isinstance(kind, bytes) else kind
+
+
+def ensure_year_partition(conn: Any, year: int) -> str:
+    """Create ``year``'s partition if it does not exist yet and return its name."""
+
+    name = partition_name(year)
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF parking_tickets FOR VALUES {_bounds_sql(year)}"
+    )
+    return name
+
+
+def _is_attached(conn: Any, name: str) -> bool:
+    row = conn.execute(
+        """
+        SELECT 1
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'parking_tickets'::regclass
+          AND c.relname = %s
+        """,
+        (name,),
+    ).fetchone()
+    return row is not None
+
+
+def index_definition_for(definition: str, table: str) -> str:
+    """Rewrite a ``pg_get_indexdef`` statement to build an unnamed index on ``table``."""
+
+    return re.sub(
+        r"^CREATE (UNIQUE )?INDEX \S+ ON (ONLY )?\S+ ",
+        lambda match: f"CREATE {match.group(1) or ''}INDEX ON {table} ",
+        definition,
+    )
+
+
+def _create_parent_indexes(conn: Any, table: str) -> None:
+    """Build the parent's secondary indexes on ``table`` so ATTACH can adopt them."""
+
+    rows = conn.execute(
+        """
+        SELECT pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        WHERE i.indrelid = 'parking_tickets'::regclass
+          AND NOT i.indisprimary
+        """
+    ).fetchall()
+    for (definition,) in rows:
+        conn.execute(index_definition_for(definition, table))
+
+
+def swap_year_partition(conn: Any, year: int, populate: PartitionPopulator) -> None:
+    """Replace ``year``'s partition with a freshly built table.
+
+    The build table is filled while the current partition keeps serving
+    reads, indexed, then swapped in with DETACH/ATTACH.  A CHECK constraint
+    matching the partition bound lets ATTACH skip its validation scan.  Runs
+    on the caller's transaction; the parent is only exclusively locked from
+    the DETACH until commit.
+    """
+
+    name = partition_name(year)
+    build = f"{name}_load"
+    start, end = year_bounds(year)
+    previous = name if _is_attached(conn, name) else None
+
+    conn.execute(f"DROP TABLE IF EXISTS {build}")
+    conn.execute(f"CREATE TABLE {build} (LIKE parking_tickets INCLUDING DEFAULTS)")
+    conn.execute(
+        f"ALTER TABLE {build} ADD CONSTRAINT {build}_bounds "
+        f"CHECK (date_of_infraction >= '{start.isoformat()}' AND date_of_infraction < '{end.isoformat()}')"
+    )
+    populate(conn, build, previous)
+    conn.execute(
+        f"ALTER TABLE {build} ADD CONSTRAINT {build}_pkey PRIMARY KEY (ticket_hash, date_of_infraction)"
+    )
+    _create_parent_indexes(conn, build)
+    conn.execute(f"ANALYZE {build}")
+
+    if previous is not None:
+        conn.execute(f"ALTER TABLE parking_tickets DETACH PARTITION {previous}")
+        conn.execute(f"DROP TABLE {previous}")
+    else:
+        conn.execute(f"DROP TABLE IF EXISTS {name}")
+    conn.execute(f"ALTER TABLE {build} RENAME TO {name}")
+    conn.execute(f"ALTER TABLE {name} RENAME CONSTRAINT {build}_pkey TO {name}_pkey")
+    conn.execute(f"ALTER TABLE parking_tickets ATTACH PARTITION {name} FOR VALUES {_bounds_sql(year)}")
+    conn.execute(f"ALTER TABLE {name} DROP CONSTRAINT {build}_bounds")
+
+
+def _migrate_legacy(conn: Any) -> None:
+    """Move rows from the unpartitioned heap into per-year partitions."""
+
+    conn.execute("ALTER TABLE parking_tickets ADD COLUMN IF NOT EXISTS ticket_hash TEXT")
+    conn.execute(
+        """
+        UPDATE parking_tickets
+        SET ticket_hash = md5(
+            COALESCE(ticket_number, '') || '|' ||
+            COALESCE(date_of_infraction::TEXT, '') || '|' ||
+            COALESCE(time_of_infraction, '') || '|' ||
+            COALESCE(infraction_code, '') || '|' ||
+            COALESCE(infraction_description, '') || '|' ||
+            COALESCE(set_fine_amount::TEXT, '') || '|' ||
+            COALESCE(location1, '') || '|' ||
+            COALESCE(location2, '') || '|' ||
+            COALESCE(location3, '') || '|' ||
+            COALESCE(location4, '')
+        )
+        WHERE ticket_hash IS NULL
+        """
+    )
+    conn.execute(f"ALTER TABLE parking_tickets RENAME TO {LEGACY_TABLE}")
+    # Index names are schema-wide; free them for the partitioned parent.
+    index_names = conn.execute(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s",
+        (LEGACY_TABLE,),
+    ).fetchall()
+    for (index_name,) in index_names:
+        conn.execute(f'ALTER INDEX "{index_name}" RENAME TO "{index_name[:56]}_legacy"')
+
+    conn.execute(PARKING_TICKETS_DDL)
+    years = conn.execute(
+        f"""
+        SELECT DISTINCT EXTRACT(YEAR FROM date_of_infraction)::INT
+        FROM {LEGACY_TABLE}
+        WHERE date_of_infraction IS NOT NULL
+        ORDER BY 1
+        """
+    ).fetchall()
+    column_list = ", ".join(PARKING_TICKET_COLUMNS)
+    # The tile columns are recomputed; the heap may predate them or hold stale values.
+    select_list = ", ".join(
+        tile_columns_sql("geom") if column == "geom_3857" else column
+        for column in PARKING_TICKET_COLUMNS
+        if column != "tile_qk_prefix"
+    )
+    for (year,) in years:
+        start, end = year_bounds(year)
+        ensure_year_partition(conn, year)
+        cursor = conn.execute(
+            f"""
+            INSERT INTO parking_tickets ({column_list})
+            SELECT DISTINCT ON (ticket_hash) {select_list}
+            FROM {LEGACY_TABLE}
+            WHERE date_of_infraction >= %s AND date_of_infraction < %s
+            ORDER BY ticket_hash, updated_at DESC NULLS LAST
+            """,
+            (start.isoformat(), end.isoformat()),
+        )
+        logger.info("[parking_tickets] migrated %s rows into %s", cursor.rowcount, partition_name(year))
+
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {UNDATED_TABLE} (LIKE {LEGACY_TABLE})")
+    undated = conn.execute(
+        f"INSERT INTO {UNDATED_TABLE} SELECT * FROM {LEGACY_TABLE} WHERE date_of_infraction IS NULL"
+    ).rowcount
+    if undated:
+        logger.warning(
+            "[parking_tickets] moved %s undated rows to %s; they cannot be partitioned",
+            undated,
+            UNDATED_TABLE,
+        )
+    conn.execute(f"DROP TABLE {LEGACY_TABLE}")
+
+
+def ensure_partitioned_parking_tickets(pg: PostgresClient) -> None:
+    """Create the partitioned ``parking_tickets``, migrating a legacy heap in place.
+
+    The migration runs in a single transaction, so readers keep seeing the
+    old table until every year has been copied.
+    """
+
+    with pg.connect() as conn:
+        conn.execute(MERCATOR_QUADKEY_PREFIX_DDL)
+        kind = parking_tickets_kind(conn)
+        if kind == "p":
+            conn.commit()
+            return
+        if kind is None:
+            conn.execute(PARKING_TICKETS_DDL)
+        else:
+            logger.info("[parking_tickets] migrating parking_tickets to yearly partitions")
+            _migrate_legacy(conn)
+        conn.commit()
+
+
+__all__ = [
+    "MERCATOR_QUADKEY_PREFIX_DDL",
+    "PARKING_TICKETS_DDL",
+    "PARKING_TICKET_COLUMNS",
+    "TILE_QUADKEY_PREFIX_LENGTH",
+    "TILE_QUADKEY_ZOOM",
+    "UNDATED_TABLE",
+    "ensure_partitioned_parking_tickets",
+    "ensure_year_partition",
+    "index_definition_for",
+    "parking_tickets_kind",
+    "partition_name",
+    "swap_year_partition",
+    "tile_columns_sql",
+    "year_bounds",
+]
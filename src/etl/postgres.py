@@ -3,23 +3,367 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
-from dataclasses import dataclass
-from typing import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Sequence
 
 import psycopg
+from psycopg.copy import QueuedLibpqWriter
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:  # pragma: no cover - optional dependency
+    ConnectionPool = None  # type: ignore
+
+
+@dataclass
+class PoolMetrics:
+    """Counters describing how a shared connection pool is being used."""
+
+    checkouts: int = 0
+    in_use: int = 0
+    max_in_use: int = 0
+    created: int = 0
+    closed: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_created(self) -> None:
+        with self._lock:
+            self.created += 1
+
+    def record_closed(self) -> None:
+        with self._lock:
+            self.closed += 1
+
+    def record_checkout(self, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def record_return(self) -> None:
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+
+if ConnectionPool is not None:
+
+    class _MeteredConnectionPool(ConnectionPool):
+        """``ConnectionPool`` that counts the connections it closes.
+
+        Idle shrinking, expiry, draining and closing the pool all go through
+        ``_close_connection``; broken connections are discarded without it and
+        show up in the pool's own ``connections_lost``/``returns_bad`` stats.
+        """
+
+        def __init__(self, *args: Any, metrics: PoolMetrics, **kwargs: Any) -> None:
+            self._metrics = metrics
+            super().__init__(*args, **kwargs)
+
+        def _close_connection(self, conn: Any) -> None:
+            try:
+                super()._close_connection(conn)
+            finally:
+                self._metrics.record_closed()
+
+else:  # pragma: no cover - optional dependency
+    _MeteredConnectionPool = None  # type: ignore
+
+
+def _column_values(values: Any) -> list:
+    if hasattr(values, "to_pylist"):
+        return values.to_pylist()
+    if hasattr(values, "tolist"):
+        return values.tolist()
+    return list(values)
+
+
+def iter_batch_rows(batch: Any, columns: Sequence[str]) -> Iterator[Sequence[object]]:
+    """Yield row tuples in ``columns`` order from one COPY batch.
+
+    Accepted shapes: a sequence of row tuples; a pandas ``DataFrame`` (missing
+    values become NULL); an Arrow ``RecordBatch``/``Table``; a mapping of column
+    name to NumPy array (or any sequence); or a tuple of NumPy column arrays in
+    ``columns`` order.
+    """
+
+    if hasattr(batch, "itertuples") and hasattr(batch, "columns"):
+        values = []
+        for name in columns:
+            column = batch[name]
+            data = column.to_numpy(dtype=object)
+            missing = column.isna().to_numpy()
+            if missing.any():
+                data = data.copy()
+                data[missing] = None
+            values.append(data.tolist())
+        return zip(*values)
+    if hasattr(batch, "schema") and hasattr(batch, "column"):
+        return zip(*(batch.column(name).to_pylist() for name in columns))
+    if isinstance(batch, Mapping):
+        return zip(*(_column_values(batch[name]) for name in columns))
+    if isinstance(batch, tuple) and batch and all(getattr(values, "ndim", 0) == 1 for values in batch):
+        return zip(*(_column_values(values) for values in batch))
+    return iter(batch)
+
+
+class _Done:
+    pass
+
+
+class _Failed:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class _BatchPrefetcher:
+    """Produce up to ``depth`` row batches ahead of the COPY writer on a thread."""
+
+    def __init__(self, batches: Iterable[Any], columns: Sequence[str], depth: int) -> None:
+        self._batches = batches
+        self._columns = columns
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, name="copy-prefetch", daemon=True)
+
+    def _put(self, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        try:
+            for batch in self._batches:
+                if not self._put(list(iter_batch_rows(batch, self._columns))):
+                    return
+        except BaseException as exc:  # noqa: BLE001 - re-raised on the consumer thread
+            self._put(_Failed(exc))
+            return
+        self._put(_Done())
+
+    def __iter__(self) -> Iterator[list]:
+        self._thread.start()
+        try:
+            while True:
+                item = self._queue.get()
+                if isinstance(item, _Done):
+                    return
+                if isinstance(item, _Failed):
+                    raise item.error
+                yield item
+        finally:
+            self._stop.set()
+            self._thread.join()
+
+
+def copy_batches(
+    conn: psycopg.Connection,
+    table: str,
+    columns: Sequence[str],
+    batches: Iterable[Any],
+    *,
+    types: Sequence[str] | None = None,
+    prefetch: int = 2,
+    coerce_text: bool = False,
+    progress: Callable[[int], None] | None = None,
+) -> int:
+    """COPY ``batches`` into ``table`` on ``conn`` and return the row count.
+
+    With ``types`` (Postgres type names, one per column) the data is sent in
+    binary format, so values must already have the matching Python types;
+    ``coerce_text`` stringifies non-``str`` values bound for ``text`` columns.
+    Without ``types`` the text format is used.  When ``prefetch`` is positive
+    the next batches are produced on a background thread and the COPY data is
+    flushed to the socket by psycopg's queued writer, so parsing, encoding and
+    sending overlap.  ``progress`` receives the running row count per batch.
+    """
+
+    column_list = ",".join(columns)
+    copy_format = "binary" if types is not None else "text"
+    copy_sql = f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT {copy_format})"
+    text_positions = (
+        [index for index, name in enumerate(types) if name == "text"] if types is not None and coerce_text else []
+    )
+    if prefetch > 0:
+        source: Iterable[Iterable[Sequence[object]]] = _BatchPrefetcher(batches, columns, prefetch)
+    else:
+        source = (iter_batch_rows(batch, columns) for batch in batches)
+
+    row_count = 0
+    cursor = conn.cursor()
+    writer = QueuedLibpqWriter(cursor) if prefetch > 0 else None
+    with cursor.copy(copy_sql, writer=writer) as copy:
+        if types is not None:
+            copy.set_types(list(types))
+        for rows in source:
+            for row in rows:
+                if text_positions:
+                    row = list(row)
+                    for index in text_positions:
+                        value = row[index]
+                        if value is not None and not isinstance(value, str):
+                            row[index] = str(value)
+                copy.write_row(row)
+                row_count += 1
+            if progress is not None:
+                progress(row_count)
+    return row_count
+
+
+_POOLS: Dict[tuple, Any] = {}
+_POOL_METRICS: Dict[tuple, PoolMetrics] = {}
+_POOLS_LOCK = threading.Lock()
 
 
 @dataclass
 class PostgresClient:
-    """Thin wrapper around psycopg connections with sensible defaults."""
+    """Thin wrapper around psycopg connections with sensible defaults.
+
+    With ``pooled=True`` connections are borrowed from a bounded
+    ``psycopg_pool.ConnectionPool`` shared by every client that uses the same
+    DSN, application name and statement timeout.  Session settings are applied
+    once when the pool opens a connection instead of on every call.
+    """
 
     dsn: str
     application_name: str = "toronto-parking-etl"
     connect_timeout: int = 10
     statement_timeout_ms: int | None = 600_000
+    pooled: bool = False
+    pool_min_size: int = 1
+    pool_max_size: int = 4
+    pool_max_idle_seconds: float = 300.0
+    pool_timeout_seconds: float = 30.0
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Any,
+        *,
+        application_name: str | None = None,
+        pool_by_default: bool = False,
+    ) -> "PostgresClient":
+        """Build a client from a :class:`~src.etl.config.DatabaseConfig`.
+
+        ``PG_POOL_ENABLED`` (``config.pool_enabled``) decides whether
+        connections are pooled; when it is unset ``pool_by_default`` does.
+        The API handlers default to pooling: serverless workers stay warm
+        between invocations, so a few long-lived connections save a TCP and
+        auth handshake per request.  ETL runs hold their connections for long
+        stretches and default to plain connections.
+        """
+
+        pooled = pool_by_default if config.pool_enabled is None else config.pool_enabled
+        return cls(
+            config.dsn,
+            application_name=application_name or config.application_name,
+            connect_timeout=config.connect_timeout,
+            statement_timeout_ms=config.statement_timeout_ms,
+            pooled=pooled,
+            pool_min_size=config.pool_min_size,
+            pool_max_size=config.pool_max_size,
+            pool_max_idle_seconds=config.pool_max_idle_seconds,
+        )
 
+    # Pool management -------------------------------------------------
+    def _pool_key(self) -> tuple:
+        return (self.dsn, self.application_name, self.statement_timeout_ms)
+
+    def _configure_connection(self, conn: psycopg.Connection) -> None:
+        if self.statement_timeout_ms is not None:
+            conn.execute(f"SET statement_timeout = {int(self.statement_timeout_ms)}")
+        # The pool requires connections to be returned idle.
+        conn.commit()
+        _POOL_METRICS[self._pool_key()].record_created()
+
+    def _get_pool(self):
+        key = self._pool_key()
+        pool = _POOLS.get(key)
+        if pool is not None:
+            return pool
+        if ConnectionPool is None:
+            raise RuntimeError(
+                "The 'psycopg-pool' package is required for pooled PostgresClient connections. "
+                "Install it via 'pip install psycopg-pool'."
+            )
+        with _POOLS_LOCK:
+            pool = _POOLS.get(key)
+            if pool is None:
+                metrics = _POOL_METRICS[key] = PoolMetrics()
+                pool = _MeteredConnectionPool(
+                    self.dsn,
+                    metrics=metrics,
+                    min_size=max(0, self.pool_min_size),
+                    max_size=max(1, self.pool_min_size, self.pool_max_size),
+                    max_idle=self.pool_max_idle_seconds,
+                    timeout=self.pool_timeout_seconds,
+                    kwargs={
+                        "connect_timeout": self.connect_timeout,
+                        "application_name": self.application_name,
+                    },
+                    configure=self._configure_connection,
+                    check=ConnectionPool.check_connection,
+                    name=self.application_name,
+                    open=True,
+                )
+                _POOLS[key] = pool
+        return pool
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return wait/in-use/lifecycle metrics for this client's pool."""
+
+        key = self._pool_key()
+        pool = _POOLS.get(key)
+        metrics = _POOL_METRICS.get(key)
+        if pool is None or metrics is None:
+            return {"pooled": self.pooled, "open": False}
+        stats = pool.get_stats()
+        return {
+            "pooled": True,
+            "open": True,
+            "pool_min": int(stats.get("pool_min", self.pool_min_size)),
+            "pool_max": int(stats.get("pool_max", self.pool_max_size)),
+            "pool_size": int(stats.get("pool_size", 0)),
+            "pool_available": int(stats.get("pool_available", 0)),
+            "requests_waiting": int(stats.get("requests_waiting", 0)),
+            "checkouts": metrics.checkouts,
+            "in_use": metrics.in_use,
+            "max_in_use": metrics.max_in_use,
+            "created": metrics.created,
+            "closed": metrics.closed,
+            "lost": int(stats.get("connections_lost", 0)) + int(stats.get("returns_bad", 0)),
+            "wait_ms_total": round(metrics.wait_ms_total, 3),
+            "wait_ms_avg": round(metrics.wait_ms_total / metrics.checkouts, 3) if metrics.checkouts else 0.0,
+            "wait_ms_max": round(metrics.wait_ms_max, 3),
+        }
+
+    def close(self) -> None:
+        """Close the shared pool backing this client (no-op when unpooled)."""
+
+        key = self._pool_key()
+        with _POOLS_LOCK:
+            pool = _POOLS.pop(key, None)
+        if pool is not None:
+            pool.close()
+
+    # Connections -----------------------------------------------------
     @contextmanager
     def connect(self, *, autocommit: bool = False) -> Iterator[psycopg.Connection]:
+        if self.pooled:
+            with self._pooled_connection(autocommit=autocommit) as conn:
+                yield conn
+            return
+
         with psycopg.connect(
             self.dsn,
             autocommit=autocommit,
@@ -30,6 +374,19 @@ class PostgresClient:
                 conn.execute(f"SET statement_timeout = {int(self.statement_timeout_ms)}")
             yield conn
 
+    @contextmanager
+    def _pooled_connection(self, *, autocommit: bool) -> Iterator[psycopg.Connection]:
+        pool = self._get_pool()
+        metrics = _POOL_METRICS[self._pool_key()]
+        started = time.perf_counter()
+        with pool.connection() as conn:
+            metrics.record_checkout((time.perf_counter() - started) * 1000.0)
+            try:
+                conn.autocommit = autocommit
+                yield conn
+            finally:
+                metrics.record_return()
+
     def execute(self, sql: str, params: Sequence[object] | None = None) -> int | None:
         with self.connect(autocommit=True) as conn:
             cursor = conn.execute(sql, params or ())
@@ -50,22 +407,45 @@ class PostgresClient:
                 cur.execute(sql, params or ())
                 return cur.fetchall()
 
-    def copy_rows(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[object]]) -> int:
-        """Bulk load ``rows`` into ``table`` using ``COPY``."""
+    def copy_rows(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Iterable[Sequence[object]],
+        *,
+        types: Sequence[str] | None = None,
+        coerce_text: bool = False,
+    ) -> int:
+        """Bulk load ``rows`` into ``table`` using ``COPY``.
+
+        Passing ``types`` switches to binary COPY; see :func:`copy_batches`.
+        """
+
+        with self.connect(autocommit=True) as conn:
+            return copy_batches(
+                conn, table, columns, [rows], types=types, prefetch=0, coerce_text=coerce_text,
+            )
+
+    def copy_batches(
+        self,
+        table: str,
+        columns: Sequence[str],
+        batches: Iterable[Any],
+        *,
+        types: Sequence[str] | None = None,
+        prefetch: int = 2,
+        coerce_text: bool = False,
+    ) -> int:
+        """Pipelined bulk load of ``batches`` into ``table``; see :func:`copy_batches`."""
 
-        column_list = ",".join(columns)
-        copy_sql = f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT text)"
-        row_count = 0
         with self.connect(autocommit=True) as conn:
-            with conn.cursor().copy(copy_sql) as copy:
-                for row in rows:
-                    copy.write_row(row)
-                    row_count += 1
-        return row_count
+            return copy_batches(
+                conn, table, columns, batches, types=types, prefetch=prefetch, coerce_text=coerce_text,
+            )
 
     def ensure_extensions(self) -> None:
         self.execute("CREATE EXTENSION IF NOT EXISTS postgis")
         self.execute("CREATE EXTENSION IF NOT EXISTS postgis_raster")
 
 
-__all__ = ["PostgresClient"]
+__all__ = ["PostgresClient", "PoolMetrics", "copy_batches", "iter_batch_rows"]
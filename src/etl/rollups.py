@@ -0,0 +1,201 @@
+"""Pre-aggregated spatial rollups backing the viewport summary API.
+
+``parking_ticket_rollup`` buckets tickets into Web Mercator grid cells at
+``ROLLUP_ZOOM`` (roughly 900 m at Toronto's latitude) per year, month and
+street.  Every ticket is dated (undated rows never reach ``parking_tickets``),
+so each one falls in a real year and month.  Viewport summaries add up the
+cells fully inside the bounding box and only touch raw ``parking_tickets`` rows
+in the partially covered edge cells.  The ETL refreshes the rollup one year at
+a time, right after reloading it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+import math
+from typing import Any, Optional
+
+from .postgres import PostgresClient
+
+
+ROLLUP_ZOOM = 15
+MERCATOR_ORIGIN = 20037508.342789244
+MERCATOR_RADIUS = 6378137.0
+ROLLUP_CELL_SIZE = 2 * MERCATOR_ORIGIN / (1 << ROLLUP_ZOOM)
+
+# Rollup cell of a 4326 point column; Python mirrors this in ``rollup_cell``.
+ROLLUP_CELL_X_SQL = f"FLOOR((ST_X(ST_Transform({{geom}}, 3857)) + {MERCATOR_ORIGIN}) / {ROLLUP_CELL_SIZE})::INT"
+ROLLUP_CELL_Y_SQL = f"FLOOR((ST_Y(ST_Transform({{geom}}, 3857)) + {MERCATOR_ORIGIN}) / {ROLLUP_CELL_SIZE})::INT"
+
+PARKING_ROLLUP_DDL = """
+    CREATE TABLE IF NOT EXISTS parking_ticket_rollup (
+        cell_x INTEGER NOT NULL,
+        cell_y INTEGER NOT NULL,
+        year SMALLINT NOT NULL,
+        month SMALLINT NOT NULL,
+        street_key TEXT NOT NULL,
+        ticket_count BIGINT NOT NULL,
+        total_fines NUMERIC NOT NULL,
+        sample_location TEXT,
+        PRIMARY KEY (cell_x, cell_y, year, month, street_key)
+    )
+"""
+
+PARKING_ROLLUP_INDEX_DDLS: tuple[str, ...] = (
+    "CREATE INDEX IF NOT EXISTS parking_ticket_rollup_year_cell_idx ON parking_ticket_rollup (year, cell_x, cell_y)",
+    # Exact edge-cell fallback filters raw tickets by bounding box.
+    "CREATE INDEX IF NOT EXISTS parking_tickets_geom_idx ON parking_tickets USING GIST (geom)",
+)
+
+
+def _mercator(lon: float, lat: float) -> tuple[float, float]:
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = math.radians(lon) * MERCATOR_RADIUS
+    y = math.log(math.tan(math.pi / 4 + math.radians(lat) / 2)) * MERCATOR_RADIUS
+    return x, y
+
+
+def _lonlat(x: float, y: float) -> tuple[float, float]:
+    lon = math.degrees(x / MERCATOR_RADIUS)
+    lat = math.degrees(2 * math.atan(math.exp(y / MERCATOR_RADIUS)) - math.pi / 2)
+    return lon, lat
+
+
+def rollup_cell(lon: float, lat: float) -> tuple[int, int]:
+    """Return the rollup ``(cell_x, cell_y)`` containing a WGS84 point."""
+
+    x, y = _mercator(lon, lat)
+    return (
+        math.floor((x + MERCATOR_ORIGIN) / ROLLUP_CELL_SIZE),
+        math.floor((y + MERCATOR_ORIGIN) / ROLLUP_CELL_SIZE),
+    )
+
+
+@dataclass(frozen=True)
+class CellRange:
+    """Inclusive range of rollup cells lying entirely inside a bounding box."""
+
+    min_x: int
+    max_x: int
+    min_y: int
+    max_y: int
+
+    @classmethod
+    def interior(cls, west: float, south: float, east: float, north: float) -> Optional["CellRange"]:
+        """Cells fully covered by the box, or ``None`` when no cell fits."""
+
+        min_mx, min_my = _mercator(west, south)
+        max_mx, max_my = _mercator(east, north)
+        min_x = math.ceil((min_mx + MERCATOR_ORIGIN) / ROLLUP_CELL_SIZE)
+        min_y = math.ceil((min_my + MERCATOR_ORIGIN) / ROLLUP_CELL_SIZE)
+        max_x = math.floor((max_mx + MERCATOR_ORIGIN) / ROLLUP_CELL_SIZE) - 1
+        max_y = math.floor((max_my + MERCATOR_ORIGIN) / ROLLUP_CELL_SIZE) - 1
+        if min_x > max_x or min_y > max_y:
+            return None
+        return cls(min_x, max_x, min_y, max_y)
+
+    def envelope(self) -> tuple[float, float, float, float]:
+        """WGS84 ``(west, south, east, north)`` of the covered cells."""
+
+        west, south = _lonlat(
+            self.min_x * ROLLUP_CELL_SIZE - MERCATOR_ORIGIN,
+            self.min_y * ROLLUP_CELL_SIZE - MERCATOR_ORIGIN,
+        )
+        east, north = _lonlat(
+            (self.max_x + 1) * ROLLUP_CELL_SIZE - MERCATOR_ORIGIN,
+            (self.max_y + 1) * ROLLUP_CELL_SIZE - MERCATOR_ORIGIN,
+        )
+        return west, south, east, north
+
+
+# Strips overlap the interior by this much (degrees) so rounding in the
+# inverse projection never drops an edge ticket; callers exclude interior
+# cells exactly with ``ROLLUP_CELL_X_SQL``/``ROLLUP_CELL_Y_SQL``.
+EDGE_STRIP_OVERLAP = 1e-9
+
+
+def edge_strips(
+    west: float, south: float, east: float, north: float, interior: Optional[CellRange]
+) -> list[tuple[float, float, float, float]]:
+    """Up to four boxes covering ``(west, south, east, north)`` minus ``interior``.
+
+    South and north strips span the full width; west and east strips fill
+    the band between them.  Empty strips (interior flush with the edge) are
+    left out.
+    """
+
+    if interior is None:
+        return [(west, south, east, north)]
+    inner_west, inner_south, inner_east, inner_north = interior.envelope()
+    inner_west = min(inner_west + EDGE_STRIP_OVERLAP, east)
+    inner_south = min(inner_south + EDGE_STRIP_OVERLAP, north)
+    inner_east = max(inner_east - EDGE_STRIP_OVERLAP, west)
+    inner_north = max(inner_north - EDGE_STRIP_OVERLAP, south)
+    strips = [
+        (west, south, east, inner_south),
+        (west, inner_north, east, north),
+        (west, inner_south, inner_west, inner_north),
+        (inner_east, inner_south, east, inner_north),
+    ]
+    return [strip for strip in strips if strip[0] < strip[2] and strip[1] < strip[3]]
+
+
+def ensure_parking_rollup(pg: PostgresClient) -> None:
+    pg.execute(PARKING_ROLLUP_DDL)
+    for ddl in PARKING_ROLLUP_INDEX_DDLS:
+        pg.execute(ddl)
+
+
+def refresh_parking_rollup(conn: Any, *, year: int | None = None) -> int:
+    """Rebuild rollup rows for one ticket ``year`` (every year when omitted).
+
+    Runs on the caller's connection so the refresh commits together with the
+    ticket load that made it necessary.
+    """
+
+    range_sql = ""
+    params: tuple[object, ...] = ()
+    if year is None:
+        conn.execute("DELETE FROM parking_ticket_rollup")
+    else:
+        conn.execute("DELETE FROM parking_ticket_rollup WHERE year = %s", (year,))
+        range_sql = "AND date_of_infraction >= %s AND date_of_infraction < %s"
+        params = (date(year, 1, 1).isoformat(), date(year + 1, 1, 1).isoformat())
+
+    cursor = conn.execute(
+        f"""
+        INSERT INTO parking_ticket_rollup (
+            cell_x, cell_y, year, month, street_key, ticket_count, total_fines, sample_location
+        )
+        SELECT
+            {ROLLUP_CELL_X_SQL.format(geom="geom")},
+            {ROLLUP_CELL_Y_SQL.format(geom="geom")},
+            EXTRACT(YEAR FROM date_of_infraction)::SMALLINT,
+            EXTRACT(MONTH FROM date_of_infraction)::SMALLINT,
+            COALESCE(NULLIF(street_normalized, ''), 'Unknown'),
+            COUNT(*),
+            COALESCE(SUM(set_fine_amount), 0),
+            MAX(location1)
+        FROM parking_tickets
+        WHERE geom IS NOT NULL
+          {range_sql}
+        GROUP BY 1, 2, 3, 4, 5
+        """,
+        params,
+    )
+    return cursor.rowcount or 0
+
+
+__all__ = [
+    "CellRange",
+    "EDGE_STRIP_OVERLAP",
+    "PARKING_ROLLUP_DDL",
+    "ROLLUP_CELL_X_SQL",
+    "ROLLUP_CELL_Y_SQL",
+    "ROLLUP_ZOOM",
+    "edge_strips",
+    "ensure_parking_rollup",
+    "refresh_parking_rollup",
+    "rollup_cell",
+]
@@ -5,11 +5,12 @@ from __future__ import annotations
 import argparse
 import importlib
 import logging
-from typing import Iterable, Sequence, Type
+from typing import Dict, Iterable, List, Sequence
 
 from .config import DatasetConfig, ETLConfig
 from .ckan import CKANClient
 from .postgres import PostgresClient
+from .scheduler import DagScheduler, Stage, StageTiming
 from .state import ETLStateStore
 from .storage import ArtefactStore
 
@@ -31,7 +32,7 @@ def _run_dataset(
     store: ArtefactStore,
     pg: PostgresClient,
     state_store: ETLStateStore,
-) -> None:
+) -> Dict[str, float]:
     handler_cls = _load_handler(dataset.handler)
     handler = handler_cls(
         dataset,
@@ -42,29 +43,65 @@ def _run_dataset(
     )
     LOGGER.info("Running ETL for %s", dataset.slug)
     handler.run()
+    return dict(getattr(handler, "stage_timings", {}))
 
 
-def run_pipeline(selected: Sequence[str] | None = None) -> None:
+def build_dataset_stages(
+    datasets: Iterable[DatasetConfig],
+    *,
+    ckan: CKANClient,
+    store: ArtefactStore,
+    pg: PostgresClient,
+    state_store: ETLStateStore,
+    stage_timings: Dict[str, Dict[str, float]],
+) -> List[Stage]:
+    """One scheduler stage per dataset; extract/transform/load seconds land in ``stage_timings``."""
+
+    def stage_for(dataset: DatasetConfig) -> Stage:
+        def run() -> None:
+            stage_timings[dataset.slug] = _run_dataset(
+                dataset, ckan=ckan, store=store, pg=pg, state_store=state_store
+            )
+
+        return Stage(name=dataset.slug, run=run, depends_on=dataset.depends_on)
+
+    return [stage_for(dataset) for dataset in datasets]
+
+
+def run_pipeline(selected: Sequence[str] | None = None, *, max_workers: int | None = None) -> Dict[str, StageTiming]:
+    """Run the configured datasets, independent ones concurrently.
+
+    Datasets wait for their ``depends_on`` datasets (when those are part of
+    the run); the timings of each dataset are stored in
+    ``etl_state.metadata['run_timings']``.
+    """
+
     config = ETLConfig.default()
     logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
 
-    pg = PostgresClient(
-        config.database.dsn,
-        application_name=config.database.application_name,
-        connect_timeout=config.database.connect_timeout,
-        statement_timeout_ms=config.database.statement_timeout_ms,
-    )
+    pg = PostgresClient.from_config(config.database)
     store = ArtefactStore(config.storage.raw_root, config.storage.staging_root)
     ckan = CKANClient(config.base_url, user_agent=config.user_agent)
     state_store = ETLStateStore(pg)
 
+    datasets = [dataset for dataset in config.datasets if not selected or dataset.slug in selected]
+    stage_timings: Dict[str, Dict[str, float]] = {}
+
+    def record(timing: StageTiming) -> None:
+        payload = timing.to_json()
+        payload["stages"] = stage_timings.get(timing.name, {})
+        state_store.record_run_timings(timing.name, payload)
+
     try:
-        for dataset in config.datasets:
-            if selected and dataset.slug not in selected:
-                continue
-            _run_dataset(dataset, ckan=ckan, store=store, pg=pg, state_store=state_store)
+        stages = build_dataset_stages(
+            datasets, ckan=ckan, store=store, pg=pg, state_store=state_store, stage_timings=stage_timings
+        )
+        return DagScheduler(stages, max_workers=max_workers, on_stage_complete=record).run()
     finally:
         ckan.close()
+        if pg.pooled:
+            LOGGER.info("Postgres pool stats: %s", pg.pool_stats())
+            pg.close()
 
 
 def main(argv: Sequence[str] | None = None) -> None:
@@ -74,8 +111,13 @@ def main(argv: Sequence[str] | None = None) -> None:
         nargs="*",
         help="Run a subset of datasets by slug",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Datasets to run concurrently (default: ETL_MAX_PARALLEL_STAGES or 3)",
+    )
     args = parser.parse_args(argv)
-    run_pipeline(args.datasets)
+    run_pipeline(args.datasets, max_workers=args.workers)
 
 
 if __name__ == "__main__":  # pragma: no cover
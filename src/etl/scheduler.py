@@ -0,0 +1,175 @@
+"""Dependency-aware concurrent execution of pipeline stages.
+
+Datasets and refresh steps declare which other stages they need; every stage
+whose dependencies have finished runs on a bounded thread pool, so independent
+work (the camera datasets while parking tickets load, say) overlaps.  A failed
+stage skips everything downstream of it while unrelated branches finish, and
+the run then raises :class:`SchedulerError` with the timings of every stage.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 3
+
+
+class SchedulerError(RuntimeError):
+    """Raised after a run in which at least one stage failed."""
+
+    def __init__(self, message: str, timings: Dict[str, "StageTiming"]) -> None:
+        super().__init__(message)
+        self.timings = timings
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A unit of work; ``depends_on`` names other stages of the same run."""
+
+    name: str
+    run: Callable[[], Any]
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageTiming:
+    name: str
+    status: str  # "succeeded", "failed" or "skipped"
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    elapsed_seconds: float = 0.0
+    error: Optional[str] = None
+
+    def to_json(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def max_parallel_stages() -> int:
+    return max(1, int(os.getenv("ETL_MAX_PARALLEL_STAGES", str(DEFAULT_MAX_WORKERS)) or DEFAULT_MAX_WORKERS))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def execution_order(stages: Sequence[Stage]) -> List[str]:
+    """Topological order of ``stages`` (declaration order among peers).
+
+    Dependencies on stages that are not part of the run are ignored, so a
+    subset (``--datasets parking_tickets``) runs against whatever is already
+    loaded.  Raises ``ValueError`` for duplicate names or cycles.
+    """
+
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names: {sorted({name for name in names if names.count(name) > 1})}")
+    remaining = {stage.name: {dep for dep in stage.depends_on if dep in names} for stage in stages}
+    order: List[str] = []
+    while remaining:
+        ready = [name for name in names if name in remaining and not remaining[name]]
+        if not ready:
+            raise ValueError(f"Dependency cycle between stages: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+            order.append(name)
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return order
+
+
+class DagScheduler:
+    """Run stages concurrently as soon as their dependencies have succeeded."""
+
+    def __init__(
+        self,
+        stages: Iterable[Stage],
+        *,
+        max_workers: Optional[int] = None,
+        on_stage_complete: Optional[Callable[[StageTiming], None]] = None,
+    ) -> None:
+        self.stages = list(stages)
+        execution_order(self.stages)
+        self.max_workers = max_workers or max_parallel_stages()
+        self.on_stage_complete = on_stage_complete
+
+    def run(self) -> Dict[str, StageTiming]:
+        by_name = {stage.name: stage for stage in self.stages}
+        waiting = {stage.name: {dep for dep in stage.depends_on if dep in by_name} for stage in self.stages}
+        timings: Dict[str, StageTiming] = {}
+        running: Dict[Future, Tuple[StageTiming, float]] = {}
+
+        def complete(timing: StageTiming) -> None:
+            timings[timing.name] = timing
+            if self.on_stage_complete is not None:
+                try:
+                    self.on_stage_complete(timing)
+                except Exception:  # pragma: no cover - reporting must not break the run
+                    LOGGER.exception("Recording timings for stage %s failed", timing.name)
+
+        def skip_dependents(failed: str) -> None:
+            for name in [name for name, deps in waiting.items() if failed in deps]:
+                del waiting[name]
+                LOGGER.warning("Skipping stage %s because %s did not succeed", name, failed)
+                complete(StageTiming(name=name, status="skipped", error=f"dependency {failed} did not succeed"))
+                skip_dependents(name)
+
+        def execute(stage: Stage) -> None:
+            LOGGER.info("Starting stage %s", stage.name)
+            stage.run()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="etl-stage") as executor:
+            while waiting or running:
+                for name in [name for name in by_name if name in waiting and not waiting[name]]:
+                    del waiting[name]
+                    timing = StageTiming(name=name, status="running", started_at=_now())
+                    running[executor.submit(execute, by_name[name])] = (timing, time.perf_counter())
+                if not running:
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    timing, started = running.pop(future)
+                    timing.elapsed_seconds = time.perf_counter() - started
+                    timing.finished_at = _now()
+                    error = future.exception()
+                    if error is None:
+                        timing.status = "succeeded"
+                        LOGGER.info("Finished stage %s in %.1fs", timing.name, timing.elapsed_seconds)
+                        for deps in waiting.values():
+                            deps.discard(timing.name)
+                    else:
+                        timing.status = "failed"
+                        timing.error = f"{type(error).__name__}: {error}"
+                        LOGGER.error(
+                            "Stage %s failed after %.1fs",
+                            timing.name,
+                            timing.elapsed_seconds,
+                            exc_info=(type(error), error, error.__traceback__),
+                        )
+                    complete(timing)
+                    if error is not None:
+                        skip_dependents(timing.name)
+
+        ordered = {name: timings[name] for name in execution_order(self.stages) if name in timings}
+        failed = [name for name, timing in ordered.items() if timing.status == "failed"]
+        if failed:
+            raise SchedulerError(f"Stages failed: {', '.join(failed)}", ordered)
+        return ordered
+
+
+__all__ = [
+    "DagScheduler",
+    "SchedulerError",
+    "Stage",
+    "StageTiming",
+    "execution_order",
+    "max_parallel_stages",
+]
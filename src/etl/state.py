@@ -78,5 +78,25 @@ class ETLStateStore:
             ),
         )
 
+    def record_run_timings(self, dataset_slug: str, timings: Dict[str, Any]) -> None:
+        """Store the timings of the latest run under ``metadata['run_timings']``.
+
+        Merged into the existing metadata rather than replacing it, so it can
+        be written after ``upsert`` (or for slugs that are not datasets, such
+        as the full refresh).
+        """
+
+        self.client.execute(
+            """
+            INSERT INTO etl_state (dataset_slug, metadata)
+            VALUES (%(slug)s, jsonb_build_object('run_timings', %(timings)s::JSONB))
+            ON CONFLICT (dataset_slug)
+            DO UPDATE SET
+                metadata = jsonb_set(COALESCE(etl_state.metadata, '{}'::JSONB), '{run_timings}', %(timings)s::JSONB),
+                updated_at = NOW()
+            """,
+            {"slug": dataset_slug, "timings": Json(timings)},
+        )
+
 
 __all__ = ["ETLStateStore", "DatasetState"]
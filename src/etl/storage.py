@@ -2,23 +2,86 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 import hashlib
 import json
 import logging
-from typing import Any, Dict
+import os
+import threading
+from types import TracebackType
+from typing import Any, BinaryIO, Dict, Optional, Type
 
 
 LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class ArtefactInfo:
+    """A file committed to the store, with the hash computed while it was written."""
+
+    path: Path
+    sha1: str
+    size: int
+
+
+class ArtefactWriter:
+    """Write bytes to ``<destination>.part``, hashing them as they arrive.
+
+    :meth:`commit` renames the temporary file over ``destination`` in one
+    step, so readers never see a half-written artefact.  Leaving the context
+    with an exception keeps the ``.part`` file for a later resume; with
+    ``append`` the bytes already in it are hashed once and new chunks are
+    added to the end.
+    """
+
+    def __init__(self, destination: Path, *, append: bool = False) -> None:
+        self.destination = destination
+        self.partial = destination.with_name(destination.name + ".part")
+        self._digest = hashlib.sha1(usedforsecurity=False)
+        self.size = 0
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if append and self.partial.exists():
+            with self.partial.open("rb") as existing:
+                for chunk in iter(lambda: existing.read(1 << 20), b""):
+                    self._digest.update(chunk)
+                    self.size += len(chunk)
+            self._handle: BinaryIO = self.partial.open("ab")
+        else:
+            self._handle = self.partial.open("wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._handle.write(chunk)
+        self._digest.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> ArtefactInfo:
+        self._handle.close()
+        os.replace(self.partial, self.destination)
+        return ArtefactInfo(self.destination, self._digest.hexdigest(), self.size)
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def __enter__(self) -> "ArtefactWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+
 @dataclass
 class ArtefactStore:
     """Manages storage locations for downloaded resources and staging files."""
 
     raw_root: Path
     staging_root: Path
+    _manifest_lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         self.raw_root.mkdir(parents=True, exist_ok=True)
@@ -29,6 +92,11 @@ class ArtefactStore:
         filename = key if suffix is None else f"{key}{suffix}"
         return self.raw_root / dataset_slug / filename
 
+    def writer(self, destination: Path, *, append: bool = False) -> ArtefactWriter:
+        """Hashing, atomically committed writer for an artefact under this store."""
+
+        return ArtefactWriter(destination, append=append)
+
     def staging_path(self, dataset_slug: str, name: str) -> Path:
         return self.staging_root / dataset_slug / name
 
@@ -36,7 +104,9 @@ class ArtefactStore:
         target = self.raw_root / dataset_slug / "manifest.json"
         target.parent.mkdir(parents=True, exist_ok=True)
         LOGGER.debug("Writing manifest %s", target)
-        target.write_text(json.dumps(payload, indent=2, sort_keys=True))
+        temporary = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary.write_text(json.dumps(payload, indent=2, sort_keys=True))
+        os.replace(temporary, target)
         return target
 
     def read_manifest(self, dataset_slug: str) -> Dict[str, Any] | None:
@@ -49,5 +119,60 @@ class ArtefactStore:
             LOGGER.warning("Manifest for %s is corrupted; ignoring", dataset_slug)
             return None
 
+    def record_download(
+        self,
+        dataset_slug: str,
+        resource_id: str,
+        path: Path,
+        *,
+        sha1: str,
+        size: int,
+        last_modified: str | None = None,
+    ) -> None:
+        """Remember the content of a downloaded resource in the dataset manifest."""
+
+        with self._manifest_lock:
+            manifest = self.read_manifest(dataset_slug) or {}
+            downloads = manifest.setdefault("downloads", {})
+            downloads[resource_id] = {
+                "path": os.path.relpath(path, self.raw_root),
+                "sha1": sha1,
+                "size": size,
+                "last_modified": last_modified,
+            }
+            self.write_manifest(dataset_slug, manifest)
+
+    def download_record(self, dataset_slug: str, resource_id: str) -> Dict[str, Any] | None:
+        """Manifest entry for ``resource_id`` if its file is still present and intact in size."""
+
+        with self._manifest_lock:
+            manifest = self.read_manifest(dataset_slug) or {}
+        record = (manifest.get("downloads") or {}).get(resource_id)
+        if not record or self._recorded_file(record) is None:
+            return None
+        return record
+
+    def find_content(self, sha1: str) -> Optional[Path]:
+        """Any recorded download (across datasets) whose content hashes to ``sha1``."""
+
+        with self._manifest_lock:
+            manifests = [self.read_manifest(path.parent.name) for path in self.raw_root.glob("*/manifest.json")]
+        for manifest in manifests:
+            for record in ((manifest or {}).get("downloads") or {}).values():
+                if record.get("sha1") == sha1:
+                    path = self._recorded_file(record)
+                    if path is not None:
+                        return path
+        return None
+
+    def _recorded_file(self, record: Dict[str, Any]) -> Optional[Path]:
+        path = self.raw_root / record.get("path", "")
+        try:
+            if path.is_file() and path.stat().st_size == record.get("size"):
+                return path
+        except OSError:  # pragma: no cover - racing deletes
+            return None
+        return None
+
 
-__all__ = ["ArtefactStore"]
+__all__ = ["ArtefactInfo", "ArtefactStore", "ArtefactWriter"]
@@ -5,8 +5,12 @@ from __future__ import annotations
 import csv
 import gzip
 import hashlib
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, Iterator, Sequence
+from typing import Iterable, Iterator, List, Sequence, TypeVar
+
+
+T = TypeVar("T")
 
 
 def sha1sum(path: Path) -> str:
@@ -28,4 +32,15 @@ def iter_csv(path: Path, *, encoding: str = "utf-8", newline: str = "") -> Itera
             yield row
 
 
-__all__ = ["sha1sum", "iter_csv"]
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield lists of up to ``size`` consecutive items."""
+
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, max(1, size)))
+        if not chunk:
+            return
+        yield chunk
+
+
+__all__ = ["sha1sum", "iter_csv", "chunked"]
@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+import uuid
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import redis
 
@@ -26,8 +27,64 @@ class RedisCache:
     def set(self, value: bytes, *parts: str, ttl: Optional[int] = None) -> None:
         self._client.set(self.build_key(*parts), value, ex=ttl or self.default_ttl_seconds)
 
+    def mget(self, keys: Sequence[Sequence[str]]) -> List[Optional[bytes]]:
+        """Fetch several entries in one round-trip; ``keys`` holds key parts."""
+
+        if not keys:
+            return []
+        return list(self._client.mget([self.build_key(*parts) for parts in keys]))
+
+    def set_many(self, items: Iterable[Tuple[Sequence[str], bytes]], *, ttl: Optional[int] = None) -> None:
+        """Store several entries using a single pipelined round-trip."""
+
+        pipeline = self._client.pipeline(transaction=False)
+        for parts, value in items:
+            pipeline.set(self.build_key(*parts), value, ex=ttl or self.default_ttl_seconds)
+        pipeline.execute()
+
+    def set_persistent(self, value: bytes, *parts: str) -> None:
+        """Store an entry without expiry (used for version markers)."""
+
+        self._client.set(self.build_key(*parts), value)
+
     def delete(self, *parts: str) -> None:
         self._client.delete(self.build_key(*parts))
 
+    def iter_keys(self, *parts: str, count: int = 1000) -> Iterator[bytes]:
+        """Incrementally SCAN the full keys nested under ``parts``."""
+
+        return self._client.scan_iter(match=f"{self.build_key(*parts)}:*", count=count)
+
+    def delete_keys(self, keys: Sequence[str | bytes]) -> int:
+        """Delete raw (already namespaced) keys, e.g. those from :meth:`iter_keys`."""
+
+        if not keys:
+            return 0
+        return int(self._client.delete(*keys))
+
+    def acquire_lock(self, *parts: str, ttl_ms: int) -> Optional[str]:
+        """Try to take a short-lived lease; returns the owner token on success."""
+
+        token = uuid.uuid4().hex
+        if self._client.set(self.build_key(*parts), token.encode("ascii"), nx=True, px=ttl_ms):
+            return token
+        return None
+
+    def release_lock(self, token: str, *parts: str) -> None:
+        """Release a lease only if it is still owned by ``token``."""
+
+        self._client.eval(_RELEASE_LOCK_SCRIPT, 1, self.build_key(*parts), token)
+
+    def exists(self, *parts: str) -> bool:
+        return bool(self._client.exists(self.build_key(*parts)))
+
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
 
 __all__ = ["RedisCache"]
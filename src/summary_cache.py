@@ -0,0 +1,144 @@
+"""Result cache for viewport summaries.
+
+Viewport bounds are snapped outward to a tile grid two zoom levels finer than
+the map zoom, so nearby pans share a cache entry while the summarised area
+grows by at most one grid tile on each side.  Entries are keyed on the dataset,
+snapped tile range, filters and the dataset's ETL data version, live in Redis
+and are fronted by a short-lived in-process LRU.  A new ETL sync changes the
+data version, which retires old entries without explicit invalidation.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import json
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .redis_cache import RedisCache
+from .tiles.cache import TileMemoryCache
+
+
+SNAP_ZOOM_OFFSET = 2
+MAX_SNAP_ZOOM = 18
+
+
+@dataclass(frozen=True)
+class SnappedBounds:
+    """A viewport expanded to whole tiles at ``zoom``."""
+
+    zoom: int
+    min_x: int
+    min_y: int
+    max_x: int
+    max_y: int
+
+    @classmethod
+    def from_bounds(cls, bounds: Dict[str, float], map_zoom: float) -> "SnappedBounds":
+        zoom = max(0, min(MAX_SNAP_ZOOM, int(math.floor(map_zoom)) + SNAP_ZOOM_OFFSET))
+        min_x, min_y = _tile_for(bounds["west"], bounds["north"], zoom)
+        max_x, max_y = _tile_for(bounds["east"], bounds["south"], zoom)
+        return cls(zoom, min_x, min_y, max_x, max_y)
+
+    def to_bounds(self) -> Dict[str, float]:
+        west, north = _tile_corner(self.min_x, self.min_y, self.zoom)
+        east, south = _tile_corner(self.max_x + 1, self.max_y + 1, self.zoom)
+        return {"west": west, "south": south, "east": east, "north": north}
+
+    def key_parts(self) -> Tuple[str, ...]:
+        return (str(self.zoom), str(self.min_x), str(self.min_y), str(self.max_x), str(self.max_y))
+
+
+def _tile_for(lon: float, lat: float, zoom: int) -> Tuple[int, int]:
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    scale = 1 << zoom
+    x = int((lon + 180.0) / 360.0 * scale)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * scale)
+    return min(max(x, 0), scale - 1), min(max(y, 0), scale - 1)
+
+
+def _tile_corner(x: int, y: int, zoom: int) -> Tuple[float, float]:
+    scale = 1 << zoom
+    lon = x / scale * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / scale))))
+    return lon, lat
+
+
+@dataclass
+class SummaryCache:
+    """Two-tier (in-process LRU + Redis) cache for viewport summaries."""
+
+    redis: Optional[RedisCache]
+    memory: TileMemoryCache
+    version_loader: Callable[[str], str]
+    ttl_seconds: int = 6 * 60 * 60
+    memory_ttl_seconds: float = 60.0
+    version_check_interval_seconds: float = 30.0
+    _versions: Dict[str, Tuple[str, float]] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _counters: Dict[str, int] = field(
+        default_factory=lambda: {"memory_hits": 0, "redis_hits": 0, "misses": 0},
+        init=False,
+    )
+
+    def data_version(self, dataset: str) -> str:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._versions.get(dataset)
+            if cached is not None and now - cached[1] < self.version_check_interval_seconds:
+                return cached[0]
+        version = self.version_loader(dataset)
+        with self._lock:
+            self._versions[dataset] = (version, now)
+        return version
+
+    def key_parts(self, dataset: str, snapped: SnappedBounds, filters: Dict[str, Optional[int]]) -> Tuple[str, ...]:
+        return (
+            dataset,
+            self.data_version(dataset),
+            *snapped.key_parts(),
+            str(filters.get("year") or "-"),
+            str(filters.get("month") or "-"),
+        )
+
+    def get_or_compute(
+        self,
+        dataset: str,
+        snapped: SnappedBounds,
+        filters: Dict[str, Optional[int]],
+        compute: Callable[[], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        parts = self.key_parts(dataset, snapped, filters)
+        payload = self.memory.get(parts)  # type: ignore[arg-type]
+        if payload is not None:
+            self._count("memory_hits")
+            return json.loads(payload)
+        if self.redis is not None:
+            payload = self.redis.get(*parts)
+            if payload is not None:
+                self._count("redis_hits")
+                self.memory.put(parts, payload, self.memory_ttl_seconds)  # type: ignore[arg-type]
+                return json.loads(payload)
+
+        self._count("misses")
+        summary = compute()
+        payload = json.dumps(summary).encode("utf-8")
+        if self.redis is not None:
+            self.redis.set(payload, *parts, ttl=self.ttl_seconds)
+        self.memory.put(parts, payload, self.memory_ttl_seconds)  # type: ignore[arg-type]
+        return summary
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {**counters, "memory": self.memory.stats()}
+
+
+__all__ = ["SnappedBounds", "SummaryCache"]
@@ -0,0 +1,266 @@
+"""Two-tier tile cache: an in-process LRU layered in front of Redis.
+
+Every Redis hit still pays a network round-trip and a full copy of the tile,
+so hot tiles are also kept in a byte-budgeted LRU inside each worker.  Both
+tiers use the zoom-based TTLs from the README (24h for z<=10, 2h for z<=13 and
+10 minutes beyond).  Each rebuild publishes a :class:`~.invalidation.TileVersion`
+to Redis: its ``key_version`` is embedded in every Redis tile key, and workers
+that observe the next version drop only the in-process entries overlapping the
+changed quadkey prefixes (or the whole dataset when they missed a version).
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..redis_cache import RedisCache
+from .invalidation import VERSION_PREFIX, TileVersion, load_tile_version, tile_in_prefixes
+
+
+TileKey = Tuple[str, int, int, int, str]
+
+TILE_TTL_TIERS: Tuple[Tuple[int, int], ...] = (
+    (10, 24 * 60 * 60),
+    (13, 2 * 60 * 60),
+)
+TILE_TTL_DEFAULT_SECONDS = 10 * 60
+
+
+def tile_ttl_seconds(z: int) -> int:
+    """Return the cache TTL for a tile at zoom ``z``."""
+
+    for max_zoom, ttl in TILE_TTL_TIERS:
+        if z <= max_zoom:
+            return ttl
+    return TILE_TTL_DEFAULT_SECONDS
+
+
+@dataclass
+class _Entry:
+    value: bytes
+    expires_at: float
+
+
+class TileMemoryCache:
+    """Thread-safe LRU bounded by the total number of cached bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: "OrderedDict[TileKey, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: TileKey) -> Optional[bytes]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: TileKey, value: bytes, ttl_seconds: float) -> None:
+        size = len(value)
+        if size > self.max_bytes or ttl_seconds <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value=value, expires_at=time.monotonic() + ttl_seconds)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def drop_dataset(self, dataset: str) -> int:
+        return self.drop_where(lambda key: key[0] == dataset)
+
+    def drop_where(self, predicate: Callable[[TileKey], bool]) -> int:
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: TileKey) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.value)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+@dataclass
+class TwoTierTileCache:
+    """Read-through cache combining :class:`TileMemoryCache` and Redis."""
+
+    VERSION_PREFIX = VERSION_PREFIX
+
+    redis: RedisCache
+    memory: TileMemoryCache
+    version_check_interval_seconds: float = 5.0
+    _known_versions: Dict[str, Optional[TileVersion]] = field(default_factory=dict, init=False, repr=False)
+    _last_version_check: Dict[str, float] = field(default_factory=dict, init=False, repr=False)
+    _version_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _redis_hits: int = field(default=0, init=False)
+    _redis_misses: int = field(default=0, init=False)
+
+    @classmethod
+    def with_budget(
+        cls,
+        redis: RedisCache,
+        *,
+        max_megabytes: float,
+        version_check_interval_seconds: float = 5.0,
+    ) -> "TwoTierTileCache":
+        memory = TileMemoryCache(int(max_megabytes * 1024 * 1024))
+        return cls(redis, memory, version_check_interval_seconds=version_check_interval_seconds)
+
+    def key_version(self, dataset: str) -> int:
+        known = self._known_versions.get(dataset)
+        return known.key_version if known is not None else 0
+
+    def _redis_parts(self, key: TileKey) -> Tuple[str, ...]:
+        dataset, z, x, y, variant = key
+        parts = (dataset, f"v{self.key_version(dataset)}", str(z), str(x), str(y))
+        return (*parts, variant) if variant else parts
+
+    def get(self, dataset: str, z: int, x: int, y: int, *, variant: str = "") -> Optional[bytes]:
+        self.sync_version(dataset)
+        key: TileKey = (dataset, z, x, y, variant)
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        value = self.redis.get(*self._redis_parts(key))
+        if value is None:
+            self._redis_misses += 1
+            return None
+        self._redis_hits += 1
+        self.memory.put(key, value, tile_ttl_seconds(z))
+        return value
+
+    def get_many(
+        self,
+        dataset: str,
+        coordinates: Sequence[Tuple[int, int, int]],
+        *,
+        variant: str = "",
+    ) -> List[Optional[bytes]]:
+        self.sync_version(dataset)
+        results: List[Optional[bytes]] = []
+        remote_indexes: List[int] = []
+        for index, (z, x, y) in enumerate(coordinates):
+            value = self.memory.get((dataset, z, x, y, variant))
+            results.append(value)
+            if value is None:
+                remote_indexes.append(index)
+        if remote_indexes:
+            keys = [self._redis_parts((dataset, *coordinates[i], variant)) for i in remote_indexes]
+            for index, value in zip(remote_indexes, self.redis.mget(keys)):
+                if value is None:
+                    self._redis_misses += 1
+                    continue
+                self._redis_hits += 1
+                z, x, y = coordinates[index]
+                self.memory.put((dataset, z, x, y, variant), value, tile_ttl_seconds(z))
+                results[index] = value
+        return results
+
+    def set(self, dataset: str, z: int, x: int, y: int, value: bytes, *, variant: str = "") -> None:
+        self.sync_version(dataset)
+        ttl = tile_ttl_seconds(z)
+        key: TileKey = (dataset, z, x, y, variant)
+        self.redis.set(value, *self._redis_parts(key), ttl=ttl)
+        self.memory.put(key, value, ttl)
+
+    def set_many(
+        self,
+        dataset: str,
+        tiles: Dict[Tuple[int, int, int], bytes],
+        *,
+        variant: str = "",
+    ) -> None:
+        self.sync_version(dataset)
+        by_ttl: Dict[int, List[Tuple[Sequence[str], bytes]]] = {}
+        for (z, x, y), value in tiles.items():
+            ttl = tile_ttl_seconds(z)
+            key: TileKey = (dataset, z, x, y, variant)
+            by_ttl.setdefault(ttl, []).append((self._redis_parts(key), value))
+            self.memory.put(key, value, ttl)
+        for ttl, items in by_ttl.items():
+            self.redis.set_many(items, ttl=ttl)
+
+    def sync_version(self, dataset: str) -> None:
+        """Follow the dataset's published tile version and drop stale entries."""
+
+        now = time.monotonic()
+        with self._version_lock:
+            last_check = self._last_version_check.get(dataset)
+            if last_check is not None and now - last_check < self.version_check_interval_seconds:
+                return
+            self._last_version_check[dataset] = now
+        version = load_tile_version(self.redis, dataset)
+        with self._version_lock:
+            known = self._known_versions.get(dataset)
+            self._known_versions[dataset] = version
+        if last_check is None or version == known:
+            return
+        if (
+            known is not None
+            and version is not None
+            and not version.full
+            and version.key_version == known.key_version
+            and version.version == known.version + 1
+        ):
+            prefixes = version.changed_prefixes
+            self.memory.drop_where(
+                lambda key: key[0] == dataset and tile_in_prefixes(key[1], key[2], key[3], prefixes)
+            )
+        else:
+            self.memory.drop_dataset(dataset)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "memory": self.memory.stats(),
+            "redis": {"hits": self._redis_hits, "misses": self._redis_misses},
+        }
+
+
+__all__ = [
+    "TileMemoryCache",
+    "TwoTierTileCache",
+    "tile_ttl_seconds",
+]
@@ -0,0 +1,157 @@
+"""Pre-compressed tile variants and HTTP content negotiation helpers.
+
+Tiles are compressed once when rendered and cached per encoding, so Redis holds
+gzip/brotli payloads instead of raw MVT bytes and the handler can stream the
+negotiated variant without recompressing.  Each cached variant carries a stable
+content hash of the raw tile; the HTTP ``ETag`` is that hash plus a suffix
+naming the content-coding (``"<hash>-br"``, ``"<hash>-gz"``), since the
+compressed bodies are different representations and must not share a strong
+validator.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import gzip
+import hashlib
+from typing import Dict, Optional
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+ENCODING_BROTLI = "br"
+ENCODING_GZIP = "gzip"
+ENCODING_IDENTITY = "identity"
+
+_ETAG_LENGTH = 16
+_ENVELOPE_SEPARATOR = b":"
+_ETAG_SUFFIXES = {ENCODING_BROTLI: "-br", ENCODING_GZIP: "-gz", ENCODING_IDENTITY: ""}
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Encodings that are stored for every rendered tile."""
+
+    if brotli is not None:
+        return (ENCODING_BROTLI, ENCODING_GZIP)
+    return (ENCODING_GZIP,)
+
+
+def tile_etag(raw: bytes) -> str:
+    """Stable content hash of the uncompressed tile."""
+
+    return hashlib.blake2b(raw, digest_size=_ETAG_LENGTH // 2).hexdigest()
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    """ETag of the ``encoding`` representation of a tile hashed to ``etag``."""
+
+    return etag + _ETAG_SUFFIXES.get(encoding, f"-{encoding}")
+
+
+@dataclass
+class EncodedTile:
+    """A rendered tile with its ETag and one or more compressed variants."""
+
+    etag: str
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def from_raw(cls, raw: bytes) -> "EncodedTile":
+        variants = {
+            # mtime=0 keeps the gzip bytes identical across renders.
+            ENCODING_GZIP: gzip.compress(raw, compresslevel=6, mtime=0),
+        }
+        if brotli is not None:
+            variants[ENCODING_BROTLI] = brotli.compress(raw, quality=6)
+        return cls(etag=tile_etag(raw), variants=variants)
+
+    def etag_for(self, encoding: str) -> str:
+        return variant_etag(self.etag, encoding)
+
+    def body_for(self, encoding: str) -> Optional[bytes]:
+        """Return the payload for ``encoding`` (``identity`` is decompressed)."""
+
+        if encoding == ENCODING_IDENTITY:
+            gzipped = self.variants.get(ENCODING_GZIP)
+            if gzipped is not None:
+                return gzip.decompress(gzipped)
+            if brotli is not None and ENCODING_BROTLI in self.variants:
+                return brotli.decompress(self.variants[ENCODING_BROTLI])
+            return None
+        return self.variants.get(encoding)
+
+
+def pack_variant(etag: str, body: bytes) -> bytes:
+    """Serialise a cached variant as ``<etag>:<body>``."""
+
+    return etag.encode("ascii") + _ENVELOPE_SEPARATOR + body
+
+
+def unpack_variant(envelope: bytes) -> tuple[str, bytes] | None:
+    prefix_length = _ETAG_LENGTH + len(_ENVELOPE_SEPARATOR)
+    if len(envelope) < prefix_length or envelope[_ETAG_LENGTH:prefix_length] != _ENVELOPE_SEPARATOR:
+        return None
+    return envelope[:_ETAG_LENGTH].decode("ascii"), envelope[prefix_length:]
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str:
+    """Pick the best stored encoding for an ``Accept-Encoding`` header."""
+
+    accepted: Dict[str, float] = {}
+    for token in (accept_encoding or "").split(","):
+        token = token.strip()
+        if not token:
+            continue
+        name, _, params = token.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    for encoding in available_encodings():
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return ENCODING_IDENTITY
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Return True when an ``If-None-Match`` header matches ``etag``.
+
+    ``etag`` is the served representation's tag (see :func:`variant_etag`);
+    comparison is weak, as RFC 9110 requires for ``If-None-Match``.
+    """
+
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+
+__all__ = [
+    "ENCODING_BROTLI",
+    "ENCODING_GZIP",
+    "ENCODING_IDENTITY",
+    "EncodedTile",
+    "available_encodings",
+    "etag_matches",
+    "negotiate_encoding",
+    "pack_variant",
+    "tile_etag",
+    "unpack_variant",
+    "variant_etag",
+]
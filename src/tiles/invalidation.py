@@ -0,0 +1,205 @@
+"""Tile version stamping and targeted cache invalidation.
+
+Every tile-table rebuild records a :class:`TileVersion` for its dataset: a
+monotonically increasing ``version``, the quadkey prefixes whose content
+changed, and a ``key_version`` embedded in Redis tile keys.  Small rebuilds keep
+the key version and purge only the tiles overlapping the changed prefixes from
+Redis and ``tile_blob_cache``; rebuilds touching most prefixes bump the key
+version instead so every cached tile is bypassed at once.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..etl.config import RedisConfig
+from ..etl.postgres import PostgresClient
+from ..redis_cache import RedisCache
+from .service import _quadkey_prefix_from_tile
+
+
+LOGGER = logging.getLogger(__name__)
+
+VERSION_PREFIX = "version"
+
+
+@dataclass(frozen=True)
+class TileVersion:
+    """Outcome of a tile-table rebuild for one dataset."""
+
+    dataset: str
+    version: int
+    key_version: int
+    changed_prefixes: Tuple[str, ...]
+    full: bool
+
+    def to_payload(self) -> bytes:
+        return json.dumps(
+            {
+                "dataset": self.dataset,
+                "version": self.version,
+                "key_version": self.key_version,
+                "changed_prefixes": list(self.changed_prefixes),
+                "full": self.full,
+            },
+            sort_keys=True,
+        ).encode("utf-8")
+
+    @classmethod
+    def from_payload(cls, payload: bytes | str | None) -> Optional["TileVersion"]:
+        if not payload:
+            return None
+        try:
+            data: Dict[str, Any] = json.loads(payload)
+            return cls(
+                dataset=str(data["dataset"]),
+                version=int(data["version"]),
+                key_version=int(data["key_version"]),
+                changed_prefixes=tuple(data.get("changed_prefixes") or ()),
+                full=bool(data.get("full")),
+            )
+        except (ValueError, KeyError, TypeError):
+            LOGGER.warning("Ignoring malformed tile version payload")
+            return None
+
+
+def tile_in_prefixes(z: int, x: int, y: int, prefixes: Iterable[str]) -> bool:
+    """Return True when tile ``z/x/y`` overlaps any of the quadkey ``prefixes``."""
+
+    quadkey = _quadkey_prefix_from_tile(z, x, y)
+    return any(quadkey.startswith(prefix) or prefix.startswith(quadkey) for prefix in prefixes)
+
+
+def load_tile_version(cache: RedisCache, dataset: str) -> Optional[TileVersion]:
+    return TileVersion.from_payload(cache.get(VERSION_PREFIX, dataset))
+
+
+def publish_tile_version(cache: RedisCache, tile_version: TileVersion) -> None:
+    """Make ``tile_version`` visible to API workers (no expiry)."""
+
+    cache.set_persistent(tile_version.to_payload(), VERSION_PREFIX, tile_version.dataset)
+
+
+def purge_changed_tiles(
+    pg: PostgresClient,
+    cache: Optional[RedisCache],
+    tile_version: TileVersion,
+    *,
+    batch_size: int = 500,
+) -> Dict[str, int]:
+    """Evict tiles affected by ``tile_version`` from Redis and ``tile_blob_cache``.
+
+    Redis is skipped when ``cache`` is ``None``.
+    """
+
+    dataset = tile_version.dataset
+    prefixes = tile_version.changed_prefixes
+    purged = {"redis_keys": 0, "blob_rows": 0}
+
+    if tile_version.full:
+        # The key version moved on, so stale Redis entries are unreachable and
+        # simply age out; only the database blob cache needs clearing.
+        purged["blob_rows"] = pg.execute("DELETE FROM public.tile_blob_cache WHERE dataset = %s", (dataset,)) or 0
+        return purged
+
+    if not prefixes:
+        return purged
+
+    if cache is not None:
+        purged["redis_keys"] = _purge_redis_tiles(cache, tile_version, batch_size=batch_size)
+
+    rows = pg.fetch_all("SELECT z, x, y FROM public.tile_blob_cache WHERE dataset = %s", (dataset,))
+    stale = [(z, x, y) for z, x, y in rows if tile_in_prefixes(z, x, y, prefixes)]
+    if stale:
+        purged["blob_rows"] = pg.execute(
+            """
+            DELETE FROM public.tile_blob_cache AS cache
+            USING unnest(%s::int[], %s::int[], %s::int[]) AS stale(z, x, y)
+            WHERE cache.dataset = %s
+              AND cache.z = stale.z
+              AND cache.x = stale.x
+              AND cache.y = stale.y
+            """,
+            ([c[0] for c in stale], [c[1] for c in stale], [c[2] for c in stale], dataset),
+        ) or 0
+    return purged
+
+
+def _purge_redis_tiles(cache: RedisCache, tile_version: TileVersion, *, batch_size: int) -> int:
+    key_parts = (tile_version.dataset, f"v{tile_version.key_version}")
+    key_root = cache.build_key(*key_parts)
+    deleted = 0
+    pending: List[str | bytes] = []
+    for key in cache.iter_keys(*key_parts):
+        coords = _parse_tile_key(key, key_root)
+        if coords is None or not tile_in_prefixes(*coords, tile_version.changed_prefixes):
+            continue
+        pending.append(key)
+        if len(pending) >= batch_size:
+            deleted += cache.delete_keys(pending)
+            pending = []
+    if pending:
+        deleted += cache.delete_keys(pending)
+    return deleted
+
+
+def _parse_tile_key(key: str | bytes, key_root: str) -> Optional[Tuple[int, int, int]]:
+    if isinstance(key, bytes):
+        key = key.decode("utf-8", errors="ignore")
+    remainder = key[len(key_root) + 1 :].split(":")
+    if len(remainder) < 3:
+        return None
+    try:
+        return int(remainder[0]), int(remainder[1]), int(remainder[2])
+    except ValueError:
+        return None
+
+
+def tile_cache_from_env() -> Optional[RedisCache]:
+    """Redis tile cache the API workers read, or ``None`` when no URL is configured."""
+
+    try:
+        redis_config = RedisConfig.from_env()
+    except RuntimeError:
+        return None
+    return RedisCache(
+        redis_config.url,
+        default_ttl_seconds=redis_config.default_ttl_seconds,
+        namespace=f"{redis_config.namespace}:tiles",
+    )
+
+
+def publish_and_purge(
+    pg: PostgresClient,
+    cache: Optional[RedisCache],
+    tile_versions: Sequence[TileVersion],
+) -> None:
+    """Publish rebuild versions and evict the affected tiles."""
+
+    for tile_version in tile_versions:
+        if cache is not None:
+            publish_tile_version(cache, tile_version)
+        purged = purge_changed_tiles(pg, cache, tile_version)
+        LOGGER.info(
+            "Tile version %s for %s (key v%s, %s changed prefixes, full=%s): purged %s",
+            tile_version.version,
+            tile_version.dataset,
+            tile_version.key_version,
+            len(tile_version.changed_prefixes),
+            tile_version.full,
+            purged,
+        )
+
+
+__all__ = [
+    "TileVersion",
+    "load_tile_version",
+    "publish_and_purge",
+    "publish_tile_version",
+    "purge_changed_tiles",
+    "tile_cache_from_env",
+    "tile_in_prefixes",
+]
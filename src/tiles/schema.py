@@ -8,11 +8,19 @@ application start without requiring a full ETL re-run.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Callable, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
+import threading
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Tuple
 
+from src.etl.bootstrap import PARKING_TILE_FEATURE_KEY_SQL, TILE_DIRTY_FEATURES_DDL
+from src.etl.parking_partitions import MERCATOR_QUADKEY_PREFIX_DDL, tile_columns_sql
 from src.etl.postgres import PostgresClient
 
+if TYPE_CHECKING:  # pragma: no cover - import cycle via src.tiles.service
+    from src.redis_cache import RedisCache
+
+    from .invalidation import TileVersion
+
 
 BASE_POINT_TABLES: tuple[dict[str, str], ...] = (
     {
@@ -42,6 +50,28 @@ BASE_POINT_TABLES: tuple[dict[str, str], ...] = (
     },
 )
 
+TILE_TABLE_COLUMNS: tuple[str, ...] = (
+    "dataset",
+    "feature_id",
+    "min_zoom",
+    "max_zoom",
+    "tile_qk_prefix",
+    "tile_qk_group",
+    "geom",
+    "ticket_count",
+    "total_fine_amount",
+    "street_normalized",
+    "centreline_id",
+    "location_name",
+    "location",
+    "status",
+    "ward",
+    "kind",
+    "cluster_size",
+    "grid_meters",
+)
+TILE_TABLE_COLUMN_SQL = ", ".join(TILE_TABLE_COLUMNS)
+
 
 @dataclass
 class TileSchemaManager:
@@ -52,8 +82,14 @@ class TileSchemaManager:
     quadkey_prefix_length: int = 16
     tile_rebuild_workers: int = 1
     logger: Callable[[str], None] | None = None
+    invalidation_prefix_length: int = 10
+    full_invalidation_ratio: float = 0.5
+    publish_versions: bool = True
+    tile_cache: Optional["RedisCache"] = None
+    tile_versions: List["TileVersion"] = field(default_factory=list, init=False, repr=False)
+    _tile_versions_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
-    def ensure(self, *, include_tile_tables: bool = True) -> None:
+    def ensure(self, *, include_tile_tables: bool = True, incremental: bool = False) -> None:
         """Apply schema guarantees (idempotent).
 
         Parameters
@@ -62,6 +98,13 @@ class TileSchemaManager:
             When ``True`` (default) the legacy ``*_tiles`` partitioned tables are
             rebuilt.  Set to ``False`` to skip that expensive step when relying on
             streaming tile generation instead of precomputed tables.
+        incremental:
+            Refresh only the parking tile features queued by the ETL in
+            ``tile_dirty_features`` instead of rebuilding the table from scratch.
+
+        Tile versions recorded by the rebuild are published and their changed
+        tiles purged (see :meth:`publish_tile_versions`) unless
+        ``publish_versions`` is off.
         """
 
         self.ensure_helpers()
@@ -69,10 +112,35 @@ class TileSchemaManager:
         self._ensure_base_columns()
         if include_tile_tables:
             self._log("Ensuring tile tables and partitions")
-            self._ensure_tile_tables()
+            self._ensure_tile_tables(incremental=incremental)
+            if self.publish_versions:
+                self.publish_tile_versions()
         else:
             self._log("Skipping tile table rebuild (include_tile_tables=False)")
 
+    def publish_tile_versions(self) -> None:
+        """Publish the recorded tile versions to Redis and purge the changed tiles.
+
+        API workers only learn about a rebuild through the published version,
+        so skipping this leaves stale tiles cached until they expire.  Uses
+        ``tile_cache`` or, when unset, the Redis cache from the environment;
+        without Redis only ``tile_blob_cache`` is purged.
+        """
+
+        if not self.tile_versions:
+            return
+        from .invalidation import publish_and_purge, tile_cache_from_env
+
+        cache = self.tile_cache if self.tile_cache is not None else tile_cache_from_env()
+        if cache is None:
+            self._log("No Redis URL configured; purging tile_blob_cache only")
+        for tile_version in self.tile_versions:
+            self._log(
+                f"Tile version for {tile_version.dataset} is now {tile_version.version} "
+                f"(key v{tile_version.key_version}, {len(tile_version.changed_prefixes)} changed prefixes)"
+            )
+        publish_and_purge(self.pg, cache, self.tile_versions)
+
     # ------------------------------------------------------------------
     # Helpers
     def _log(self, message: str) -> None:
@@ -158,12 +226,59 @@ class TileSchemaManager:
         )
         return [(row[0], row[1]) for row in rows]
 
+    def _relation_kind(self, table: str) -> Optional[str]:
+        row = self.pg.fetch_one(
+            """
+            SELECT c.relkind
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public'
+              AND c.relname = %s
+            """,
+            (table,),
+        )
+        if row is None:
+            return None
+        kind = row[0]
+        return kind.decode() if isinstance(kind, bytes) else kind
+
+    def _backfill_partitioned_table(self, table_meta: dict[str, str]) -> None:
+        """Add and fill the projected columns of a partitioned table in place.
+
+        The CTAS swap in :meth:`_rebuild_base_table` would replace the
+        partitioned parent with a plain heap (and drop every partition with
+        it), so columns are added on the parent, which cascades to the
+        partitions, and only rows still missing a projection are updated with
+        the same expressions the ETL writes (:func:`tile_columns_sql`).
+        """
+
+        table = self._quote_ident(table_meta["table"])
+        geom_column = self._quote_ident(table_meta["geom"])
+        geom_3857_column = self._quote_ident(table_meta["geom_3857"])
+
+        self.pg.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {geom_3857_column} geometry(POINT, 3857)")
+        self.pg.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS tile_qk_prefix TEXT")
+        stale = f"{geom_column} IS NOT NULL AND ({geom_3857_column} IS NULL OR tile_qk_prefix IS NULL)"
+        row = self.pg.fetch_one(f"SELECT EXISTS (SELECT 1 FROM {table} WHERE {stale} LIMIT 1)")
+        if row and row[0]:
+            self._log("    Filling projected columns for rows that lack them")
+            self.pg.execute(
+                f"""
+                UPDATE {table}
+                SET ({geom_3857_column}, tile_qk_prefix) = ({tile_columns_sql(geom_column)})
+                WHERE {stale}
+                """
+            )
+
     def _rebuild_base_table(self, table_meta: dict[str, str]) -> None:
         table = table_meta["table"]
         geom_column = table_meta["geom"]
         geom_3857_column = table_meta["geom_3857"]
         tile_prefix_column = "tile_qk_prefix"
 
+        if self._relation_kind(table) == "p":
+            raise RuntimeError(f"Refusing to rebuild partitioned table '{table}' via CTAS")
+
         column_metadata = self._get_column_metadata(table)
         existing_columns = [name for name, _, _ in column_metadata if name not in (geom_3857_column, tile_prefix_column)]
         not_null_columns = [name for name, required, _ in column_metadata if required and name in existing_columns]
@@ -239,56 +354,7 @@ class TileSchemaManager:
         """Create SQL helper functions for quadkey and tile math."""
 
         self._log("  Creating mercator_quadkey_prefix function")
-        self.pg.execute(
-            """
-            CREATE OR REPLACE FUNCTION mercator_quadkey_prefix(
-                input geometry,
-                zoom integer,
-                prefix_length integer
-            ) RETURNS text AS $$
-            DECLARE
-                max_zoom integer := GREATEST(1, zoom);
-                effective_prefix integer := LEAST(GREATEST(prefix_length, 1), max_zoom);
-                quadkey text;
-                srid integer;
-            BEGIN
-                IF input IS NULL THEN
-                    RETURN NULL;
-                END IF;
-
-                srid := COALESCE(NULLIF(ST_SRID(input), 0), 3857);
-
-                WITH point AS (
-                    SELECT ST_Transform(
-                        ST_SetSRID(ST_Centroid(input), srid),
-                        4326
-                    ) AS geom
-                ), coords AS (
-                    SELECT
-                        GREATEST(LEAST(ST_X(geom), 180.0), -180.0) AS lon,
-                        GREATEST(LEAST(ST_Y(geom), 85.0511287798), -85.0511287798) AS lat
-                    FROM point
-                ), tiles AS (
-                    SELECT
-                        floor(((lon + 180.0) / 360.0) * power(2, max_zoom))::bigint AS tile_x,
-                        floor(((1.0 - ln(tan(radians(lat)) + (1.0 / cos(radians(lat)))) / pi()) / 2.0 * power(2, max_zoom)))::bigint AS tile_y
-                    FROM coords
-                ), digits AS (
-                    SELECT
-                        ((tile_x >> (i - 1)) & 1) + 2 * ((tile_y >> (i - 1)) & 1) AS digit,
-                        i
-                    FROM tiles,
-                    LATERAL generate_series(max_zoom, 1, -1) AS gs(i)
-                )
-                SELECT string_agg(digit::text, '' ORDER BY i DESC)
-                INTO quadkey
-                FROM digits;
-
-                RETURN SUBSTRING(COALESCE(quadkey, '') FROM 1 FOR effective_prefix);
-            END;
-            $$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE;
-            """
-        )
+        self.pg.execute(MERCATOR_QUADKEY_PREFIX_DDL)
 
         # Function to compute tile bounds in Web Mercator for a given xyz.
         self._log("  Creating tile_envelope_3857 function")
@@ -307,6 +373,31 @@ class TileSchemaManager:
         prefix_len = self.quadkey_prefix_length
         quadkey_zoom = self.quadkey_zoom
 
+        self._log("  Ensuring tile version tables")
+        self.pg.execute(TILE_DIRTY_FEATURES_DDL)
+        self.pg.execute(
+            """
+            CREATE TABLE IF NOT EXISTS public.tile_versions (
+                dataset text PRIMARY KEY,
+                version bigint NOT NULL,
+                key_version bigint NOT NULL,
+                changed_prefixes text[] NOT NULL DEFAULT '{}',
+                full_invalidation boolean NOT NULL DEFAULT false,
+                rebuilt_at timestamptz NOT NULL DEFAULT NOW()
+            )
+            """
+        )
+        self.pg.execute(
+            """
+            CREATE TABLE IF NOT EXISTS public.tile_prefix_digests (
+                dataset text NOT NULL,
+                prefix text NOT NULL,
+                digest text NOT NULL,
+                PRIMARY KEY (dataset, prefix)
+            )
+            """
+        )
+
         self._log("  Ensuring tile_blob_cache table")
         self.pg.execute(
             """
@@ -681,6 +772,16 @@ class TileSchemaManager:
             geom_3857 = table_meta["geom_3857"]
 
             self._log(f"  Processing base table '{table}'")
+            if self._relation_kind(table) == "p":
+                self._log("    Partitioned table; adding projected columns in place")
+                self._backfill_partitioned_table(table_meta)
+                self.pg.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_geom_3857_idx ON {table} USING GIST ({geom_3857});"
+                )
+                self.pg.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_tile_qk_prefix_idx ON {table} (tile_qk_prefix);"
+                )
+                continue
             has_geom = self._column_exists(table, geom_3857) and self._column_has_data(table, geom_3857)
             has_prefix = self._column_exists(table, "tile_qk_prefix") and self._column_has_data(
                 table, "tile_qk_prefix", treat_blank_as_null=True
@@ -699,74 +800,101 @@ class TileSchemaManager:
                     f"CREATE INDEX IF NOT EXISTS {table}_tile_qk_prefix_idx ON {table} (tile_qk_prefix);"
                 )
 
-    def _ensure_tile_tables(self) -> None:
-        """Create partitioned tile tables populated from the base tables."""
+    def _parking_tile_select(self, *, dirty_only: bool = False) -> str:
+        """SELECT producing ``parking_ticket_tiles`` rows.
+
+        With ``dirty_only`` the aggregation is limited to the features listed in
+        the ``tmp_dirty_features`` temp table (see :meth:`_refresh_tile_features`).
+        """
+
+        feature_filter = (
+            f"AND {PARKING_TILE_FEATURE_KEY_SQL} IN (SELECT feature_id FROM tmp_dirty_features)"
+            if dirty_only
+            else ""
+        )
+        return f"""
+                WITH ranked AS (
+                    SELECT
+                        {PARKING_TILE_FEATURE_KEY_SQL} AS feature_id,
+                        geom_3857,
+                        street_normalized,
+                        centreline_id,
+                        COUNT(*) OVER (PARTITION BY {PARKING_TILE_FEATURE_KEY_SQL}) AS ticket_count,
+                        SUM(COALESCE(set_fine_amount, 0)) OVER (PARTITION BY {PARKING_TILE_FEATURE_KEY_SQL}) AS total_fines,
+                        ROW_NUMBER() OVER (PARTITION BY {PARKING_TILE_FEATURE_KEY_SQL} ORDER BY date_of_infraction DESC NULLS LAST, time_of_infraction DESC NULLS LAST) AS rn
+                    FROM parking_tickets
+                    WHERE geom_3857 IS NOT NULL
+                    {feature_filter}
+                ), aggregated AS (
+                    SELECT
+                        feature_id,
+                        ticket_count,
+                        total_fines,
+                        geom_3857,
+                        street_normalized,
+                        centreline_id
+                    FROM ranked
+                    WHERE rn = 1
+                )
+                SELECT
+                    'parking_tickets' AS dataset,
+                    agg.feature_id,
+                    variants.min_zoom,
+                    variants.max_zoom,
+                    mercator_quadkey_prefix(parts.geom, {self.quadkey_zoom}, {self.quadkey_prefix_length}) AS tile_qk_prefix,
+                    SUBSTRING(mercator_quadkey_prefix(parts.geom, {self.quadkey_zoom}, {self.quadkey_prefix_length}) FROM 1 FOR 1) AS tile_qk_group,
+                    parts.geom,
+                    agg.ticket_count,
+                    agg.total_fines,
+                    agg.street_normalized,
+                    agg.centreline_id::BIGINT,
+                    COALESCE(agg.street_normalized, agg.feature_id) AS location_name,
+                    COALESCE(agg.street_normalized, agg.feature_id) AS location,
+                    NULL::TEXT AS status,
+                    NULL::TEXT AS ward,
+                    'point'::TEXT AS kind,
+                    1::INTEGER AS cluster_size,
+                    NULL::NUMERIC AS grid_meters
+                FROM aggregated AS agg
+                CROSS JOIN LATERAL (
+                    SELECT 0 AS min_zoom, 10 AS max_zoom, subdivided.geom AS geom_variant
+                    FROM ST_Subdivide(
+                        ST_SnapToGrid(ST_SimplifyPreserveTopology(agg.geom_3857, 25), 1.0),
+                        32
+                    ) AS subdivided(geom)
+                    UNION ALL
+                    SELECT 11 AS min_zoom, 16 AS max_zoom, subdivided.geom AS geom_variant
+                    FROM ST_Subdivide(
+                        ST_SnapToGrid(agg.geom_3857, 0.25),
+                        32
+                    ) AS subdivided(geom)
+                ) AS variants(min_zoom, max_zoom, geom_variant)
+                CROSS JOIN LATERAL (
+                    SELECT (ST_Dump(geom_variant)).geom
+                ) AS parts
+            """
+
+    def _ensure_tile_tables(self, *, incremental: bool = False) -> None:
+        """Create partitioned tile tables populated from the base tables.
+
+        With ``incremental`` the parking tiles are refreshed only for features
+        queued in ``tile_dirty_features`` once the table has been built before;
+        the (small) camera tables are always rebuilt.
+        """
+
+        incremental_selects = {
+            "parking_ticket_tiles": (
+                PARKING_TILE_FEATURE_KEY_SQL,
+                lambda: self._parking_tile_select(dirty_only=True),
+            ),
+        }
 
         builders: Iterable[tuple[str, str, str, str]] = (
             (
                 "parking_ticket_tiles",
                 "parking_tickets",
                 "parking_tickets",
-                f"""
-                    WITH ranked AS (
-                        SELECT
-                            COALESCE(centreline_id::text, street_normalized, location1, ticket_hash) AS feature_id,
-                            geom_3857,
-                            street_normalized,
-                            centreline_id,
-                            COUNT(*) OVER (PARTITION BY COALESCE(centreline_id::text, street_normalized, location1, ticket_hash)) AS ticket_count,
-                            SUM(COALESCE(set_fine_amount, 0)) OVER (PARTITION BY COALESCE(centreline_id::text, street_normalized, location1, ticket_hash)) AS total_fines,
-                            ROW_NUMBER() OVER (PARTITION BY COALESCE(centreline_id::text, street_normalized, location1, ticket_hash) ORDER BY date_of_infraction DESC NULLS LAST, time_of_infraction DESC NULLS LAST) AS rn
-                        FROM parking_tickets
-                        WHERE geom_3857 IS NOT NULL
-                    ), aggregated AS (
-                        SELECT
-                            feature_id,
-                            ticket_count,
-                            total_fines,
-                            geom_3857,
-                            street_normalized,
-                            centreline_id
-                        FROM ranked
-                        WHERE rn = 1
-                    )
-                    SELECT
-                        'parking_tickets' AS dataset,
-                        agg.feature_id,
-                        variants.min_zoom,
-                        variants.max_zoom,
-                        mercator_quadkey_prefix(parts.geom, {self.quadkey_zoom}, {self.quadkey_prefix_length}) AS tile_qk_prefix,
-                        SUBSTRING(mercator_quadkey_prefix(parts.geom, {self.quadkey_zoom}, {self.quadkey_prefix_length}) FROM 1 FOR 1) AS tile_qk_group,
-                        parts.geom,
-                        agg.ticket_count,
-                        agg.total_fines,
-                        agg.street_normalized,
-                        agg.centreline_id::BIGINT,
-                        COALESCE(agg.street_normalized, agg.feature_id) AS location_name,
-                        COALESCE(agg.street_normalized, agg.feature_id) AS location,
-                        NULL::TEXT AS status,
-                        NULL::TEXT AS ward,
-                        'point'::TEXT AS kind,
-                        1::INTEGER AS cluster_size,
-                        NULL::NUMERIC AS grid_meters
-                    FROM aggregated AS agg
-                    CROSS JOIN LATERAL (
-                        SELECT 0 AS min_zoom, 10 AS max_zoom, subdivided.geom AS geom_variant
-                        FROM ST_Subdivide(
-                            ST_SnapToGrid(ST_SimplifyPreserveTopology(agg.geom_3857, 25), 1.0),
-                            32
-                        ) AS subdivided(geom)
-                        UNION ALL
-                        SELECT 11 AS min_zoom, 16 AS max_zoom, subdivided.geom AS geom_variant
-                        FROM ST_Subdivide(
-                            ST_SnapToGrid(agg.geom_3857, 0.25),
-                            32
-                        ) AS subdivided(geom)
-                    ) AS variants(min_zoom, max_zoom, geom_variant)
-                    CROSS JOIN LATERAL (
-                        SELECT (ST_Dump(geom_variant)).geom
-                    ) AS parts
-                """,
+                self._parking_tile_select(),
             ),
             (
                 "red_light_camera_tiles",
@@ -1127,53 +1255,32 @@ class TileSchemaManager:
 
             self._ensure_quadkey_partitions(table_name)
 
+            if incremental and table_name in incremental_selects and self._has_tile_version(dataset_name):
+                feature_key_sql, dirty_select = incremental_selects[table_name]
+                self._ensure_tile_indexes(table_name, dataset_name)
+                self._refresh_tile_features(table_name, base_table, dataset_name, feature_key_sql, dirty_select())
+                return
+
+            # A full rebuild covers every queued feature.
+            self.pg.execute("DELETE FROM tile_dirty_features WHERE dataset = %s", (dataset_name,))
             # Clear and repopulate to avoid duplicate entries.
             self._log("    Truncating existing tile rows")
             self.pg.execute(f"TRUNCATE {table_name} RESTART IDENTITY;")
             self._log("    Populating tile table")
             inserted_rows = self.pg.execute(
                 f"""
-                INSERT INTO {table_name} (
-                    dataset,
-                    feature_id,
-                    min_zoom,
-                    max_zoom,
-                    tile_qk_prefix,
-                    tile_qk_group,
-                    geom,
-                    ticket_count,
-                    total_fine_amount,
-                    street_normalized,
-                    centreline_id,
-                    location_name,
-                    location,
-                    status,
-                    ward,
-                    kind,
-                    cluster_size,
-                    grid_meters
-                )
+                INSERT INTO {table_name} ({TILE_TABLE_COLUMN_SQL})
                 {populate_sql}
                 """
             )
             if inserted_rows:
                 self._log(f"      Inserted {inserted_rows} rows into {table_name}")
 
-            self._log("    Creating indexes")
-            self.pg.execute(
-                f"CREATE INDEX IF NOT EXISTS {table_name}_geom_idx ON {table_name} USING GIST (geom);"
-            )
-            self.pg.execute(
-                f"CREATE INDEX IF NOT EXISTS {table_name}_dataset_prefix_idx ON {table_name} (dataset, tile_qk_group, tile_qk_prefix);"
-            )
-            self.pg.execute(
-                f"CREATE INDEX IF NOT EXISTS {table_name}_zoom_idx ON {table_name} (min_zoom, max_zoom) WHERE dataset = '{dataset_name}';"
-            )
-            self.pg.execute(
-                f"CREATE INDEX IF NOT EXISTS {table_name}_prefix_idx ON {table_name} (tile_qk_prefix);"
-            )
+            self._ensure_tile_indexes(table_name, dataset_name)
             self.pg.execute(f"ANALYZE {table_name};")
+            self._record_tile_version(table_name, dataset_name)
 
+        self.tile_versions = []
         worker_count = max(1, int(self.tile_rebuild_workers or 1))
         if worker_count > 1:
             self._log(f"  Rebuilding tile tables with up to {worker_count} worker threads")
@@ -1185,6 +1292,237 @@ class TileSchemaManager:
             for builder in builders:
                 rebuild_table(builder)
 
+    def _ensure_tile_indexes(self, table_name: str, dataset_name: str) -> None:
+        self._log("    Creating indexes")
+        self.pg.execute(
+            f"CREATE INDEX IF NOT EXISTS {table_name}_geom_idx ON {table_name} USING GIST (geom);"
+        )
+        self.pg.execute(
+            f"CREATE INDEX IF NOT EXISTS {table_name}_dataset_prefix_idx ON {table_name} (dataset, tile_qk_group, tile_qk_prefix);"
+        )
+        self.pg.execute(
+            f"CREATE INDEX IF NOT EXISTS {table_name}_zoom_idx ON {table_name} (min_zoom, max_zoom) WHERE dataset = '{dataset_name}';"
+        )
+        self.pg.execute(
+            f"CREATE INDEX IF NOT EXISTS {table_name}_prefix_idx ON {table_name} (tile_qk_prefix);"
+        )
+        self.pg.execute(
+            f"CREATE INDEX IF NOT EXISTS {table_name}_feature_idx ON {table_name} (dataset, feature_id);"
+        )
+
+    def _has_tile_version(self, dataset_name: str) -> bool:
+        row = self.pg.fetch_one("SELECT 1 FROM public.tile_versions WHERE dataset = %s", (dataset_name,))
+        return row is not None
+
+    def _refresh_tile_features(
+        self,
+        table_name: str,
+        base_table: str,
+        dataset_name: str,
+        feature_key_sql: str,
+        dirty_select_sql: str,
+    ) -> Optional["TileVersion"]:
+        """Recompute tile rows for the queued dirty features only.
+
+        The queue is drained, the affected features' rows are rebuilt into a
+        temp table, and the old rows are replaced in a single transaction so
+        readers switch from the old to the new rows atomically.  Inserts go
+        through the parent table and are routed to their ``tile_qk_group``
+        partition.
+        """
+
+        prefix_len = max(1, min(self.invalidation_prefix_length, self.quadkey_prefix_length))
+        self.pg.execute(
+            f"CREATE INDEX IF NOT EXISTS {base_table}_tile_feature_idx ON {base_table} (({feature_key_sql}));"
+        )
+        with self.pg.connect() as conn:
+            conn.execute("CREATE TEMP TABLE tmp_dirty_features (feature_id TEXT PRIMARY KEY) ON COMMIT DROP")
+            claimed = conn.execute(
+                """
+                WITH claimed AS (
+                    DELETE FROM tile_dirty_features
+                    WHERE dataset = %s
+                    RETURNING feature_id
+                )
+                INSERT INTO tmp_dirty_features (feature_id)
+                SELECT DISTINCT feature_id FROM claimed
+                """,
+                (dataset_name,),
+            ).rowcount
+            if not claimed:
+                self._log(f"    No dirty features queued for {dataset_name}; tile table unchanged")
+                return None
+            self._log(f"    Refreshing {claimed} dirty feature(s) in {table_name}")
+            conn.execute("ANALYZE tmp_dirty_features")
+
+            # Rows loaded since the base table was projected lack geom_3857.
+            conn.execute(
+                f"""
+                UPDATE {base_table}
+                SET geom_3857 = ST_Transform(geom, 3857),
+                    tile_qk_prefix = mercator_quadkey_prefix(
+                        ST_Transform(geom, 3857), {self.quadkey_zoom}, {self.quadkey_prefix_length}
+                    )
+                WHERE geom_3857 IS NULL
+                  AND geom IS NOT NULL
+                  AND {feature_key_sql} IN (SELECT feature_id FROM tmp_dirty_features)
+                """
+            )
+            conn.execute(f"CREATE TEMP TABLE tmp_tile_rows ON COMMIT DROP AS {dirty_select_sql}")
+            touched_rows = conn.execute(
+                f"""
+                SELECT LEFT(tile_qk_prefix, {prefix_len})
+                FROM {table_name}
+                WHERE dataset = %s
+                  AND feature_id IN (SELECT feature_id FROM tmp_dirty_features)
+                UNION
+                SELECT LEFT(tile_qk_prefix, {prefix_len})
+                FROM tmp_tile_rows
+                """,
+                (dataset_name,),
+            ).fetchall()
+            deleted = conn.execute(
+                f"""
+                DELETE FROM {table_name} AS tiles
+                USING tmp_dirty_features AS dirty
+                WHERE tiles.dataset = %s
+                  AND tiles.feature_id = dirty.feature_id
+                """,
+                (dataset_name,),
+            ).rowcount
+            inserted = conn.execute(
+                f"INSERT INTO {table_name} ({TILE_TABLE_COLUMN_SQL}) SELECT * FROM tmp_tile_rows"
+            ).rowcount
+        self._log(f"      Replaced {deleted} row(s) with {inserted} row(s) in {table_name}")
+
+        touched = sorted({row[0] for row in touched_rows})
+        if not touched:
+            return None
+        return self._record_tile_version(table_name, dataset_name, prefixes=touched)
+
+    def _record_tile_version(
+        self,
+        table_name: str,
+        dataset_name: str,
+        *,
+        prefixes: Optional[List[str]] = None,
+    ) -> "TileVersion":
+        """Diff per-prefix content digests and stamp a new dataset tile version.
+
+        Every quadkey prefix (truncated to ``invalidation_prefix_length``) gets an
+        order-independent digest of its tile rows.  Prefixes whose digest differs
+        from the previous rebuild -- including ones that appeared or vanished --
+        are recorded so caches can be purged selectively.  The first rebuild, or
+        one touching more than ``full_invalidation_ratio`` of the prefixes, bumps
+        the cache key version instead.  ``prefixes`` limits the diff to the
+        given prefixes after an incremental refresh.
+        """
+
+        from .invalidation import TileVersion
+
+        prefix_len = max(1, min(self.invalidation_prefix_length, self.quadkey_prefix_length))
+        fresh_scope = previous_scope = ""
+        scope_params: tuple[object, ...] = ()
+        if prefixes is not None:
+            fresh_scope = f"AND LEFT(tile_qk_prefix, {prefix_len}) = ANY(%s)"
+            previous_scope = "AND prefix = ANY(%s)"
+            scope_params = (list(prefixes),)
+        with self.pg.connect() as conn:
+            conn.execute(
+                f"""
+                CREATE TEMP TABLE tmp_tile_prefix_digests ON COMMIT DROP AS
+                SELECT
+                    LEFT(tile_qk_prefix, {prefix_len}) AS prefix,
+                    md5(string_agg(row_digest, '' ORDER BY row_digest)) AS digest
+                FROM (
+                    SELECT
+                        tile_qk_prefix,
+                        md5(concat_ws(
+                            '|', feature_id, min_zoom, max_zoom, ticket_count, total_fine_amount,
+                            street_normalized, centreline_id, location_name, location, status,
+                            ward, kind, cluster_size, grid_meters, md5(ST_AsBinary(geom))
+                        )) AS row_digest
+                    FROM {table_name}
+                    WHERE dataset = %s
+                    {fresh_scope}
+                ) AS rows
+                GROUP BY 1
+                """,
+                (dataset_name, *scope_params),
+            )
+            changed_rows = conn.execute(
+                f"""
+                SELECT COALESCE(fresh.prefix, previous.prefix)
+                FROM tmp_tile_prefix_digests AS fresh
+                FULL OUTER JOIN (
+                    SELECT prefix, digest
+                    FROM public.tile_prefix_digests
+                    WHERE dataset = %s
+                    {previous_scope}
+                ) AS previous
+                  ON previous.prefix = fresh.prefix
+                WHERE fresh.digest IS DISTINCT FROM previous.digest
+                ORDER BY 1
+                """,
+                (dataset_name, *scope_params),
+            ).fetchall()
+            previous_count, fresh_count = conn.execute(
+                """
+                SELECT
+                    (SELECT COUNT(*) FROM public.tile_prefix_digests WHERE dataset = %s),
+                    (SELECT COUNT(*) FROM tmp_tile_prefix_digests)
+                """,
+                (dataset_name,),
+            ).fetchone()
+            changed = tuple(row[0] for row in changed_rows)
+            full = previous_count == 0 or len(changed) > self.full_invalidation_ratio * max(
+                previous_count, fresh_count, 1
+            )
+
+            conn.execute(
+                f"DELETE FROM public.tile_prefix_digests WHERE dataset = %s {previous_scope}",
+                (dataset_name, *scope_params),
+            )
+            conn.execute(
+                """
+                INSERT INTO public.tile_prefix_digests (dataset, prefix, digest)
+                SELECT %s, prefix, digest FROM tmp_tile_prefix_digests
+                """,
+                (dataset_name,),
+            )
+            version, key_version = conn.execute(
+                """
+                INSERT INTO public.tile_versions AS current (
+                    dataset, version, key_version, changed_prefixes, full_invalidation, rebuilt_at
+                )
+                VALUES (%s, 1, 1, %s, %s, NOW())
+                ON CONFLICT (dataset) DO UPDATE SET
+                    version = current.version + 1,
+                    key_version = current.key_version + CASE WHEN EXCLUDED.full_invalidation THEN 1 ELSE 0 END,
+                    changed_prefixes = EXCLUDED.changed_prefixes,
+                    full_invalidation = EXCLUDED.full_invalidation,
+                    rebuilt_at = EXCLUDED.rebuilt_at
+                RETURNING version, key_version
+                """,
+                (dataset_name, list(changed), full),
+            ).fetchone()
+
+        tile_version = TileVersion(
+            dataset=dataset_name,
+            version=int(version),
+            key_version=int(key_version),
+            changed_prefixes=changed,
+            full=full,
+        )
+        self._log(
+            f"    Tile version {tile_version.version} for {dataset_name}: "
+            f"{len(changed)} changed prefix(es), key v{tile_version.key_version}"
+            + (" (full invalidation)" if full else "")
+        )
+        with self._tile_versions_lock:
+            self.tile_versions.append(tile_version)
+        return tile_version
+
     def _ensure_quadkey_partitions(self, parent: str) -> None:
         """Ensure four list partitions (0-3) exist for the given parent table."""
 
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from ..etl.postgres import PostgresClient
 from .schema import TileSchemaManager
@@ -83,9 +83,48 @@ class TileService:
         *,
         filters: Optional[Dict[str, Any]] = None,  # noqa: ARG002 - retained for API parity
     ) -> bytes | None:
-        definition = TILE_DATASET_DEFINITIONS.get(dataset)
-        if not definition:
-            raise ValueError(f"Dataset '{dataset}' is not configured for tiles")
+        definition = _definition_for(dataset)
+        sql, params = self._tile_sql(definition, dataset, z, x, y)
+        row = self.pg.fetch_one(sql, tuple(params))
+        if not row or row[0] is None:
+            return None
+        return bytes(row[0])
+
+    def get_tiles(
+        self,
+        dataset: str,
+        coordinates: Iterable[Tuple[int, int, int]],
+    ) -> Dict[Tuple[int, int, int], bytes | None]:
+        """Render several tiles with a single round-trip.
+
+        Each tile is a ``UNION ALL`` branch running the same query as
+        :meth:`get_tile`, so both routes produce byte-identical tiles for the
+        shared tile cache.  The result maps every requested ``(z, x, y)`` to
+        its MVT payload (``None`` when the tile is empty).
+        """
+
+        definition = _definition_for(dataset)
+        requested: List[Tuple[int, int, int]] = list(dict.fromkeys((int(z), int(x), int(y)) for z, x, y in coordinates))
+        results: Dict[Tuple[int, int, int], bytes | None] = {coord: None for coord in requested}
+        if not requested:
+            return results
+
+        branches: List[str] = []
+        params: List[Any] = []
+        for z, x, y in requested:
+            tile_sql, tile_params = self._tile_sql(definition, dataset, z, x, y)
+            branches.append(f"SELECT %s::int AS z, %s::int AS x, %s::int AS y, ({tile_sql}) AS mvt")
+            params.extend([z, x, y, *tile_params])
+        for z, x, y, mvt in self.pg.fetch_all("\nUNION ALL\n".join(branches), tuple(params)):
+            if mvt is None:
+                continue
+            results[(int(z), int(x), int(y))] = bytes(mvt)
+        return results
+
+    def _tile_sql(
+        self, definition: Dict[str, Any], dataset: str, z: int, x: int, y: int
+    ) -> Tuple[str, List[Any]]:
+        """Query rendering tile ``z/x/y`` of ``dataset`` as one MVT value."""
 
         quadkey = _quadkey_prefix_from_tile(z, x, y)
         quadkey_prefix = quadkey[: self.quadkey_prefix_length]
@@ -95,7 +134,7 @@ class TileService:
             f"data.{definition['geom_column']} && bounds.geom",
             f"%s BETWEEN data.{definition['min_zoom_column']} AND data.{definition['max_zoom_column']}",
         ]
-        params = [z, x, y, z]
+        params: List[Any] = [z, x, y, z]
 
         if quadkey_prefix:
             where_clauses.append(f"data.{definition['tile_group_column']} = %s")
@@ -120,14 +159,18 @@ class TileService:
                 CROSS JOIN bounds
                 WHERE {' AND '.join(where_clauses)}
             )
-            SELECT ST_AsMVT(features, %s, 4096, 'geom') FROM features;
+            SELECT ST_AsMVT(features, %s, 4096, 'geom') FROM features
         """
 
         params.append(dataset)
-        row = self.pg.fetch_one(sql, tuple(params))
-        if not row or row[0] is None:
-            return None
-        return bytes(row[0])
+        return sql, params
+
+
+def _definition_for(dataset: str) -> Dict[str, Any]:
+    definition = TILE_DATASET_DEFINITIONS.get(dataset)
+    if not definition:
+        raise ValueError(f"Dataset '{dataset}' is not configured for tiles")
+    return definition
 
 
 def _quadkey_prefix_from_tile(z: int, x: int, y: int) -> str:
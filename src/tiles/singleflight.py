@@ -0,0 +1,185 @@
+"""Request coalescing for cold tile renders.
+
+When a popular tile expires every concurrent request misses the cache at the
+same moment.  :class:`SingleFlight` collapses concurrent callers inside one
+process onto a single render, and :class:`RedisSingleFlight` extends that to
+every worker sharing a Redis instance by taking a short lease before
+rendering.  Followers wait for the leader's result instead of re-running the
+same ``ST_AsMVT`` query.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, TypeVar
+
+from ..redis_cache import RedisCache
+
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Ensure only one in-process caller runs ``fn`` for a given key."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+@dataclass
+class RedisSingleFlight:
+    """Cross-worker coalescing backed by a Redis lease.
+
+    The worker that wins the lease renders and populates the cache; the others
+    poll the cache until the result appears, the lease is released, or the
+    lease expires, and only then fall back to rendering themselves.  Empty
+    tiles are never cached as tiles, so the leader leaves a marker for
+    ``empty_ttl_seconds`` that lets followers (and later misses) return
+    ``None`` without rendering.
+    """
+
+    cache: RedisCache
+    lease_ms: int = 5_000
+    poll_interval_ms: int = 25
+    lock_prefix: str = "lock"
+    empty_prefix: str = "empty"
+    empty_ttl_seconds: int = 30
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _counters: Dict[str, int] = field(
+        default_factory=lambda: {
+            "leases_acquired": 0,
+            "waits": 0,
+            "served_from_peer": 0,
+            "served_empty": 0,
+            "fallback_renders": 0,
+        },
+        init=False,
+        repr=False,
+    )
+
+    def _bump(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def do(
+        self,
+        key_parts: Sequence[str],
+        render: Callable[[], Optional[T]],
+        load_cached: Callable[[], Optional[T]],
+    ) -> Optional[T]:
+        lock_parts = (self.lock_prefix, *key_parts)
+        empty_parts = (self.empty_prefix, *key_parts)
+        if self.empty_ttl_seconds > 0 and self.cache.exists(*empty_parts):
+            self._bump("served_empty")
+            return None
+        token = self.cache.acquire_lock(*lock_parts, ttl_ms=self.lease_ms)
+        if token is not None:
+            self._bump("leases_acquired")
+            try:
+                result = render()
+                if result is None and self.empty_ttl_seconds > 0:
+                    # Published before the lease is released so waiting peers see it.
+                    self.cache.set(b"1", *empty_parts, ttl=self.empty_ttl_seconds)
+                return result
+            finally:
+                self.cache.release_lock(token, *lock_parts)
+
+        self._bump("waits")
+        deadline = time.monotonic() + self.lease_ms / 1000.0
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval_ms / 1000.0)
+            lease_released = not self.cache.exists(*lock_parts)
+            cached = load_cached()
+            if cached is not None:
+                self._bump("served_from_peer")
+                return cached
+            if lease_released:
+                if self.empty_ttl_seconds > 0 and self.cache.exists(*empty_parts):
+                    self._bump("served_empty")
+                    return None
+                break
+
+        self._bump("fallback_renders")
+        return render()
+
+    def known_empty(self, keys: Sequence[Sequence[str]]) -> List[bool]:
+        """Flag the ``keys`` that carry an empty marker, using one MGET.
+
+        Batch callers render many tiles in one query instead of through
+        :meth:`do`; this and :meth:`mark_empty` give them the same markers.
+        """
+
+        if self.empty_ttl_seconds <= 0 or not keys:
+            return [False] * len(keys)
+        markers = self.cache.mget([(self.empty_prefix, *parts) for parts in keys])
+        found = [marker is not None for marker in markers]
+        with self._lock:
+            self._counters["served_empty"] += sum(found)
+        return found
+
+    def mark_empty(self, keys: Sequence[Sequence[str]]) -> None:
+        """Leave an empty marker for every key in ``keys``, pipelined."""
+
+        if self.empty_ttl_seconds <= 0 or not keys:
+            return
+        self.cache.set_many(
+            [((self.empty_prefix, *parts), b"1") for parts in keys],
+            ttl=self.empty_ttl_seconds,
+        )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+
+__all__ = ["SingleFlight", "RedisSingleFlight"]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import math
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from geocoding.centreline_geocoder import (
+    GEOCODER_VERSION,
+    CentrelineGeocoder,
+    CentrelineSegment,
+    normalize_street_name,
+)
+
+
+def centreline_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "CENTRELINE_ID": 1,
+                "LINEAR_NAME": "QUEEN",
+                "LINEAR_NAME_TYPE": "ST",
+                "LINEAR_NAME_DIR": "W",
+                "PARITY_L": "e",
+                "PARITY_R": None,
+                "LOW_NUM_EVEN": 2,
+                "HIGH_NUM_EVEN": 100,
+                "LOW_NUM_ODD": math.nan,
+                "HIGH_NUM_ODD": math.nan,
+                "FEATURE_CODE": 201500,
+                "FEATURE_CODE_DESC": "Major Arterial",
+                "JURISDICTION": "CITY OF TORONTO",
+                "geometry": json.dumps({"type": "LineString", "coordinates": [[-79.39, 43.65], [-79.38, 43.66]]}),
+            },
+            {
+                "CENTRELINE_ID": 2,
+                "LINEAR_NAME": None,
+                "LINEAR_NAME_FULL": "Lane W Spadina",
+                "LOW_NUM_ODD": 1,
+                "HIGH_NUM_ODD": 9,
+                "geometry": {"type": "Point", "coordinates": [-79.40, 43.64]},
+            },
+            {"CENTRELINE_ID": 3, "LINEAR_NAME": "QUEEN", "LINEAR_NAME_TYPE": "ST", "LINEAR_NAME_DIR": "W"},
+        ]
+    )
+
+
+def iterrows_index(frame: pd.DataFrame) -> dict[str, list[CentrelineSegment]]:
+    index: dict[str, list[CentrelineSegment]] = {}
+    for _, row in frame.iterrows():
+        label = CentrelineGeocoder._compose_label(row)
+        geometry = row.get("geometry")
+        geometry = json.loads(geometry) if isinstance(geometry, str) else geometry
+        segment = CentrelineSegment(
+            centreline_id=int(row.get("CENTRELINE_ID", 0)),
+            street_key=normalize_street_name(label),
+            street_label=label,
+            parity_left=CentrelineGeocoder._safe_upper(row.get("PARITY_L")),
+            parity_right=CentrelineGeocoder._safe_upper(row.get("PARITY_R")),
+            low_even=CentrelineGeocoder._safe_int(row.get("LOW_NUM_EVEN")),
+            high_even=CentrelineGeocoder._safe_int(row.get("HIGH_NUM_EVEN")),
+            low_odd=CentrelineGeocoder._safe_int(row.get("LOW_NUM_ODD")),
+            high_odd=CentrelineGeocoder._safe_int(row.get("HIGH_NUM_ODD")),
+            feature_code=CentrelineGeocoder._safe_int(row.get("FEATURE_CODE")),
+            feature_code_desc=row.get("FEATURE_CODE_DESC"),
+            jurisdiction=CentrelineGeocoder._safe_str(row.get("JURISDICTION")),
+            centroid=CentrelineGeocoder._compute_centroid(geometry),
+        )
+        index.setdefault(segment.street_key, []).append(segment)
+    return index
+
+
+def comparable(index: dict[str, list[CentrelineSegment]]) -> dict[str, list[tuple]]:
+    # NaN descriptions never compare equal; normalise them for the assertion.
+    return {
+        key: [
+            tuple(None if isinstance(value, float) and math.isnan(value) else value for value in vars(segment).values())
+            for segment in segments
+        ]
+        for key, segments in index.items()
+    }
+
+
+def test_columnar_build_matches_row_by_row_build() -> None:
+    frame = centreline_frame()
+
+    geocoder = CentrelineGeocoder(frame)
+
+    assert comparable(geocoder._segments_by_key) == comparable(iterrows_index(frame))
+    lat, lon = geocoder._segments_by_key["QUEEN STREET WEST"][0].centroid
+    assert math.isclose(lat, 43.655) and math.isclose(lon, -79.385)
+
+
+def test_sql_centroid_columns_take_precedence() -> None:
+    frame = centreline_frame().drop(columns=["geometry"])
+    frame["CENTROID_LAT"] = [43.655, 43.64, math.nan]
+    frame["CENTROID_LON"] = [-79.385, -79.40, math.nan]
+
+    geocoder = CentrelineGeocoder(frame)
+
+    queen = geocoder._segments_by_key["QUEEN STREET WEST"]
+    assert [segment.centroid for segment in queen] == [(43.655, -79.385), None]
+
+
+def test_snapshot_round_trip(tmp_path: Path) -> None:
+    geocoder = CentrelineGeocoder(centreline_frame())
+    geocoder.geocode("10 QUEN ST W")
+    snapshot = tmp_path / "geocoder.pickle"
+
+    geocoder.save_snapshot(snapshot)
+    restored = CentrelineGeocoder.load_snapshot(snapshot)
+
+    assert restored is not None
+    assert restored._fuzzy_cache == {}
+    assert restored.geocode("10 QUEEN ST W") == geocoder.geocode("10 QUEEN ST W")
+    assert CentrelineGeocoder.load_snapshot(tmp_path / "missing.pickle") is None
+
+
+def test_snapshot_in_the_previous_layout_is_rebuilt(tmp_path: Path) -> None:
+    snapshot = tmp_path / "geocoder.pickle"
+    snapshot.write_bytes(pickle.dumps((GEOCODER_VERSION, CentrelineGeocoder(centreline_frame()))))
+
+    assert CentrelineGeocoder.load_snapshot(snapshot) is None
+
+
+def test_concurrent_snapshot_saves_do_not_collide(tmp_path: Path) -> None:
+    geocoder = CentrelineGeocoder(centreline_frame())
+    snapshot = tmp_path / "geocoder.pickle"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: geocoder.save_snapshot(snapshot), range(8)))
+
+    assert CentrelineGeocoder.load_snapshot(snapshot) is not None
+    assert list(tmp_path.glob("*.tmp")) == []
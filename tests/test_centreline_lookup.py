@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import difflib
+
+import pandas as pd
+import pytest
+
+from geocoding.centreline_geocoder import CentrelineGeocoder
+
+
+STREETS = [
+    ("QUEEN", "ST", "W"),
+    ("QUEEN", "ST", "E"),
+    ("KING", "ST", "W"),
+    ("MC CAUL", "ST", None),
+    ("SPADINA", "AVE", None),
+    ("SPADINA", "RD", None),
+    ("ST CLAIR", "AVE", "W"),
+    ("BLOOR", "ST", "W"),
+]
+
+
+def build_geocoder() -> CentrelineGeocoder:
+    frame = pd.DataFrame(
+        [
+            {
+                "CENTRELINE_ID": index,
+                "LINEAR_NAME": name,
+                "LINEAR_NAME_TYPE": kind,
+                "LINEAR_NAME_DIR": direction,
+                "CENTROID_LAT": 43.6 + index / 100,
+                "CENTROID_LON": -79.4,
+            }
+            for index, (name, kind, direction) in enumerate(STREETS, start=1)
+        ]
+    )
+    return CentrelineGeocoder(frame)
+
+
+def test_space_stripped_keys_resolve_to_the_first_matching_street() -> None:
+    geocoder = build_geocoder()
+
+    segments = geocoder._lookup_segments("MCCAUL STREET")
+
+    assert [segment.centreline_id for segment in segments] == [4]
+
+
+def test_fuzzy_lookup_matches_difflib() -> None:
+    geocoder = build_geocoder()
+    queries = [
+        "QUEN STREET WEST",
+        "SPADNA AVENUE",
+        "SPADINA ROAD",
+        "KNG STREET",
+        "ST CLAR AVENUE WEST",
+        "BLOR STREET",
+        "LAKESHORE BOULEVARD",
+        "",
+    ]
+
+    for query in queries:
+        expected = None
+        for cutoff in (0.88, 0.82):
+            matches = difflib.get_close_matches(query, geocoder._street_keys, n=1, cutoff=cutoff)
+            if matches:
+                expected = matches[0]
+                break
+        assert geocoder._find_fuzzy_key(query) == expected, query
+
+
+def test_batch_geocode_dedupes_and_keeps_input_order_across_workers() -> None:
+    geocoder = build_geocoder()
+    addresses = ["QUEEN ST W", "KNG ST W", None, "QUEEN ST W", "NOWHERE LANE", "SPADINA AVE", "KNG ST W"]
+    expected = [geocoder.geocode(address) if address else None for address in addresses]
+    cache: dict = {"SPADINA AVE": None}
+
+    results, stats = geocoder.batch_geocode_with_stats(addresses, workers=2, chunk_size=1, cache=cache)
+
+    assert results[0] is not None and results[1] is not None
+    assert results[:5] == expected[:5]
+    assert results[5] is None and results[6] == expected[6]
+    assert (stats.addresses, stats.unique_addresses, stats.cache_hits, stats.geocoded) == (7, 4, 1, 3)
+    assert stats.workers == 2 and stats.duplicate_hits == 3
+    assert set(cache) == {"QUEEN ST W", "KNG ST W", "NOWHERE LANE", "SPADINA AVE"}
+
+
+
+def test_batch_geocode_raises_geocoder_errors_instead_of_caching_a_miss(monkeypatch: pytest.MonkeyPatch) -> None:
+    geocoder = build_geocoder()
+    cache: dict = {}
+
+    def broken(address: str):
+        raise ValueError(address)
+
+    monkeypatch.setattr(geocoder, "geocode", broken)
+
+    with pytest.raises(ValueError):
+        geocoder.batch_geocode_with_stats(["QUEEN ST W"], cache=cache)
+    assert cache == {}
+
+def line(*points: tuple[float, float]) -> dict:
+    return {"type": "LineString", "coordinates": [[lon, lat] for lat, lon in points]}
+
+
+def test_intersections_resolve_to_shared_segment_endpoints() -> None:
+    frame = pd.DataFrame(
+        [
+            {"CENTRELINE_ID": 10, "LINEAR_NAME": "QUEEN", "LINEAR_NAME_TYPE": "ST", "LINEAR_NAME_DIR": "W",
+             "geometry": line((43.650, -79.400), (43.651, -79.395))},
+            {"CENTRELINE_ID": 11, "LINEAR_NAME": "QUEEN", "LINEAR_NAME_TYPE": "ST", "LINEAR_NAME_DIR": "W",
+             "geometry": line((43.651, -79.395), (43.652, -79.390))},
+            {"CENTRELINE_ID": 20, "LINEAR_NAME": "SPADINA", "LINEAR_NAME_TYPE": "AVE",
+             "geometry": line((43.645, -79.396), (43.651, -79.395))},
+            {"CENTRELINE_ID": 21, "LINEAR_NAME": "SPADINA", "LINEAR_NAME_TYPE": "AVE",
+             "geometry": line((43.651, -79.395), (43.657, -79.394))},
+            {"CENTRELINE_ID": 30, "LINEAR_NAME": "PETER", "LINEAR_NAME_TYPE": "ST",
+             "geometry": line((43.6485, -79.3920), (43.6500, -79.3915))},
+        ]
+    )
+    geocoder = CentrelineGeocoder(frame)
+
+    crossing = geocoder.geocode("SPADINA AVE / QUEEN ST W")
+    assert crossing is not None
+    assert (crossing.latitude, crossing.longitude) == (43.651, -79.395)
+    assert crossing.street_normalized == "SPADINA AVENUE & QUEEN STREET WEST"
+    assert crossing.centreline_id == 20
+
+    # Peter never touches Queen in this network: midpoint of the closest nodes.
+    offset = geocoder.geocode("PETER ST N/O QUEEN ST W")
+    assert offset is not None
+    assert offset.centreline_id == 30
+    assert abs(offset.latitude - (43.6500 + 43.652) / 2) < 1e-9
+    assert abs(offset.longitude - (-79.3915 + -79.390) / 2) < 1e-9
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from typing import Any, Dict, List
+
+import pytest
+
+from src.etl.ckan import CKANClient, CKANError
+
+
+RESOURCE_ID = "red-light-charges"
+
+
+class FakeDatastore:
+    """``datastore_search_sql`` backed by sqlite; ``_id`` has gaps like a real datastore after deletes."""
+
+    def __init__(self, rows: int) -> None:
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(
+            f'CREATE TABLE "{RESOURCE_ID}" (_id INTEGER PRIMARY KEY, ticket TEXT, ward INTEGER, code TEXT, _full_text TEXT)'
+        )
+        self.conn.executemany(
+            f'INSERT INTO "{RESOURCE_ID}" VALUES (?, ?, ?, ?, ?)',
+            [
+                (index, f"T{index:04d}", index % 3, str(index % 5), f"'t{index:04d}':1")
+                for index in range(1, rows + 1)
+                if index % 7 != 0
+            ],
+        )
+        self.lock = threading.Lock()
+        self.queries: List[str] = []
+
+    def __call__(self, sql: str) -> Dict[str, Any]:
+        with self.lock:
+            self.queries.append(sql)
+            rows = [dict(row) for row in self.conn.execute(sql)]
+        return {"records": rows}
+
+    def expected(self, where: str = "1 = 1") -> List[str]:
+        return [row[0] for row in self.conn.execute(f'SELECT ticket FROM "{RESOURCE_ID}" WHERE {where} ORDER BY _id')]
+
+
+@pytest.fixture()
+def datastore(monkeypatch: pytest.MonkeyPatch) -> FakeDatastore:
+    fake = FakeDatastore(rows=1000)
+    monkeypatch.setattr(CKANClient, "datastore_search_sql", lambda self, sql: fake(sql))
+    return fake
+
+
+@pytest.mark.parametrize("prefetch", [0, 3])
+def test_keyset_pagination_streams_every_row_in_id_order(datastore: FakeDatastore, prefetch: int) -> None:
+    client = CKANClient("http://ckan.invalid")
+
+    tickets = [record["ticket"] for record in client.iter_datastore_sql(RESOURCE_ID, chunk_size=100, prefetch=prefetch)]
+
+    assert tickets == datastore.expected()
+    assert not any("OFFSET" in sql for sql in datastore.queries)
+
+
+def test_datastore_search_filters_become_keyset_conditions(datastore: FakeDatastore) -> None:
+    client = CKANClient("http://ckan.invalid")
+
+    tickets = [
+        record["ticket"]
+        for record in client.datastore_search(RESOURCE_ID, limit=64, filters={"ward": [1, 2]}, prefetch=2)
+    ]
+
+    assert tickets == datastore.expected("ward IN (1, 2)")
+    assert all('"ward" IN (\'1\', \'2\')' in sql for sql in datastore.queries[1:])
+
+
+def test_numeric_filters_are_quoted_for_text_columns(datastore: FakeDatastore) -> None:
+    client = CKANClient("http://ckan.invalid")
+
+    records = list(client.datastore_search(RESOURCE_ID, limit=100, filters={"code": 3, "ward": 0}))
+
+    assert [record["ticket"] for record in records] == datastore.expected("code = '3' AND ward = 0")
+    assert all('"code" = \'3\' AND "ward" = \'0\'' in sql for sql in datastore.queries)
+    assert records and all("_full_text" not in record for record in records)
+
+
+def test_prefetch_stops_early_without_reading_the_whole_table(datastore: FakeDatastore) -> None:
+    client = CKANClient("http://ckan.invalid")
+
+    iterator = client.iter_datastore_keyset(RESOURCE_ID, page_size=50, prefetch=2)
+    first = [next(iterator)["ticket"] for _ in range(10)]
+    iterator.close()
+
+    assert first == datastore.expected()[:10]
+    assert len(datastore.queries) <= 1 + 3
+
+
+def test_empty_any_of_filter_matches_nothing(datastore: FakeDatastore) -> None:
+    client = CKANClient("http://ckan.invalid")
+
+    assert list(client.datastore_search(RESOURCE_ID, limit=100, filters={"ward": []})) == []
+    assert all("FALSE" in sql and "IN ()" not in sql for sql in datastore.queries)
+
+
+class FakeSearchResponse:
+    def __init__(self, result: Dict[str, Any]) -> None:
+        self.result = result
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> Dict[str, Any]:
+        return {"success": True, "result": self.result}
+
+
+def test_datastore_search_falls_back_when_the_sql_action_is_unavailable(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = CKANClient("http://ckan.invalid")
+    rows = [{"_id": index, "ticket": f"T{index:04d}"} for index in range(1, 6)]
+    sql_calls: List[str] = []
+    searches: List[Dict[str, Any]] = []
+
+    def refuse_sql(self, sql: str) -> Dict[str, Any]:
+        sql_calls.append(sql)
+        raise CKANError('{"success": false, "error": {"__type": "Authorization Error"}}')
+
+    def search(url: str, *, params: Dict[str, Any], timeout: int) -> FakeSearchResponse:
+        assert url == "http://ckan.invalid/api/3/action/datastore_search"
+        searches.append(params)
+        offset = params["offset"]
+        return FakeSearchResponse({"records": rows[offset : offset + params["limit"]], "total": len(rows)})
+
+    monkeypatch.setattr(CKANClient, "datastore_search_sql", refuse_sql)
+    monkeypatch.setattr(client._session, "get", search)
+    monkeypatch.setattr("src.etl.ckan.time.sleep", lambda seconds: None)
+
+    first = list(client.datastore_search(RESOURCE_ID, limit=2, filters={"ward": 1}))
+    second = list(client.datastore_search(RESOURCE_ID, limit=2))
+
+    assert first == rows and second == rows
+    assert [params["offset"] for params in searches] == [0, 2, 4, 0, 2, 4]
+    assert searches[0]["filters"] == '{"ward": 1}'
+    # The client remembers the refusal instead of retrying the SQL action per call.
+    assert len(sql_calls) == 1
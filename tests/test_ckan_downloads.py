@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.etl.ckan import CKANClient
+from src.etl.downloads import DownloadManager, DownloadRequest
+from src.etl.storage import ArtefactStore, ArtefactWriter
+
+
+FILES: Dict[str, bytes] = {
+    "tags-2022": bytes(range(256)) * 64,
+    "tags-2023": b"2023," * 5000,
+    "tags-2023-copy": b"2023," * 5000,
+}
+
+
+class FakeCKAN(BaseHTTPRequestHandler):
+    """Just enough of CKAN: ``resource_show`` and range-capable file downloads."""
+
+    log: List[Tuple[str, str | None, int]] = []
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002 - BaseHTTPRequestHandler signature
+        pass
+
+    def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler naming
+        parsed = urlparse(self.path)
+        if parsed.path == "/api/3/action/resource_show":
+            resource_id = parse_qs(parsed.query)["id"][0]
+            base = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+            self._send(200, json.dumps({"success": True, "result": {"url": f"{base}/files/{resource_id}.zip"}}).encode())
+            return
+
+        resource_id = Path(parsed.path).stem
+        body = FILES[resource_id]
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        requested = self.headers.get("Range")
+        start = 0
+        if requested and self.headers.get("If-Range") == etag:
+            start = int(requested.split("=")[1].rstrip("-"))
+            if start >= len(body):
+                self._send(416, b"", {"Content-Range": f"bytes */{len(body)}"})
+                return
+            self._send(206, body[start:], {"ETag": etag, "Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}"})
+        else:
+            self._send(200, body, {"ETag": etag})
+        FakeCKAN.log.append((resource_id, requested, len(body) - start))
+
+    def _send(self, status: int, body: bytes, headers: Dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture()
+def ckan() -> Iterator[CKANClient]:
+    FakeCKAN.log = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeCKAN)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = CKANClient(f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        yield client
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture()
+def store(tmp_path: Path) -> ArtefactStore:
+    return ArtefactStore(tmp_path / "raw", tmp_path / "staging")
+
+
+def requests_for(store: ArtefactStore, names: List[str]) -> List[DownloadRequest]:
+    return [
+        DownloadRequest(
+            key=name,
+            resource_id=name,
+            destination=store.raw_path("parking_tickets", name, ".zip"),
+            last_modified="2024-01-01",
+        )
+        for name in names
+    ]
+
+
+def test_concurrent_downloads_are_verified_recorded_and_deduplicated(ckan: CKANClient, store: ArtefactStore) -> None:
+    manager = DownloadManager(ckan, store, "parking_tickets", max_workers=3)
+    requests = requests_for(store, list(FILES))
+
+    results = manager.download_all(requests)
+
+    for name, body in FILES.items():
+        assert results[name].path.read_bytes() == body
+        assert results[name].sha1 == hashlib.sha1(body).hexdigest()
+        assert store.download_record("parking_tickets", name)["sha1"] == results[name].sha1
+    assert os.path.samefile(results["tags-2023"].path, results["tags-2023-copy"].path)
+    assert not list(store.raw_root.rglob("*.part*"))
+
+    FakeCKAN.log.clear()
+    again = manager.download_all(requests)
+    assert {result.outcome for result in again.values()} == {"present"}
+    assert FakeCKAN.log == []
+
+
+def test_known_content_is_linked_without_downloading(ckan: CKANClient, store: ArtefactStore) -> None:
+    manager = DownloadManager(ckan, store, "parking_tickets")
+    first = manager.download(requests_for(store, ["tags-2022"])[0])
+    FakeCKAN.log.clear()
+
+    moved = DownloadRequest(
+        key="tags-2022",
+        resource_id="renamed-2022",
+        destination=store.raw_path("parking_tickets", "renamed-2022", ".zip"),
+        expected_sha1=first.sha1,
+    )
+    result = manager.download(moved)
+
+    assert result.outcome == "linked"
+    assert os.path.samefile(result.path, first.path)
+    assert FakeCKAN.log == []
+
+
+def test_interrupted_download_resumes_with_a_range_request(ckan: CKANClient, store: ArtefactStore) -> None:
+    body = FILES["tags-2022"]
+    destination = store.raw_path("parking_tickets", "tags-2022", ".zip")
+    destination.parent.mkdir(parents=True)
+    partial = destination.with_name(destination.name + ".part")
+    partial.write_bytes(body[:5000])
+    destination.with_name(destination.name + ".part.json").write_text(
+        json.dumps({"url": f"{ckan.base_url}/files/tags-2022.zip", "validator": f'"{hashlib.sha1(body).hexdigest()}"'})
+    )
+
+    artefact = ckan.download_resource("tags-2022", destination)
+
+    assert destination.read_bytes() == body
+    assert (artefact.sha1, artefact.size) == (hashlib.sha1(body).hexdigest(), len(body))
+    assert FakeCKAN.log == [("tags-2022", "bytes=5000-", len(body) - 5000)]
+    assert not partial.exists()
+
+
+def test_partial_download_with_a_stale_validator_restarts(ckan: CKANClient, store: ArtefactStore) -> None:
+    body = FILES["tags-2023"]
+    destination = store.raw_path("parking_tickets", "tags-2023", ".zip")
+    destination.parent.mkdir(parents=True)
+    destination.with_name(destination.name + ".part").write_bytes(b"stale bytes from an older revision")
+    destination.with_name(destination.name + ".part.json").write_text(
+        json.dumps({"url": f"{ckan.base_url}/files/tags-2023.zip", "validator": '"old"'})
+    )
+
+    ckan.download_resource("tags-2023", destination)
+
+    assert destination.read_bytes() == body
+    assert FakeCKAN.log == [("tags-2023", "bytes=34-", len(body))]
+
+
+def test_artefact_writer_hashes_while_writing_and_commits_atomically(tmp_path: Path) -> None:
+    destination = tmp_path / "archive.zip"
+    destination.write_bytes(b"previous revision")
+
+    with pytest.raises(RuntimeError):
+        with ArtefactWriter(destination) as writer:
+            writer.write(b"first half, ")
+            raise RuntimeError("connection dropped")
+    assert destination.read_bytes() == b"previous revision"
+
+    with ArtefactWriter(destination, append=True) as writer:
+        writer.write(b"second half")
+        artefact = writer.commit()
+
+    assert destination.read_bytes() == b"first half, second half"
+    assert artefact.sha1 == hashlib.sha1(b"first half, second half").hexdigest()
+    assert artefact.size == len(b"first half, second half")
+    assert not destination.with_name("archive.zip.part").exists()
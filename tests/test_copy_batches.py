@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.etl.postgres import _BatchPrefetcher, copy_batches, iter_batch_rows
+
+
+COLUMNS = ("name", "count", "score")
+
+
+class FakeCopy:
+    def __init__(self) -> None:
+        self.types: list[str] | None = None
+        self.rows: list[tuple] = []
+
+    def __enter__(self) -> "FakeCopy":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def set_types(self, types: list[str]) -> None:
+        self.types = types
+
+    def write_row(self, row) -> None:
+        self.rows.append(tuple(row))
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.copier = FakeCopy()
+        self.statements: list[str] = []
+
+    def cursor(self) -> "FakeConnection":
+        return self
+
+    def copy(self, sql: str, writer=None) -> FakeCopy:
+        self.statements.append(sql)
+        return self.copier
+
+
+def test_batch_shapes_yield_the_same_rows() -> None:
+    expected = [("a", 1, 0.5), ("b", 2, None)]
+    frame = pd.DataFrame({"score": [0.5, np.nan], "name": ["a", "b"], "count": [1, 2]})
+    shapes = [
+        expected,
+        frame,
+        {"name": np.array(["a", "b"], dtype=object), "count": np.array([1, 2]), "score": [0.5, None]},
+        (np.array(["a", "b"], dtype=object), np.array([1, 2]), np.array([0.5, None], dtype=object)),
+    ]
+    for batch in shapes:
+        assert [tuple(row) for row in iter_batch_rows(batch, COLUMNS)] == expected
+
+
+def test_copy_batches_binary_with_text_coercion() -> None:
+    conn = FakeConnection()
+    seen: list[int] = []
+    written = copy_batches(
+        conn,  # type: ignore[arg-type]
+        "staging",
+        COLUMNS,
+        [[("a", 1, 0.5)], [(7, 2, None)]],
+        types=("text", "int4", "float8"),
+        prefetch=0,
+        coerce_text=True,
+        progress=seen.append,
+    )
+    assert written == 2
+    assert conn.statements == ["COPY staging (name,count,score) FROM STDIN WITH (FORMAT binary)"]
+    assert conn.copier.types == ["text", "int4", "float8"]
+    assert conn.copier.rows == [("a", 1, 0.5), ("7", 2, None)]
+    assert seen == [1, 2]
+
+
+def test_prefetcher_preserves_order_and_reraises() -> None:
+    batches = [[(index, index, index)] for index in range(5)]
+    assert [rows for rows in _BatchPrefetcher(batches, COLUMNS, 2)] == batches
+
+    def failing():
+        yield [("a", 1, 1.0)]
+        raise ValueError("bad archive")
+
+    received = []
+    with pytest.raises(ValueError, match="bad archive"):
+        for rows in _BatchPrefetcher(failing(), COLUMNS, 1):
+            received.append(rows)
+    assert received == [[("a", 1, 1.0)]]
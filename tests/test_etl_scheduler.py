@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import List
+
+import pytest
+
+from src.etl.scheduler import DagScheduler, SchedulerError, Stage, execution_order
+
+
+def test_independent_stages_overlap_and_dependents_wait() -> None:
+    events: List[str] = []
+    lock = threading.Lock()
+    both_running = threading.Barrier(2, timeout=5)
+
+    def stage(name: str, *, rendezvous: bool = False):
+        def run() -> None:
+            with lock:
+                events.append(f"start {name}")
+            if rendezvous:
+                # Only returns if the two camera datasets really run at the same time.
+                both_running.wait()
+            time.sleep(0.01)
+            with lock:
+                events.append(f"end {name}")
+
+        return run
+
+    stages = [
+        Stage("centreline", stage("centreline")),
+        Stage("parking_tickets", stage("parking_tickets"), depends_on=("centreline",)),
+        Stage("red_light_locations", stage("red_light_locations", rendezvous=True), depends_on=("centreline",)),
+        Stage("ase_locations", stage("ase_locations", rendezvous=True), depends_on=("centreline",)),
+    ]
+    completed: List[str] = []
+
+    timings = DagScheduler(stages, max_workers=3, on_stage_complete=lambda timing: completed.append(timing.name)).run()
+
+    assert events.index("end centreline") < min(
+        events.index(f"start {name}") for name in ("parking_tickets", "red_light_locations", "ase_locations")
+    )
+    assert list(timings) == ["centreline", "parking_tickets", "red_light_locations", "ase_locations"]
+    assert all(timing.status == "succeeded" and timing.elapsed_seconds > 0 for timing in timings.values())
+    assert sorted(completed) == sorted(timings)
+
+
+def test_failure_skips_dependents_but_finishes_other_branches() -> None:
+    ran: List[str] = []
+
+    def fail() -> None:
+        raise RuntimeError("centreline download failed")
+
+    stages = [
+        Stage("centreline", fail),
+        Stage("parking_tickets", lambda: ran.append("parking_tickets"), depends_on=("centreline",)),
+        Stage("tiles", lambda: ran.append("tiles"), depends_on=("parking_tickets",)),
+        Stage("ase_charges", lambda: ran.append("ase_charges")),
+    ]
+
+    with pytest.raises(SchedulerError) as excinfo:
+        DagScheduler(stages, max_workers=2).run()
+
+    statuses = {name: timing.status for name, timing in excinfo.value.timings.items()}
+    assert statuses == {
+        "centreline": "failed",
+        "parking_tickets": "skipped",
+        "tiles": "skipped",
+        "ase_charges": "succeeded",
+    }
+    assert ran == ["ase_charges"]
+    assert "centreline download failed" in excinfo.value.timings["centreline"].error
+
+
+def test_execution_order_ignores_unselected_dependencies_and_rejects_cycles() -> None:
+    noop = lambda: None  # noqa: E731
+
+    assert execution_order([Stage("parking_tickets", noop, depends_on=("centreline",))]) == ["parking_tickets"]
+    with pytest.raises(ValueError):
+        execution_order([Stage("a", noop, depends_on=("b",)), Stage("b", noop, depends_on=("a",))])
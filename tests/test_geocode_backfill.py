@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import importlib.util
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from src.etl.parking_partitions import tile_columns_sql
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "scripts" / "geocode_parking_tickets.py"
+
+Key = Tuple[str, str, str, str]
+
+
+def key(street: str) -> Key:
+    return (street, "", "", "")
+
+
+class FakeResult:
+    def __init__(self, rows: Optional[List[tuple]] = None) -> None:
+        self.rows = rows or []
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeTickets:
+    """Connection stand-in following the statements the backfill issues.
+
+    Tickets are ``[location key, year, resolved]``; every statement is kept in
+    ``statements`` and the checkpoint in ``state``.
+    """
+
+    def __init__(self, tickets: List[Tuple[Key, int]]) -> None:
+        self.tickets = [[ticket_key, year, False] for ticket_key, year in tickets]
+        self.state: Optional[Dict[str, Any]] = None
+        self.results: List[tuple] = []
+        self.statements: List[str] = []
+        self.fetches: List[tuple] = []
+
+    def execute(self, sql: str, params=None) -> FakeResult:
+        statement = " ".join(sql.split())
+        self.statements.append(statement)
+        if statement.startswith("SELECT metadata FROM etl_state"):
+            return FakeResult([(self.state,)] if self.state is not None else [])
+        if statement.startswith("INSERT INTO etl_state"):
+            self.state = dict(params[1].obj)
+            return FakeResult()
+        if statement.startswith("SELECT DISTINCT COALESCE(location1"):
+            self.fetches.append(tuple(params))
+            *after, size = params
+            keys = sorted({ticket_key for ticket_key, _, resolved in self.tickets if not resolved})
+            if after:
+                keys = [candidate for candidate in keys if candidate > tuple(after)]
+            return FakeResult(keys[:size])
+        if statement.startswith("CREATE TEMP TABLE geocode_backfill_results"):
+            self.results = []
+            return FakeResult()
+        if statement.startswith("WITH updated AS ( UPDATE parking_tickets"):
+            resolved_keys = {tuple(row[:4]) for row in self.results}
+            years: Counter = Counter()
+            for ticket in self.tickets:
+                if ticket[0] in resolved_keys and not ticket[2]:
+                    ticket[2] = True
+                    years[ticket[1]] += 1
+            return FakeResult(sorted(years.items()))
+        return FakeResult()
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+
+class FakeGeocoder:
+    def __init__(self, module: ModuleType, resolvable: Dict[Key, Tuple[float, float]]) -> None:
+        self.module = module
+        self.resolvable = resolvable
+        self.seen: List[Key] = []
+
+    def geocode_rows(self, records, *, workers: int = 1):
+        payloads = []
+        for record in records:
+            record_key = tuple(record[f"location{i}"] for i in range(1, 5))
+            self.seen.append(record_key)
+            point = self.resolvable.get(record_key)
+            payloads.append(
+                None
+                if point is None
+                else self.module.GeocodeResultPayload(record_key[0], 1000 + len(self.seen), point[1], point[0])
+            )
+        return payloads
+
+    def clear_cache(self) -> None:
+        pass
+
+
+@pytest.fixture()
+def backfill(monkeypatch: pytest.MonkeyPatch) -> Tuple[ModuleType, List[int]]:
+    spec = importlib.util.spec_from_file_location("geocode_backfill_under_test", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # Dataclasses resolve their annotations through sys.modules.
+    monkeypatch.setitem(sys.modules, spec.name, module)
+    spec.loader.exec_module(module)
+    refreshed: List[int] = []
+
+    def copy_batches(conn, table, columns, batches, **kwargs):
+        conn.results.extend(row for batch in batches for row in batch)
+        return len(conn.results)
+
+    def refresh_parking_rollup(conn, *, year=None):
+        refreshed.append(year)
+        return 1
+
+    monkeypatch.setattr(module, "copy_batches", copy_batches)
+    monkeypatch.setattr(module, "refresh_parking_rollup", refresh_parking_rollup)
+    return module, refreshed
+
+
+def test_interrupted_backfill_resumes_after_the_last_location(backfill) -> None:
+    module, refreshed = backfill
+    conn = FakeTickets(
+        [
+            (key("ADELAIDE ST W"), 2022),
+            (key("ADELAIDE ST W"), 2023),
+            (key("BAY ST"), 2023),
+            (key("COLLEGE ST"), 2024),
+            (key("DUNDAS ST W"), 2024),
+            (key("ESPLANADE"), 2021),
+        ]
+    )
+    resolvable = {
+        key("ADELAIDE ST W"): (43.649, -79.389),
+        key("COLLEGE ST"): (43.659, -79.401),
+        key("DUNDAS ST W"): (43.653, -79.397),
+        key("ESPLANADE"): (43.647, -79.371),
+    }
+    geocoder = FakeGeocoder(module, resolvable)
+
+    # The first run stops after one batch, as an interrupted run would.
+    assert module.run_backfill(conn, geocoder, batch_size=2, limit=2) == (2, 2)
+    assert conn.state["last_location"] == list(key("BAY ST"))
+    assert refreshed == [2022, 2023]
+    assert conn.state["rollup_years"] == []
+
+    # BAY ST never resolves; the keyset keeps the resumed run from fetching it again.
+    assert module.run_backfill(conn, geocoder, batch_size=2) == (5, 5)
+    assert conn.fetches[1] == (*key("BAY ST"), 2)
+    streets = ("ADELAIDE ST W", "BAY ST", "COLLEGE ST", "DUNDAS ST W", "ESPLANADE")
+    assert geocoder.seen == [key(street) for street in streets]
+    assert conn.state["completed"] is True
+    assert refreshed == [2022, 2023, 2021, 2024]
+    assert [ticket for ticket in conn.tickets if not ticket[2]] == [[key("BAY ST"), 2023, False]]
+
+
+def test_dry_run_does_not_checkpoint_or_refresh(backfill) -> None:
+    module, refreshed = backfill
+    conn = FakeTickets([(key("ADELAIDE ST W"), 2022)])
+
+    module.run_backfill(conn, FakeGeocoder(module, {key("ADELAIDE ST W"): (43.649, -79.389)}), dry_run=True)
+
+    assert conn.state is None
+    assert refreshed == []
+    assert not any(statement.startswith("WITH updated AS") for statement in conn.statements)
+
+
+def test_update_writes_tile_columns_and_queues_features(backfill) -> None:
+    module, _ = backfill
+    conn = FakeTickets([(key("ADELAIDE ST W"), 2022), (key("ADELAIDE ST W"), 2024)])
+
+    updated, years = module.apply_batch(conn, [(*key("ADELAIDE ST W"), "ADELAIDE ST W", 1001, -79.389, 43.649)])
+
+    assert (updated, years) == (2, [2022, 2024])
+    update = next(statement for statement in conn.statements if statement.startswith("WITH updated AS"))
+    set_sql = update.split(" SET ", 1)[1].split(" FROM ", 1)[0]
+    assert set(re.findall(r"(\w+) = ", set_sql)) == {
+        "street_normalized",
+        "centreline_id",
+        "geom",
+        "geom_3857",
+        "tile_qk_prefix",
+        "updated_at",
+    }
+    assert "geom_3857 = COALESCE(r.geom_3857, t.geom_3857)" in set_sql
+    assert "tile_qk_prefix = COALESCE(r.tile_qk_prefix, t.tile_qk_prefix)" in set_sql
+    assert " ".join(tile_columns_sql(module.RESULT_GEOM_SQL).split()) in update
+    assert "RETURNING t.date_of_infraction" in update
+    assert "INSERT INTO tile_dirty_features" in update
+    # Features the tickets were drawn under before the update are queued as well.
+    before = [statement for statement in conn.statements if statement.startswith("INSERT INTO tile_dirty_features")]
+    assert len(before) == 1
+    assert conn.statements.index(before[0]) < conn.statements.index(update)
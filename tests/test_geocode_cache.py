@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from geocoding.centreline_geocoder import GeocodeResult
+from src.etl.datasets import parking_tickets
+from src.etl.datasets.parking_tickets import ParkingTicketsETL
+from src.etl.geocode_cache import GeocodeStore
+
+
+class FakeStore:
+    def __init__(self, entries: dict) -> None:
+        self.entries = entries
+        self.added: list[tuple] = []
+
+    def load(self) -> dict:
+        return dict(self.entries)
+
+    def add(self, key, value) -> None:
+        self.added.append((key, value))
+
+    def flush(self) -> int:
+        return len(self.added)
+
+
+class FakeGeocoder:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def geocode(self, address: str):
+        self.calls.append(address)
+        if address.startswith("NR 1 YONGE"):
+            return GeocodeResult("YONGE STREET", 43.64, -79.37, 101, None, None, None)
+        return None
+
+
+def test_persisted_geocodes_seed_the_cache_and_new_results_are_queued(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setenv("PARKING_TICKETS_LOCATION_LOOKUP", str(tmp_path / "missing.geojson"))
+    monkeypatch.setenv("PARKING_TICKETS_DISABLE_GEOCODER", "0")
+    store = FakeStore(
+        {
+            ("NR", "100 QUEEN ST W", "", ""): ("QUEEN STREET WEST", 7, 43.65, -79.38),
+            ("AT", "NOWHERE", "", ""): None,
+        }
+    )
+    monkeypatch.setattr(parking_tickets.GeocodeStore, "open", classmethod(lambda cls, pg: store))
+    etl = ParkingTicketsETL.for_staging(SimpleNamespace(slug="parking_tickets"), object())  # type: ignore[arg-type]
+    geocoder = FakeGeocoder()
+    etl._geocoder = geocoder  # type: ignore[assignment]
+    etl._open_geocode_store()
+
+    cached = etl._geocode_record({"location1": "nr", "location2": " 100 Queen St W"})
+    assert cached["centreline_id"] == 7
+    assert etl._geocode_record({"location1": "AT", "location2": "NOWHERE"}) is None
+    assert geocoder.calls == []
+
+    resolved = etl._geocode_record({"location1": "NR", "location2": "1 YONGE ST"})
+    assert resolved.centreline_id == 101
+    assert etl._geocode_record({"location1": "OPP", "location2": "2 UNKNOWN RD"}) is None
+    assert store.added == [
+        (("NR", "1 YONGE ST", "", ""), ("YONGE STREET", 101, 43.64, -79.37)),
+        (("OPP", "2 UNKNOWN RD", "", ""), None),
+    ]
+
+
+def test_store_flushes_once_a_batch_is_full(monkeypatch: pytest.MonkeyPatch) -> None:
+    flushed: list[list[tuple]] = []
+    store = GeocodeStore(pg=None, version="abc-g1", batch_size=2)  # type: ignore[arg-type]
+    monkeypatch.setattr(store, "flush", lambda: flushed.append(list(store._pending)) or 0)
+
+    store.add(("NR", "1 YONGE ST", "", ""), ("YONGE STREET", 101, 43.64, -79.37))
+    assert flushed == []
+    store.add(("OPP", "2 UNKNOWN RD", "", ""), None)
+    assert flushed == [
+        [
+            ("abc-g1", "NR", "1 YONGE ST", "", "", True, "YONGE STREET", 101, 43.64, -79.37),
+            ("abc-g1", "OPP", "2 UNKNOWN RD", "", "", False, None, None, None, None),
+        ]
+    ]
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from types import ModuleType
+from typing import Any, List
+
+import pytest
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "scripts" / "load_parking_tickets_local.py"
+HEADER = "tag_number_masked,date_of_infraction,infraction_code,infraction_description,set_fine_amount,time_of_infraction,location1,location2,location3,location4\n"
+
+
+class FakePG:
+    """Records every statement, whether sent through ``execute`` or a connection."""
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+        self.copied: List[tuple] = []
+
+    def connect(self):
+        return nullcontext(self)
+
+    def execute(self, sql: str, params: Any = None) -> None:
+        self.statements.append(" ".join(sql.split()))
+
+    def copy_rows(self, table: str, columns, rows) -> int:
+        self.copied.extend(rows)
+        return len(self.copied)
+
+    def fetch_all(self, sql: str, params: Any = None) -> List[tuple]:
+        self.statements.append(" ".join(sql.split()))
+        return sorted({(int(row[2][:4]),) for row in self.copied})
+
+
+@pytest.fixture()
+def loader(monkeypatch: pytest.MonkeyPatch) -> ModuleType:
+    spec = importlib.util.spec_from_file_location("load_parking_tickets_local_under_test", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    monkeypatch.setitem(sys.modules, spec.name, module)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_load_year_queues_dirty_features_and_refreshes_touched_rollup_years(
+    loader: ModuleType, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    refreshed: List[int] = []
+    monkeypatch.setattr(loader, "refresh_parking_rollup", lambda conn, *, year: refreshed.append(year))
+    csv_path = tmp_path / "Parking_Tags_Data_2023.csv"
+    csv_path.write_text(
+        HEADER
+        + "A01,20230105,29,PARK PROHIBITED,30,0930,NR,KING ST W,,\n"
+        + "A02,20221231,29,PARK PROHIBITED,30,2359,NR,KING ST W,,\n"
+    )
+    pg = FakePG()
+
+    written = loader.load_year(pg, [csv_path], 2023, {})
+
+    assert written == 2
+    assert refreshed == [2022, 2023]
+    truncate = pg.statements.index("TRUNCATE parking_tickets_y2023")
+    upsert = next(i for i, sql in enumerate(pg.statements) if sql.startswith("INSERT INTO parking_tickets AS target"))
+    dirty = [i for i, sql in enumerate(pg.statements) if sql.startswith("INSERT INTO tile_dirty_features")]
+    assert dirty[0] < truncate < dirty[1] < upsert < dirty[2]
+    assert "geom_3857, tile_qk_prefix )" in pg.statements[upsert]
+    assert "tile_qk_prefix = COALESCE(EXCLUDED.tile_qk_prefix, target.tile_qk_prefix)" in pg.statements[upsert]
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.etl.datasets.parking_tickets import ParkingTicketsETL
+from src.etl.parking_records import STAGING_COLUMNS
+from src.etl.postgres import iter_batch_rows
+
+
+CSV_TEXT = "﻿tag_number_masked,date_of_infraction,infraction_code,infraction_description,set_fine_amount,time_of_infraction,location1,location2,location3,location4\n" + "\n".join(
+    [
+        "***01,20230105,29,PARK PROHIBITED TIME NO PERMIT,30,0930,NR, 100 QUEEN ST W,,",
+        "***02,2023-01-06,,,,,AT,KING ST W,,",
+        "***03,2023/01/07,5,PARK HWY PROHIBED TIME/DAY,50.00,12:15,,100 queen st w ,,",
+        ",20230108,29,NO TICKET NUMBER,30,0100,NR,KING ST W,,",
+        "***05,not-a-date,29,BAD DATE,30,0100,NR,KING ST W,,",
+        "***06,20230109,29,BAD FINE,abc,7,OPP,1 YONGE ST,,",
+        "***07,20230110,29,PARK PROHIBITED TIME NO PERMIT,30,0930,NR,100 QUEEN ST W,,",
+    ]
+) + "\n"
+
+
+@pytest.fixture()
+def loader(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> ParkingTicketsETL:
+    monkeypatch.setenv("PARKING_TICKETS_LOCATION_LOOKUP", str(tmp_path / "missing.geojson"))
+    monkeypatch.setenv("PARKING_TICKETS_DISABLE_GEOCODER", "1")
+    monkeypatch.setenv("PARKING_TICKETS_CSV_CHUNK_ROWS", "3")
+    etl = ParkingTicketsETL.for_staging(SimpleNamespace(slug="parking_tickets"), None)  # type: ignore[arg-type]
+    etl._location_lookup = {
+        "100 QUEEN ST W": {
+            "street_normalized": "100 QUEEN ST W",
+            "latitude": 43.6525,
+            "longitude": -79.3838,
+            "centreline_id": None,
+        }
+    }
+    return etl
+
+
+def read_chunks(loader: ParkingTicketsETL, archive_path: Path, engine: str) -> tuple[list[int], list[tuple]]:
+    loader.csv_engine = engine
+    loader._geocode_cache.clear()
+    chunks = list(loader._iter_archive_chunks(archive_path))
+    rows = [tuple(row) for _, _, batch in chunks for row in iter_batch_rows(batch, STAGING_COLUMNS)]
+    return [consumed for _, consumed, _ in chunks], rows
+
+
+def test_columnar_batches_match_row_path(loader: ParkingTicketsETL, tmp_path: Path) -> None:
+    archive_path = tmp_path / "parking_tags_2023.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("Parking_Tags_Data_2023.000.csv", CSV_TEXT.encode("utf-8"))
+
+    expected_positions, expected = read_chunks(loader, archive_path, "rows")
+    positions, actual = read_chunks(loader, archive_path, "columnar")
+
+    assert positions == expected_positions == [3, 6, 7]
+    assert actual == expected
+    assert [row[1] for row in actual] == ["***01", "***02", "***03", "***06", "***07"]
+    assert actual[0][-2:] == (43.6525, -79.3838)
+    assert actual[0][0] != actual[-1][0]
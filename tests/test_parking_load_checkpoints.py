@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import zipfile
+from concurrent.futures import Future
+from contextlib import nullcontext
+from dataclasses import asdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from src.etl.datasets import parking_tickets
+from src.etl.datasets.base import ExtractionResult
+from src.etl.datasets.parking_tickets import ParkingTicketsETL
+from src.etl.parking_checkpoints import YearLoadCheckpoint
+from src.etl.postgres import PostgresClient, iter_batch_rows
+from src.etl.state import DatasetState
+
+
+HEADER = "tag_number_masked,date_of_infraction,infraction_code,infraction_description,set_fine_amount,time_of_infraction,location1,location2,location3,location4\n"
+
+
+def member_csv(prefix: str, count: int) -> bytes:
+    rows = [f"{prefix}{index:02d},20230105,29,PARK PROHIBITED,30,0930,NR,KING ST W,," for index in range(count)]
+    return (HEADER + "\n".join(rows) + "\n").encode("utf-8")
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.checkpoints: List[dict] = []
+        self.commits = 0
+
+    def execute(self, sql: str, params: Any = None) -> "FakeConnection":
+        if "INSERT INTO etl_state" in sql:
+            self.checkpoints.append(dict(params["payload"].obj))
+        return self
+
+    def commit(self) -> None:
+        self.commits += 1
+
+
+@pytest.fixture()
+def archive_path(tmp_path: Path) -> Path:
+    path = tmp_path / "parking_tags_2023.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("Parking_Tags_Data_2023.001.csv", member_csv("B", 4))
+        archive.writestr("Parking_Tags_Data_2023.000.csv", member_csv("A", 5))
+    return path
+
+
+@pytest.fixture(params=["columnar", "rows"])
+def loader(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> ParkingTicketsETL:
+    monkeypatch.setenv("PARKING_TICKETS_LOCATION_LOOKUP", str(tmp_path / "missing.geojson"))
+    monkeypatch.setenv("PARKING_TICKETS_DISABLE_GEOCODER", "1")
+    monkeypatch.setenv("PARKING_TICKETS_CSV_ENGINE", request.param)
+    monkeypatch.setenv("PARKING_TICKETS_CSV_CHUNK_ROWS", "2")
+    monkeypatch.setenv("PARKING_TICKETS_CHECKPOINT_ROWS", "3")
+    return ParkingTicketsETL.for_staging(SimpleNamespace(slug="parking_tickets"), None)  # type: ignore[arg-type]
+
+
+@pytest.fixture()
+def copied(monkeypatch: pytest.MonkeyPatch) -> List[List[str]]:
+    windows: List[List[str]] = []
+
+    def fake_copy_batches(conn, table, columns, batches, **kwargs) -> int:
+        tickets = [row[1] for batch in batches for row in iter_batch_rows(batch, columns)]
+        windows.append(tickets)
+        return len(tickets)
+
+    monkeypatch.setattr(parking_tickets, "copy_batches", fake_copy_batches)
+    return windows
+
+
+def test_copy_commits_a_checkpoint_per_window(
+    loader: ParkingTicketsETL, archive_path: Path, copied: List[List[str]]
+) -> None:
+    conn = FakeConnection()
+    checkpoint = YearLoadCheckpoint(year=2023, archive_hash="abc", staging_table="parking_tickets_staging_2023")
+
+    rows = loader._copy_archive(conn, checkpoint.staging_table, 2023, archive_path, checkpoint)
+
+    assert rows == 9
+    assert copied == [["A00", "A01", "A02", "A03"], ["A04", "B00", "B01"], ["B02", "B03"]]
+    assert [(entry["member"], entry["member_rows"], entry["rows_staged"]) for entry in conn.checkpoints] == [
+        ("Parking_Tags_Data_2023.000.csv", 4, 4),
+        ("Parking_Tags_Data_2023.001.csv", 2, 7),
+        ("Parking_Tags_Data_2023.001.csv", 4, 9),
+    ]
+    assert conn.commits == 3
+
+
+def test_copy_resumes_from_checkpoint_position(
+    loader: ParkingTicketsETL, archive_path: Path, copied: List[List[str]]
+) -> None:
+    conn = FakeConnection()
+    checkpoint = YearLoadCheckpoint(
+        year=2023,
+        archive_hash="abc",
+        staging_table="parking_tickets_staging_2023",
+        member="Parking_Tags_Data_2023.000.csv",
+        member_rows=4,
+        rows_staged=4,
+    )
+
+    rows = loader._copy_archive(conn, checkpoint.staging_table, 2023, archive_path, checkpoint)
+
+    assert rows == 9
+    assert [ticket for window in copied for ticket in window] == ["A04", "B00", "B01", "B02", "B03"]
+    assert YearLoadCheckpoint.from_json(conn.checkpoints[-1]) == checkpoint
+
+
+def test_merge_refreshes_rollups_and_tiles_for_out_of_year_rows(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("PARKING_TICKETS_LOCATION_LOOKUP", str(tmp_path / "missing.geojson"))
+    monkeypatch.setenv("PARKING_TICKETS_DISABLE_GEOCODER", "1")
+    loader = ParkingTicketsETL.for_staging(SimpleNamespace(slug="parking_tickets"), None)  # type: ignore[arg-type]
+    refreshed: List[int] = []
+    monkeypatch.setattr(parking_tickets, "swap_year_partition", lambda conn, year, populate: None)
+    monkeypatch.setattr(parking_tickets, "refresh_parking_rollup", lambda conn, *, year: refreshed.append(year))
+
+    class MergeConnection:
+        def __init__(self) -> None:
+            self.statements: List[str] = []
+
+        def execute(self, sql: str, params: Any = None) -> SimpleNamespace:
+            statement = " ".join(sql.split())
+            self.statements.append(statement)
+            years = [(2024,), (2022,)] if statement.startswith("SELECT DISTINCT EXTRACT(YEAR") else []
+            return SimpleNamespace(fetchall=lambda: years, fetchone=lambda: (3,))
+
+    conn = MergeConnection()
+    undated = loader._merge_year(conn, 2023, "parking_tickets_staging_2023")
+
+    assert undated == 3
+    assert conn.statements[-1] == (
+        "SELECT COUNT(*) FROM parking_tickets_staging_2023 WHERE NULLIF(date_of_infraction, '') IS NULL"
+    )
+    assert refreshed == [2023, 2022, 2024]
+    upsert = next(index for index, sql in enumerate(conn.statements) if sql.startswith("INSERT INTO parking_tickets AS target"))
+    dirty = [
+        index
+        for index, sql in enumerate(conn.statements)
+        if sql.startswith("INSERT INTO tile_dirty_features") and "ticket_hash IN" in sql
+    ]
+    assert len(dirty) == 2 and dirty[0] < upsert < dirty[1]
+
+
+def test_merged_checkpoint_excludes_undated_rows_from_the_load(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("PARKING_TICKETS_LOCATION_LOOKUP", str(tmp_path / "missing.geojson"))
+    monkeypatch.setenv("PARKING_TICKETS_DISABLE_GEOCODER", "1")
+    conn = FakeConnection()
+    loader = ParkingTicketsETL.for_staging(
+        SimpleNamespace(slug="parking_tickets"),
+        SimpleNamespace(connect=lambda: nullcontext(conn)),  # type: ignore[arg-type]
+    )
+    monkeypatch.setattr(loader, "_merge_year", lambda conn, year, staging_table: 2)
+    checkpoint = YearLoadCheckpoint(2023, "hash", "parking_tickets_staging_2023", rows_staged=9, status="staged")
+
+    loader._merge_staged_year(checkpoint)
+
+    assert (checkpoint.status, checkpoint.rows_undated, checkpoint.rows_loaded) == ("merged", 2, 7)
+    assert conn.checkpoints[-1]["rows_undated"] == 2
+
+
+
+def test_run_records_undated_rows_in_the_dataset_state(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("PARKING_TICKETS_LOCATION_LOOKUP", str(tmp_path / "missing.geojson"))
+    monkeypatch.setenv("PARKING_TICKETS_DISABLE_GEOCODER", "1")
+    upserts: List[Dict[str, Any]] = []
+
+    class FakeStateStore:
+        def get(self, slug: str) -> DatasetState:
+            return DatasetState(slug, None, None, {"resources": {"2022": {"year": 2022, "row_count": 5}}})
+
+        def upsert(self, slug: str, **kwargs: Any) -> None:
+            upserts.append(kwargs)
+
+    loader = ParkingTicketsETL(
+        SimpleNamespace(slug="parking_tickets"),
+        ckan=None,
+        store=None,
+        pg=SimpleNamespace(ensure_extensions=lambda: None),
+        state_store=FakeStateStore(),
+    )
+    extraction = ExtractionResult(
+        resource_paths={"2023": tmp_path / "parking_tags_2023.zip"},
+        resource_hashes={"2023": "h2023"},
+        resource_metadata={"2023": {"year": 2023}},
+    )
+    monkeypatch.setattr(loader, "extract", lambda state: extraction)
+    monkeypatch.setattr(loader, "_ensure_tables", lambda: None)
+    monkeypatch.setattr(loader, "_backfill_rollup_if_empty", lambda: None)
+    monkeypatch.setattr(
+        loader,
+        "_load_resource_year",
+        lambda year, path, archive_hash: YearLoadCheckpoint(
+            year, archive_hash, "parking_tickets_staging_2023", rows_staged=9, rows_undated=2, status="merged"
+        ),
+    )
+
+    loader.run()
+
+    assert len(upserts) == 1
+    assert upserts[0]["last_resource_hash"] == "h2023"
+    assert upserts[0]["metadata"] == {
+        "row_count": 7,
+        "rows_undated": 2,
+        "resources": {
+            "2023": {"year": 2023, "row_count": 7, "rows_undated": 2},
+            "2022": {"year": 2022, "row_count": 5},
+        },
+    }
+
+class FakeDatabase:
+    """Staging tables, year checkpoints and merged tickets shared by every connection."""
+
+    def __init__(self) -> None:
+        self.checkpoints: Dict[str, dict] = {}
+        self.staging: Dict[str, List[tuple]] = {}
+        self.tickets: List[tuple] = []
+        self.clients: List[str] = []
+
+    def connect(self, client: PostgresClient) -> "FakeDatabaseConnection":
+        self.clients.append(client.application_name)
+        return FakeDatabaseConnection(self)
+
+
+class FakeDatabaseConnection:
+    def __init__(self, db: FakeDatabase) -> None:
+        self.db = db
+
+    def execute(self, sql: str, params: Any = None) -> SimpleNamespace:
+        statement = " ".join(sql.split())
+        row = None
+        if statement.startswith("SELECT metadata -> 'load_checkpoints'"):
+            payload = self.db.checkpoints.get(params[0])
+            row = (dict(payload),) if payload else None
+        elif statement.startswith("INSERT INTO etl_state"):
+            self.db.checkpoints[params["year"]] = dict(params["payload"].obj)
+        elif statement.startswith("CREATE UNLOGGED TABLE IF NOT EXISTS"):
+            self.db.staging.setdefault(statement.split()[6], [])
+        elif statement.startswith("SELECT COUNT(*) FROM"):
+            row = (len(self.db.staging[statement.split()[3]]),)
+        elif statement.startswith("TRUNCATE"):
+            self.db.staging[statement.split()[1]] = []
+        elif statement.startswith("DROP TABLE IF EXISTS"):
+            self.db.staging.pop(statement.split()[4], None)
+        return SimpleNamespace(fetchone=lambda: row)
+
+    def commit(self) -> None:
+        pass
+
+
+class InlineExecutor:
+    """Runs submitted workers in this process, in submission order."""
+
+    def __init__(self, max_workers: int, mp_context: Any = None) -> None:
+        self.max_workers = max_workers
+
+    def __enter__(self) -> "InlineExecutor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+    def submit(self, fn, *args: Any) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def yearly_archive(tmp_path: Path, year: int, count: int, undated: int = 0) -> Path:
+    rows = [f"Y{year}{index:02d},{year}0105,29,PARK PROHIBITED,30,0930,NR,KING ST W,," for index in range(count)]
+    rows += [f"U{year}{index:02d},,29,PARK PROHIBITED,30,0930,NR,KING ST W,," for index in range(undated)]
+    path = tmp_path / f"parking_tags_{year}.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(f"Parking_Tags_Data_{year}.csv", HEADER + "\n".join(rows) + "\n")
+    return path
+
+
+@pytest.mark.parametrize("engine", ["columnar", "rows"])
+def test_parallel_load_matches_sequential_load(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, engine: str) -> None:
+    monkeypatch.setenv("PARKING_TICKETS_LOCATION_LOOKUP", str(tmp_path / "missing.geojson"))
+    monkeypatch.setenv("PARKING_TICKETS_DISABLE_GEOCODER", "1")
+    monkeypatch.setenv("PARKING_TICKETS_CSV_ENGINE", engine)
+    monkeypatch.setenv("PARKING_TICKETS_CSV_CHUNK_ROWS", "2")
+    monkeypatch.setenv("PARKING_TICKETS_CHECKPOINT_ROWS", "3")
+    descriptors = [
+        {"name": "2022", "year": 2022, "path": yearly_archive(tmp_path, 2022, 5), "hash": "h2022"},
+        {"name": "2023", "year": 2023, "path": yearly_archive(tmp_path, 2023, 4, undated=2), "hash": "h2023"},
+    ]
+    columns: List[str] = []
+
+    def fake_copy_batches(conn, table, batch_columns, batches, **kwargs) -> int:
+        columns[:] = batch_columns
+        rows = [row for batch in batches for row in iter_batch_rows(batch, batch_columns)]
+        conn.db.staging[table].extend(rows)
+        return len(rows)
+
+    def fake_merge_year(conn, year: int, staging_table: str) -> int:
+        date_index = columns.index("date_of_infraction")
+        staged = conn.db.staging[staging_table]
+        conn.db.tickets.extend(row for row in staged if row[date_index])
+        return sum(1 for row in staged if not row[date_index])
+
+    monkeypatch.setattr(parking_tickets, "copy_batches", fake_copy_batches)
+    monkeypatch.setattr(parking_tickets, "ProcessPoolExecutor", InlineExecutor)
+
+    def run(parallel: bool):
+        db = FakeDatabase()
+        monkeypatch.setattr(PostgresClient, "connect", lambda client, **kwargs: nullcontext(db.connect(client)))
+        pg = PostgresClient("postgresql://etl@127.0.0.1:9/parking", pooled=True, application_name="etl")
+        loader = ParkingTicketsETL.for_staging(SimpleNamespace(slug="parking_tickets"), pg)
+        monkeypatch.setattr(loader, "_merge_year", fake_merge_year)
+        if parallel:
+            checkpoints = loader._load_years_parallel(descriptors, workers=2)
+        else:
+            checkpoints = {
+                descriptor["name"]: loader._load_resource_year(descriptor["year"], descriptor["path"], descriptor["hash"])
+                for descriptor in descriptors
+            }
+        return db, checkpoints
+
+    sequential_db, sequential = run(parallel=False)
+    parallel_db, parallel = run(parallel=True)
+
+    assert {name: asdict(checkpoint) for name, checkpoint in parallel.items()} == {
+        name: asdict(checkpoint) for name, checkpoint in sequential.items()
+    }
+    # Undated source rows are dropped while parsing, on either path.
+    assert {name: (c.rows_staged, c.rows_loaded, c.status) for name, c in parallel.items()} == {
+        "2022": (5, 5, "merged"),
+        "2023": (4, 4, "merged"),
+    }
+    assert sorted(parallel_db.tickets) == sorted(sequential_db.tickets)
+    assert len(parallel_db.tickets) == 9
+    assert parallel_db.checkpoints == sequential_db.checkpoints
+    assert parallel_db.staging == {} and sequential_db.staging == {}
+    # Workers stage over their own unpooled client; merges stay on the loader's.
+    assert "etl-worker" in parallel_db.clients and "etl-worker" not in sequential_db.clients
+
+
+@pytest.mark.parametrize(("resume_rows", "positions"), [(0, [2, 4, 5]), (3, [5]), (5, [])])
+def test_engines_resume_at_the_same_record_across_multiline_fields(
+    loader: ParkingTicketsETL, tmp_path: Path, resume_rows: int, positions: List[int]
+) -> None:
+    member = "Parking_Tags_Data_2023.000.csv"
+    rows = [f"A{index:02d},20230105,29,PARK PROHIBITED,30,0930,NR,KING ST W,," for index in range(5)]
+    # One record, three physical lines.
+    rows[1] = 'A01,20230105,29,"PARK\nPROHIBITED\nAREA",30,0930,NR,KING ST W,,'
+    path = tmp_path / "parking_tags_2023.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(member, HEADER + "\n".join(rows) + "\n")
+
+    chunks = list(loader._iter_archive_chunks(path, member, resume_rows))
+
+    assert [(name, consumed) for name, consumed, _ in chunks] == [(member, position) for position in positions]
+    tickets = [row[1] for _, _, batch in chunks for row in iter_batch_rows(batch, parking_tickets.STAGING_COLUMNS)]
+    assert tickets == [f"A{index:02d}" for index in range(resume_rows, 5)]
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional
+
+import pytest
+
+from src.etl.parking_partitions import (
+    PARKING_TICKET_COLUMNS,
+    PARKING_TICKETS_DDL,
+    index_definition_for,
+    partition_name,
+    swap_year_partition,
+)
+from src.tiles.schema import BASE_POINT_TABLES, TileSchemaManager
+
+
+class FakeResult:
+    def __init__(self, rows: list[tuple]) -> None:
+        self.rows = rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeTable:
+    def __init__(self, kind: str, columns: List[str], *, parent: Optional[str] = None) -> None:
+        self.kind = kind
+        self.columns = list(columns)
+        self.parent = parent
+        # Rows with ``geom`` but no projection yet.
+        self.unprojected = False
+
+
+class FakeCatalog:
+    """Enough of the Postgres catalog to follow DDL issued against ``parking_tickets``.
+
+    Serves both the connection API used by the partition helpers and the
+    ``PostgresClient`` API used by ``TileSchemaManager``.
+    """
+
+    def __init__(self) -> None:
+        self.tables: Dict[str, FakeTable] = {}
+        self.statements: List[str] = []
+
+    # Layouts -----------------------------------------------------------
+    @classmethod
+    def partitioned(cls, *years: int, tile_columns: bool = True) -> "FakeCatalog":
+        catalog = cls()
+        columns = [
+            column for column in PARKING_TICKET_COLUMNS if tile_columns or column not in ("geom_3857", "tile_qk_prefix")
+        ]
+        catalog.tables["parking_tickets"] = FakeTable("p", columns)
+        for year in years:
+            catalog.tables[partition_name(year)] = FakeTable("r", columns, parent="parking_tickets")
+        for meta in BASE_POINT_TABLES[1:]:
+            catalog.tables[meta["table"]] = FakeTable("r", ["geom", "geom_3857", "tile_qk_prefix"])
+        return catalog
+
+    def partitions(self) -> List[str]:
+        return sorted(name for name, table in self.tables.items() if table.parent == "parking_tickets")
+
+    # Connection API ------------------------------------------------------
+    def execute(self, sql: str, params=None) -> FakeResult:
+        statement = " ".join(sql.split())
+        self.statements.append(statement)
+        return FakeResult(self._apply(statement, params))
+
+    def commit(self) -> None:
+        pass
+
+    # PostgresClient API --------------------------------------------------
+    def ensure_extensions(self) -> None:
+        pass
+
+    def fetch_one(self, sql: str, params=None) -> tuple | None:
+        return self.execute(sql, params).fetchone()
+
+    def fetch_all(self, sql: str, params=None) -> list[tuple]:
+        return self.execute(sql, params).fetchall()
+
+    # ---------------------------------------------------------------------
+    def _apply(self, statement: str, params) -> list[tuple]:
+        unquoted = statement.replace('"', "")
+        if "FROM pg_inherits" in statement:
+            table = self.tables.get(params[0])
+            return [(1,)] if table is not None and table.parent == "parking_tickets" else []
+        if "pg_get_indexdef" in statement:
+            return [("CREATE INDEX parking_tickets_geom_idx ON ONLY public.parking_tickets USING gist (geom)",)]
+        if "FROM pg_class" in statement:
+            table = self.tables.get(params[0])
+            return [(table.kind,)] if table is not None else []
+        if "FROM information_schema.columns" in statement and len(params) == 2:
+            table = self.tables.get(params[0])
+            return [(1,)] if table is not None and params[1] in table.columns else []
+        if "FROM information_schema" in statement or "FROM pg_indexes" in statement:
+            return []
+        if unquoted.startswith("SELECT EXISTS"):
+            table = self.tables[re.search(r"FROM (\w+)", unquoted).group(1)]
+            if "IS NULL" in unquoted:
+                return [(table.unprojected,)]
+            column = re.search(r"WHERE (\w+) IS NOT NULL", unquoted).group(1)
+            return [(column in table.columns and not table.unprojected,)]
+
+        match = re.match(r"CREATE TABLE (\w+) \(LIKE (\w+)", unquoted)
+        if match:
+            self.tables[match.group(1)] = FakeTable("r", self.tables[match.group(2)].columns)
+            return []
+        match = re.match(r"CREATE TABLE (\w+) AS .* FROM (\w+)", unquoted)
+        if match:
+            self.tables[match.group(1)] = FakeTable("r", self.tables[match.group(2)].columns)
+            return []
+        match = re.match(r"DROP TABLE (?:IF EXISTS )?(\w+)", unquoted)
+        if match:
+            dropped = match.group(1)
+            if self.tables.pop(dropped, None) is not None and unquoted.endswith("CASCADE"):
+                for name in [name for name, table in self.tables.items() if table.parent == dropped]:
+                    del self.tables[name]
+            return []
+        match = re.match(r"ALTER TABLE (?:IF EXISTS )?(\w+) (.*)", unquoted)
+        if match and match.group(1) in self.tables:
+            self._alter(match.group(1), match.group(2))
+            return []
+        match = re.match(r"UPDATE (\w+)", unquoted)
+        if match:
+            table = self.tables[match.group(1)]
+            table.unprojected = False
+            for partition in self.tables.values():
+                if partition.parent == match.group(1):
+                    partition.unprojected = False
+        return []
+
+    def _alter(self, name: str, action: str) -> None:
+        match = re.match(r"RENAME TO (\w+)", action)
+        if match:
+            self.tables[match.group(1)] = self.tables.pop(name)
+            for table in self.tables.values():
+                if table.parent == name:
+                    table.parent = match.group(1)
+            return
+        match = re.match(r"ADD COLUMN IF NOT EXISTS (\w+)", action)
+        if match:
+            for table in [self.tables[name], *(t for t in self.tables.values() if t.parent == name)]:
+                if match.group(1) not in table.columns:
+                    table.columns.append(match.group(1))
+            return
+        match = re.match(r"DETACH PARTITION (\w+)", action)
+        if match:
+            self.tables[match.group(1)].parent = None
+            return
+        match = re.match(r"ATTACH PARTITION (\w+)", action)
+        if match:
+            assert self.tables[match.group(1)].columns == self.tables[name].columns
+            self.tables[match.group(1)].parent = name
+
+
+def test_index_definitions_are_rebuilt_on_the_build_table() -> None:
+    definition = "CREATE INDEX parking_tickets_geom_idx ON ONLY public.parking_tickets USING gist (geom)"
+    assert index_definition_for(definition, "parking_tickets_y2023_load") == (
+        "CREATE INDEX ON parking_tickets_y2023_load USING gist (geom)"
+    )
+
+
+def test_partitioned_table_declares_the_tile_columns() -> None:
+    for column in ("geom_3857", "tile_qk_prefix"):
+        assert column in PARKING_TICKET_COLUMNS
+        assert re.search(rf"\b{column}\b", PARKING_TICKETS_DDL)
+
+
+def test_swap_builds_before_detaching_and_attaches_with_year_bounds() -> None:
+    catalog = FakeCatalog.partitioned(2022, 2023)
+    populated: list[tuple[str, str | None, list[str]]] = []
+    swap_year_partition(
+        catalog,
+        2023,
+        lambda conn, build, previous: populated.append((build, previous, list(conn.tables[build].columns))),
+    )
+
+    assert partition_name(2023) == "parking_tickets_y2023"
+    build, previous, build_columns = populated[0]
+    assert (build, previous) == ("parking_tickets_y2023_load", "parking_tickets_y2023")
+    assert {"geom_3857", "tile_qk_prefix"} <= set(build_columns)
+    statements = catalog.statements
+    detach = statements.index("ALTER TABLE parking_tickets DETACH PARTITION parking_tickets_y2023")
+    assert statements.index("CREATE INDEX ON parking_tickets_y2023_load USING gist (geom)") < detach
+    assert (
+        "ALTER TABLE parking_tickets ATTACH PARTITION parking_tickets_y2023 "
+        "FOR VALUES FROM ('2023-01-01') TO ('2024-01-01')"
+    ) in statements[detach:]
+    assert catalog.partitions() == ["parking_tickets_y2022", "parking_tickets_y2023"]
+
+
+def test_first_load_of_a_year_has_no_previous_partition() -> None:
+    catalog = FakeCatalog.partitioned(2010)
+    populated: list[str | None] = []
+    swap_year_partition(catalog, 2009, lambda _conn, _build, previous: populated.append(previous))
+    assert populated == [None]
+    assert not any("DETACH" in statement for statement in catalog.statements)
+    assert catalog.partitions() == ["parking_tickets_y2009", "parking_tickets_y2010"]
+
+
+@pytest.mark.parametrize("tile_columns", [True, False])
+def test_tile_schema_ensure_keeps_the_partitioned_table(tile_columns: bool) -> None:
+    catalog = FakeCatalog.partitioned(2022, 2023, tile_columns=tile_columns)
+    # A year swapped in before the manager ever ran, plus rows written without a projection.
+    swap_year_partition(catalog, 2024, lambda *_: None)
+    catalog.tables["parking_tickets"].unprojected = True
+
+    TileSchemaManager(catalog).ensure(include_tile_tables=False)
+
+    parent = catalog.tables["parking_tickets"]
+    assert parent.kind == "p"
+    assert catalog.partitions() == ["parking_tickets_y2022", "parking_tickets_y2023", "parking_tickets_y2024"]
+    assert {"geom_3857", "tile_qk_prefix"} <= set(parent.columns)
+    assert not parent.unprojected
+    assert not any("parking_tickets__geom_refresh" in statement for statement in catalog.statements)
+    assert "CREATE INDEX IF NOT EXISTS parking_tickets_tile_qk_prefix_idx ON parking_tickets (tile_qk_prefix);" in (
+        catalog.statements
+    )
+
+    with pytest.raises(RuntimeError):
+        TileSchemaManager(catalog)._rebuild_base_table(BASE_POINT_TABLES[0])
+    assert catalog.tables["parking_tickets"].kind == "p"
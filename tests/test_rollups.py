@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from src.etl.rollups import CellRange, rollup_cell
+
+
+def test_interior_cells_exclude_partially_covered_edges() -> None:
+    west, south, east, north = -79.42, 43.63, -79.36, 43.67
+    interior = CellRange.interior(west, south, east, north)
+    assert interior is not None
+
+    west_cell, south_cell = rollup_cell(west, south)
+    east_cell, north_cell = rollup_cell(east, north)
+    assert interior.min_x == west_cell + 1
+    assert interior.min_y == south_cell + 1
+    assert interior.max_x == east_cell - 1
+    assert interior.max_y == north_cell - 1
+
+    centre_x, centre_y = rollup_cell(-79.39, 43.65)
+    assert interior.min_x <= centre_x <= interior.max_x
+    assert interior.min_y <= centre_y <= interior.max_y
+
+
+def test_small_viewport_has_no_interior_cells() -> None:
+    assert CellRange.interior(-79.3801, 43.6501, -79.3799, 43.6503) is None
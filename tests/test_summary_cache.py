@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from src.summary_cache import SnappedBounds, SummaryCache
+from src.tiles.cache import TileMemoryCache
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[tuple[str, ...], bytes] = {}
+
+    def get(self, *parts: str) -> bytes | None:
+        return self.values.get(parts)
+
+    def set(self, value: bytes, *parts: str, ttl: int | None = None) -> None:
+        self.values[parts] = value
+
+
+def test_nearby_viewports_snap_to_the_same_grid() -> None:
+    bounds = {"west": -79.3901, "south": 43.6441, "east": -79.3702, "north": 43.6539}
+    first = SnappedBounds.from_bounds(bounds, 15.2)
+    assert first.zoom == 17
+
+    snapped = first.to_bounds()
+    assert snapped["west"] <= bounds["west"] and snapped["east"] >= bounds["east"]
+    assert snapped["south"] <= bounds["south"] and snapped["north"] >= bounds["north"]
+
+    nudged = {
+        "west": snapped["west"] + 1e-6,
+        "south": snapped["south"] + 1e-6,
+        "east": snapped["east"] - 1e-6,
+        "north": snapped["north"] - 1e-6,
+    }
+    assert SnappedBounds.from_bounds(nudged, 15.8) == first
+
+
+def test_summary_cache_tiers_and_data_version() -> None:
+    redis = FakeRedis()
+    versions = {"parking_tickets": "v1"}
+    cache = SummaryCache(
+        redis,  # type: ignore[arg-type]
+        TileMemoryCache(1024 * 1024),
+        lambda dataset: versions[dataset],
+        version_check_interval_seconds=0,
+    )
+    snapped = SnappedBounds(17, 1, 2, 3, 4)
+    filters = {"year": 2023, "month": None}
+    calls: list[int] = []
+
+    def compute() -> dict:
+        calls.append(1)
+        return {"visibleCount": len(calls)}
+
+    assert cache.get_or_compute("parking_tickets", snapped, filters, compute) == {"visibleCount": 1}
+    assert cache.get_or_compute("parking_tickets", snapped, filters, compute) == {"visibleCount": 1}
+    cache.memory.clear()
+    assert cache.get_or_compute("parking_tickets", snapped, filters, compute) == {"visibleCount": 1}
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["redis_hits"] == 1
+
+    versions["parking_tickets"] = "v2"
+    assert cache.get_or_compute("parking_tickets", snapped, filters, compute) == {"visibleCount": 2}
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from src.tiles.cache import TileMemoryCache, TwoTierTileCache, tile_ttl_seconds
+from src.tiles.invalidation import TileVersion, tile_in_prefixes
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[tuple[str, ...], bytes] = {}
+        self.gets = 0
+
+    def get(self, *parts: str) -> bytes | None:
+        self.gets += 1
+        return self.values.get(parts)
+
+    def mget(self, keys):
+        return [self.values.get(tuple(parts)) for parts in keys]
+
+    def set(self, value: bytes, *parts: str, ttl: int | None = None) -> None:
+        self.values[parts] = value
+
+    def set_many(self, items, *, ttl: int | None = None) -> None:
+        for parts, value in items:
+            self.values[tuple(parts)] = value
+
+
+def test_tile_ttl_tiers_match_readme() -> None:
+    assert tile_ttl_seconds(8) == 24 * 3600
+    assert tile_ttl_seconds(12) == 2 * 3600
+    assert tile_ttl_seconds(15) == 600
+
+
+def test_memory_cache_evicts_least_recently_used_by_bytes() -> None:
+    cache = TileMemoryCache(max_bytes=10)
+    cache.put(("parking_tickets", 14, 1, 1, ""), b"aaaa", 60)
+    cache.put(("parking_tickets", 14, 1, 2, ""), b"bbbb", 60)
+    assert cache.get(("parking_tickets", 14, 1, 1, "")) == b"aaaa"
+    cache.put(("parking_tickets", 14, 1, 3, ""), b"cccc", 60)
+
+    assert cache.get(("parking_tickets", 14, 1, 2, "")) is None
+    assert cache.get(("parking_tickets", 14, 1, 3, "")) == b"cccc"
+    stats = cache.stats()
+    assert stats["bytes"] == 8
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def _publish(redis: FakeRedis, version: int, key_version: int, prefixes: tuple[str, ...], full: bool = False) -> None:
+    payload = TileVersion("parking_tickets", version, key_version, prefixes, full).to_payload()
+    redis.values[("version", "parking_tickets")] = payload
+
+
+def test_two_tier_cache_serves_memory_hits_and_drops_on_version_bump() -> None:
+    redis = FakeRedis()
+    cache = TwoTierTileCache.with_budget(redis, max_megabytes=1, version_check_interval_seconds=0)  # type: ignore[arg-type]
+    redis.values[("parking_tickets", "v0", "14", "4577", "5980")] = b"tile-v1"
+
+    assert cache.get("parking_tickets", 14, 4577, 5980) == b"tile-v1"
+    redis.values[("parking_tickets", "v0", "14", "4577", "5980")] = b"tile-v2"
+    assert cache.get("parking_tickets", 14, 4577, 5980) == b"tile-v1"
+
+    _publish(redis, 1, 1, (), full=True)
+    redis.values[("parking_tickets", "v1", "14", "4577", "5980")] = b"tile-v3"
+    assert cache.get("parking_tickets", 14, 4577, 5980) == b"tile-v3"
+    assert cache.memory.stats()["invalidations"] == 1
+
+
+def test_two_tier_cache_drops_only_changed_prefixes() -> None:
+    redis = FakeRedis()
+    _publish(redis, 1, 1, ())
+    cache = TwoTierTileCache.with_budget(redis, max_megabytes=1, version_check_interval_seconds=0)  # type: ignore[arg-type]
+    cache.set("parking_tickets", 14, 4577, 5980, b"changed")
+    cache.set("parking_tickets", 14, 0, 0, b"untouched")
+    assert ("parking_tickets", "v1", "14", "4577", "5980") in redis.values
+
+    _publish(redis, 2, 1, ("0302231",))
+    cache.get("parking_tickets", 14, 0, 0)
+
+    assert cache.memory.stats()["invalidations"] == 1
+    assert cache.memory.get(("parking_tickets", 14, 0, 0, "")) == b"untouched"
+    assert cache.memory.get(("parking_tickets", 14, 4577, 5980, "")) is None
+
+
+def test_tile_in_prefixes_matches_ancestors_and_descendants() -> None:
+    assert tile_in_prefixes(14, 4577, 5980, ("0302231",))
+    assert tile_in_prefixes(3, 2, 2, ("0302231",))
+    assert tile_in_prefixes(0, 0, 0, ("1",))
+    assert not tile_in_prefixes(14, 0, 0, ("0302231",))
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import gzip
+
+from src.tiles.encoding import (
+    ENCODING_GZIP,
+    ENCODING_IDENTITY,
+    EncodedTile,
+    available_encodings,
+    etag_matches,
+    negotiate_encoding,
+    pack_variant,
+    unpack_variant,
+    variant_etag,
+)
+
+
+def test_encoded_tile_variants_round_trip_with_stable_etag() -> None:
+    raw = b"\x1a\x02mvt" * 100
+    first = EncodedTile.from_raw(raw)
+    second = EncodedTile.from_raw(raw)
+
+    assert first.etag == second.etag
+    assert first.variants == second.variants
+    assert set(first.variants) == set(available_encodings())
+    assert gzip.decompress(first.variants[ENCODING_GZIP]) == raw
+    assert first.body_for(ENCODING_IDENTITY) == raw
+
+
+def test_pack_and_unpack_variant() -> None:
+    tile = EncodedTile.from_raw(b"tile")
+    envelope = pack_variant(tile.etag, tile.variants[ENCODING_GZIP])
+
+    assert unpack_variant(envelope) == (tile.etag, tile.variants[ENCODING_GZIP])
+    assert unpack_variant(b"legacy-raw-bytes") is None
+
+
+def test_negotiate_encoding_honours_quality_values() -> None:
+    preferred = available_encodings()[0]
+    assert negotiate_encoding("gzip, deflate, br") == preferred
+    assert negotiate_encoding("br;q=0, gzip") == ENCODING_GZIP
+    assert negotiate_encoding("identity") == ENCODING_IDENTITY
+    assert negotiate_encoding(None) == ENCODING_IDENTITY
+
+
+def test_etag_matches_weak_and_list_values() -> None:
+    assert etag_matches('W/"abc", "def"', "def")
+    assert etag_matches('"abc"', "abc")
+    assert etag_matches("*", "abc")
+    assert not etag_matches('"abc"', "def")
+
+
+def test_each_encoding_has_its_own_etag() -> None:
+    tile = EncodedTile.from_raw(b"\x1a\x02mvt" * 10)
+    encodings = (*available_encodings(), ENCODING_IDENTITY)
+    etags = {encoding: tile.etag_for(encoding) for encoding in encodings}
+
+    assert len(set(etags.values())) == len(encodings)
+    assert etags[ENCODING_GZIP] == f"{tile.etag}-gz"
+    assert variant_etag(tile.etag, "br") == f"{tile.etag}-br"
+    assert etags[ENCODING_IDENTITY] == tile.etag
+    for encoding, etag in etags.items():
+        assert etag_matches(f'"{etag}"', etag)
+        assert etag_matches(f'W/"{etag}"', etag)
+        others = [other for other in etags.values() if other != etag]
+        assert not any(etag_matches(f'"{other}"', etag) for other in others), encoding
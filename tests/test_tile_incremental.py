@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import pytest
+
+from src.tiles.schema import PARKING_TILE_FEATURE_KEY_SQL, TileSchemaManager
+
+
+class FakeResult:
+    def __init__(self, rows: Optional[List[tuple]] = None, rowcount: int = 0) -> None:
+        self.rows = rows or []
+        self.rowcount = rowcount
+
+    def fetchall(self) -> List[tuple]:
+        return self.rows
+
+
+class FakeTileStore:
+    """Follows the statements ``_refresh_tile_features`` issues against one tile table.
+
+    ``source`` maps a feature to the tile prefixes its current base rows would
+    produce; tile rows are ``(dataset, feature_id, tile_qk_prefix)`` tuples.
+    """
+
+    def __init__(
+        self,
+        tiles: List[Tuple[str, str, str]],
+        dirty: List[Tuple[str, str]],
+        source: Dict[str, List[str]],
+    ) -> None:
+        self.tiles = list(tiles)
+        self.dirty = list(dirty)
+        self.source = source
+        self.tmp_dirty: Set[str] = set()
+        self.tmp_rows: List[Tuple[str, str, str]] = []
+        self.statements: List[str] = []
+
+    # PostgresClient API --------------------------------------------------
+    def execute(self, sql: str, params=None) -> None:
+        self.statements.append(" ".join(sql.split()))
+
+    @contextmanager
+    def connect(self) -> Iterator["FakeTileConnection"]:
+        yield FakeTileConnection(self)
+
+    # Connection API ------------------------------------------------------
+    def run(self, sql: str, params=None) -> FakeResult:
+        statement = " ".join(sql.split())
+        self.statements.append(statement)
+        if statement.startswith("CREATE TEMP TABLE tmp_dirty_features"):
+            self.tmp_dirty = set()
+            return FakeResult()
+        if statement.startswith("WITH claimed AS ( DELETE FROM tile_dirty_features"):
+            claimed = {feature for dataset, feature in self.dirty if dataset == params[0]}
+            self.dirty = [(dataset, feature) for dataset, feature in self.dirty if dataset != params[0]]
+            self.tmp_dirty = claimed
+            return FakeResult(rowcount=len(claimed))
+        if statement.startswith("CREATE TEMP TABLE tmp_tile_rows"):
+            # Only the dirty-only select may feed the refresh.
+            assert "IN (SELECT feature_id FROM tmp_dirty_features)" in statement
+            self.tmp_rows = [
+                ("parking_tickets", feature, prefix)
+                for feature in sorted(self.tmp_dirty)
+                for prefix in self.source.get(feature, [])
+            ]
+            return FakeResult()
+        if statement.startswith("SELECT LEFT(tile_qk_prefix"):
+            length = int(statement.split("LEFT(tile_qk_prefix, ")[1].split(")")[0])
+            prefixes = {
+                prefix[:length]
+                for dataset, feature, prefix in self.tiles
+                if dataset == params[0] and feature in self.tmp_dirty
+            }
+            prefixes |= {prefix[:length] for _, _, prefix in self.tmp_rows}
+            return FakeResult([(prefix,) for prefix in prefixes])
+        if statement.startswith("DELETE FROM parking_ticket_tiles"):
+            kept = [row for row in self.tiles if not (row[0] == params[0] and row[1] in self.tmp_dirty)]
+            deleted = len(self.tiles) - len(kept)
+            self.tiles = kept
+            return FakeResult(rowcount=deleted)
+        if statement.startswith("INSERT INTO parking_ticket_tiles"):
+            assert statement.endswith("SELECT * FROM tmp_tile_rows")
+            self.tiles.extend(self.tmp_rows)
+            return FakeResult(rowcount=len(self.tmp_rows))
+        return FakeResult()
+
+
+class FakeTileConnection:
+    def __init__(self, store: FakeTileStore) -> None:
+        self.store = store
+
+    def execute(self, sql: str, params=None) -> FakeResult:
+        return self.store.run(sql, params)
+
+
+@pytest.fixture()
+def manager(monkeypatch: pytest.MonkeyPatch):
+    recorded: List[List[str]] = []
+    manager = TileSchemaManager(pg=None)  # type: ignore[arg-type]
+
+    def record(table_name: str, dataset_name: str, *, prefixes: Optional[List[str]] = None) -> str:
+        recorded.append(list(prefixes or []))
+        return "version"
+
+    monkeypatch.setattr(manager, "_record_tile_version", record)
+    return manager, recorded
+
+
+def refresh(manager: TileSchemaManager, store: FakeTileStore):
+    manager.pg = store  # type: ignore[assignment]
+    return manager._refresh_tile_features(
+        "parking_ticket_tiles",
+        "parking_tickets",
+        "parking_tickets",
+        PARKING_TILE_FEATURE_KEY_SQL,
+        manager._parking_tile_select(dirty_only=True),
+    )
+
+
+def test_refresh_rewrites_only_the_dirty_features_and_drains_the_queue(manager) -> None:
+    manager, recorded = manager
+    untouched = [
+        ("parking_tickets", "street:KING ST W", "0302231112003101"),
+        ("parking_tickets", "street:QUEEN ST E", "0302231112003320"),
+        ("red_light_locations", "street:BAY ST", "0302231112003102"),
+    ]
+    store = FakeTileStore(
+        tiles=[*untouched, ("parking_tickets", "street:YONGE ST", "0302231112010000")],
+        dirty=[
+            ("parking_tickets", "street:YONGE ST"),
+            ("parking_tickets", "street:YONGE ST"),
+            ("parking_tickets", "street:BLOOR ST W"),
+            ("red_light_locations", "street:BAY ST"),
+        ],
+        source={
+            # New data for a clean feature must not be picked up.
+            "street:KING ST W": ["0302231112999999"],
+            "street:YONGE ST": ["0302231112011111", "0302231112011112"],
+            "street:BLOOR ST W": ["0302231101000000"],
+        },
+    )
+
+    version = refresh(manager, store)
+
+    assert version == "version"
+    assert sorted(store.tiles) == sorted(
+        [
+            *untouched,
+            ("parking_tickets", "street:YONGE ST", "0302231112011111"),
+            ("parking_tickets", "street:YONGE ST", "0302231112011112"),
+            ("parking_tickets", "street:BLOOR ST W", "0302231101000000"),
+        ]
+    )
+    # Only the parking queue is drained.
+    assert store.dirty == [("red_light_locations", "street:BAY ST")]
+    # Old and new prefixes of the refreshed features, at the invalidation length.
+    assert recorded == [["0302231101", "0302231112"]]
+    assert any(
+        statement.startswith("CREATE INDEX IF NOT EXISTS parking_tickets_tile_feature_idx")
+        for statement in store.statements
+    )
+
+
+def test_refresh_without_dirty_features_leaves_the_table_alone(manager) -> None:
+    manager, recorded = manager
+    tiles = [("parking_tickets", "street:KING ST W", "0302231112003101")]
+    store = FakeTileStore(tiles=tiles, dirty=[], source={"street:KING ST W": ["0302231112999999"]})
+
+    assert refresh(manager, store) is None
+    assert store.tiles == tiles
+    assert recorded == []
+    assert not any(statement.startswith("DELETE FROM parking_ticket_tiles") for statement in store.statements)
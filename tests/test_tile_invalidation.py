@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pytest
+
+from src.tiles.invalidation import (
+    TileVersion,
+    load_tile_version,
+    publish_tile_version,
+    purge_changed_tiles,
+    tile_cache_from_env,
+)
+from src.tiles.schema import TileSchemaManager
+from src.tiles.service import _quadkey_prefix_from_tile
+
+
+NAMESPACE = "toronto:tiles:tiles"
+# Downtown tile, a neighbour outside its level-10 prefix, and their z8 ancestor.
+CHANGED = (14, 4577, 5980)
+UNCHANGED = (14, 4609, 5980)
+ANCESTOR = (8, 71, 93)
+
+
+class FakeRedis:
+    """Raw-key store with the scan/delete surface ``RedisCache`` exposes."""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, bytes] = {}
+
+    def build_key(self, *parts: str) -> str:
+        return ":".join([NAMESPACE, *parts])
+
+    def get(self, *parts: str) -> Optional[bytes]:
+        return self.values.get(self.build_key(*parts))
+
+    def set_persistent(self, value: bytes, *parts: str) -> None:
+        self.values[self.build_key(*parts)] = value
+
+    def iter_keys(self, *parts: str, count: int = 1000):
+        root = self.build_key(*parts) + ":"
+        return iter([key.encode("utf-8") for key in list(self.values) if key.startswith(root)])
+
+    def delete_keys(self, keys: Sequence[str | bytes]) -> int:
+        deleted = 0
+        for key in keys:
+            deleted += self.values.pop(key.decode("utf-8") if isinstance(key, bytes) else key, None) is not None
+        return deleted
+
+    def put_tile(self, key_version: int, coords: Tuple[int, int, int], variant: str = "") -> str:
+        parts = ["parking_tickets", f"v{key_version}", *map(str, coords)]
+        if variant:
+            parts.append(variant)
+        key = self.build_key(*parts)
+        self.values[key] = b"tile"
+        return key
+
+
+class FakePG:
+    def __init__(self, blob_rows: List[Tuple[int, int, int]]) -> None:
+        self.blob_rows = blob_rows
+        self.executed: List[Tuple[str, Any]] = []
+
+    def fetch_all(self, sql: str, params=None) -> List[tuple]:
+        return list(self.blob_rows)
+
+    def execute(self, sql: str, params=None) -> int:
+        self.executed.append((" ".join(sql.split()), params))
+        return len(params[0]) if "unnest" in sql else len(self.blob_rows)
+
+
+def changed_version(*, full: bool = False) -> TileVersion:
+    prefix = _quadkey_prefix_from_tile(*CHANGED)[:10]
+    assert not _quadkey_prefix_from_tile(*UNCHANGED).startswith(prefix)
+    assert prefix.startswith(_quadkey_prefix_from_tile(*ANCESTOR))
+    return TileVersion("parking_tickets", 7, 2, (prefix,), full)
+
+
+def test_published_version_is_what_workers_load() -> None:
+    redis = FakeRedis()
+    version = changed_version()
+
+    publish_tile_version(redis, version)  # type: ignore[arg-type]
+
+    assert load_tile_version(redis, "parking_tickets") == version  # type: ignore[arg-type]
+    assert load_tile_version(redis, "ase_locations") is None  # type: ignore[arg-type]
+
+
+def test_purge_evicts_only_tiles_under_the_changed_prefixes() -> None:
+    redis = FakeRedis()
+    stale = [redis.put_tile(2, CHANGED), redis.put_tile(2, CHANGED, "gzip"), redis.put_tile(2, ANCESTOR)]
+    kept = [redis.put_tile(2, UNCHANGED), redis.put_tile(1, CHANGED)]
+    pg = FakePG([CHANGED, UNCHANGED, ANCESTOR])
+
+    purged = purge_changed_tiles(pg, redis, changed_version(), batch_size=2)  # type: ignore[arg-type]
+
+    assert purged == {"redis_keys": 3, "blob_rows": 2}
+    assert sorted(redis.values) == sorted(kept)
+    assert not any(key in redis.values for key in stale)
+    sql, params = pg.executed[0]
+    assert sql.startswith("DELETE FROM public.tile_blob_cache AS cache USING unnest")
+    assert sorted(zip(params[0], params[1], params[2])) == sorted([CHANGED, ANCESTOR])
+    assert params[3] == "parking_tickets"
+
+
+def test_full_rebuild_clears_the_blob_cache_and_leaves_redis_to_expire() -> None:
+    redis = FakeRedis()
+    redis.put_tile(2, CHANGED)
+    pg = FakePG([CHANGED, UNCHANGED])
+
+    purged = purge_changed_tiles(pg, redis, changed_version(full=True))  # type: ignore[arg-type]
+
+    assert purged == {"redis_keys": 0, "blob_rows": 2}
+    assert pg.executed == [("DELETE FROM public.tile_blob_cache WHERE dataset = %s", ("parking_tickets",))]
+    assert len(redis.values) == 1
+
+
+@pytest.mark.parametrize("include_tile_tables", [True, False])
+def test_ensure_publishes_and_purges_rebuilt_tile_versions(
+    monkeypatch: pytest.MonkeyPatch, include_tile_tables: bool
+) -> None:
+    redis = FakeRedis()
+    redis.put_tile(2, CHANGED)
+    pg = FakePG([CHANGED])
+    manager = TileSchemaManager(pg, tile_cache=redis)  # type: ignore[arg-type]
+    monkeypatch.setattr(manager, "ensure_helpers", lambda: None)
+    monkeypatch.setattr(manager, "_ensure_base_columns", lambda: None)
+    monkeypatch.setattr(
+        manager, "_ensure_tile_tables", lambda *, incremental: manager.tile_versions.append(changed_version())
+    )
+
+    manager.ensure(include_tile_tables=include_tile_tables)
+
+    if include_tile_tables:
+        assert load_tile_version(redis, "parking_tickets") == changed_version()  # type: ignore[arg-type]
+        assert list(redis.values) == [redis.build_key("version", "parking_tickets")]
+        assert len(pg.executed) == 1
+    else:
+        assert load_tile_version(redis, "parking_tickets") is None  # type: ignore[arg-type]
+        assert pg.executed == []
+
+
+def test_tile_cache_from_env_matches_the_api_workers(monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in ("REDIS_URL", "REDIS_PUBLIC_URL", "REDIS_CONNECTION"):
+        monkeypatch.delenv(name, raising=False)
+    assert tile_cache_from_env() is None
+
+    monkeypatch.setenv("REDIS_PUBLIC_URL", "redis://127.0.0.1:9/0")
+    monkeypatch.setenv("REDIS_DEFAULT_TTL", "120")
+    monkeypatch.setenv("REDIS_NAMESPACE", "staging")
+    cache = tile_cache_from_env()
+
+    assert cache is not None
+    assert cache.url == "redis://127.0.0.1:9/0"
+    assert cache.default_ttl_seconds == 120
+    assert cache.namespace == "staging:tiles"
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from src.tiles.singleflight import RedisSingleFlight, SingleFlight
+
+
+class FakeLockCache:
+    def __init__(self) -> None:
+        self.locks: dict[tuple[str, ...], str] = {}
+        self.values: dict[tuple[str, ...], bytes] = {}
+
+    def acquire_lock(self, *parts: str, ttl_ms: int) -> str | None:
+        if parts in self.locks:
+            return None
+        self.locks[parts] = "token"
+        return "token"
+
+    def release_lock(self, token: str, *parts: str) -> None:
+        if self.locks.get(parts) == token:
+            del self.locks[parts]
+
+    def set(self, value: bytes, *parts: str, ttl: int | None = None) -> None:
+        self.values[parts] = value
+
+    def exists(self, *parts: str) -> bool:
+        return parts in self.locks or parts in self.values
+
+
+def test_single_flight_coalesces_concurrent_callers() -> None:
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls: list[int] = []
+
+    def render() -> bytes:
+        calls.append(1)
+        started.set()
+        release.wait(timeout=2)
+        return b"tile"
+
+    results: list[bytes] = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", render)))
+    leader.start()
+    started.wait(timeout=2)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", render))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(timeout=2)
+
+    assert calls == [1]
+    assert results == [b"tile"] * 5
+    assert flight.stats() == {"leaders": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_single_flight_propagates_errors_and_resets() -> None:
+    flight = SingleFlight()
+
+    def boom() -> bytes:
+        raise RuntimeError("render failed")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", boom)
+    assert flight.do("k", lambda: b"ok") == b"ok"
+
+
+def test_redis_single_flight_waits_for_peer_result() -> None:
+    cache = FakeLockCache()
+    flight = RedisSingleFlight(cache, lease_ms=500, poll_interval_ms=5)  # type: ignore[arg-type]
+    key = ("parking_tickets", "14", "4577", "5980")
+    cache.locks[("lock", *key)] = "peer"
+
+    def peer_finishes() -> None:
+        time.sleep(0.02)
+        cache.values[key] = b"peer-tile"
+        del cache.locks[("lock", *key)]
+
+    threading.Thread(target=peer_finishes).start()
+    result = flight.do(key, lambda: b"own-render", lambda: cache.values.get(key))
+
+    assert result == b"peer-tile"
+    assert flight.stats()["served_from_peer"] == 1
+    assert flight.stats()["fallback_renders"] == 0
+
+
+def test_redis_single_flight_renders_when_lease_released_without_result() -> None:
+    cache = FakeLockCache()
+    flight = RedisSingleFlight(cache, lease_ms=500, poll_interval_ms=5)  # type: ignore[arg-type]
+    key = ("ase_locations", "3", "2", "2")
+
+    assert flight.do(key, lambda: b"rendered", lambda: None) == b"rendered"
+    assert flight.stats()["leases_acquired"] == 1
+    assert cache.locks == {}
+
+
+def test_redis_single_flight_shares_empty_results_without_rendering() -> None:
+    cache = FakeLockCache()
+    leader = RedisSingleFlight(cache, lease_ms=500, poll_interval_ms=5)  # type: ignore[arg-type]
+    key = ("parking_tickets", "16", "18310", "23921")
+    renders: list[str] = []
+
+    assert leader.do(key, lambda: renders.append("leader"), lambda: None) is None
+    assert cache.values[("empty", *key)] == b"1"
+    assert cache.locks == {}
+
+    # Later misses in any worker skip the render while the marker lives.
+    assert leader.do(key, lambda: renders.append("again") or b"own", lambda: None) is None
+    assert renders == ["leader"]
+    assert leader.stats()["served_empty"] == 1
+
+
+def test_redis_single_flight_follower_returns_peer_empty_result() -> None:
+    cache = FakeLockCache()
+    follower = RedisSingleFlight(cache, lease_ms=500, poll_interval_ms=5)  # type: ignore[arg-type]
+    key = ("parking_tickets", "16", "18310", "23922")
+    cache.locks[("lock", *key)] = "peer"
+
+    def peer_finds_nothing() -> None:
+        time.sleep(0.02)
+        cache.values[("empty", *key)] = b"1"
+        del cache.locks[("lock", *key)]
+
+    threading.Thread(target=peer_finds_nothing).start()
+    result = follower.do(key, lambda: b"own-render", lambda: None)
+
+    assert result is None
+    assert follower.stats()["served_empty"] == 1
+    assert follower.stats()["fallback_renders"] == 0